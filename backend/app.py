@@ -1,19 +1,184 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from controllers.slice_controller import create_slice
+import argparse
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from fastapi import Body, FastAPI, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from controllers.slice_controller import SliceConflictError, SliceNotFoundError, create_slice_service
+from models.slice_model import BulkCreateRequest, BulkDeleteRequest, slice_request_from_profile
+from utils.nsmf_client import CircuitOpenError, NSMFError
 
-app = Flask(__name__)
-CORS(app)
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 
-app = Flask(__name__)
-CORS(app)
 
-@app.route('/api/slice', methods=['POST'])
-def handle_create_slice():
-    data = request.json
-    response = create_slice(data)
-    return jsonify(response), 201
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Un service par worker : orchestrateur en processus, ou client NSMF avec son pool de connexions
+    app.state.service = create_slice_service()
+    try:
+        yield
+    finally:
+        await app.state.service.close()
+
+
+app = FastAPI(title="Slice Orchestrator API", lifespan=lifespan)
+app.add_middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+
+
+@app.exception_handler(SliceNotFoundError)
+async def handle_not_found(request: Request, error: SliceNotFoundError) -> JSONResponse:
+    return JSONResponse({'detail': str(error)}, status_code=404)
+
+
+@app.exception_handler(SliceConflictError)
+async def handle_conflict(request: Request, error: SliceConflictError) -> JSONResponse:
+    return JSONResponse({'detail': str(error)}, status_code=409)
+
+
+@app.exception_handler(NSMFError)
+async def handle_unavailable(request: Request, error: NSMFError) -> JSONResponse:
+    # NSMF distant injoignable, trop lent ou disjoncté : l'appelant peut réessayer plus tard
+    headers = {}
+    if isinstance(error, CircuitOpenError):
+        headers['Retry-After'] = str(max(1, round(request.app.state.service.client.breaker.retry_after())))
+    return JSONResponse({'detail': str(error)}, status_code=503, headers=headers)
+
+
+@app.exception_handler(ValueError)
+async def handle_invalid(request: Request, error: ValueError) -> JSONResponse:
+    return JSONResponse({'detail': str(error)}, status_code=400)
+
+
+@app.get('/healthz')
+async def health() -> Dict[str, str]:
+    return {'status': 'ok'}
+
+
+@app.post('/api/slice', status_code=201)
+async def create_slice(request: Request, data: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+    # L'interface web (SlicingForm) envoie un {'SliceProfile': ...} : traduit en requête de slice
+    if 'SliceProfile' in data:
+        data = slice_request_from_profile(data['SliceProfile'])
+    return await request.app.state.service.create_slice(data)
+
+
+@app.get('/api/slices')
+async def list_slices(request: Request, offset: int = Query(0, ge=0), limit: Optional[int] = Query(100, ge=0, le=1000),
+                      slice_type: Optional[str] = None, slice_differentiator: Optional[str] = None,
+                      status: Optional[str] = None, owner: Optional[str] = None) -> Dict[str, Any]:
+    filters = {'slice_type': slice_type, 'slice_differentiator': slice_differentiator, 'status': status, 'owner': owner}
+    return await request.app.state.service.list_slices(
+        offset, limit, **{field: value for field, value in filters.items() if value is not None})
+
+
+@app.post('/api/slices/bulk')
+async def create_slices(request: Request, bulk: BulkCreateRequest) -> Dict[str, Any]:
+    # Un résultat par slice, dans l'ordre : {'status': 'success', 'slice_id'} ou {'status': 'failed', 'error'}
+    return {'results': await request.app.state.service.create_slices(bulk.slices)}
+
+
+@app.post('/api/slices/bulk-delete')
+async def delete_slices(request: Request, bulk: BulkDeleteRequest) -> Dict[str, Any]:
+    return {'results': await request.app.state.service.delete_slices(bulk.slice_ids)}
 
-if __name__ == '__main__':
-    app.run(debug=True, port=5000)
 
+@app.get('/api/slice/{slice_id}')
+async def get_slice(request: Request, slice_id: str) -> Dict[str, Any]:
+    return await request.app.state.service.get_slice(slice_id)
+
+
+@app.get('/api/slice/{slice_id}/status')
+async def get_slice_status(request: Request, slice_id: str) -> Dict[str, Any]:
+    return await request.app.state.service.get_slice_status(slice_id)
+
+
+@app.put('/api/slice/{slice_id}')
+async def modify_slice(request: Request, slice_id: str, modification: Dict[str, Any] = Body(...),
+                       expected_version: Optional[int] = Query(None, ge=1)) -> Dict[str, Any]:
+    # `expected_version` : contrôle optimiste, 409 si la slice a changé entre-temps
+    return await request.app.state.service.modify_slice(slice_id, modification, expected_version)
+
+
+@app.delete('/api/slice/{slice_id}', status_code=204)
+async def delete_slice(request: Request, slice_id: str, expected_version: Optional[int] = Query(None, ge=1)) -> Response:
+    await request.app.state.service.delete_slice(slice_id, expected_version)
+    return Response(status_code=204)
+
+
+def parse_event_types(types: Optional[str]) -> List[str]:
+    # "slice.created,vnf.released" -> ['slice.created', 'vnf.released']
+    return [t.strip() for t in (types or '').split(',') if t.strip()]
+
+
+@app.get('/api/events')
+async def stream_events(request: Request, types: Optional[str] = None, slice_id: Optional[str] = None) -> Response:
+    # Server-Sent Events : un événement par message, `id` = séquence du bus (un trou signale des pertes)
+    batches = request.app.state.service.events(parse_event_types(types), slice_id)
+    try:
+        await batches.__anext__()  # Abonnement confirmé : les erreurs deviennent des réponses HTTP
+    except BaseException:
+        await batches.aclose()
+        raise
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            yield ': connected\n\n'
+            async for batch in batches:
+                if await request.is_disconnected():
+                    break
+                if not batch:
+                    yield ': keepalive\n\n'
+                    continue
+                yield ''.join(f"id: {event['sequence']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                              for event in batch)
+        finally:
+            await batches.aclose()
+
+    return StreamingResponse(body(), media_type='text/event-stream',
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.websocket('/api/events/ws')
+async def events_socket(websocket: WebSocket, types: Optional[str] = None, slice_id: Optional[str] = None) -> None:
+    # Même flux en WebSocket : un message JSON par événement, {'type': 'keepalive'} en l'absence d'événement
+    try:
+        batches = websocket.app.state.service.events(parse_event_types(types), slice_id)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    await websocket.accept()
+    try:
+        async for batch in batches:
+            for event in batch or [{'type': 'keepalive'}]:
+                await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    except (NSMFError, ValueError) as e:  # NSMF distant indisponible ou filtre refusé
+        await websocket.close(code=1011 if isinstance(e, NSMFError) else 1008, reason=str(e))
+    finally:
+        await batches.aclose()
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the slice orchestrator REST API")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes; more than one requires NSMF_URL (remote NSMF)")
+    args = parser.parse_args()
+
+    # L'orchestrateur en processus garde l'état des slices en mémoire : plusieurs
+    # workers auraient chacun leur propre inventaire
+    if args.workers > 1 and not os.environ.get('NSMF_URL'):
+        parser.error("--workers > 1 requires NSMF_URL; run a single in-process orchestrator instance "
+                     "and point the workers at it")
+    uvicorn.run('app:app', host=args.host, port=args.port, workers=args.workers, app_dir=BACKEND_DIR,
+                log_level='warning', access_log=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,264 @@
-from models.slice_model import Slice
-from utils.api_utils import send_request_to_nsmf
-
-def create_slice(data):
-    slice = Slice(**data)
-    # Ajoutez la logique métier ici si nécessaire
-    response = send_request_to_nsmf(slice)
-    return response
+import asyncio
+import json
+import os
+import sys
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+import httpx
+from utils.api_utils import create_nsmf_client
+from utils.nsmf_client import NSMFClient, NSMFError
+
+# Les composants d'orchestration sont des modules à plat dans component/slice_orchestrator
+ORCHESTRATOR_PATH = os.environ.get('SLICE_ORCHESTRATOR_PATH', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'component', 'slice_orchestrator'))
+DEFAULT_TEMPLATE = os.path.join('config', 'network_slice_templates', 'gst_template2.json')
+# Taille de la file d'un abonné aux événements ; au-delà, les plus anciens sont écartés
+EVENT_QUEUE_SIZE = 1000
+# Intervalle maximal entre deux lots d'événements : un lot vide sert de signal de vie
+EVENT_HEARTBEAT = 15.0
+# Champs sans valeur par défaut dans le GST : une requête qui les omet est rejetée (400)
+REQUIRED_SLICE_FIELDS = ('slice_type', 'qos', 'resources')
+
+
+class SliceNotFoundError(LookupError):
+    pass
+
+
+class SliceConflictError(RuntimeError):
+    pass
+
+
+class LocalSliceService:
+    """Orchestrateur hébergé dans le processus de l'API.
+
+    L'état des slices vit dans ce processus : un seul worker doit l'héberger.
+    Les opérations passent par le LifecycleEngine de l'orchestrateur et sont
+    attendues sans bloquer la boucle d'événements (`await job`).
+    """
+
+    def __init__(self, template_path: Optional[str] = None, ip_pools: Sequence[str] = ()):
+        if ORCHESTRATOR_PATH not in sys.path:
+            sys.path.insert(0, ORCHESTRATOR_PATH)
+        from slice_orchestrator import SliceOrchestrator
+        from slice_locks import VersionConflictError
+        from csmf import CSMF
+        from nsmf import NSMF
+        from nssmf import CoreNSSMF
+        from slice_events import EventBus
+
+        self._conflict_type = VersionConflictError
+        self.event_bus = EventBus(EVENT_QUEUE_SIZE)
+        self.orchestrator = SliceOrchestrator()
+        self.csmf = CSMF(template_path or os.path.join(ORCHESTRATOR_PATH, DEFAULT_TEMPLATE))
+        nssmf = CoreNSSMF(events=self.event_bus)
+        for cidr in ip_pools:
+            nssmf.nfvo.add_ip_pool(cidr)  # Pools d'adresses VNF supplémentaires (site par défaut)
+        self.orchestrator.set_components(self.csmf, NSMF(events=self.event_bus), nssmf)
+        self.csmf.set_slice_orchestrator(self.orchestrator)
+
+    async def close(self) -> None:
+        self.orchestrator.lifecycle.shutdown()
+
+    async def create_slice(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        missing = [field for field in REQUIRED_SLICE_FIELDS if request.get(field) is None]
+        if missing:
+            raise ValueError(f"Missing required slice fields: {', '.join(missing)}")
+        slice_id = await self._run(self.orchestrator.create_slice_async(request))
+        return self._details(slice_id)
+
+    async def create_slices(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return await self._run(self.orchestrator.create_slices_async(requests))
+
+    async def modify_slice(self, slice_id: str, modification: Dict[str, Any],
+                           expected_version: Optional[int] = None) -> Dict[str, Any]:
+        await self._run(self._submit(self.orchestrator.modify_slice_async, slice_id, modification, expected_version))
+        return self._details(slice_id)
+
+    async def delete_slice(self, slice_id: str, expected_version: Optional[int] = None) -> None:
+        await self._run(self._submit(self.orchestrator.delete_slice_async, slice_id, expected_version))
+
+    async def delete_slices(self, slice_ids: List[str]) -> List[Dict[str, Any]]:
+        # Suppressions concurrentes ; un résultat par slice, dans l'ordre
+        outcomes = await asyncio.gather(*(self.delete_slice(slice_id) for slice_id in slice_ids),
+                                        return_exceptions=True)
+        return [{'status': 'failed', 'slice_id': slice_id, 'error': str(outcome)} if isinstance(outcome, Exception)
+                else {'status': 'success', 'slice_id': slice_id}
+                for slice_id, outcome in zip(slice_ids, outcomes)]
+
+    async def get_slice(self, slice_id: str) -> Dict[str, Any]:
+        return self._details(slice_id)
+
+    async def get_slice_status(self, slice_id: str) -> Dict[str, Any]:
+        return self._status(slice_id, self._record(slice_id))
+
+    async def list_slices(self, offset: int = 0, limit: Optional[int] = None, **filters: Any) -> Dict[str, Any]:
+        page = self.orchestrator.query_slices(offset, limit, **filters)
+        records = ((slice_id, self.orchestrator.slices.get(slice_id)) for slice_id in page['slice_ids'])
+        return {
+            'slices': [self._status(slice_id, record) for slice_id, record in records if record is not None],
+            'total': page['total'],
+            'next_offset': page['next_offset']
+        }
+
+    def events(self, types: Sequence[str] = (), slice_id: Optional[str] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        # L'abonnement est pris immédiatement (types inconnus : ValueError avant le début du flux)
+        subscription = self.event_bus.subscribe(types or None, slice_id)
+        return self._event_batches(subscription)
+
+    @staticmethod
+    async def _event_batches(subscription) -> AsyncIterator[List[Dict[str, Any]]]:
+        # Lots d'événements sérialisables ; le premier lot, vide, confirme l'abonnement,
+        # puis un lot vide après EVENT_HEARTBEAT secondes sans événement
+        try:
+            yield []
+            while not subscription.closed:
+                events = await subscription.get_many_async(timeout=EVENT_HEARTBEAT)
+                yield [event.to_dict() for event in events]
+        finally:
+            subscription.close()
+
+    def _record(self, slice_id: str) -> Dict[str, Any]:
+        record = self.orchestrator.slices.get(slice_id)
+        if record is None:
+            raise SliceNotFoundError(f"Slice {slice_id} not found")
+        return record
+
+    @staticmethod
+    def _status(slice_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {'slice_id': slice_id, 'status': record['status'].name, 'version': record['version']}
+
+    def _details(self, slice_id: str) -> Dict[str, Any]:
+        record = self._record(slice_id)
+        details = self._status(slice_id, record)
+        details['request'] = record['request']
+        if 'error' in record:
+            details['error'] = record['error']
+        return details
+
+    def _submit(self, submit, slice_id: str, *args: Any):
+        # Les erreurs levées à la soumission (slice absente, version périmée) sont traduites comme celles du job
+        try:
+            return submit(slice_id, *args)
+        except Exception as e:
+            self._raise(e)
+
+    async def _run(self, job) -> Any:
+        try:
+            return await job
+        except Exception as e:
+            self._raise(e)
+        finally:
+            self.orchestrator.lifecycle.forget_job(job.job_id)
+
+    def _raise(self, error: Exception) -> None:
+        if isinstance(error, self._conflict_type):
+            raise SliceConflictError(str(error)) from error
+        if isinstance(error, ValueError) and 'not found' in str(error):
+            raise SliceNotFoundError(str(error)) from error
+        raise error
+
+
+class RemoteSliceService:
+    """Client d'un NSMF distant (par ex. une autre instance de cette API en mode local).
+
+    Toutes les requêtes d'un worker passent par un même NSMFClient : pool de
+    connexions keep-alive, délais, retries et disjoncteur.
+    """
+
+    def __init__(self, client: NSMFClient):
+        self.client = client
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def create_slice(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._call('POST', '/slice', json=request)
+
+    async def create_slices(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return (await self._call('POST', '/slices/bulk', json={'slices': requests}))['results']
+
+    async def modify_slice(self, slice_id: str, modification: Dict[str, Any],
+                           expected_version: Optional[int] = None) -> Dict[str, Any]:
+        return await self._call('PUT', f'/slice/{slice_id}', json=modification,
+                                params=self._version_params(expected_version))
+
+    async def delete_slice(self, slice_id: str, expected_version: Optional[int] = None) -> None:
+        await self._call('DELETE', f'/slice/{slice_id}', params=self._version_params(expected_version))
+
+    async def delete_slices(self, slice_ids: List[str]) -> List[Dict[str, Any]]:
+        return (await self._call('POST', '/slices/bulk-delete', json={'slice_ids': slice_ids}))['results']
+
+    async def get_slice(self, slice_id: str) -> Dict[str, Any]:
+        return await self._call('GET', f'/slice/{slice_id}')
+
+    async def get_slice_status(self, slice_id: str) -> Dict[str, Any]:
+        return await self._call('GET', f'/slice/{slice_id}/status')
+
+    async def list_slices(self, offset: int = 0, limit: Optional[int] = None, **filters: Any) -> Dict[str, Any]:
+        params = {'offset': offset, **filters}
+        if limit is not None:
+            params['limit'] = limit
+        return await self._call('GET', '/slices', params=params)
+
+    def events(self, types: Sequence[str] = (), slice_id: Optional[str] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        # Relais du flux SSE du NSMF distant, au même format que LocalSliceService.events
+        params = {}
+        if types:
+            params['types'] = ','.join(types)
+        if slice_id is not None:
+            params['slice_id'] = slice_id
+        return self._relay_events(params)
+
+    async def _relay_events(self, params: Dict[str, str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        async with self.client.stream('/events', params=params) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                self._check(response)
+            yield []
+            data = []
+            async for line in response.aiter_lines():
+                if line.startswith('data:'):
+                    data.append(line[5:].strip())
+                elif line.startswith(':'):
+                    yield []  # Signal de vie du NSMF
+                elif not line and data:
+                    yield [json.loads('\n'.join(data))]
+                    data = []
+
+    @staticmethod
+    def _version_params(expected_version: Optional[int]) -> Dict[str, int]:
+        return {} if expected_version is None else {'expected_version': expected_version}
+
+    async def _call(self, method: str, path: str, **kwargs: Any) -> Any:
+        if method == 'GET':
+            response = await self.client.get(path, **kwargs)
+        else:
+            response = await self.client.request(method, path, **kwargs)
+        self._check(response)
+        return response.json() if response.content else None
+
+    def _check(self, response: httpx.Response) -> None:
+        if response.status_code == 404:
+            raise SliceNotFoundError(self._detail(response))
+        if response.status_code == 409:
+            raise SliceConflictError(self._detail(response))
+        if response.status_code in (400, 422):
+            raise ValueError(self._detail(response))
+        if response.status_code >= 500:
+            raise NSMFError(f"NSMF answered {response.status_code}: {self._detail(response)}")
+        response.raise_for_status()
+
+    @staticmethod
+    def _detail(response: httpx.Response) -> str:
+        try:
+            return response.json().get('detail', response.text)
+        except ValueError:
+            return response.text
+
+
+def create_slice_service() -> Any:
+    # NSMF_URL désigne un NSMF distant (ex. http://localhost:8000/nsmf/api) ; sans lui, orchestrateur en processus
+    nsmf_url = os.environ.get('NSMF_URL')
+    if nsmf_url:
+        return RemoteSliceService(create_nsmf_client(nsmf_url))
+    ip_pools = [cidr.strip() for cidr in os.environ.get('SLICE_IP_POOLS', '').split(',') if cidr.strip()]
+    return LocalSliceService(os.environ.get('GST_TEMPLATE_PATH'), ip_pools)
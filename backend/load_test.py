@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List
+import httpx
+
+# Requête de référence, conforme au template GST du CSMF
+SLICE_REQUEST = {
+    "slice_type": "eMBB",
+    "slice_differentiator": "000001",
+    "qos": {
+        "latency": {"value": 10, "unit": "ms"},
+        "throughput": {"value": 100, "unit": "Mbps"},
+        "reliability": {"value": 99.9, "unit": "%"}
+    },
+    "resources": {
+        "cpu": {"value": 1, "unit": "vCPUs"},
+        "memory": {"value": 512, "unit": "MB"},
+        "storage": {"value": 20, "unit": "GB"},
+        "bandwidth": {"value": 100, "unit": "Mbps"}
+    }
+}
+# Mélange d'opérations par défaut (poids relatifs)
+DEFAULT_MIX = {'create': 2, 'get': 5, 'status': 5, 'list': 2, 'delete': 1}
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_load(base_url: str, concurrency: int, duration: float, mix: Dict[str, int],
+                   preload: int = 50) -> Dict[str, Any]:
+    """Charge l'API avec `concurrency` clients pendant `duration` secondes.
+
+    Retourne le débit global et, par opération, le nombre de requêtes, les
+    erreurs et les latences p50/p99 (en millisecondes).
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url.rstrip('/'), limits=limits, timeout=30.0) as client:
+        response = await client.post('/api/slices/bulk', json={'slices': [SLICE_REQUEST] * preload})
+        response.raise_for_status()
+        slice_ids = [r['slice_id'] for r in response.json()['results'] if r['status'] == 'success']
+
+        operations, weights = zip(*mix.items())
+        latencies: Dict[str, List[float]] = {operation: [] for operation in operations}
+        errors: Dict[str, int] = {operation: 0 for operation in operations}
+        deadline = time.perf_counter() + duration
+
+        async def request(operation: str) -> httpx.Response:
+            if operation == 'create':
+                return await client.post('/api/slice', json=SLICE_REQUEST)
+            if operation == 'list':
+                return await client.get('/api/slices', params={'limit': 50})
+            if not slice_ids:
+                return await client.get('/api/slices', params={'limit': 1})
+            slice_id = random.choice(slice_ids)
+            if operation == 'get':
+                return await client.get(f'/api/slice/{slice_id}')
+            if operation == 'status':
+                return await client.get(f'/api/slice/{slice_id}/status')
+            slice_ids.remove(slice_id)
+            return await client.delete(f'/api/slice/{slice_id}')
+
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                operation = random.choices(operations, weights)[0]
+                start = time.perf_counter()
+                try:
+                    response = await request(operation)
+                    # Un 404 sur une lecture signale une slice supprimée entre-temps par un autre client
+                    failed = response.status_code >= 400 and not (response.status_code == 404 and operation != 'delete')
+                    if operation == 'create' and not failed:
+                        slice_ids.append(response.json()['slice_id'])
+                except httpx.HTTPError:
+                    failed = True
+                latencies[operation].append(time.perf_counter() - start)
+                if failed:
+                    errors[operation] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    total = sum(len(values) for values in latencies.values())
+    return {
+        'base_url': base_url,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'requests': total,
+        'requests_per_sec': round(total / elapsed, 1),
+        'errors': sum(errors.values()),
+        'operations': {
+            operation: {
+                'requests': len(values),
+                'errors': errors[operation],
+                'p50_ms': round(percentile(values, 0.5) * 1000, 2),
+                'p99_ms': round(percentile(values, 0.99) * 1000, 2)
+            } for operation, values in latencies.items()
+        }
+    }
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    # "create=2,get=5" -> {'create': 2, 'get': 5}
+    mix = {}
+    for item in filter(None, spec.split(',')):
+        operation, _, weight = item.partition('=')
+        if operation not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation: {operation}")
+        mix[operation] = int(weight or 1)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test of the slice orchestrator REST API")
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=30.0, help="seconds")
+    parser.add_argument('--mix', default=','.join(f"{op}={w}" for op, w in DEFAULT_MIX.items()))
+    parser.add_argument('--preload', type=int, default=50, help="slices created before the measurement")
+    parser.add_argument('--output', help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args.url, args.concurrency, args.duration, parse_mix(args.mix), args.preload))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
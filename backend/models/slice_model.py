@@ -1,4 +1,74 @@
-class Slice:
-    def __init__(self, SliceProfile, SliceSubnet):
-        self.SliceProfile = SliceProfile
-        self.SliceSubnet = SliceSubnet
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+MAX_BULK_SIZE = 1000
+
+# SST normalisés (3GPP TS 23.501) -> type de slice du GST
+SST_SLICE_TYPES = {'1': 'eMBB', '2': 'URLLC', '3': 'mMTC'}
+# Unités du formulaire SliceProfile -> unités du GST (MB, GB)
+MEMORY_TO_MB = {'MB': 1, 'GB': 1024}
+STORAGE_TO_GB = {'GB': 1, 'TB': 1024}
+
+
+class BulkCreateRequest(BaseModel):
+    slices: List[Dict[str, Any]] = Field(..., min_length=1, max_length=MAX_BULK_SIZE)
+
+
+class BulkDeleteRequest(BaseModel):
+    slice_ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_SIZE)
+
+
+def _number(value: Any, field: str) -> Optional[float]:
+    # Les champs du formulaire arrivent en chaînes ; vide = non renseigné
+    if value is None or value == '':
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid number for {field}: {value!r}")
+    return int(number) if number.is_integer() else number
+
+
+def _measure(value: Any, unit: str, field: str, scale: float = 1) -> Optional[Dict[str, Any]]:
+    number = _number(value, field)
+    return None if number is None else {'value': number * scale, 'unit': unit}
+
+
+def slice_request_from_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Traduit le SliceProfile du formulaire de l'interface web en requête de slice (GST)."""
+    snssai = profile.get('snssai') or {}
+    sst = str(profile.get('sST') or snssai.get('sst') or '').strip()
+    slice_type = SST_SLICE_TYPES.get(sst, sst)
+    if slice_type not in SST_SLICE_TYPES.values():
+        raise ValueError(f"Unsupported slice service type: {sst!r}")
+
+    latency = profile.get('latency') or {}
+    throughput = profile.get('dlThptPerUE') or {}
+    qos = {
+        'latency': _measure(latency.get('latencyTime'), latency.get('latencyUnit') or 'ms', 'latency'),
+        'throughput': _measure(throughput.get('value'), throughput.get('unit') or 'Mbps', 'dlThptPerUE'),
+        'reliability': _measure(profile.get('reliability'), '%', 'reliability')
+    }
+
+    resources = profile.get('resources') or {}
+    cpu = resources.get('cpu') or {}
+    memory = resources.get('memory') or {}
+    storage = resources.get('storage') or {}
+    memory_unit = memory.get('unit') or 'MB'
+    storage_unit = storage.get('unit') or 'GB'
+    if memory_unit not in MEMORY_TO_MB or storage_unit not in STORAGE_TO_GB:
+        raise ValueError(f"Unsupported resource units: {memory_unit}, {storage_unit}")
+    slice_resources = {
+        'cpu': _measure(cpu.get('value'), 'vCPUs', 'cpu'),
+        'memory': _measure(memory.get('value'), 'MB', 'memory', MEMORY_TO_MB[memory_unit]),
+        'storage': _measure(storage.get('value'), 'GB', 'storage', STORAGE_TO_GB[storage_unit])
+    }
+
+    request = {
+        'slice_type': slice_type,
+        'qos': {name: value for name, value in qos.items() if value is not None},
+        'resources': {name: value for name, value in slice_resources.items() if value is not None}
+    }
+    if snssai.get('sd'):
+        request['slice_differentiator'] = str(snssai['sd'])
+    return request
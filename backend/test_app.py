@@ -0,0 +1,124 @@
+import os
+import sys
+import unittest
+import httpx
+from fastapi.testclient import TestClient
+from app import app
+from controllers.slice_controller import ORCHESTRATOR_PATH, RemoteSliceService
+from utils.nsmf_client import NSMFClient
+
+if ORCHESTRATOR_PATH not in sys.path:
+    sys.path.insert(0, ORCHESTRATOR_PATH)
+from test_slice_lifecycle import SLICE_REQUEST
+
+class TestSliceAPI(unittest.TestCase):
+    def setUp(self):
+        os.environ.pop('NSMF_URL', None)  # Orchestrateur en processus
+        self.client = TestClient(app)
+        self.client.__enter__()  # Exécute le lifespan : un service neuf par test
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+
+    def create(self, **overrides):
+        response = self.client.post('/api/slice', json=dict(SLICE_REQUEST, **overrides))
+        self.assertEqual(response.status_code, 201, response.text)
+        return response.json()
+
+    def test_crud(self):
+        created = self.create()
+        slice_id = created['slice_id']
+        self.assertEqual((created['status'], created['version']), ('ACTIVE', 1))
+        self.assertEqual(self.client.get(f'/api/slice/{slice_id}').json()['request'], SLICE_REQUEST)
+
+        response = self.client.put(f'/api/slice/{slice_id}', json={'slice_differentiator': '000002'})
+        self.assertEqual(response.status_code, 200, response.text)
+        modified = response.json()
+        self.assertEqual(modified['version'], 2)
+        self.assertEqual(modified['request'], dict(SLICE_REQUEST, slice_differentiator='000002'))
+        self.assertEqual(self.client.get(f'/api/slice/{slice_id}').json(), modified)
+        self.assertEqual(self.client.get('/api/slices', params={'slice_differentiator': '000002'}).json()['total'], 1)
+
+        self.assertEqual(self.client.delete(f'/api/slice/{slice_id}').status_code, 204)
+        self.assertEqual(self.client.get(f'/api/slice/{slice_id}').status_code, 404)
+
+    def test_list_filters(self):
+        embb = [self.create()['slice_id'] for _ in range(3)]
+        urllc = self.create(slice_type='URLLC')['slice_id']
+
+        page = self.client.get('/api/slices', params={'slice_type': 'eMBB', 'limit': 2}).json()
+        self.assertEqual((page['total'], len(page['slices']), page['next_offset']), (3, 2, 2))
+        self.assertTrue({s['slice_id'] for s in page['slices']} <= set(embb))
+        page = self.client.get('/api/slices', params={'slice_type': 'URLLC', 'status': 'ACTIVE'}).json()
+        self.assertEqual([s['slice_id'] for s in page['slices']], [urllc])
+        self.assertEqual(self.client.get('/api/slices', params={'status': 'ERROR'}).json()['total'], 0)
+
+    def test_bulk_operations(self):
+        response = self.client.post('/api/slices/bulk', json={'slices': [SLICE_REQUEST, {'slice_type': 'bogus'}]})
+        self.assertEqual(response.status_code, 200, response.text)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['success', 'failed'])
+        self.assertIn('slice_type', results[1]['error'])
+
+        response = self.client.post('/api/slices/bulk-delete', json={'slice_ids': [results[0]['slice_id'], 'unknown']})
+        self.assertEqual([r['status'] for r in response.json()['results']], ['success', 'failed'])
+        self.assertEqual(self.client.get('/api/slices').json()['total'], 0)
+        self.assertEqual(self.client.post('/api/slices/bulk', json={'slices': []}).status_code, 422)
+
+    def test_slicing_form_payload(self):
+        # Corps envoyé par slicing-frontend/src/components/SlicingForm.js : champs du formulaire en chaînes
+        profile = {
+            'sST': '1', 'sliceProfileId': 'profile-1', 'plmnIdList': [{'mcc': '208', 'mnc': '95'}],
+            'snssai': {'sst': '1', 'sd': '000001'}, 'sliceProfileName': 'video', 'description': '',
+            'maxNumberofUEs': '100', 'coverageAreaTAList': ['1'],
+            'latency': {'latencyTime': '10', 'latencyUnit': 'ms'},
+            'ulThptPerUE': {'value': '50', 'unit': 'Mbps'}, 'dlThptPerUE': {'value': '100', 'unit': 'Mbps'},
+            'availability': '99.9', 'reliability': '99.9', 'packetDelayBudget': '', 'maxNumberofConns': '',
+            'resources': {'cpu': {'value': '4', 'unit': 'vCPUs'}, 'memory': {'value': '4', 'unit': 'GB'},
+                          'storage': {'value': '1', 'unit': 'TB'}}
+        }
+        response = self.client.post('/api/slice', json={'SliceProfile': profile})
+        self.assertEqual(response.status_code, 201, response.text)
+        request = response.json()['request']
+        self.assertEqual((request['slice_type'], request['slice_differentiator']), ('eMBB', '000001'))
+        self.assertEqual(request['qos'], {'latency': {'value': 10, 'unit': 'ms'},
+                                          'throughput': {'value': 100, 'unit': 'Mbps'},
+                                          'reliability': {'value': 99.9, 'unit': '%'}})
+        self.assertEqual(request['resources'], {'cpu': {'value': 4, 'unit': 'vCPUs'},
+                                                'memory': {'value': 4096, 'unit': 'MB'},
+                                                'storage': {'value': 1024, 'unit': 'GB'}})
+
+        empty = dict(profile, sST='', snssai={'sst': '', 'sd': ''})
+        self.assertEqual(self.client.post('/api/slice', json={'SliceProfile': empty}).status_code, 400)
+        bad = dict(profile, resources=dict(profile['resources'], cpu={'value': 'four', 'unit': 'vCPUs'}))
+        self.assertEqual(self.client.post('/api/slice', json={'SliceProfile': bad}).status_code, 400)
+
+    def test_error_mapping(self):
+        self.assertEqual(self.client.get('/api/slice/unknown').status_code, 404)
+        self.assertEqual(self.client.put('/api/slice/unknown', json={'priority': 2}).status_code, 404)
+        self.assertEqual(self.client.post('/api/slice', json=dict(SLICE_REQUEST, slice_type='bogus')).status_code, 400)
+        response = self.client.post('/api/slice', json={'slice_type': 'eMBB'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['detail'], "Missing required slice fields: qos, resources")
+
+        slice_id = self.create()['slice_id']
+        self.client.put(f'/api/slice/{slice_id}', json={'priority': 2})
+        response = self.client.put(f'/api/slice/{slice_id}', json={'priority': 3}, params={'expected_version': 1})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.delete(f'/api/slice/{slice_id}', params={'expected_version': 1}).status_code, 409)
+        self.assertEqual(self.client.get(f'/api/slice/{slice_id}/status').json()['status'], 'ACTIVE')
+
+    def test_unavailable_nsmf(self):
+        # NSMF distant surchargé : 503 après le dernier essai
+        local = app.state.service
+        transport = httpx.MockTransport(lambda request: httpx.Response(503, json={'detail': 'overloaded'}))
+        app.state.service = RemoteSliceService(NSMFClient('http://nsmf/nsmf/api', retries=0, transport=transport))
+        try:
+            response = self.client.get('/api/slice/any')
+            self.assertEqual(response.status_code, 503)
+            self.assertIn('overloaded', response.json()['detail'])
+        finally:
+            app.state.service = local
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.nsmf_client import CircuitBreaker, CircuitOpenError, DeadlineExceededError, NSMFClient, NSMFError
+
+class StubNSMF(ThreadingHTTPServer):
+    # NSMF factice : compte connexions et requêtes, peut échouer ou ralentir sur commande
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.connections = 0
+        self.hits = {}
+        self.failures = 0  # Nombre de prochaines requêtes répondues en 503
+        self.delay = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/nsmf/api"
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length)) if length else None
+        with self.server.lock:
+            key = f"{self.command} {self.path}"
+            self.server.hits[key] = self.server.hits.get(key, 0) + 1
+            failing = self.server.failures > 0
+            self.server.failures -= failing
+        time.sleep(self.server.delay)
+        status, payload = (503, {'detail': 'overloaded'}) if failing else (200, {'path': self.path, 'body': body})
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+class TestNSMFClient(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = StubNSMF()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def client(self, **kwargs):
+        kwargs.setdefault('backoff', 0.01)
+        return NSMFClient(self.server.url, http2=False, **kwargs)
+
+    async def test_connections_are_kept_alive(self):
+        async with self.client(max_connections=2) as client:
+            for index in range(20):
+                response = await client.post('/slice', json={'index': index})
+                self.assertEqual(response.json()['body'], {'index': index})
+        self.assertEqual(self.server.connections, 1)
+
+    async def test_idempotent_calls_are_retried(self):
+        self.server.failures = 2
+        async with self.client() as client:
+            response = await client.put('/slice/abc', json={})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits['PUT /nsmf/api/slice/abc'], 3)
+        self.assertEqual(client.stats['retries'], 2)
+
+    async def test_post_is_not_retried_once_sent(self):
+        self.server.failures = 1
+        async with self.client() as client:
+            response = await client.post('/slice', json={})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits['POST /nsmf/api/slice'], 1)
+
+    async def test_unreachable_nsmf_raises(self):
+        self.server.shutdown()
+        self.server.server_close()
+        async with NSMFClient(self.server.url, http2=False, retries=1, backoff=0.01) as client:
+            with self.assertRaises(NSMFError):
+                await client.post('/slice', json={})
+            self.assertEqual(client.stats['requests'], 2)  # Connexion refusée : requête non émise, donc rejouée
+
+    async def test_deadline_bounds_the_call(self):
+        self.server.delay = 0.5
+        async with self.client() as client:
+            start = time.monotonic()
+            with self.assertRaises(DeadlineExceededError):
+                await client.get('/slices', deadline=0.2)
+            self.assertLess(time.monotonic() - start, 0.45)
+
+    async def test_identical_gets_are_coalesced(self):
+        self.server.delay = 0.1
+        async with self.client() as client:
+            responses = await asyncio.gather(*(client.get('/slices', params={'limit': 10}) for _ in range(10)),
+                                             client.get('/slices', params={'limit': 20}))
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual(self.server.hits['GET /nsmf/api/slices?limit=10'], 1)
+        self.assertEqual(self.server.hits['GET /nsmf/api/slices?limit=20'], 1)
+        self.assertEqual(client.stats['coalesced'], 9)
+
+    async def test_circuit_breaker_fails_fast_then_recovers(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=lambda: now[0])
+        self.server.failures = 3
+        async with self.client(retries=0, breaker=breaker) as client:
+            for _ in range(3):
+                self.assertEqual((await client.get('/slice/abc')).status_code, 503)
+            with self.assertRaises(CircuitOpenError):
+                await client.get('/slice/abc')
+            self.assertEqual(self.server.hits['GET /nsmf/api/slice/abc'], 3)
+
+            now[0] = 11  # Fin du délai : un appel d'essai referme le circuit
+            self.assertEqual((await client.get('/slice/abc')).status_code, 200)
+            self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,16 @@
-import requests
+import os
+from typing import Optional
+from utils.nsmf_client import CircuitBreaker, NSMFClient
 
-def send_request_to_nsmf(slice):
-    url = 'http://localhost:8000/nsmf/api/slice'
-    headers = {'Content-Type': 'application/json'}
-    response = requests.post(url, json=slice.__dict__, headers=headers)
-    return response.json()
+
+def create_nsmf_client(base_url: Optional[str] = None) -> NSMFClient:
+    # Un client par worker, réglé par l'environnement ; remplace les requests.post sans pool ni délai
+    return NSMFClient(
+        base_url or os.environ.get('NSMF_URL', 'http://localhost:8000/nsmf/api'),
+        timeout=float(os.environ.get('NSMF_TIMEOUT', 5.0)),
+        deadline=float(os.environ.get('NSMF_DEADLINE', 15.0)),
+        retries=int(os.environ.get('NSMF_RETRIES', 3)),
+        max_connections=int(os.environ.get('NSMF_MAX_CONNECTIONS', 100)),
+        breaker=CircuitBreaker(failure_threshold=int(os.environ.get('NSMF_BREAKER_THRESHOLD', 5)),
+                               reset_timeout=float(os.environ.get('NSMF_BREAKER_RESET', 30.0)))
+    )
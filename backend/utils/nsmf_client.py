@@ -0,0 +1,237 @@
+import asyncio
+import importlib.util
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+import httpx
+
+# Méthodes rejouables sans risque de double effet
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+# Réponses d'un NSMF surchargé ou indisponible, rejouées (et comptées par le disjoncteur)
+RETRY_STATUSES = frozenset({502, 503, 504})
+# Erreurs garantissant que la requête n'a pas été émise : rejouables même pour un POST
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+class NSMFError(RuntimeError):
+    pass
+
+
+class CircuitOpenError(NSMFError):
+    pass
+
+
+class DeadlineExceededError(NSMFError):
+    pass
+
+
+class CircuitBreaker:
+    """Disjoncteur : après `failure_threshold` échecs consécutifs, les appels
+    échouent immédiatement pendant `reset_timeout` secondes, puis un seul
+    appel d'essai (état semi-ouvert) décide de la réouverture du circuit.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> None:
+        # Lève CircuitOpenError si l'appel doit être refusé sans toucher au réseau
+        if self.state == self.OPEN:
+            if self.clock() - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("NSMF circuit is open")
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                raise CircuitOpenError("NSMF circuit is half-open, trial call in flight")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+
+    def release(self) -> None:
+        # Appel abandonné sans verdict (annulation) : libère l'essai semi-ouvert
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        # Secondes avant le prochain appel d'essai (0 si le circuit laisse passer)
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+
+
+class NSMFClient:
+    """Client HTTP asynchrone du NSMF, partagé par toutes les requêtes d'un worker.
+
+    - pool borné de connexions keep-alive (HTTP/2 si le paquet `h2` est installé) ;
+    - `deadline` : budget total d'un appel, retries et attente du pool compris ;
+    - retries avec backoff exponentiel à gigue complète pour les méthodes
+      idempotentes (et pour toute requête qui n'a pas pu être émise) ;
+    - disjoncteur partagé : un NSMF en panne échoue vite au lieu d'accumuler
+      des requêtes en attente ;
+    - coalescence : des GET identiques simultanés partagent une seule requête.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 5.0, deadline: float = 15.0, retries: int = 3,
+                 backoff: float = 0.1, max_backoff: float = 2.0, max_connections: int = 100,
+                 http2: Optional[bool] = None, breaker: Optional[CircuitBreaker] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {'requests': 0, 'retries': 0, 'coalesced': 0, 'rejected': 0}
+        self._inflight: Dict[Tuple[str, Tuple], asyncio.Future] = {}
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip('/'),
+            timeout=timeout,
+            http2=HTTP2_AVAILABLE if http2 is None else http2,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self) -> 'NSMFClient':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None,
+                  deadline: Optional[float] = None) -> httpx.Response:
+        # Les appelants d'un GET déjà en vol attendent sa réponse au lieu d'en émettre un nouveau
+        key = (path, tuple(sorted((params or {}).items())))
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self.request('GET', path, params=params, deadline=deadline))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.stats['coalesced'] += 1
+        # shield : l'annulation d'un appelant n'annule pas la requête partagée
+        return await asyncio.shield(future)
+
+    async def post(self, path: str, json: Any = None, deadline: Optional[float] = None) -> httpx.Response:
+        return await self.request('POST', path, json=json, deadline=deadline)
+
+    async def put(self, path: str, json: Any = None, params: Optional[Dict[str, Any]] = None,
+                  deadline: Optional[float] = None) -> httpx.Response:
+        return await self.request('PUT', path, json=json, params=params, deadline=deadline)
+
+    async def delete(self, path: str, params: Optional[Dict[str, Any]] = None,
+                     deadline: Optional[float] = None) -> httpx.Response:
+        return await self.request('DELETE', path, params=params, deadline=deadline)
+
+    async def request(self, method: str, path: str, json: Any = None, params: Optional[Dict[str, Any]] = None,
+                      deadline: Optional[float] = None) -> httpx.Response:
+        """Émet la requête avec retries ; retourne la réponse finale quel que soit son statut.
+
+        Lève CircuitOpenError, DeadlineExceededError, ou NSMFError si le
+        NSMF reste injoignable après le dernier essai.
+        """
+        method = method.upper()
+        expires = time.monotonic() + (self.deadline if deadline is None else deadline)
+        attempt = 0
+        while True:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceededError(f"{method} {path}: deadline exceeded after {attempt} attempt(s)")
+            try:
+                self.breaker.allow()
+            except CircuitOpenError:
+                self.stats['rejected'] += 1
+                raise
+
+            self.stats['requests'] += 1
+            retry_after = None
+            try:
+                response = await self.client.request(method, path, json=json, params=params,
+                                                     timeout=min(self.timeout, remaining))
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                if attempt >= self.retries or not (method in IDEMPOTENT_METHODS or isinstance(e, UNSENT_ERRORS)):
+                    if isinstance(e, httpx.TimeoutException) and remaining < self.timeout:
+                        raise DeadlineExceededError(f"{method} {path}: deadline exceeded") from e
+                    raise NSMFError(f"{method} {path} failed: {e!r}") from e
+            except BaseException:
+                self.breaker.release()  # Annulation : l'appel d'essai éventuel ne compte pas
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if attempt >= self.retries or method not in IDEMPOTENT_METHODS:
+                    return response
+                retry_after = self._retry_after(response)
+
+            attempt += 1
+            self.stats['retries'] += 1
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if time.monotonic() + delay >= expires:
+                raise DeadlineExceededError(f"{method} {path}: deadline exceeded after {attempt} attempt(s)")
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(self, path: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[httpx.Response]:
+        # Réponse longue durée (flux d'événements) : pas de retry ni de délai de lecture,
+        # seule l'ouverture passe par le disjoncteur
+        try:
+            self.breaker.allow()
+        except CircuitOpenError:
+            self.stats['rejected'] += 1
+            raise
+        self.stats['requests'] += 1
+        try:
+            async with self.client.stream('GET', path, params=params,
+                                          timeout=httpx.Timeout(self.timeout, read=None)) as response:
+                if response.status_code in RETRY_STATUSES:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                yield response
+        except httpx.TransportError as e:
+            self.breaker.record_failure()
+            raise NSMFError(f"GET {path} stream failed: {e!r}") from e
+        except BaseException:
+            self.breaker.release()
+            raise
+
+    def _forget(self, key: Tuple[str, Tuple], future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not future.cancelled():
+            future.exception()  # Évite l'avertissement si tous les appelants ont été annulés
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        try:
+            return float(response.headers['Retry-After'])
+        except (KeyError, ValueError):
+            return None
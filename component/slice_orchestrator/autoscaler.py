@@ -0,0 +1,383 @@
+import csv
+import json
+import math
+import time
+from collections import deque
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from slice_logging import get_logger
+from vnf_metrics import FakeMetricsSource, MetricsCollector, MetricsStore
+
+SCOPES = ('vnf', 'sub_slice')
+# Priorité entre deux politiques en conflit sur une même cible : la montée en charge l'emporte
+SCALE_PRIORITY = {'up': 1, 'down': 0}
+STATISTICS = ('mean', 'p95', 'max')
+# Métrique dérivée : cpu_usage (en % d'un cœur) rapporté aux vCPUs alloués à la VNF
+CPU_UTILIZATION = 'cpu_utilization'
+DEFAULT_INTERVAL = 15.0
+HISTORY_SIZE = 1000
+
+logger = get_logger('autoscaler')
+
+# Sous-slice minimale utilisée par le banc de simulation
+SIMULATION_CONFIG = {
+    'slice_type': 'eMBB',
+    'qos': {'throughput': {'value': 100, 'unit': 'Mbps'}},
+    'resources': {
+        'cpu': {'value': 1, 'unit': 'vCPUs'},
+        'memory': {'value': 1024, 'unit': 'MB'},
+        'storage': {'value': 10, 'unit': 'GB'}
+    }
+}
+
+
+class ScalingPolicy:
+    """Politique d'autoscaling d'un composant d'une sous-slice.
+
+    Le composant passe à l'échelle supérieure quand la statistique de la
+    métrique sur la fenêtre dépasse `scale_out_threshold`, et inférieure
+    quand elle passe sous `scale_in_threshold` ; entre les deux seuils rien
+    ne se passe (hystérésis). Le dépassement doit durer `sustain`
+    évaluations, et deux actions sur la même cible sont séparées d'au moins
+    `cooldown` secondes. Avec `target`, le pas est proportionnel à l'écart
+    à la cible (comme un HPA Kubernetes), sinon il vaut `step` vCPUs.
+    """
+
+    def __init__(self, component: str = 'UPF', metric: str = CPU_UTILIZATION, statistic: str = 'mean',
+                 window: float = 60.0, scale_out_threshold: float = 80.0, scale_in_threshold: float = 30.0,
+                 target: Optional[float] = None, step: int = 1, max_step: int = 4, min_cpu: int = 1,
+                 max_cpu: int = 32, cooldown: float = 120.0, sustain: int = 1, scope: str = 'vnf'):
+        if statistic not in STATISTICS:
+            raise ValueError(f"Unknown statistic: {statistic}")
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown scaling scope: {scope}")
+        if scale_in_threshold >= scale_out_threshold:
+            raise ValueError("scale_in_threshold must be lower than scale_out_threshold")
+        if not 1 <= min_cpu <= max_cpu:
+            raise ValueError("min_cpu and max_cpu must satisfy 1 <= min_cpu <= max_cpu")
+        if step < 1 or max_step < 1 or sustain < 1:
+            raise ValueError("step, max_step and sustain must be positive integers")
+        self.component = component
+        self.metric = metric
+        self.statistic = statistic
+        self.window = window
+        self.scale_out_threshold = scale_out_threshold
+        self.scale_in_threshold = scale_in_threshold
+        self.target = target
+        self.step = step
+        self.max_step = max_step
+        self.min_cpu = min_cpu
+        self.max_cpu = max_cpu
+        self.cooldown = cooldown
+        self.sustain = sustain
+        self.scope = scope
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScalingPolicy':
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+class Autoscaler:
+    """Boucle de contrôle fermée entre les métriques des VNFs et le NSSMF.
+
+    À chaque évaluation, les politiques des sous-slices sont confrontées aux
+    agrégats glissants du `MetricsStore` du NFVO ; les actions retenues sont
+    appliquées par lots (`NFVO.scale_vnf_instances` pour une VNF,
+    `CoreNSSMF.scale_sub_slices` pour toute la sous-slice). En mode
+    `dry_run`, les actions sont seulement journalisées dans `history`.
+    """
+
+    def __init__(self, nssmf: Any, dry_run: bool = False, interval: float = DEFAULT_INTERVAL,
+                 clock: Callable[[], float] = time.time):
+        if nssmf.nfvo.metrics is None:
+            raise ValueError("The NFVO has no metrics store; attach a MetricsCollector first")
+        self.nssmf = nssmf
+        self.nfvo = nssmf.nfvo
+        self.dry_run = dry_run
+        self.interval = interval
+        self.clock = clock
+        self.policies: Dict[str, List[ScalingPolicy]] = {}
+        self.history: deque = deque(maxlen=HISTORY_SIZE)
+        self._state: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def set_policy(self, sub_slice_id: str, *policies: ScalingPolicy) -> None:
+        if sub_slice_id not in self.nssmf.sub_slices:
+            raise ValueError(f"Sub-slice {sub_slice_id} not found")
+        with self._lock:
+            self.policies[sub_slice_id] = list(policies)
+            self._forget(sub_slice_id)
+
+    def remove_policy(self, sub_slice_id: str) -> None:
+        with self._lock:
+            self.policies.pop(sub_slice_id, None)
+            self._forget(sub_slice_id)
+
+    def evaluate(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        # Décisions de l'évaluation courante, au plus une action par cible
+        now = self.clock() if now is None else now
+        actions: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        with self._lock:
+            for sub_slice_id in list(self.policies):
+                sub_slice = self.nssmf.sub_slices.get(sub_slice_id)
+                if sub_slice is None:  # Sous-slice terminée depuis
+                    self.policies.pop(sub_slice_id)
+                    self._forget(sub_slice_id)
+                    continue
+                for policy in self.policies[sub_slice_id]:
+                    action = self._decide(sub_slice_id, sub_slice, policy, now)
+                    if action is None:
+                        continue
+                    key = (sub_slice_id, policy.component if policy.scope == 'vnf' else '')
+                    previous = actions.get(key)
+                    if previous is None or self._priority(action) > self._priority(previous):
+                        actions[key] = action
+        return list(actions.values())
+
+    @staticmethod
+    def _priority(action: Dict[str, Any]) -> Tuple[int, int]:
+        # Entre deux politiques en conflit, le sens (SCALE_PRIORITY) puis le pas le plus grand
+        return SCALE_PRIORITY[action['scale_type']], action['scale_amount']
+
+    def apply(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Exécution groupée ; chaque action reçoit un `status` et, en cas d'échec, une `error`
+        if self.dry_run:
+            for action in actions:
+                action['status'] = 'dry_run'
+        else:
+            vnf_actions = [a for a in actions if a['scope'] == 'vnf']
+            sub_slice_actions = [a for a in actions if a['scope'] == 'sub_slice']
+            if vnf_actions:
+                results = self.nfvo.scale_vnf_instances([
+                    {'slice_id': a['nfvo_slice_id'], 'component': a['component'],
+                     'scale_type': a['scale_type'], 'scale_amount': a['scale_amount']} for a in vnf_actions])
+                self._merge_results(vnf_actions, results)
+            if sub_slice_actions:
+                results = self.nssmf.scale_sub_slices([
+                    {'sub_slice_id': a['sub_slice_id'], 'scale_type': a['scale_type'],
+                     'scale_amount': a['scale_amount']} for a in sub_slice_actions])
+                self._merge_results(sub_slice_actions, results)
+
+        with self._lock:
+            for action in actions:
+                if action['status'] != 'failed':
+                    state = self._state.get((action['sub_slice_id'], action['component'], action['metric']))
+                    if state is not None:
+                        state['last_action'] = action['timestamp']
+                        state['count'] = 0
+                else:
+                    logger.warning("Autoscaling of %s in sub-slice %s failed: %s",
+                                   action['component'], action['sub_slice_id'], action['error'])
+                self.history.append(action)
+        return actions
+
+    def step(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        # Une itération de la boucle : évaluation puis application
+        return self.apply(self.evaluate(now))
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="slice-autoscaler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.step()
+            except Exception as e:
+                logger.error("Autoscaler evaluation failed: %s", e)
+
+    def _decide(self, sub_slice_id: str, sub_slice: Dict[str, Any], policy: ScalingPolicy,
+                now: float) -> Optional[Dict[str, Any]]:
+        # À appeler avec le verrou tenu
+        nfvo_slice_id = sub_slice['nfvo_slice_id']
+        try:
+            stats = self.nfvo.get_vnf_metric_stats(nfvo_slice_id, policy.component, policy.window, now)
+            allocated = self.nfvo.get_vnf_instance(nfvo_slice_id, policy.component)['resources']['cpu']
+        except ValueError:
+            return None
+        column = 'cpu_usage' if policy.metric == CPU_UTILIZATION else policy.metric
+        if column not in stats:
+            return None
+        value = stats[column][policy.statistic]
+        if policy.metric == CPU_UTILIZATION:
+            value /= allocated
+
+        if value > policy.scale_out_threshold:
+            direction = 'up'
+        elif value < policy.scale_in_threshold:
+            direction = 'down'
+        else:
+            direction = None
+
+        state = self._state.setdefault((sub_slice_id, policy.component, policy.metric),
+                                       {'direction': None, 'count': 0, 'last_action': None})
+        if direction != state['direction']:
+            state['direction'], state['count'] = direction, 0
+        if direction is None:
+            return None
+        state['count'] += 1
+        if state['count'] < policy.sustain:
+            return None
+        if state['last_action'] is not None and now - state['last_action'] < policy.cooldown:
+            return None
+
+        current = sub_slice['config']['resources']['cpu']['value'] if policy.scope == 'sub_slice' else allocated
+        amount = self._amount(policy, direction, current, value)
+        if amount <= 0:
+            return None
+        return {
+            'sub_slice_id': sub_slice_id,
+            'nfvo_slice_id': nfvo_slice_id,
+            'component': policy.component,
+            'scope': policy.scope,
+            'scale_type': direction,
+            'scale_amount': amount,
+            'metric': policy.metric,
+            'value': value,
+            'timestamp': now
+        }
+
+    @staticmethod
+    def _amount(policy: ScalingPolicy, direction: str, current: int, value: float) -> int:
+        if policy.target is not None and policy.metric == CPU_UTILIZATION:
+            desired = math.ceil(current * value / policy.target)
+            step = max(1, abs(desired - current))
+        else:
+            step = policy.step
+        step = min(step, policy.max_step)
+        if direction == 'up':
+            return min(step, policy.max_cpu - current)
+        return min(step, current - policy.min_cpu)
+
+    def _forget(self, sub_slice_id: str) -> None:
+        for key in [k for k in self._state if k[0] == sub_slice_id]:
+            del self._state[key]
+
+    @staticmethod
+    def _merge_results(actions: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> None:
+        for action, result in zip(actions, results):
+            action['status'] = result['status']
+            if 'error' in result:
+                action['error'] = result['error']
+
+
+def load_trace(path: str) -> List[Tuple[float, float]]:
+    """Lit une trace (horodatage, charge en vCPUs) au format CSV ou JSON."""
+    with open(path, newline='') as f:
+        if path.endswith('.json'):
+            return [(float(t), float(d)) for t, d in json.load(f)]
+        rows = csv.reader(f)
+        return [(float(row[0]), float(row[1])) for row in rows if row and not row[0].startswith(('#', 't'))]
+
+
+def simulate(trace: Sequence[Tuple[float, float]], policy: ScalingPolicy,
+             config: Optional[Dict[str, Any]] = None, nssmf: Any = None) -> Dict[str, Any]:
+    """Rejoue une trace de charge contre l'autoscaler et mesure sa réactivité.
+
+    À chaque point (horodatage, charge en vCPUs), la VNF ciblée consomme
+    min(charge, vCPUs alloués) ; l'autoscaler évalue puis agit sur un NSSMF
+    réel. Le rapport donne le temps de réaction à chaque surcharge (temps
+    passé sous la capacité nécessaire pour rester sous `scale_out_threshold`),
+    le dépassement de capacité au pic et le nombre d'actions.
+    """
+    if nssmf is None:
+        from nssmf import CoreNSSMF
+        nssmf = CoreNSSMF()
+    nfvo = nssmf.nfvo
+    if nfvo.metrics is None:
+        nfvo.metrics = MetricsStore()
+    sub_slice_id = nssmf.create_sub_slice(dict(config or SIMULATION_CONFIG))
+    nfvo_slice_id = nssmf.sub_slices[sub_slice_id]['nfvo_slice_id']
+    target_id = nfvo.get_vnf_instance(nfvo_slice_id, policy.component)['instance_id']
+
+    clock = {'now': 0.0, 'demand': 0.0}
+
+    def generate(instance_id: str, instance: Dict[str, Any]) -> Dict[str, float]:
+        if instance_id != target_id:
+            return {'cpu_usage': 0.0}
+        return {'cpu_usage': min(clock['demand'], instance['resources']['cpu']) * 100}
+
+    collector = MetricsCollector(nfvo, FakeMetricsSource(generate), clock=lambda: clock['now'])
+    autoscaler = Autoscaler(nssmf, clock=lambda: clock['now'])
+    autoscaler.set_policy(sub_slice_id, policy)
+
+    timeline = []
+    for timestamp, demand in trace:
+        clock['now'], clock['demand'] = timestamp, demand
+        collector.collect_once()
+        actions = autoscaler.step()
+        allocated = nfvo.get_vnf_instance(nfvo_slice_id, policy.component)['resources']['cpu']
+        needed = max(policy.min_cpu, math.ceil(demand * 100 / policy.scale_out_threshold))
+        timeline.append((timestamp, demand, allocated, needed, len(actions)))
+
+    nssmf.terminate_sub_slice(sub_slice_id)
+    return _report(timeline)
+
+
+def _report(timeline: List[Tuple[float, float, int, int, int]]) -> Dict[str, Any]:
+    reaction_times = []
+    overload_start = None
+    for timestamp, _, allocated, needed, _ in timeline:
+        if allocated < needed and overload_start is None:
+            overload_start = timestamp
+        elif allocated >= needed and overload_start is not None:
+            reaction_times.append(timestamp - overload_start)
+            overload_start = None
+    unresolved = overload_start is not None
+    if unresolved:
+        reaction_times.append(timeline[-1][0] - overload_start)
+
+    peak_needed = max((needed for _, _, _, needed, _ in timeline), default=0)
+    peak_allocated = max((allocated for _, _, allocated, _, _ in timeline), default=0)
+    underprovisioned = sum(allocated < needed for _, _, allocated, needed, _ in timeline)
+    return {
+        'samples': len(timeline),
+        'actions': sum(count for *_, count in timeline),
+        'reaction_times': reaction_times,
+        'mean_reaction_time': sum(reaction_times) / len(reaction_times) if reaction_times else 0.0,
+        'max_reaction_time': max(reaction_times, default=0.0),
+        'unresolved_overload': unresolved,
+        'peak_overshoot': peak_allocated / peak_needed - 1 if peak_needed else 0.0,
+        'mean_overprovisioning': sum(allocated / needed for _, _, allocated, needed, _ in timeline) / len(timeline)
+        if timeline else 0.0,
+        'underprovisioned_fraction': underprovisioned / len(timeline) if timeline else 0.0,
+        'timeline': [{'timestamp': t, 'demand': d, 'allocated': a, 'needed': n} for t, d, a, n, _ in timeline]
+    }
+
+
+def _parse_args(argv: Optional[Iterable[str]] = None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay a load trace against the slice autoscaler")
+    parser.add_argument('trace', help="CSV (timestamp,demand) or JSON trace; demand in vCPUs")
+    parser.add_argument('--policy', help="JSON file with ScalingPolicy parameters")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    policy_args = {}
+    if args.policy:
+        with open(args.policy) as f:
+            policy_args = json.load(f)
+    report = simulate(load_trace(args.trace), ScalingPolicy.from_dict(policy_args))
+    report.pop('timeline')
+    print(json.dumps(report, indent=2))
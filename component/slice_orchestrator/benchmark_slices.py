@@ -0,0 +1,284 @@
+"""Banc de performance de la pile d'orchestration des slices.
+
+Chaque banc pilote un composant (SliceOrchestrator, NSMF, CoreNSSMF, NFVO)
+à travers les phases create / modify / scale / delete pour n slices ; pour
+le SliceOrchestrator et le NSMF, qui n'exposent pas de mise à l'échelle, la
+phase scale passe par le sous-slice core (CoreNSSMF.scale_sub_slice). Le
+CSMF ne gère pas d'instances : son banc mesure les phases translate et
+translate_modification. Chaque banc mesure, par phase : débit (ops/s),
+latences p50/p99, RSS maximal du processus et allocations par opération
+(blocs nets et octets retenus, mesurés par tracemalloc sur un échantillon
+exclu des latences).
+
+Chaque couple (banc, taille) tourne dans un processus neuf pour que le RSS
+maximal lui soit propre. Les résultats sont écrits en JSON et peuvent être
+comparés à ceux d'un autre commit :
+
+    python benchmark_slices.py --sizes 10 1000 100000 --output bench.json
+    python benchmark_slices.py --compare baseline.json --output bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_PATH = os.path.join(BASE_DIR, "config", "network_slice_templates", "gst_template2.json")
+DEFAULT_SIZES = (10, 1000, 10000)
+ALLOCATION_SAMPLE = 50  # Opérations tracées par tracemalloc en tête de chaque phase
+LARGE_IP_POOL = '10.0.0.0/8'  # Assez d'adresses pour 100k slices de 4 VNFs
+
+SLICE_REQUEST = {
+    "slice_type": "eMBB",
+    "slice_differentiator": "000001",
+    "qos": {
+        "latency": {"value": 10, "unit": "ms"},
+        "throughput": {"value": 100, "unit": "Mbps"},
+        "reliability": {"value": 99.9, "unit": "%"}
+    },
+    "resources": {
+        "cpu": {"value": 4, "unit": "vCPUs"},
+        "memory": {"value": 4096, "unit": "MB"},
+        "storage": {"value": 20, "unit": "GB"},
+        "bandwidth": {"value": 100, "unit": "Mbps"}
+    }
+}
+MODIFIED_RESOURCES = dict(SLICE_REQUEST['resources'], cpu={"value": 8, "unit": "vCPUs"})
+VNF_RESOURCES = {
+    'AMF': {'cpu': 2, 'memory': 2048, 'storage': 10},
+    'NRF': {'cpu': 1, 'memory': 1024, 'storage': 5},
+    'SMF': {'cpu': 2, 'memory': 2048, 'storage': 8},
+    'UPF': {'cpu': 4, 'memory': 4096, 'storage': 20}
+}
+
+Phase = Tuple[str, Callable[[int], Any]]
+
+
+def _request(i: int) -> Dict[str, Any]:
+    return dict(SLICE_REQUEST, slice_differentiator=f"{i % 1000000:06d}")
+
+
+def _vnf_resources() -> Dict[str, Dict[str, int]]:
+    return {component: dict(resources) for component, resources in VNF_RESOURCES.items()}
+
+
+def _core_sub_slice(nsmf: Any, slice_id: str) -> str:
+    return nsmf.get_slice_instance(slice_id)['sub_slices']['core']
+
+
+def bench_csmf(n: int) -> Iterator[Phase]:
+    from csmf import CSMF
+    csmf = CSMF(TEMPLATE_PATH)
+    requests = [_request(i) for i in range(n)]
+    yield 'translate', lambda i: csmf.translate_request(requests[i])
+    yield 'translate_modification', lambda i: csmf.translate_modification({'resources': MODIFIED_RESOURCES})
+
+
+def bench_nfvo(n: int) -> Iterator[Phase]:
+    from nfvo import NFVO
+    nfvo = NFVO(ip_pools={'default': [LARGE_IP_POOL]})
+    ids: List[str] = []
+    yield 'create', lambda i: ids.append(nfvo.instantiate_vnfs(_vnf_resources())['slice_id'])
+    yield 'modify', lambda i: nfvo.update_network_slice(ids[i], {'UPF': {'cpu': 8, 'memory': 8192, 'storage': 20}})
+    yield 'scale', lambda i: nfvo.scale_vnf_instance(ids[i], 'SMF', 'up', 1)
+    yield 'delete', lambda i: nfvo.delete_network_slice(ids[i])
+
+
+def bench_nssmf(n: int) -> Iterator[Phase]:
+    from nssmf import CoreNSSMF
+    nssmf = CoreNSSMF()
+    nssmf.nfvo.add_ip_pool(LARGE_IP_POOL)
+    ids: List[str] = []
+    yield 'create', lambda i: ids.append(nssmf.create_sub_slice(_request(i)))
+    yield 'modify', lambda i: nssmf.update_sub_slice(ids[i], dict(_request(i), resources=MODIFIED_RESOURCES))
+    yield 'scale', lambda i: nssmf.scale_sub_slice(ids[i], 'up', 1)
+    yield 'delete', lambda i: nssmf.terminate_sub_slice(ids[i])
+
+
+def bench_nsmf(n: int) -> Iterator[Phase]:
+    from nsmf import NSMF
+    from nssmf import CoreNSSMF
+    nssmf = CoreNSSMF()
+    nssmf.nfvo.add_ip_pool(LARGE_IP_POOL)
+    nsmf = NSMF()
+    nsmf.register_nssmf('core', nssmf)
+    ids: List[str] = []
+    yield 'create', lambda i: ids.append(nsmf.create_slice_instance(_request(i)))
+    yield 'modify', lambda i: nsmf.update_slice_instance(ids[i], {'core': dict(_request(i), resources=MODIFIED_RESOURCES)})
+    yield 'scale', lambda i: nssmf.scale_sub_slice(_core_sub_slice(nsmf, ids[i]), 'up', 1)
+    yield 'delete', lambda i: nsmf.terminate_slice_instance(ids[i])
+
+
+def bench_orchestrator(n: int) -> Iterator[Phase]:
+    from csmf import CSMF
+    from nsmf import NSMF
+    from nssmf import CoreNSSMF
+    from slice_orchestrator import SliceOrchestrator
+    nssmf = CoreNSSMF()
+    nssmf.nfvo.add_ip_pool(LARGE_IP_POOL)
+    orchestrator = SliceOrchestrator()
+    orchestrator.set_components(CSMF(TEMPLATE_PATH), NSMF(), nssmf)
+    ids: List[str] = []
+    yield 'create', lambda i: ids.append(orchestrator.create_slice(_request(i)))
+    yield 'modify', lambda i: orchestrator.modify_slice(ids[i], {'resources': MODIFIED_RESOURCES})
+    yield 'scale', lambda i: nssmf.scale_sub_slice(_core_sub_slice(orchestrator.nsmf, ids[i]), 'up', 1)
+    yield 'delete', lambda i: orchestrator.delete_slice(ids[i])
+    orchestrator.lifecycle.shutdown()
+
+
+BENCHMARKS: Dict[str, Callable[[int], Iterator[Phase]]] = {
+    'csmf': bench_csmf,
+    'nfvo': bench_nfvo,
+    'nssmf': bench_nssmf,
+    'nsmf': bench_nsmf,
+    'orchestrator': bench_orchestrator
+}
+
+
+def _percentile(sorted_values: List[int], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))]
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # Octets sous macOS, Ko sous Linux
+
+
+def run_phase(benchmark: str, n: int, phase: str, op: Callable[[int], Any],
+              allocation_sample: int = ALLOCATION_SAMPLE) -> Dict[str, Any]:
+    # Les `allocation_sample` premières opérations sont tracées (allocations),
+    # les suivantes chronométrées ; tracemalloc fausserait les latences
+    sample = min(allocation_sample, n // 2)
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for i in range(sample):
+        op(i)
+    retained, _ = tracemalloc.get_traced_memory()
+    blocks = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+
+    latencies = []
+    clock = time.perf_counter_ns
+    started = clock()
+    for i in range(sample, n):
+        before = clock()
+        op(i)
+        latencies.append(clock() - before)
+    elapsed = (clock() - started) / 1e9
+    latencies.sort()
+
+    timed = n - sample
+    return {
+        'benchmark': benchmark,
+        'slices': n,
+        'phase': phase,
+        'ops': timed,
+        'ops_per_sec': timed / elapsed if elapsed else 0.0,
+        'mean_us': sum(latencies) / timed / 1e3 if timed else 0.0,
+        'p50_us': _percentile(latencies, 50) / 1e3,
+        'p99_us': _percentile(latencies, 99) / 1e3,
+        'peak_rss_kb': _peak_rss_kb(),
+        'alloc_blocks_per_op': blocks / sample if sample else 0.0,
+        'alloc_bytes_per_op': retained / sample if sample else 0.0
+    }
+
+
+def run_benchmark(benchmark: str, n: int, allocation_sample: int = ALLOCATION_SAMPLE) -> List[Dict[str, Any]]:
+    return [run_phase(benchmark, n, phase, op, allocation_sample) for phase, op in BENCHMARKS[benchmark](n)]
+
+
+def run_isolated(benchmark: str, n: int) -> List[Dict[str, Any]]:
+    # Processus neuf par (banc, taille) : le RSS maximal ne mélange pas les bancs
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', benchmark, str(n)],
+                               cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2) -> List[str]:
+    """Liste les régressions (débit en baisse ou p99 en hausse au-delà de `threshold`)."""
+    key = lambda r: (r['benchmark'], r['slices'], r['phase'])
+    previous = {key(r): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        name = '/'.join(map(str, key(result)))
+        if old['ops_per_sec'] and result['ops_per_sec'] < old['ops_per_sec'] * (1 - threshold):
+            regressions.append(f"{name}: ops/sec {old['ops_per_sec']:.0f} -> {result['ops_per_sec']:.0f}")
+        if old['p99_us'] and result['p99_us'] > old['p99_us'] * (1 + threshold):
+            regressions.append(f"{name}: p99 {old['p99_us']:.1f}us -> {result['p99_us']:.1f}us")
+    return regressions
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the slice orchestration stack")
+    parser.add_argument('--benchmarks', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Baseline JSON file; exit with status 1 on regression")
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--in-process', action='store_true', help="Run without subprocess isolation")
+    parser.add_argument('--worker', nargs=2, metavar=('BENCHMARK', 'SLICES'), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    # Les composants journalisent chaque opération ; on mesure le code, pas la console
+    logging.disable(logging.INFO)
+    if args.worker:
+        print(json.dumps(run_benchmark(args.worker[0], int(args.worker[1]))))
+        return 0
+
+    results = []
+    for benchmark in args.benchmarks:
+        for n in args.sizes:
+            phases = run_benchmark(benchmark, n) if args.in_process else run_isolated(benchmark, n)
+            for r in phases:
+                print(f"{r['benchmark']:>12} {r['slices']:>7} {r['phase']:<22} {r['ops_per_sec']:>10.0f} ops/s "
+                      f"p50 {r['p50_us']:>8.1f}us p99 {r['p99_us']:>8.1f}us rss {r['peak_rss_kb'] // 1024:>5}MB "
+                      f"{r['alloc_bytes_per_op']:>8.0f}B/op")
+            results.extend(phases)
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'allocation_sample': ALLOCATION_SAMPLE
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,8 @@
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List
+from gst_validator import load_compiled_template
+from tracing import instrument
 """
 class CSMF:
     def __init__(self, gst_template_path: str):
@@ -90,10 +92,12 @@ class CSMF:
         # Obtenir le statut de la slice auprès du SO
         return self.slice_orchestrator.get_slice_status(slice_id)
 """
+@instrument
 class CSMF:
     def __init__(self, gst_template_path: str):
         self.gst_template_path = gst_template_path
         self.gst_template = self._load_gst_template()
+        self.compiled_template = load_compiled_template(gst_template_path)
         self.nsmf = None
         self.slice_orchestrator = None 
 
@@ -112,6 +116,11 @@ class CSMF:
         with open(self.gst_template_path, 'r') as file:
             return json.load(file)
 
+    def reload_template(self) -> None:
+        """Recharge le template GST ; le plan n'est recompilé que si le fichier a changé."""
+        self.gst_template = self._load_gst_template()
+        self.compiled_template = load_compiled_template(self.gst_template_path)
+
     def get_slice_details(self, slice_id: str) -> Dict[str, Any]:
         if self.nsmf is None:
             raise RuntimeError("NSMF not set")
@@ -129,37 +138,52 @@ class CSMF:
         slice_id = self.slice_orchestrator.create_slice(slice_config)
         return slice_id
 
+    def process_communication_service_requests(self, service_requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Traite un lot de demandes et retourne un résultat par demande, dans l'ordre."""
+        if self.slice_orchestrator is None:
+            raise RuntimeError("Slice Orchestrator not set")
+
+        results: List[Dict[str, Any]] = [None] * len(service_requests)
+        valid = []
+        slice_configs = []
+        for index, service_request in enumerate(service_requests):
+            try:
+                slice_configs.append(self._translate_service_to_slice_config(service_request))
+            except ValueError as e:
+                results[index] = {'status': 'failed', 'error': str(e)}
+                continue
+            valid.append(index)
+
+        for index, result in zip(valid, self.slice_orchestrator.create_slices(slice_configs)):
+            results[index] = result
+        return results
+
 
     def translate_request(self, service_request: Dict[str, Any]) -> Dict[str, Any]:
         """Traduit une demande de service en configuration de slice."""
         return self._translate_service_to_slice_config(service_request)
     
     def translate_modification(self, modification: Dict[str, Any]) -> Dict[str, Any]:
-        """Traduit une demande de modification de service en configuration de slice."""
-        return self._translate_service_to_slice_config(modification)
+        """Traduit une demande de modification de service en configuration de slice.
+
+        Seuls les attributs présents dans la modification sont retournés : les
+        valeurs par défaut du template n'écrasent pas la configuration existante.
+        """
+        return self.compiled_template.translate(modification, defaults=False)
 
     def _translate_service_to_slice_config(self, service_request: Dict[str, Any]) -> Dict[str, Any]:
         """Traduit une demande de service en configuration de slice basée sur le GST."""
-        slice_config = {}
-        for attr, template_value in self.gst_template['gst']['attributes'].items():
-            if attr in service_request:
-                if self._validate_attribute(attr, service_request[attr], template_value):
-                    slice_config[attr] = service_request[attr]
-                else:
-                    raise ValueError(f"Invalid value for attribute {attr}")
-            else:
-                slice_config[attr] = template_value.get('default', None)
-        return slice_config
+        return self.compiled_template.translate(service_request)
 
-    def _validate_attribute(self, attr: str, value: Any, template: Dict[str, Any]) -> bool:
+    def _validate_attribute(self, attr: str, value: Any, template: Dict[str, Any] = None) -> bool:
         """Valide un attribut par rapport à sa définition dans le template."""
-        return True  # Placeholder, à implémenter selon les besoins spécifiques
+        return self.compiled_template.validate_attribute(attr, value) is None
 
     def update_communication_service(self, slice_id: str, update_request: Dict[str, Any]) -> None:
         if self.slice_orchestrator is None:
             raise RuntimeError("Slice Orchestrator not set")
 
-        update_config = self._translate_service_to_slice_config(update_request)
+        update_config = self.translate_modification(update_request)
         self.slice_orchestrator.modify_slice(slice_id, update_config)
 
 
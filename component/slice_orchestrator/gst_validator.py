@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Check = Callable[[Any], Optional[str]]
+
+_TYPE_CHECKS = {
+    'string': lambda v: isinstance(v, str),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list)
+}
+
+# Cache des plans compilés : chemin -> (mtime_ns, taille, empreinte, plan)
+_plan_cache: Dict[str, Tuple[int, int, str, 'CompiledTemplate']] = {}
+_plan_cache_lock = Lock()
+
+
+def _compile_schema(name: str, schema: Dict[str, Any]) -> Optional[Check]:
+    # Compilation d'une définition d'attribut en une fonction de vérification.
+    # La fonction retourne None si la valeur est valide, sinon un message d'erreur.
+    checks: List[Check] = []
+
+    expected_type = schema.get('type')
+    if expected_type in _TYPE_CHECKS:
+        type_check = _TYPE_CHECKS[expected_type]
+        checks.append(lambda v: None if type_check(v) else f"{name} must be of type {expected_type}")
+
+    allowed = schema.get('enum', schema.get('allowed_values'))
+    if allowed is not None:
+        allowed_values = frozenset(allowed)
+        message = f"{name} must be one of {', '.join(map(str, allowed))}"
+
+        def check_enum(value):
+            try:
+                return None if value in allowed_values else message
+            except TypeError:  # Valeur non hachable (dict, liste)
+                return message
+        checks.append(check_enum)
+
+    if 'maxLength' in schema:
+        max_length = int(schema['maxLength'])
+        checks.append(lambda v: None if len(str(v)) <= max_length else f"{name} exceeds maxLength {max_length}")
+
+    if 'minimum' in schema:
+        minimum = float(schema['minimum'])
+        checks.append(lambda v: None if _TYPE_CHECKS['number'](v) and v >= minimum
+                      else f"{name} is below minimum {schema['minimum']}")
+    if 'maximum' in schema:
+        maximum = float(schema['maximum'])
+        checks.append(lambda v: None if _TYPE_CHECKS['number'](v) and v <= maximum
+                      else f"{name} is above maximum {schema['maximum']}")
+
+    properties = schema.get('properties')
+    if isinstance(properties, dict):
+        nested = [(prop, _compile_schema(f"{name}.{prop}", sub)) for prop, sub in properties.items()]
+        nested = [(prop, check) for prop, check in nested if check is not None]
+        if nested:
+            def check_properties(value):
+                if not isinstance(value, dict):
+                    return None  # Déjà signalé par la vérification de type
+                for prop, check in nested:
+                    if prop in value:
+                        error = check(value[prop])
+                        if error:
+                            return error
+                return None
+            checks.append(check_properties)
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value):
+        for check in checks:
+            error = check(value)
+            if error:
+                return error
+        return None
+    return check_all
+
+
+class CompiledTemplate:
+    """Plan de traduction et de validation précompilé d'un template GST.
+
+    Les valeurs par défaut, énumérations, bornes et longueurs maximales sont
+    extraites une seule fois ; la traduction d'une requête devient alors une
+    unique passe sur les attributs du template.
+    """
+
+    def __init__(self, template: Dict[str, Any]):
+        attributes = template['gst']['attributes']
+        self.attributes: List[str] = list(attributes)
+        self.defaults: Dict[str, Any] = {attr: spec.get('default', None) for attr, spec in attributes.items()}
+        self.optional = frozenset(attr for attr, spec in attributes.items() if spec.get('optional'))
+        self.checks: Dict[str, Check] = {}
+        for attr, spec in attributes.items():
+            check = _compile_schema(attr, spec)
+            if check is not None:
+                self.checks[attr] = check
+
+    def validate_attribute(self, attr: str, value: Any) -> Optional[str]:
+        # Retourne un message d'erreur, ou None si la valeur est conforme
+        if value is None and attr in self.optional:
+            return None
+        check = self.checks.get(attr)
+        return check(value) if check else None
+
+    def translate(self, service_request: Dict[str, Any], defaults: bool = True) -> Dict[str, Any]:
+        # Traduction et validation en une passe ; lève ValueError au premier attribut invalide.
+        # Sans `defaults`, seuls les attributs présents dans la requête sont retournés (modifications partielles)
+        slice_config = dict(self.defaults) if defaults else {}
+        checks = self.checks
+        for attr in self.attributes:
+            if attr in service_request:
+                value = service_request[attr]
+                check = checks.get(attr)
+                if check is not None and not (value is None and attr in self.optional):
+                    error = check(value)
+                    if error:
+                        raise ValueError(f"Invalid value for attribute {attr}: {error}")
+                slice_config[attr] = value
+        return slice_config
+
+
+def load_compiled_template(path: str) -> CompiledTemplate:
+    """Retourne le plan compilé du template, recompilé seulement si le fichier a changé."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"GST template file not found: {path}")
+
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    with _plan_cache_lock:
+        cached = _plan_cache.get(key)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[3]
+
+    with open(key, 'rb') as file:
+        content = file.read()
+    digest = hashlib.sha256(content).hexdigest()
+
+    with _plan_cache_lock:
+        cached = _plan_cache.get(key)
+        if cached and cached[2] == digest:
+            plan = cached[3]
+        else:
+            plan = CompiledTemplate(json.loads(content))
+        _plan_cache[key] = (stat.st_mtime_ns, stat.st_size, digest, plan)
+        return plan
@@ -0,0 +1,170 @@
+import json
+import os
+import zlib
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional, Tuple
+from slice_logging import get_logger
+
+SNAPSHOT_FILE = "snapshot.jsonl"
+LOG_FILE = "wal.log"
+
+_PUT = "p"
+_DELETE = "d"
+
+logger = get_logger('inventory_store')
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(',', ':')).encode()
+
+
+def _frame(payload: bytes) -> bytes:
+    # Une ligne par enregistrement : CRC32 du JSON, espace, JSON
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _encode(record: Any) -> bytes:
+    return _frame(_dumps(record))
+
+
+def _decode(line: bytes) -> Optional[Any]:
+    # Retourne None pour une ligne tronquée ou corrompue
+    if not line.endswith(b"\n") or len(line) < 10:
+        return None
+    checksum, payload = line[:8], line[9:-1]
+    try:
+        if int(checksum, 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+class InventoryStore:
+    """Stockage persistant de l'inventaire des slices (NSMF, NSSMF, NFVO).
+
+    Chaque mutation est ajoutée à un journal (write-ahead log) en O(1) ; les
+    enregistrements sont répartis par espace de noms (`namespace`). Au-delà
+    de `compact_every` entrées, le journal est compacté dans un snapshot
+    écrit de façon atomique (fichier temporaire puis renommage). Au
+    redémarrage, le snapshot puis le journal sont rejoués ; une fin de
+    journal tronquée par un crash est ignorée puis coupée.
+
+    Les valeurs sont sérialisées au moment de `put` et conservées sous cette
+    forme : le snapshot reflète exactement ce qui a été journalisé, même si
+    l'appelant modifie ensuite ses objets.
+    """
+
+    def __init__(self, directory: str, compact_every: int = 100000, fsync: bool = False):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.fsync = fsync
+        self.data: Dict[str, Dict[str, bytes]] = {}  # Espace de noms -> clé -> valeur JSON
+        self._lock = Lock()
+        self._log_entries = 0
+        os.makedirs(directory, exist_ok=True)
+        self._snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self._log_path = os.path.join(directory, LOG_FILE)
+        self._recover()
+        self._log = open(self._log_path, 'ab')
+
+    def namespace(self, name: str) -> Dict[str, Any]:
+        # Copie décodée des enregistrements d'un espace de noms
+        with self._lock:
+            records = dict(self.data.get(name, {}))
+        return {key: json.loads(value) for key, value in records.items()}
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        value = self.data.get(namespace, {}).get(key)
+        return default if value is None else json.loads(value)
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        self.put_many(namespace, ((key, value),))
+
+    def put_many(self, namespace: str, items: Iterable[Tuple[str, Any]]) -> None:
+        # Écriture groupée : une seule écriture (et synchronisation) pour tout le lot
+        encoded = [(key, _dumps(value)) for key, value in items]
+        if not encoded:
+            return
+        prefix = b'["%s",%s,' % (_PUT.encode(), _dumps(namespace))
+        with self._lock:
+            self._append(b"".join(_frame(b"%s%s,%s]" % (prefix, _dumps(key), value)) for key, value in encoded))
+            records = self.data.setdefault(namespace, {})
+            for key, value in encoded:
+                records[key] = value
+            self._log_entries += len(encoded)
+            self._maybe_compact()
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._append(_encode([_DELETE, namespace, key]))
+            self.data.get(namespace, {}).pop(key, None)
+            self._log_entries += 1
+            self._maybe_compact()
+
+    def compact(self) -> None:
+        with self._lock:
+            self._compact()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._log.closed:
+                self._log.close()
+
+    def _append(self, data: bytes) -> None:
+        self._log.write(data)
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+    def _maybe_compact(self) -> None:
+        if self.compact_every and self._log_entries >= self.compact_every:
+            self._compact()
+
+    def _compact(self) -> None:
+        # Écriture du snapshot complet puis remise à zéro du journal
+        tmp_path = self._snapshot_path + ".tmp"
+        with open(tmp_path, 'wb') as snapshot:
+            for namespace, records in self.data.items():
+                prefix = b"[%s," % _dumps(namespace)
+                snapshot.write(b"".join(_frame(b"%s%s,%s]" % (prefix, _dumps(key), value))
+                                        for key, value in records.items()))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+
+        # Rejouer le journal sur le nouveau snapshot est idempotent : un crash ici est sans danger
+        self._log.close()
+        self._log = open(self._log_path, 'wb')
+        self._log_entries = 0
+        logger.info("Compacted inventory store in %s", self.directory)
+
+    def _recover(self) -> None:
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, 'rb') as snapshot:
+                for line in snapshot:
+                    record = _decode(line)
+                    if record is None:
+                        raise RuntimeError(f"Corrupted inventory snapshot: {self._snapshot_path}")
+                    namespace, key, value = record
+                    self.data.setdefault(namespace, {})[key] = _dumps(value)
+
+        if not os.path.exists(self._log_path):
+            return
+        valid_size = 0
+        with open(self._log_path, 'rb') as log:
+            for line in log:
+                record = _decode(line)
+                if record is None:
+                    break
+                if record[0] == _PUT:
+                    self.data.setdefault(record[1], {})[record[2]] = _dumps(record[3])
+                else:
+                    self.data.get(record[1], {}).pop(record[2], None)
+                valid_size += len(line)
+                self._log_entries += 1
+
+        if valid_size != os.path.getsize(self._log_path):
+            logger.warning("Truncating torn tail of inventory log %s", self._log_path)
+            with open(self._log_path, 'r+b') as log:
+                log.truncate(valid_size)
@@ -1,89 +1,534 @@
+import glob
+import json
+import math
+import os
 import random
 import uuid
-from typing import Dict, Any, List
-import logging
+import ipaddress
+from bisect import bisect_right
+from typing import Dict, Any, List, Optional, Sequence
 from threading import Lock
+from inventory_store import InventoryStore
+from slice_locks import SliceLockManager
+from vnf_placement import PlacementEngine
+from vnf_metrics import MetricsStore
+from tracing import instrument, traced
+from slice_logging import get_logger
+from slice_events import EventBus, EventType
 
+DEFAULT_IP_POOLS = {'default': ['192.168.0.0/24']}
+STORE_NAMESPACE = 'nfvo.network_slices'
+SHARED_STORE_NAMESPACE = 'nfvo.shared_vnfs'
+IP_POOL_STORE_NAMESPACE = 'nfvo.ip_pools'
+# Propriétaire des instances partagées dans les index inverses et le placement
+SHARED_SLICE_ID = 'shared'
+# Part des ressources d'une slice ajoutée à une instance partagée quand elle s'y rattache
+SHARED_SCALE_FACTOR = 0.25
+
+
+class IPPool:
+    """Pool d'adresses d'un CIDR (IPv4 ou IPv6) géré par intervalles libres.
+
+    Les plages libres sont conservées sous forme de deux listes triées
+    (débuts et fins), si bien que la mémoire dépend du nombre de trous et
+    non de la taille du réseau : un /8 vierge n'occupe qu'une seule plage.
+    L'allocation prend l'adresse la plus basse, la libération fusionne avec
+    les plages voisines après une recherche dichotomique (O(log n)).
+    """
+
+    def __init__(self, cidr: str):
+        self.network = ipaddress.ip_network(cidr, strict=False)
+        first = int(self.network.network_address)
+        last = int(self.network.broadcast_address)
+        # Exclusion de l'adresse réseau (et de broadcast en IPv4)
+        if self.network.num_addresses > 2:
+            first += 1
+            if self.network.version == 4:
+                last -= 1
+        self.first = first
+        self.last = last
+        self.size = last - first + 1
+        self.free = self.size
+        self._starts = [first]
+        self._ends = [last]
+
+    def __contains__(self, address: int) -> bool:
+        return self.first <= address <= self.last
+
+    def allocate(self, count: int = 1) -> List[int]:
+        # Allocation de `count` adresses, en tout ou rien
+        if count < 1:
+            raise ValueError("count must be a positive integer")
+        if count > self.free:
+            raise Exception(f"IP pool {self.network} exhausted")
+
+        allocated = []
+        remaining = count
+        while remaining:
+            start, end = self._starts[0], self._ends[0]
+            taken = min(remaining, end - start + 1)
+            allocated.extend(range(start, start + taken))
+            if start + taken > end:
+                del self._starts[0]
+                del self._ends[0]
+            else:
+                self._starts[0] = start + taken
+            remaining -= taken
+
+        self.free -= count
+        return allocated
+
+    def release(self, address: int) -> bool:
+        # Libération d'une adresse ; retourne False si elle était déjà libre
+        if address not in self:
+            raise ValueError(f"Address {self._format(address)} does not belong to pool {self.network}")
+
+        index = bisect_right(self._starts, address)
+        if index > 0 and self._ends[index - 1] >= address:
+            return False
+
+        merge_left = index > 0 and self._ends[index - 1] == address - 1
+        merge_right = index < len(self._starts) and self._starts[index] == address + 1
+        if merge_left and merge_right:
+            self._ends[index - 1] = self._ends[index]
+            del self._starts[index]
+            del self._ends[index]
+        elif merge_left:
+            self._ends[index - 1] = address
+        elif merge_right:
+            self._starts[index] = address
+        else:
+            self._starts.insert(index, address)
+            self._ends.insert(index, address)
+
+        self.free += 1
+        return True
+
+    def reserve(self, address: int) -> bool:
+        # Retrait d'une adresse précise des plages libres ; False si déjà prise
+        index = bisect_right(self._starts, address) - 1
+        if index < 0 or self._ends[index] < address:
+            return False
+
+        start, end = self._starts[index], self._ends[index]
+        if start == end:
+            del self._starts[index]
+            del self._ends[index]
+        elif address == start:
+            self._starts[index] = address + 1
+        elif address == end:
+            self._ends[index] = address - 1
+        else:
+            self._ends[index] = address - 1
+            self._starts.insert(index + 1, address + 1)
+            self._ends.insert(index + 1, end)
+
+        self.free -= 1
+        return True
+
+    def is_free(self, address: int) -> bool:
+        index = bisect_right(self._starts, address)
+        return index > 0 and self._ends[index - 1] >= address
+
+    def _format(self, address: int) -> str:
+        return str(ipaddress.ip_address(address))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'cidr': str(self.network),
+            'free': [[self._format(s), self._format(e)] for s, e in zip(self._starts, self._ends)]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IPPool':
+        pool = cls(data['cidr'])
+        pool._starts = [int(ipaddress.ip_address(s)) for s, _ in data['free']]
+        pool._ends = [int(ipaddress.ip_address(e)) for _, e in data['free']]
+        pool.free = sum(e - s + 1 for s, e in zip(pool._starts, pool._ends))
+        return pool
+
+
+class IPAllocator:
+    """Allocateur d'adresses IP regroupant plusieurs pools par site.
+
+    L'allocateur n'est pas thread-safe : l'appelant (NFVO) le protège avec
+    son propre verrou. Avec `track_changes()`, il retient les adresses
+    allouées ou libérées et les pools ajoutés depuis le dernier
+    `take_changes()`, pour les snapshots incrémentaux.
+    """
+
+    def __init__(self, pools: Optional[Dict[str, List[str]]] = None):
+        self.pools: Dict[str, List[IPPool]] = {}
+        self._changes: Optional[Dict[str, bool]] = None  # Adresse -> allouée (True) ou libérée (False)
+        self._added_pools: List[List[str]] = []
+        for site, cidrs in (pools or {}).items():
+            for cidr in cidrs:
+                self.add_pool(cidr, site)
+
+    def add_pool(self, cidr: str, site: str = 'default') -> IPPool:
+        # Ajout d'un CIDR au site, en refusant les chevauchements
+        pool = IPPool(cidr)
+        for existing in self._all_pools():
+            if existing.network.version == pool.network.version and existing.network.overlaps(pool.network):
+                raise ValueError(f"CIDR {cidr} overlaps existing pool {existing.network}")
+        self.pools.setdefault(site, []).append(pool)
+        if self._changes is not None:
+            self._added_pools.append([site, cidr])
+        return pool
+
+    def allocate(self, site: str = 'default') -> str:
+        return self.allocate_many(1, site)[0]
+
+    def allocate_many(self, count: int, site: str = 'default') -> List[str]:
+        # Allocation groupée de `count` adresses sur les pools du site
+        if site not in self.pools:
+            raise ValueError(f"Unknown IP pool site: {site}")
+        if count > self.available(site):
+            raise Exception(f"IP pool exhausted for site {site}")
+
+        addresses = []
+        remaining = count
+        for pool in self.pools[site]:
+            if not remaining:
+                break
+            taken = min(remaining, pool.free)
+            if taken:
+                addresses.extend(pool._format(a) for a in pool.allocate(taken))
+                remaining -= taken
+        if self._changes is not None:
+            self._changes.update(dict.fromkeys(addresses, True))
+        return addresses
+
+    def release(self, ip: str) -> bool:
+        # Libération d'une adresse dans le pool qui la contient
+        released = self._find_pool(ip).release(int(ipaddress.ip_address(ip)))
+        if released and self._changes is not None:
+            self._changes[ip] = False
+        return released
+
+    def release_many(self, ips: List[str]) -> int:
+        return sum(1 for ip in ips if self.release(ip))
+
+    def reserve(self, ip: str) -> bool:
+        # Réservation d'une adresse précise (restauration d'état, adresses statiques)
+        reserved = self._find_pool(ip).reserve(int(ipaddress.ip_address(ip)))
+        if reserved and self._changes is not None:
+            self._changes[ip] = True
+        return reserved
+
+    def is_allocated(self, ip: str) -> bool:
+        return not self._find_pool(ip).is_free(int(ipaddress.ip_address(ip)))
+
+    def available(self, site: Optional[str] = None) -> int:
+        # Nombre d'adresses libres pour un site (ou pour tous les sites)
+        if site is None:
+            return sum(pool.free for pool in self._all_pools())
+        return sum(pool.free for pool in self.pools.get(site, []))
+
+    def track_changes(self) -> None:
+        if self._changes is None:
+            self._changes = {}
+
+    def take_changes(self) -> Dict[str, Any]:
+        # Changements nets depuis le dernier appel, puis remise à zéro
+        changes = self._changes or {}
+        delta = {
+            'added_pools': self._added_pools,
+            'allocated': [ip for ip, allocated in changes.items() if allocated],
+            'released': [ip for ip, allocated in changes.items() if not allocated]
+        }
+        if self._changes is not None:
+            self._changes = {}
+        self._added_pools = []
+        return delta
+
+    def apply_changes(self, delta: Dict[str, Any]) -> None:
+        # Rejeu d'un résultat de take_changes ; les opérations sont idempotentes
+        known = {(site, str(pool.network)) for site, pools in self.pools.items() for pool in pools}
+        for site, cidr in delta['added_pools']:
+            if (site, str(ipaddress.ip_network(cidr, strict=False))) not in known:
+                self.add_pool(cidr, site)
+        for ip in delta['allocated']:
+            self.reserve(ip)
+        for ip in delta['released']:
+            self.release(ip)
+
+    def _find_pool(self, ip: str) -> IPPool:
+        address = ipaddress.ip_address(ip)
+        value = int(address)
+        for pool in self._all_pools():
+            if pool.network.version == address.version and value in pool:
+                return pool
+        raise ValueError(f"Address {ip} does not belong to any IP pool")
+
+    def _all_pools(self):
+        for pools in self.pools.values():
+            yield from pools
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {site: [pool.to_dict() for pool in pools] for site, pools in self.pools.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'IPAllocator':
+        allocator = cls()
+        for site, pools in data.items():
+            allocator.pools[site] = [IPPool.from_dict(pool) for pool in pools]
+        return allocator
+
+
+@instrument
 class NFVO:
-    def __init__(self):
+    def __init__(self, ip_pools: Optional[Dict[str, List[str]]] = None, store: Optional[InventoryStore] = None,
+                 placement: Optional[PlacementEngine] = None, metrics: Optional[MetricsStore] = None,
+                 events: Optional[EventBus] = None):
         # Initialisation des structures de données et configuration du logging
         self.network_slices = {}
-        self.vnf_instances = {}
-        self.ip_pool = [f"192.168.0.{i}" for i in range(1, 255)]
+        self.vnf_instances = {}  # Index inverse : instance_id -> slice et composant
+        self.ip_owners = {}  # Index inverse : adresse IP -> slice et composant
+        self.ip_pools = ip_pools or DEFAULT_IP_POOLS
+        self.ip_allocator = IPAllocator(self.ip_pools)
+        self.ip_allocator.track_changes()
         self.ip_lock = Lock()  # Pour la gestion de la concurrence
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
-
-    def instantiate_vnfs(self, calculated_resources: Dict[str, Any]) -> Dict[str, Any]:
-        # Instanciation des VNFs pour une nouvelle slice réseau
-        slice_id = str(uuid.uuid4())
-        vnf_instances = {}
+        self.locks = SliceLockManager()  # Verrous par slice réseau
+        self.placement = placement  # Placement optionnel des VNFs sur les hôtes de calcul
+        self.shared_vnfs = {}  # Instances partagées entre slices : composant -> instance
+        self.shared_lock = Lock()  # Toujours pris avant ip_lock
+        self.metrics = metrics  # Séries temporelles alimentées par un MetricsCollector
+        self.store = store  # Stockage persistant optionnel de l'inventaire
+        self.events = events  # Bus optionnel : allocation et libération des instances VNF
+        self._dirty_slices = set()  # Slices modifiées depuis le dernier snapshot
+        self._dirty_shared = set()  # Instances partagées modifiées ou supprimées depuis le dernier snapshot
+        self._deleted_slices = set()  # Slices supprimées depuis le dernier snapshot
+        self._snapshot_file = None
+        self._delta_count = 0
+        self._generation = None  # Génération du dernier snapshot complet, reprise par ses deltas
+        if store is not None:
+            self.network_slices = dict(store.namespace(STORE_NAMESPACE))
+            self.shared_vnfs = dict(store.namespace(SHARED_STORE_NAMESPACE))
+            self._restore_ip_pools()
+            self._reserve_slice_ips()
+            self._rebuild_reverse_maps()
+        self.logger = get_logger('nfvo')
 
+    def instantiate_vnfs(self, calculated_resources: Dict[str, Any], slice_type: Optional[str] = None,
+                         shared_components: Sequence[str] = (), parent_slice_id: Optional[str] = None) -> Dict[str, Any]:
+        # Instanciation des VNFs pour une nouvelle slice réseau ; les composants de
+        # `shared_components` sont rattachés aux instances partagées au lieu d'être dédiés.
+        # Les événements sont publiés sous `parent_slice_id` (slice de plus haut niveau) s'il est fourni
         for component, resources in calculated_resources.items():
             if not self._validate_resources(resources):
                 raise ValueError(f"Invalid resources for component {component}")
-            
-            instance_id = str(uuid.uuid4())
-            ip_address = self._allocate_ip()
-            
+
+        slice_id = str(uuid.uuid4())
+        dedicated = {c: r for c, r in calculated_resources.items() if c not in shared_components}
+        shared = {c: r for c, r in calculated_resources.items() if c in shared_components}
+        hosts = self.placement.place(slice_id, dedicated, slice_type) if self.placement and dedicated else {}
+        try:
+            allocated = self._allocate_instances(slice_id, list(dedicated))
+        except Exception:
+            if self.placement:
+                self.placement.release(slice_id)
+            raise
+        vnf_instances = {}
+        for component, resources in dedicated.items():
             vnf_instances[component] = {
-                'instance_id': instance_id,
-                'ip_address': ip_address,
+                'instance_id': allocated[component]['instance_id'],
+                'ip_address': allocated[component]['ip_address'],
                 'status': 'running',
                 'resources': resources
             }
+            if component in hosts:
+                vnf_instances[component]['host'] = hosts[component]
+
+        try:
+            shared_vnfs = self._attach_shared_many(shared, slice_id, parent_slice_id)
+        except Exception:
+            self._release_instances(vnf_instances)
+            if self.placement:
+                self.placement.release(slice_id)
+            raise
 
         self.network_slices[slice_id] = {
             'status': 'active',
-            'vnf_instances': vnf_instances
+            'slice_type': slice_type,  # Conservé pour les re-placements (anti-affinité URLLC)
+            'parent_slice_id': parent_slice_id,
+            'vnf_instances': vnf_instances,
+            'shared_vnfs': shared_vnfs
         }
 
-        self.logger.info(f"Deployed network slice {slice_id}")
+        self._mark_dirty(slice_id)
+        self._emit_vnfs(EventType.VNF_ALLOCATED, slice_id, vnf_instances)
+        self.logger.info("Deployed network slice %s", slice_id)
         return {
             'slice_id': slice_id,
-            'vnf_instances': vnf_instances
+            'vnf_instances': vnf_instances,
+            'shared_vnfs': shared_vnfs
         }
 
-    def update_network_slice(self, slice_id: str, new_resources: Dict[str, Any]) -> Dict[str, Any]:
-        # Mise à jour des ressources d'une slice réseau existante
-        if slice_id not in self.network_slices:
-            raise ValueError(f"Network slice {slice_id} not found")
-
-        for component, resources in new_resources.items():
-            if not self._validate_resources(resources):
-                raise ValueError(f"Invalid resources for component {component}")
-            
-            if component in self.network_slices[slice_id]['vnf_instances']:
-                self.network_slices[slice_id]['vnf_instances'][component]['resources'] = resources
+    def instantiate_vnfs_batch(self, calculated_resources_list: List[Dict[str, Any]],
+                               slice_types: Optional[List[Optional[str]]] = None,
+                               shared_components: Optional[List[Sequence[str]]] = None,
+                               parent_slice_ids: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        # Instanciation groupée : validation de toutes les demandes puis allocation
+        # de toutes les adresses IP dans une seule section critique
+        results: List[Dict[str, Any]] = [None] * len(calculated_resources_list)
+        valid = []
+        dedicated_list = []
+        for index, calculated_resources in enumerate(calculated_resources_list):
+            shared = shared_components[index] if shared_components else ()
+            dedicated_list.append({c: r for c, r in calculated_resources.items() if c not in shared})
+            invalid = [c for c, r in calculated_resources.items() if not self._validate_resources(r)]
+            if invalid:
+                results[index] = {'status': 'failed', 'error': f"Invalid resources for component {invalid[0]}"}
             else:
-                # Ajout d'un nouveau composant à la slice existante
-                instance_id = str(uuid.uuid4())
+                valid.append(index)
+
+        slice_ids = {index: str(uuid.uuid4()) for index in valid}
+        hosts = {}
+        if self.placement:
+            placed = []
+            for index in valid:
+                slice_type = slice_types[index] if slice_types else None
                 try:
-                    ip_address = self._allocate_ip()
-                except Exception as e:
-                    self.logger.error(f"Failed to allocate IP: {str(e)}")
-                    raise
-                self.network_slices[slice_id]['vnf_instances'][component] = {
-                    'instance_id': instance_id,
-                    'ip_address': ip_address,
-                    'status': 'running',
-                    'resources': resources
+                    hosts[index] = self.placement.place(slice_ids[index], dedicated_list[index], slice_type)
+                except ValueError as e:
+                    results[index] = {'status': 'failed', 'error': str(e)}
+                    continue
+                placed.append(index)
+            valid = placed
+
+        with self.ip_lock:
+            # Les slices qui ne tiennent plus dans le pool échouent, les autres sont servies
+            available = self.ip_allocator.available('default')
+            admitted = []
+            needed = 0
+            for index in valid:
+                count = len(dedicated_list[index])
+                if needed + count > available:
+                    results[index] = {'status': 'failed', 'error': "IP pool exhausted"}
+                    if self.placement:
+                        self.placement.release(slice_ids[index])
+                    continue
+                needed += count
+                admitted.append(index)
+            addresses = iter(self.ip_allocator.allocate_many(needed) if needed else [])
+
+            # Les index inverses sont renseignés dans la même section critique que l'allocation
+            for index in admitted:
+                slice_id = slice_ids[index]
+                slice_type = slice_types[index] if slice_types else None
+                vnf_instances = {}
+                for component, resources in dedicated_list[index].items():
+                    instance_id = str(uuid.uuid4())
+                    ip_address = next(addresses)
+                    self._register_owner(slice_id, component, instance_id, ip_address)
+                    vnf_instances[component] = {
+                        'instance_id': instance_id,
+                        'ip_address': ip_address,
+                        'status': 'running',
+                        'resources': resources
+                    }
+                    if index in hosts:
+                        vnf_instances[component]['host'] = hosts[index][component]
+                self.network_slices[slice_id] = {
+                    'status': 'active',
+                    'slice_type': slice_type,
+                    'parent_slice_id': parent_slice_ids[index] if parent_slice_ids else None,
+                    'vnf_instances': vnf_instances,
+                    'shared_vnfs': {}
                 }
+                results[index] = {'status': 'success', 'slice_id': slice_id, 'vnf_instances': vnf_instances}
+
+        # Rattachement aux instances partagées hors de ip_lock (shared_lock se prend avant)
+        for index in admitted:
+            slice_id = slice_ids[index]
+            shared = {c: r for c, r in calculated_resources_list[index].items() if c not in dedicated_list[index]}
+            if not shared:
+                results[index]['shared_vnfs'] = {}
+                continue
+            try:
+                self.network_slices[slice_id]['shared_vnfs'] = self._attach_shared_many(shared, slice_id)
+            except Exception as e:
+                self._release_instances(self.network_slices.pop(slice_id)['vnf_instances'])
+                if self.placement:
+                    self.placement.release(slice_id)
+                results[index] = {'status': 'failed', 'error': str(e)}
+                continue
+            results[index]['shared_vnfs'] = self.network_slices[slice_id]['shared_vnfs']
 
-        self.logger.info(f"Updated network slice {slice_id}")
-        return self.network_slices[slice_id]['vnf_instances']
+        for result in results:
+            if result['status'] == 'success':
+                self._emit_vnfs(EventType.VNF_ALLOCATED, result['slice_id'], result['vnf_instances'])
+        self._mark_dirty(*(r['slice_id'] for r in results if r['status'] == 'success'))
+        self.logger.info("Deployed %d/%d network slices in batch",
+                         sum(r['status'] == 'success' for r in results), len(calculated_resources_list))
+        return results
+
+    def update_network_slice(self, slice_id: str, new_resources: Dict[str, Any]) -> Dict[str, Any]:
+        # Mise à jour des ressources d'une slice réseau existante
+        with self.locks.locked(slice_id):
+            if slice_id not in self.network_slices:
+                raise ValueError(f"Network slice {slice_id} not found")
+
+            shared_vnfs = self.network_slices[slice_id].setdefault('shared_vnfs', {})
+            slice_type = self.network_slices[slice_id].get('slice_type')
+            for component, resources in new_resources.items():
+                if not self._validate_resources(resources):
+                    raise ValueError(f"Invalid resources for component {component}")
+
+                if component in shared_vnfs:
+                    # Redimensionnement incrémental de l'instance partagée
+                    shared_vnfs[component]['increment'] = self._resize_shared(
+                        component, shared_vnfs[component]['increment'], resources)
+                elif component in self.network_slices[slice_id]['vnf_instances']:
+                    vnf_instance = self.network_slices[slice_id]['vnf_instances'][component]
+                    resources = self._with_scaling(resources, vnf_instance.get('scaling'))
+                    if self.placement:
+                        vnf_instance['host'] = self.placement.replace(slice_id, component, resources, slice_type)
+                    vnf_instance['resources'] = resources
+                else:
+                    # Ajout d'un nouveau composant à la slice existante
+                    hosts = self.placement.place(slice_id, {component: resources}, slice_type) if self.placement else {}
+                    try:
+                        allocated = self._allocate_instances(slice_id, [component])[component]
+                    except Exception as e:
+                        if self.placement:
+                            self.placement.release(slice_id, component)
+                        self.logger.error("Failed to allocate IP: %s", e)
+                        raise
+                    self.network_slices[slice_id]['vnf_instances'][component] = {
+                        'instance_id': allocated['instance_id'],
+                        'ip_address': allocated['ip_address'],
+                        'status': 'running',
+                        'resources': resources
+                    }
+                    if component in hosts:
+                        self.network_slices[slice_id]['vnf_instances'][component]['host'] = hosts[component]
+                    self._emit_vnfs(EventType.VNF_ALLOCATED, slice_id,
+                                    {component: self.network_slices[slice_id]['vnf_instances'][component]})
+
+            self._mark_dirty(slice_id)
+            self.logger.info("Updated network slice %s", slice_id)
+            return self.network_slices[slice_id]['vnf_instances']
 
     def delete_network_slice(self, slice_id: str) -> bool:
         # Suppression d'une slice réseau
-        if slice_id not in self.network_slices:
-            return False
-
-        for instance in self.network_slices[slice_id]['vnf_instances'].values():
-            self._deallocate_ip(instance['ip_address'])
+        with self.locks.locked(slice_id):
+            if slice_id not in self.network_slices:
+                return False
 
-        del self.network_slices[slice_id]
-        self.logger.info(f"Deleted network slice {slice_id}")
-        return True
+            self._release_instances(self.network_slices[slice_id]['vnf_instances'])
+            self._emit_vnfs(EventType.VNF_RELEASED, slice_id, self.network_slices[slice_id]['vnf_instances'])
+            if self.placement:
+                self.placement.release(slice_id)
+            for component, shared in self.network_slices[slice_id].get('shared_vnfs', {}).items():
+                self._detach_shared(component, shared['increment'], slice_id)
+            if self.metrics is not None:
+                self.metrics.remove(slice_id)
+            del self.network_slices[slice_id]
+            self._mark_deleted(slice_id)
+            self.logger.info("Deleted network slice %s", slice_id)
+            return True
 
     def get_slice_status(self, slice_id: str) -> str:
         # Récupération du statut d'une slice réseau
@@ -91,61 +536,364 @@ class NFVO:
             raise ValueError(f"Network slice {slice_id} not found")
         return self.network_slices[slice_id]['status']
 
+    def get_slice_by_ip(self, ip_address: str) -> Dict[str, str]:
+        # Slice et composant propriétaires d'une adresse IP (O(1))
+        owner = self.ip_owners.get(ip_address)
+        if owner is None:
+            raise ValueError(f"IP address {ip_address} is not assigned to any VNF instance")
+        return dict(owner)
+
+    def get_slice_by_instance(self, instance_id: str) -> Dict[str, str]:
+        # Slice et composant d'une instance VNF (O(1))
+        owner = self.vnf_instances.get(instance_id)
+        if owner is None:
+            raise ValueError(f"VNF instance {instance_id} not found")
+        return dict(owner)
+
     def list_network_slices(self) -> List[str]:
         # Liste des IDs de toutes les slices réseau
         return list(self.network_slices.keys())
 
     def scale_vnf_instance(self, slice_id: str, component: str, scale_type: str, scale_amount: int) -> None:
         # Mise à l'échelle d'une instance VNF
+        with self.locks.locked(slice_id):
+            self._scale_vnf(slice_id, component, scale_type, scale_amount)
+            self._mark_dirty(slice_id)
+            self.logger.info("Scaled %s VNF instance %s in slice %s", scale_type, component, slice_id)
+
+    def scale_vnf_instances(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Mise à l'échelle groupée : une action {'slice_id', 'component', 'scale_type', 'scale_amount'}
+        # par VNF, une seule écriture dans le stockage pour tout le lot
+        results = []
+        scaled = {}
+        for action in actions:
+            slice_id, component = action['slice_id'], action['component']
+            try:
+                with self.locks.locked(slice_id):
+                    self._scale_vnf(slice_id, component, action['scale_type'], action['scale_amount'])
+            except ValueError as e:
+                results.append({'status': 'failed', 'slice_id': slice_id, 'component': component, 'error': str(e)})
+                continue
+            scaled[slice_id] = None
+            results.append({'status': 'success', 'slice_id': slice_id, 'component': component})
+
+        self._mark_dirty(*(s for s in scaled if s in self.network_slices))
+        self.logger.info("Scaled %s network slices in batch", len(scaled))
+        return results
+
+    def _scale_vnf(self, slice_id: str, component: str, scale_type: str, scale_amount: int) -> None:
+        # À appeler avec le verrou de la slice tenu
         if slice_id not in self.network_slices:
             raise ValueError(f"Network slice {slice_id} not found")
-        
+
+        if component in self.network_slices[slice_id].get('shared_vnfs', {}):
+            raise ValueError(f"Component {component} of slice {slice_id} is shared; update the slice resources instead")
         if component not in self.network_slices[slice_id]['vnf_instances']:
             raise ValueError(f"Component {component} not found in slice {slice_id}")
-        
+
         vnf_instance = self.network_slices[slice_id]['vnf_instances'][component]
-        
+        resources = dict(vnf_instance['resources'])
+
         if scale_type == 'up':
-            vnf_instance['resources']['cpu'] += scale_amount
-            vnf_instance['resources']['memory'] += scale_amount * 1024  # 1GB per unit
+            resources['cpu'] += scale_amount
+            resources['memory'] += scale_amount * 1024  # 1GB per unit
         elif scale_type == 'down':
-            vnf_instance['resources']['cpu'] = max(1, vnf_instance['resources']['cpu'] - scale_amount)
-            vnf_instance['resources']['memory'] = max(1024, vnf_instance['resources']['memory'] - scale_amount * 1024)
+            resources['cpu'] = max(1, resources['cpu'] - scale_amount)
+            resources['memory'] = max(1024, resources['memory'] - scale_amount * 1024)
         else:
             raise ValueError("Invalid scale type. Use 'up' or 'down'")
 
-        self.logger.info(f"Scaled {scale_type} VNF instance {component} in slice {slice_id}")
+        # Re-placement incrémental : le VNF ne change d'hôte que si le sien est plein
+        if self.placement:
+            vnf_instance['host'] = self.placement.replace(slice_id, component, resources,
+                                                          self.network_slices[slice_id].get('slice_type'))
+        # Écart cumulé par rapport aux ressources de la sous-slice, réappliqué à chaque mise à jour
+        scaling = vnf_instance.setdefault('scaling', {'cpu': 0, 'memory': 0})
+        scaling['cpu'] += resources['cpu'] - vnf_instance['resources']['cpu']
+        scaling['memory'] += resources['memory'] - vnf_instance['resources']['memory']
+        vnf_instance['resources'].update(resources)
+
+    @staticmethod
+    def _with_scaling(resources: Dict[str, Any], scaling: Optional[Dict[str, int]]) -> Dict[str, Any]:
+        # Ressources d'une mise à jour augmentées de la mise à l'échelle propre au VNF
+        if not scaling or 'cpu' not in resources or 'memory' not in resources:
+            return resources
+        return dict(resources, cpu=max(1, resources['cpu'] + scaling['cpu']),
+                    memory=max(1024, resources['memory'] + scaling['memory']))
 
     def get_vnf_metrics(self, slice_id: str, component: str) -> Dict[str, Any]:
-        # Récupération des métriques d'une instance VNF
+        # Dernier échantillon collecté pour une instance VNF
+        key = self._instance_key(slice_id, component)
+        if self.metrics is None:
+            # Sans collecteur, les métriques sont simulées
+            vnf_instance = self.shared_vnfs[component] if key[0] == SHARED_SLICE_ID \
+                else self.network_slices[slice_id]['vnf_instances'][component]
+            return {
+                'cpu_usage': random.uniform(0, 100),
+                'memory_usage': random.uniform(0, vnf_instance['resources']['memory']),
+                'network_in': random.uniform(0, 1000),
+                'network_out': random.uniform(0, 1000)
+            }
+
+        latest = self.metrics.latest(*key)
+        if latest is None:
+            raise ValueError(f"No metrics collected yet for {component} in slice {slice_id}")
+        return latest
+
+    def get_vnf_metric_stats(self, slice_id: str, component: str, window: Optional[float] = None,
+                             now: Optional[float] = None) -> Dict[str, Any]:
+        # Moyenne, p95 et maximum de chaque métrique sur les `window` dernières secondes
+        key = self._instance_key(slice_id, component)
+        if self.metrics is None:
+            raise RuntimeError("No metrics store configured for this NFVO")
+        return self.metrics.aggregate(*key, window=window, now=now)
+
+    def get_vnf_instance(self, slice_id: str, component: str) -> Dict[str, Any]:
+        # Instance VNF (dédiée ou partagée) servant un composant de la slice
+        key = self._instance_key(slice_id, component)
+        if key[0] == SHARED_SLICE_ID:
+            return self.shared_vnfs[component]
+        return self.network_slices[slice_id]['vnf_instances'][component]
+
+    def iter_vnf_instances(self):
+        # Toutes les instances en service (slice_id, composant, instance), partagées comprises
+        for slice_id, slice_data in list(self.network_slices.items()):
+            for component, instance in list(slice_data['vnf_instances'].items()):
+                yield slice_id, component, instance
+        for component, instance in list(self.shared_vnfs.items()):
+            yield SHARED_SLICE_ID, component, instance
+
+    def _instance_key(self, slice_id: str, component: str):
         if slice_id not in self.network_slices:
             raise ValueError(f"Network slice {slice_id} not found")
-        
+        if component in self.network_slices[slice_id].get('shared_vnfs', {}):
+            return SHARED_SLICE_ID, component
         if component not in self.network_slices[slice_id]['vnf_instances']:
             raise ValueError(f"Component {component} not found in slice {slice_id}")
-        
-        vnf_instance = self.network_slices[slice_id]['vnf_instances'][component]
-        
-        # Simulation de la collecte de métriques
-        return {
-            'cpu_usage': random.uniform(0, 100),
-            'memory_usage': random.uniform(0, vnf_instance['resources']['memory']),
-            'network_in': random.uniform(0, 1000),
-            'network_out': random.uniform(0, 1000)
-        }
+        return slice_id, component
+
+    def add_ip_pool(self, cidr: str, site: str = 'default') -> None:
+        # Ajout d'un CIDR supplémentaire au pool d'un site, persisté pour le redémarrage
+        with self.ip_lock:
+            pool = self.ip_allocator.add_pool(cidr, site)
+            if self.store is not None:
+                network = str(pool.network)
+                self.store.put(IP_POOL_STORE_NAMESPACE, f"{site}/{network}", {'site': site, 'cidr': network})
+
+    def get_shared_vnfs(self) -> Dict[str, Dict[str, Any]]:
+        # Instances partagées avec leur nombre de slices rattachées
+        return {component: dict(instance) for component, instance in self.shared_vnfs.items()}
+
+    def _attach_shared_many(self, calculated_resources: Dict[str, Any], slice_id: str,
+                            parent_slice_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        # Rattachement tout-ou-rien d'une slice à plusieurs instances partagées
+        attached = {}
+        try:
+            for component, resources in calculated_resources.items():
+                attached[component] = self._attach_shared(component, resources, slice_id, parent_slice_id)
+        except Exception:
+            for component, shared in attached.items():
+                self._detach_shared(component, shared['increment'], slice_id, parent_slice_id)
+            raise
+        return attached
+
+    def _attach_shared(self, component: str, resources: Dict[str, Any], slice_id: str,
+                       parent_slice_id: Optional[str] = None) -> Dict[str, Any]:
+        # L'instance partagée est créée au premier rattachement avec les ressources complètes,
+        # puis grossit d'un incrément par slice : le coût croît de façon sous-linéaire.
+        # Sa création est publiée pour la slice `slice_id` qui l'a provoquée
+        increment = self._shared_increment(resources)
+        created = None
+        with self.shared_lock:
+            instance = self.shared_vnfs.get(component)
+            if instance is None:
+                base = {key: resources[key] for key in ('cpu', 'memory', 'storage')}
+                hosts = self.placement.place(SHARED_SLICE_ID, {component: base}) if self.placement else {}
+                try:
+                    allocated = self._allocate_instances(SHARED_SLICE_ID, [component])[component]
+                except Exception:
+                    if self.placement:
+                        self.placement.release(SHARED_SLICE_ID, component)
+                    raise
+                instance = {
+                    'instance_id': allocated['instance_id'],
+                    'ip_address': allocated['ip_address'],
+                    'status': 'running',
+                    'resources': base,
+                    'refcount': 0
+                }
+                if component in hosts:
+                    instance['host'] = hosts[component]
+                self.shared_vnfs[component] = instance
+                created = instance
+                self.logger.info("Deployed shared VNF instance %s", component)
+
+            try:
+                self._adjust_shared(component, increment)
+            except Exception:
+                if instance['refcount'] == 0:
+                    self._destroy_shared(component)
+                raise
+            instance['refcount'] += 1
+            self._persist_shared(component)
+        if created is not None:
+            self._emit_vnfs(EventType.VNF_ALLOCATED, slice_id, {component: created}, parent_slice_id, shared=True)
+        return {'instance_id': instance['instance_id'], 'increment': increment}
+
+    def _resize_shared(self, component: str, previous: Dict[str, int], resources: Dict[str, Any]) -> Dict[str, int]:
+        # Seule la différence entre l'ancien et le nouvel incrément est appliquée
+        increment = self._shared_increment(resources)
+        with self.shared_lock:
+            self._adjust_shared(component, {key: increment[key] - previous[key] for key in increment})
+            self._persist_shared(component)
+        return increment
+
+    def _detach_shared(self, component: str, increment: Dict[str, int], slice_id: str,
+                       parent_slice_id: Optional[str] = None) -> None:
+        with self.shared_lock:
+            instance = self.shared_vnfs.get(component)
+            if instance is None:
+                return
+            instance['refcount'] -= 1
+            destroyed = instance['refcount'] <= 0
+            if destroyed:
+                self._destroy_shared(component)
+            else:
+                self._adjust_shared(component, {key: -value for key, value in increment.items()})
+            self._persist_shared(component)
+        if destroyed:
+            self._emit_vnfs(EventType.VNF_RELEASED, slice_id, {component: instance}, parent_slice_id, shared=True)
+
+    def _adjust_shared(self, component: str, delta: Dict[str, int]) -> None:
+        # À appeler avec shared_lock tenu
+        instance = self.shared_vnfs[component]
+        resources = {key: value + delta.get(key, 0) for key, value in instance['resources'].items()}
+        if self.placement and 'host' in instance:
+            instance['host'] = self.placement.replace(SHARED_SLICE_ID, component, resources)
+        instance['resources'] = resources
+
+    def _destroy_shared(self, component: str) -> None:
+        # À appeler avec shared_lock tenu
+        instance = self.shared_vnfs.pop(component)
+        self._release_instances({component: instance})
+        if self.placement:
+            self.placement.release(SHARED_SLICE_ID, component)
+        if self.metrics is not None:
+            self.metrics.remove(SHARED_SLICE_ID, component)
+        self.logger.info("Removed shared VNF instance %s", component)
 
-    def _allocate_ip(self) -> str:
+    def _persist_shared(self, component: str) -> None:
+        self._dirty_shared.add(component)
+        if self.store is None:
+            return
+        if component in self.shared_vnfs:
+            self.store.put(SHARED_STORE_NAMESPACE, component, self.shared_vnfs[component])
+        else:
+            self.store.delete(SHARED_STORE_NAMESPACE, component)
+
+    @staticmethod
+    def _shared_increment(resources: Dict[str, Any]) -> Dict[str, int]:
+        return {key: math.ceil(resources[key] * SHARED_SCALE_FACTOR) for key in ('cpu', 'memory', 'storage')}
+
+    def _allocate_ip(self, site: str = 'default') -> str:
         # Allocation d'une adresse IP depuis le pool
         with self.ip_lock:
-            if not self.ip_pool:
-                raise Exception("IP pool exhausted")
-            return self.ip_pool.pop(random.randint(0, len(self.ip_pool) - 1))
+            return self.ip_allocator.allocate(site)
+
+    def _allocate_ips(self, count: int, site: str = 'default') -> List[str]:
+        # Allocation groupée d'adresses IP en une seule section critique
+        with self.ip_lock:
+            return self.ip_allocator.allocate_many(count, site)
+
+    @traced('NFVO.allocate_instances')
+    def _allocate_instances(self, slice_id: str, components: List[str], site: str = 'default') -> Dict[str, Dict[str, str]]:
+        # Allocation des adresses et enregistrement des index inverses dans la même section critique
+        with self.ip_lock:
+            addresses = self.ip_allocator.allocate_many(len(components), site)
+            allocated = {}
+            for component, ip_address in zip(components, addresses):
+                instance_id = str(uuid.uuid4())
+                self._register_owner(slice_id, component, instance_id, ip_address)
+                allocated[component] = {'instance_id': instance_id, 'ip_address': ip_address}
+        return allocated
+
+    def _release_instances(self, vnf_instances: Dict[str, Any]) -> None:
+        # Libération des adresses et retrait des index inverses dans la même section critique
+        with self.ip_lock:
+            for instance in vnf_instances.values():
+                self.ip_allocator.release(instance['ip_address'])
+                self.ip_owners.pop(instance['ip_address'], None)
+                self.vnf_instances.pop(instance['instance_id'], None)
+
+    def _emit_vnfs(self, event_type: EventType, slice_id: str, instances: Dict[str, Dict[str, Any]],
+                   parent_slice_id: Optional[str] = None, shared: bool = False) -> None:
+        # Publié hors de ip_lock et de shared_lock : un abonné BLOCK ne doit pas bloquer les allocations.
+        # L'événement porte l'ID de la slice de plus haut niveau ; l'ID NFVO reste dans les données
+        if self.events is None:
+            return
+        if parent_slice_id is None and slice_id in self.network_slices:
+            parent_slice_id = self.network_slices[slice_id].get('parent_slice_id')
+        for component, instance in instances.items():
+            self.events.publish(event_type, 'nfvo', parent_slice_id or slice_id, nfvo_slice_id=slice_id,
+                                component=component, instance_id=instance['instance_id'],
+                                ip_address=instance['ip_address'], shared=shared)
+
+    def _register_owner(self, slice_id: str, component: str, instance_id: str, ip_address: str) -> None:
+        # À appeler avec ip_lock tenu
+        owner = {'slice_id': slice_id, 'component': component}
+        self.vnf_instances[instance_id] = owner
+        self.ip_owners[ip_address] = owner
+
+    def _rebuild_reverse_maps(self) -> None:
+        # Reconstruction des index inverses après un rechargement d'état
+        with self.ip_lock:
+            self.vnf_instances = {}
+            self.ip_owners = {}
+            for slice_id, slice_data in self.network_slices.items():
+                for component, instance in slice_data['vnf_instances'].items():
+                    self._register_owner(slice_id, component, instance['instance_id'], instance['ip_address'])
+                    if self.placement and 'host' in instance:
+                        self.placement.restore(slice_id, component, instance['host'], instance['resources'])
+            for component, instance in self.shared_vnfs.items():
+                self._register_owner(SHARED_SLICE_ID, component, instance['instance_id'], instance['ip_address'])
+                if self.placement and 'host' in instance:
+                    self.placement.restore(SHARED_SLICE_ID, component, instance['host'], instance['resources'])
 
     def _deallocate_ip(self, ip: str) -> None:
         # Libération d'une adresse IP
         with self.ip_lock:
-            if ip not in self.ip_pool:
-                self.ip_pool.append(ip)
+            self.ip_allocator.release(ip)
+
+    @traced('NFVO.persist')
+    def _mark_dirty(self, *slice_ids: str) -> None:
+        # Suivi des slices modifiées depuis le dernier snapshot et écriture dans le stockage persistant
+        self._dirty_slices.update(slice_ids)
+        self._deleted_slices.difference_update(slice_ids)
+        if self.store is not None:
+            self.store.put_many(STORE_NAMESPACE, ((s, self.network_slices[s]) for s in slice_ids))
+
+    def _mark_deleted(self, slice_id: str) -> None:
+        self._dirty_slices.discard(slice_id)
+        self._deleted_slices.add(slice_id)
+        if self.store is not None:
+            self.store.delete(STORE_NAMESPACE, slice_id)
+
+    def _restore_ip_pools(self) -> None:
+        # Pools ajoutés par add_ip_pool, à recréer avant de réserver les adresses des slices
+        with self.ip_lock:
+            known = {(site, str(pool.network)) for site, pools in self.ip_allocator.pools.items() for pool in pools}
+            for record in self.store.namespace(IP_POOL_STORE_NAMESPACE).values():
+                if (record['site'], record['cidr']) not in known:
+                    self.ip_allocator.add_pool(record['cidr'], record['site'])
+
+    def _reserve_slice_ips(self) -> None:
+        # Reconstruction de l'état de l'allocateur à partir des VNFs en service
+        with self.ip_lock:
+            for slice_data in self.network_slices.values():
+                for instance in slice_data['vnf_instances'].values():
+                    self.ip_allocator.reserve(instance['ip_address'])
+            for instance in self.shared_vnfs.values():
+                self.ip_allocator.reserve(instance['ip_address'])
 
     def _validate_resources(self, resources: Dict[str, Any]) -> bool:
         # Validation des ressources demandées
@@ -158,21 +906,123 @@ class NFVO:
         
         return True
 
-    def save_state(self, filename: str) -> None:
-        # Sauvegarde de l'état du NFVO dans un fichier
-        import json
-        with open(filename, 'w') as f:
-            json.dump({
-                'network_slices': self.network_slices,
-                'ip_pool': self.ip_pool
-            }, f)
-        self.logger.info(f"Saved NFVO state to {filename}")
+    def save_state(self, filename: str, incremental: bool = False, max_deltas: int = 50) -> None:
+        # Sauvegarde de l'état du NFVO dans un fichier.
+        # En mode incrémental, seuls les changements depuis la dernière sauvegarde dans ce même
+        # fichier (slices, instances partagées, adresses) sont écrits dans un segment delta
+        # `<filename>.delta.NNNNNN`. Chaque snapshot complet ouvre une nouvelle génération,
+        # reprise par ses deltas : un delta d'une génération antérieure (laissé par un arrêt
+        # entre l'écriture de la base et le nettoyage) n'est jamais rejoué.
+        try:
+            if (not incremental or filename != self._snapshot_file or not os.path.exists(filename)
+                    or self._delta_count >= max_deltas):
+                generation = uuid.uuid4().hex
+                with self.ip_lock:
+                    ip_pools = self.ip_allocator.to_dict()
+                    self.ip_allocator.take_changes()
+                self._write_json(filename, {
+                    'generation': generation,
+                    'network_slices': self.network_slices,
+                    'shared_vnfs': self.shared_vnfs,
+                    'ip_pools': ip_pools
+                })
+                self._generation = generation
+                self._delta_count = 0
+                for delta in self._delta_files(filename):
+                    os.remove(delta)
+                self.logger.info("Saved NFVO state to %s", filename)
+            else:
+                with self.ip_lock:
+                    ip_changes = self.ip_allocator.take_changes()
+                delta_file = f"{filename}.delta.{self._delta_count + 1:06d}"
+                self._write_json(delta_file, {
+                    'generation': self._generation,
+                    'network_slices': {s: self.network_slices[s] for s in self._dirty_slices},
+                    'deleted_slices': sorted(self._deleted_slices),
+                    'shared_vnfs': {c: self.shared_vnfs[c] for c in self._dirty_shared if c in self.shared_vnfs},
+                    'deleted_shared_vnfs': sorted(c for c in self._dirty_shared if c not in self.shared_vnfs),
+                    'ip_changes': ip_changes
+                })
+                self._delta_count += 1
+                self.logger.info("Saved NFVO delta with %d changed and %d deleted slices to %s",
+                                 len(self._dirty_slices), len(self._deleted_slices), delta_file)
+        except Exception:
+            # Les changements d'adresses déjà prélevés seraient perdus : la prochaine sauvegarde sera complète
+            self._snapshot_file = None
+            raise
+
+        self._snapshot_file = filename
+        self._dirty_slices.clear()
+        self._deleted_slices.clear()
+        self._dirty_shared.clear()
 
     def load_state(self, filename: str) -> None:
-        # Chargement de l'état du NFVO depuis un fichier
-        import json
+        # Chargement de l'état du NFVO depuis un fichier, puis rejeu des segments delta de sa génération
         with open(filename, 'r') as f:
             data = json.load(f)
-            self.network_slices = data['network_slices']
-            self.ip_pool = data['ip_pool']
-        self.logger.info(f"Loaded NFVO state from {filename}")
\ No newline at end of file
+        if 'ip_pool' in data and 'ip_pools' not in data:
+            self._load_legacy_state(filename, data)
+            return
+        if 'ip_pools' not in data or 'generation' not in data:
+            raise ValueError(f"Unsupported NFVO state format in {filename}")
+        self.network_slices = data['network_slices']
+        self.shared_vnfs = data['shared_vnfs']
+        self.ip_allocator = IPAllocator.from_dict(data['ip_pools'])
+        generation = data['generation']
+
+        applied = 0
+        for delta_file in self._delta_files(filename):
+            with open(delta_file, 'r') as f:
+                delta = json.load(f)
+            if delta.get('generation') != generation:
+                self.logger.warning("Ignoring delta %s from another snapshot generation", delta_file)
+                continue
+            if 'ip_changes' not in delta:
+                raise ValueError(f"Unsupported NFVO delta format in {delta_file}")
+            self.network_slices.update(delta['network_slices'])
+            for slice_id in delta['deleted_slices']:
+                self.network_slices.pop(slice_id, None)
+            self.shared_vnfs.update(delta['shared_vnfs'])
+            for component in delta['deleted_shared_vnfs']:
+                self.shared_vnfs.pop(component, None)
+            self.ip_allocator.apply_changes(delta['ip_changes'])
+            applied += 1
+
+        self.ip_allocator.track_changes()
+        self._rebuild_reverse_maps()
+        self._snapshot_file = filename
+        self._generation = generation
+        self._delta_count = applied
+        self._dirty_slices.clear()
+        self._deleted_slices.clear()
+        self._dirty_shared.clear()
+        self.logger.info("Loaded NFVO state from %s with %s delta segments", filename, applied)
+
+    def _load_legacy_state(self, filename: str, data: Dict[str, Any]) -> None:
+        # Format d'origine {'network_slices', 'ip_pool'} (liste des adresses libres) : l'allocateur
+        # est reconstruit à partir des adresses en service, et la prochaine sauvegarde est complète
+        self.network_slices = data['network_slices']
+        self.shared_vnfs = {}
+        self.ip_allocator = IPAllocator(self.ip_pools)
+        self._reserve_slice_ips()
+        self.ip_allocator.track_changes()
+        self._rebuild_reverse_maps()
+        self._snapshot_file = None
+        self._generation = None
+        self._delta_count = 0
+        self._dirty_slices.clear()
+        self._deleted_slices.clear()
+        self._dirty_shared.clear()
+        self.logger.info("Migrated legacy NFVO state from %s", filename)
+
+    @staticmethod
+    def _delta_files(filename: str) -> List[str]:
+        return sorted(glob.glob(glob.escape(filename) + ".delta.[0-9]*"))
+
+    @staticmethod
+    def _write_json(filename: str, data: Dict[str, Any]) -> None:
+        # Écriture atomique : un snapshot interrompu ne remplace jamais le précédent
+        tmp_filename = filename + ".tmp"
+        with open(tmp_filename, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_filename, filename)
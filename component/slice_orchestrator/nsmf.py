@@ -1,26 +1,43 @@
 import uuid
-import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from inventory_store import InventoryStore
+from slice_index import SliceIndex
+from slice_locks import SliceLockManager, check_version, bump_version
+from tracing import instrument, traced
+from slice_logging import get_logger
+from slice_events import EventBus, EventType
 
+STORE_NAMESPACE = 'nsmf.slices'
+
+logger = get_logger('nsmf')
+
+@instrument
 class NSMF:
-    def __init__(self):
+    def __init__(self, store: Optional[InventoryStore] = None, events: Optional[EventBus] = None):
         # Initialisation des dictionnaires pour stocker les slices et les NSSMF
-        self.slices = {}
+        self.store = store  # Stockage persistant optionnel de l'inventaire
+        self.events = events  # Bus optionnel : création, modification, échec et suppression des slices
+        self.slices = dict(store.namespace(STORE_NAMESPACE)) if store else {}
+        self.index = SliceIndex()  # Index secondaires (type, SD, statut, propriétaire)
+        self.locks = SliceLockManager()  # Verrous par slice
+        for slice_id in self.slices:
+            self._index(slice_id)
         self.nssmfs = {}  # Pour le moment, nous n'avons que le Core NSSMF
-        logging.debug("NSMF initialized")
+        logger.debug("NSMF initialized")
     
     def register_nssmf(self, domain: str, nssmf: Any):
         # Enregistrement d'un NSSMF pour un domaine spécifique
         self.nssmfs[domain] = nssmf
-        logging.debug(f"NSSMF registered for domain: {domain}")
+        logger.debug("NSSMF registered for domain: %s", domain)
 
     def create_slice_instance(self, slice_request: Dict[str, Any]) -> str:
         # Création d'une nouvelle instance de slice
-        logging.debug(f"Received slice creation request: {slice_request}")
+        logger.debug("Received slice creation request: %s", slice_request)
         
         # Validation de base
         if 'slice_type' not in slice_request:
-            logging.error("Missing slice_type in slice request")
+            logger.error("Missing slice_type in slice request")
+            self._emit(EventType.SLICE_FAILED, None, operation='create', error="Missing slice_type in slice request")
             raise ValueError("Missing slice_type in slice request")
 
         # Génération d'un ID unique pour la nouvelle slice
@@ -28,26 +45,75 @@ class NSMF:
         self.slices[slice_id] = {
             'status': 'creating',
             'request': slice_request,
-            'sub_slices': {}
+            'sub_slices': {},
+            'version': 1
         }
+        self._index(slice_id)
 
         try:
             # Pour l'instant, nous ne gérons que le Core
             if 'core' in self.nssmfs:
-                logging.debug(f"Sending sub-slice creation request to CoreNSSMF with config: {slice_request}")
-                core_sub_slice_id = self.nssmfs['core'].create_sub_slice(slice_request)
+                logger.debug("Sending sub-slice creation request to CoreNSSMF with config: %s", slice_request)
+                core_sub_slice_id = self.nssmfs['core'].create_sub_slice(slice_request, slice_id)
                 self.slices[slice_id]['sub_slices']['core'] = core_sub_slice_id
             else:
-                logging.warning("No Core NSSMF registered")
+                logger.warning("No Core NSSMF registered")
 
             self.slices[slice_id]['status'] = 'active'
-            logging.info(f"Slice instance created successfully with ID: {slice_id}")
+            self._index(slice_id)
+            self._persist(slice_id)
+            logger.info("Slice instance created successfully with ID: %s", slice_id)
+            self._emit_created(slice_id)
             return slice_id
         except Exception as e:
-            logging.error(f"Error creating slice instance: {str(e)}")
+            logger.error("Error creating slice instance: %s", e)
             del self.slices[slice_id]
+            self.index.remove(slice_id)
+            self._emit(EventType.SLICE_FAILED, slice_id, operation='create', error=str(e))
             raise
 
+    def create_slice_instances(self, slice_requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Création groupée d'instances de slice ; un résultat par requête, dans l'ordre
+        results: List[Dict[str, Any]] = [None] * len(slice_requests)
+        valid = []
+        for index, slice_request in enumerate(slice_requests):
+            if 'slice_type' not in slice_request:
+                results[index] = {'status': 'failed', 'error': "Missing slice_type in slice request"}
+            else:
+                valid.append(index)
+
+        slice_ids = {index: str(uuid.uuid4()) for index in valid}
+        if 'core' in self.nssmfs:
+            core_results = self.nssmfs['core'].create_sub_slices([slice_requests[i] for i in valid],
+                                                                 [slice_ids[i] for i in valid])
+        else:
+            logger.warning("No Core NSSMF registered")
+            core_results = [None] * len(valid)
+
+        for index, core_result in zip(valid, core_results):
+            if core_result is not None and core_result['status'] != 'success':
+                results[index] = {'status': 'failed', 'error': core_result['error']}
+                continue
+            slice_id = slice_ids[index]
+            self.slices[slice_id] = {
+                'status': 'active',
+                'request': slice_requests[index],
+                'sub_slices': {'core': core_result['sub_slice_id']} if core_result else {},
+                'version': 1
+            }
+            self._index(slice_id)
+            results[index] = {'status': 'success', 'slice_id': slice_id}
+
+        self._persist(*(r['slice_id'] for r in results if r['status'] == 'success'))
+        if self.events is not None:
+            for result in results:
+                if result['status'] == 'success':
+                    self._emit_created(result['slice_id'])
+                else:
+                    self._emit(EventType.SLICE_FAILED, None, operation='create', error=result['error'])
+        logger.info("Created %s/%s slice instances in batch", sum(r['status'] == 'success' for r in results), len(slice_requests))
+        return results
+
     def generate_nsi_config(self, slice_id: str, service_request: Dict[str, Any]) -> Dict[str, Any]:
         # Génération de la configuration NSI pour une slice donnée
         if slice_id not in self.slices:
@@ -74,52 +140,103 @@ class NSMF:
     def get_slice_instance(self, slice_id: str) -> Dict[str, Any]:
         # Récupération des informations d'une instance de slice
         if slice_id not in self.slices:
-            logging.error(f"Slice instance {slice_id} not found")
+            logger.error("Slice instance %s not found", slice_id)
             raise ValueError(f"Slice instance {slice_id} not found")
         return self.slices[slice_id]
 
-    def update_slice_instance(self, slice_id: str, update_request: Dict[str, Any]) -> None:
-        # Mise à jour d'une instance de slice existante
-        if slice_id not in self.slices:
-            logging.error(f"Slice instance {slice_id} not found for update")
-            raise ValueError(f"Slice instance {slice_id} not found")
-        
-        logging.debug(f"Updating slice instance {slice_id} with request: {update_request}")
-        
-        # Mise à jour des sous-slices
-        if 'core' in update_request and 'core' in self.nssmfs:
-            core_sub_slice_id = self.slices[slice_id]['sub_slices'].get('core')
-            if core_sub_slice_id:
-                self.nssmfs['core'].update_sub_slice(core_sub_slice_id, update_request['core'])
+    def update_slice_instance(self, slice_id: str, update_request: Dict[str, Any],
+                              expected_version: Optional[int] = None) -> int:
+        # Mise à jour d'une instance de slice existante ; retourne la nouvelle version.
+        # Les mises à jour d'une même slice sont sérialisées par son verrou, et
+        # `expected_version` permet de rejeter une modification basée sur un état périmé.
+        with self.locks.locked(slice_id):
+            if slice_id not in self.slices:
+                logger.error("Slice instance %s not found for update", slice_id)
+                raise ValueError(f"Slice instance {slice_id} not found")
+            check_version(slice_id, self.slices[slice_id], expected_version)
+
+            logger.debug("Updating slice instance %s with request: %s", slice_id, update_request)
+
+            # Mise à jour des sous-slices
+            if 'core' in update_request and 'core' in self.nssmfs:
+                core_sub_slice_id = self.slices[slice_id]['sub_slices'].get('core')
+                if core_sub_slice_id:
+                    try:
+                        self.nssmfs['core'].update_sub_slice(core_sub_slice_id, update_request['core'])
+                    except Exception as e:
+                        self._emit(EventType.SLICE_FAILED, slice_id, operation='modify', error=str(e))
+                        raise
+
+            # Mise à jour de la requête principale
+            self.slices[slice_id]['request'].update(update_request)
+            version = bump_version(self.slices[slice_id])
+            self._index(slice_id)
+            self._persist(slice_id)
+            logger.info("Slice instance %s updated successfully", slice_id)
+            self._emit(EventType.SLICE_MODIFIED, slice_id, version=version, fields=sorted(update_request))
+            return version
+
+    def terminate_slice_instance(self, slice_id: str, expected_version: Optional[int] = None) -> None:
+        # Terminaison d'une instance de slice
+        with self.locks.locked(slice_id):
+            if slice_id not in self.slices:
+                logger.error("Slice instance %s not found for termination", slice_id)
+                raise ValueError(f"Slice instance {slice_id} not found")
+            check_version(slice_id, self.slices[slice_id], expected_version)
 
-        # Mise à jour de la requête principale
-        self.slices[slice_id]['request'].update(update_request)
-        logging.info(f"Slice instance {slice_id} updated successfully")
+            logger.debug("Terminating slice instance %s", slice_id)
 
-    def terminate_slice_instance(self, slice_id: str) -> None:
-        # Terminaison d'une instance de slice
-        if slice_id not in self.slices:
-            logging.error(f"Slice instance {slice_id} not found for termination")
-            raise ValueError(f"Slice instance {slice_id} not found")
-        
-        logging.debug(f"Terminating slice instance {slice_id}")
-        
-        # Terminer les sous-slices
-        for domain, sub_slice_id in self.slices[slice_id]['sub_slices'].items():
-            if domain in self.nssmfs:
-                self.nssmfs[domain].terminate_sub_slice(sub_slice_id)
+            # Terminer les sous-slices
+            for domain, sub_slice_id in self.slices[slice_id]['sub_slices'].items():
+                if domain in self.nssmfs:
+                    self.nssmfs[domain].terminate_sub_slice(sub_slice_id)
 
-        # Supprimer l'instance de slice
-        del self.slices[slice_id]
-        logging.info(f"Slice instance {slice_id} terminated successfully")
+            # Supprimer l'instance de slice
+            del self.slices[slice_id]
+            self.index.remove(slice_id)
+            if self.store is not None:
+                self.store.delete(STORE_NAMESPACE, slice_id)
+            logger.info("Slice instance %s terminated successfully", slice_id)
+            self._emit(EventType.SLICE_DELETED, slice_id)
 
     def list_slice_instances(self) -> list[str]:
         # Liste des IDs de toutes les instances de slice
         return list(self.slices.keys())
 
+    def query_slice_instances(self, offset: int = 0, limit: Optional[int] = None, **filters: Any) -> Dict[str, Any]:
+        # Recherche paginée via les index secondaires, ex. query_slice_instances(slice_type='URLLC', limit=50)
+        return self.index.query(offset, limit, **filters)
+
     def get_slice_details(self, slice_id: str) -> Dict[str, Any]:
         # Récupération des détails d'une instance de slice spécifique
         if slice_id not in self.slices:
-            logging.error(f"Slice instance {slice_id} not found")
+            logger.error("Slice instance %s not found", slice_id)
             raise ValueError(f"Slice instance {slice_id} not found")
-        return self.slices[slice_id]
\ No newline at end of file
+        return self.slices[slice_id]
+
+    @traced('NSMF.persist')
+    def _persist(self, *slice_ids: str) -> None:
+        # Écriture des instances modifiées dans le stockage persistant
+        if self.store is not None:
+            self.store.put_many(STORE_NAMESPACE, ((slice_id, self.slices[slice_id]) for slice_id in slice_ids))
+
+    def _emit(self, event_type: EventType, slice_id: Optional[str], **data: Any) -> None:
+        if self.events is not None:
+            self.events.publish(event_type, 'nsmf', slice_id, **data)
+
+    def _emit_created(self, slice_id: str) -> None:
+        request = self.slices[slice_id]['request']
+        self._emit(EventType.SLICE_CREATED, slice_id, slice_type=request.get('slice_type'),
+                   slice_differentiator=request.get('slice_differentiator'),
+                   sub_slices=dict(self.slices[slice_id]['sub_slices']))
+
+    def _index(self, slice_id: str) -> None:
+        # Mise à jour des index secondaires d'une instance
+        slice_instance = self.slices[slice_id]
+        request = slice_instance['request']
+        self.index.upsert(slice_id, {
+            'slice_type': request.get('slice_type'),
+            'slice_differentiator': request.get('slice_differentiator'),
+            'status': slice_instance['status'],
+            'owner': request.get('owner')
+        })
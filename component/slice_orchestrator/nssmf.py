@@ -1,53 +1,135 @@
 import uuid  
-import math  
-import logging  
 from nfvo import NFVO  
-from typing import Dict, Any, List  
+from vnf_placement import PlacementEngine
+from resource_model import ResourceModel, DEFAULT_RESOURCE_MODEL_PATH
+from inventory_store import InventoryStore
+from slice_locks import SliceLockManager, check_version, bump_version
+from tracing import instrument, traced
+from typing import Dict, Any, List, Optional, Tuple
+from slice_logging import get_logger
+from slice_events import EventBus, EventType
 
+STORE_NAMESPACE = 'nssmf.sub_slices'
+# NFs du plan de contrôle partagées entre sous-slices sans isolation physique ; SMF et UPF restent dédiés
+SHARED_COMPONENTS = ('AMF', 'NRF')
+
+logger = get_logger('nssmf')
+
+@instrument
 class CoreNSSMF:
-    def __init__(self):
+    def __init__(self, resource_model_path: str = DEFAULT_RESOURCE_MODEL_PATH,
+                 store: Optional[InventoryStore] = None, placement: Optional[PlacementEngine] = None,
+                 events: Optional[EventBus] = None):
         # Initialisation de la classe
-        self.sub_slices = {}  # Dictionnaire pour stocker les sous-slices
-        self.nfvo = NFVO()  # Instanciation de l'objet NFVO
-        logging.basicConfig(level=logging.DEBUG)  # Configuration de la journalisation
+        self.store = store  # Stockage persistant optionnel, partagé avec le NFVO
+        self.events = events  # Bus optionnel, partagé avec le NFVO
+        self.sub_slices = dict(store.namespace(STORE_NAMESPACE)) if store else {}  # Dictionnaire pour stocker les sous-slices
+        self.nfvo = NFVO(store=store, placement=placement, events=events)  # Instanciation de l'objet NFVO
+        self.locks = SliceLockManager()  # Verrous par sous-slice
+        self.resource_model = ResourceModel.from_file(resource_model_path)  # Tables de dimensionnement
 
-    def create_sub_slice(self, config: Dict[str, Any]) -> str:
-        # Méthode pour créer un nouveau sous-slice
-        logging.debug(f"Received sub-slice creation request with config: {config}")
+    def create_sub_slice(self, config: Dict[str, Any], parent_slice_id: Optional[str] = None) -> str:
+        # Méthode pour créer un nouveau sous-slice ; `parent_slice_id` est l'ID de la slice
+        # NSMF qui le contient, sous lequel les événements du sous-slice sont publiés
+        logger.debug("Received sub-slice creation request with config: %s", config)
         try:
             # Vérification de la configuration
             if not config:
-                logging.error("Received empty configuration")
+                logger.error("Received empty configuration")
                 raise ValueError("Empty configuration")
 
             if not self.validate_config(config):
-                logging.error("Configuration validation failed")
+                logger.error("Configuration validation failed")
                 raise ValueError("Invalid configuration")
 
             # Génération d'un ID unique pour le sous-slice
             sub_slice_id = str(uuid.uuid4())
             # Calcul des ressources nécessaires
             calculated_resources = self._calculate_resources(config)
-            logging.debug(f"Calculated resources: {calculated_resources}")
+            logger.debug("Calculated resources: %s", calculated_resources)
 
             # Instantiation des VNFs via le NFVO
-            nfvo_response = self.nfvo.instantiate_vnfs(calculated_resources)
-            logging.info(f"NFVO deployed network slice with response: {nfvo_response}")
+            nfvo_response = self.nfvo.instantiate_vnfs(calculated_resources, config.get('slice_type'),
+                                                       self._shared_components(config),
+                                                       parent_slice_id or sub_slice_id)
+            logger.info("NFVO deployed network slice with response: %s", nfvo_response)
             
             # Stockage des informations du sous-slice
             self.sub_slices[sub_slice_id] = {
                 'status': 'active',
-                'config': config,
+                'parent_slice_id': parent_slice_id,
+                'config': dict(config),
                 'calculated_resources': calculated_resources,
                 'nfvo_slice_id': nfvo_response['slice_id'],
-                'vnf_instances': nfvo_response['vnf_instances']
+                'vnf_instances': nfvo_response['vnf_instances'],
+                'shared_vnfs': nfvo_response['shared_vnfs'],
+                'version': 1
             }
-            logging.info(f"Sub-slice created successfully with ID: {sub_slice_id}")
+            self._persist(sub_slice_id)
+            logger.info("Sub-slice created successfully with ID: %s", sub_slice_id)
+            if parent_slice_id is None:
+                self._emit_created(sub_slice_id)
             return sub_slice_id
         except Exception as e:
-            logging.error(f"Error creating sub-slice: {str(e)}")
+            logger.error("Error creating sub-slice: %s", e)
+            if parent_slice_id is None:
+                self._emit(EventType.SLICE_FAILED, None, operation='create', error=str(e))
             raise
 
+    def create_sub_slices(self, configs: List[Dict[str, Any]],
+                          parent_slice_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        # Création groupée de sous-slices : validation par requête (chacune a son propre
+        # résultat), dimensionnement matriciel des requêtes valides en un seul appel,
+        # puis une seule instanciation groupée côté NFVO
+        results: List[Dict[str, Any]] = [None] * len(configs)
+        valid = []
+        rows = []
+        for index, config in enumerate(configs):
+            if not config or not self.validate_config(config):
+                results[index] = {'status': 'failed', 'error': "Invalid configuration"}
+                continue
+            try:
+                rows.append(self.resource_model.request_row(config['qos'], config['resources']))
+            except ValueError as e:
+                results[index] = {'status': 'failed', 'error': str(e)}
+                continue
+            valid.append(index)
+        calculated = self.resource_model.calculate_many([configs[index]['slice_type'] for index in valid], rows)
+
+        sub_slice_ids = {index: str(uuid.uuid4()) for index in valid}
+        parents = {index: parent_slice_ids[index] if parent_slice_ids else None for index in valid}
+        slice_types = [configs[index].get('slice_type') for index in valid]
+        shared = [self._shared_components(configs[index]) for index in valid]
+        nfvo_parents = [parents[index] or sub_slice_ids[index] for index in valid]
+        nfvo_results = self.nfvo.instantiate_vnfs_batch(calculated, slice_types, shared, nfvo_parents) \
+            if calculated else []
+        for index, calculated_resources, nfvo_response in zip(valid, calculated, nfvo_results):
+            if nfvo_response['status'] != 'success':
+                results[index] = nfvo_response
+                continue
+            sub_slice_id = sub_slice_ids[index]
+            self.sub_slices[sub_slice_id] = {
+                'status': 'active',
+                'parent_slice_id': parents[index],
+                'config': dict(configs[index]),
+                'calculated_resources': calculated_resources,
+                'nfvo_slice_id': nfvo_response['slice_id'],
+                'vnf_instances': nfvo_response['vnf_instances'],
+                'shared_vnfs': nfvo_response['shared_vnfs'],
+                'version': 1
+            }
+            results[index] = {'status': 'success', 'sub_slice_id': sub_slice_id}
+
+        self._persist(*(r['sub_slice_id'] for r in results if r['status'] == 'success'))
+        if self.events is not None and parent_slice_ids is None:
+            for result in results:
+                if result['status'] == 'success':
+                    self._emit_created(result['sub_slice_id'])
+                else:
+                    self._emit(EventType.SLICE_FAILED, None, operation='create', error=result['error'])
+        logger.info("Created %s/%s sub-slices in batch", sum(r['status'] == 'success' for r in results), len(configs))
+        return results
+
     def generate_vcn_config(self, slice_id, service_request):
         # Génération de la configuration VCN (Virtual Core Network)
         vcn_config = {
@@ -61,11 +143,26 @@ class CoreNSSMF:
         }
         return vcn_config
     
-    def update_sub_slice(self, sub_slice_id: str, new_config: Dict[str, Any]) -> None:
-        # Mise à jour d'un sous-slice existant
-        if sub_slice_id not in self.sub_slices:
-            raise ValueError(f"Sub-slice {sub_slice_id} not found")
-        
+    def update_sub_slice(self, sub_slice_id: str, new_config: Dict[str, Any],
+                         expected_version: Optional[int] = None) -> int:
+        # Mise à jour d'un sous-slice existant ; retourne la nouvelle version
+        with self.locks.locked(sub_slice_id):
+            if sub_slice_id not in self.sub_slices:
+                raise ValueError(f"Sub-slice {sub_slice_id} not found")
+            check_version(sub_slice_id, self.sub_slices[sub_slice_id], expected_version)
+            standalone = self.sub_slices[sub_slice_id].get('parent_slice_id') is None
+            try:
+                version = self._apply_config(sub_slice_id, new_config)
+            except Exception as e:
+                if standalone:
+                    self._emit(EventType.SLICE_FAILED, sub_slice_id, operation='modify', error=str(e))
+                raise
+            if standalone:
+                self._emit(EventType.SLICE_MODIFIED, sub_slice_id, version=version)
+            return version
+
+    def _apply_config(self, sub_slice_id: str, new_config: Dict[str, Any]) -> int:
+        # À appeler avec le verrou du sous-slice tenu
         if not self.validate_config(new_config):
             raise ValueError("Invalid configuration")
 
@@ -73,19 +170,28 @@ class CoreNSSMF:
         self.sub_slices[sub_slice_id]['config'].update(new_config)
         calculated_resources = self._calculate_resources(self.sub_slices[sub_slice_id]['config'])
         nfvo_slice_id = self.sub_slices[sub_slice_id]['nfvo_slice_id']
-        
+
         # Mise à jour du slice réseau via le NFVO
         self.nfvo.update_network_slice(nfvo_slice_id, calculated_resources)
         self.sub_slices[sub_slice_id]['calculated_resources'] = calculated_resources
+        version = bump_version(self.sub_slices[sub_slice_id])
+        self._persist(sub_slice_id)
+        return version
 
     def terminate_sub_slice(self, sub_slice_id: str) -> None:
         # Terminaison d'un sous-slice
-        if sub_slice_id not in self.sub_slices:
-            raise ValueError(f"Sub-slice {sub_slice_id} not found")
-        
-        nfvo_slice_id = self.sub_slices[sub_slice_id]['nfvo_slice_id']
-        self.nfvo.delete_network_slice(nfvo_slice_id)
-        del self.sub_slices[sub_slice_id]
+        with self.locks.locked(sub_slice_id):
+            if sub_slice_id not in self.sub_slices:
+                raise ValueError(f"Sub-slice {sub_slice_id} not found")
+
+            nfvo_slice_id = self.sub_slices[sub_slice_id]['nfvo_slice_id']
+            standalone = self.sub_slices[sub_slice_id].get('parent_slice_id') is None
+            self.nfvo.delete_network_slice(nfvo_slice_id)
+            del self.sub_slices[sub_slice_id]
+            if self.store is not None:
+                self.store.delete(STORE_NAMESPACE, sub_slice_id)
+            if standalone:
+                self._emit(EventType.SLICE_DELETED, sub_slice_id, nfvo_slice_id=nfvo_slice_id)
 
     def get_sub_slice_details(self, sub_slice_id: str) -> Dict[str, Any]:
         # Récupération des détails d'un sous-slice
@@ -111,101 +217,116 @@ class CoreNSSMF:
 
     def scale_sub_slice(self, sub_slice_id: str, scale_type: str, scale_amount: int) -> None:
         # Mise à l'échelle d'un sous-slice
-        if sub_slice_id not in self.sub_slices:
-            raise ValueError(f"Sub-slice {sub_slice_id} not found")
-        
-        current_config = self.sub_slices[sub_slice_id]['config']
+        with self.locks.locked(sub_slice_id):
+            current_config = self.get_sub_slice_config(sub_slice_id)
+            resources = self.scaled_resources(sub_slice_id, scale_type, scale_amount)
+            new_config = dict(current_config, resources=resources)
+            try:
+                version = self._apply_config(sub_slice_id, new_config)
+            except Exception as e:
+                self._emit(EventType.SLICE_FAILED, sub_slice_id, operation='scale', error=str(e))
+                raise
+            self._emit(EventType.SLICE_SCALED, sub_slice_id, version=version, scale_type=scale_type,
+                       scale_amount=scale_amount, cpu=resources['cpu']['value'], memory=resources['memory']['value'])
+
+    def scaled_resources(self, sub_slice_id: str, scale_type: str, scale_amount: int) -> Dict[str, Any]:
+        # Ressources du sous-slice après mise à l'échelle, sans les appliquer.
+        # Les ressources sont au format {'value': ..., 'unit': ...} ; la configuration
+        # n'est modifiée que via update_sub_slice, qui la valide
+        resources = self.get_sub_slice_config(sub_slice_id)['resources']
+        cpu, memory = resources['cpu']['value'], resources['memory']['value']
         if scale_type == 'up':
-            current_config['resources']['cpu'] += scale_amount
-            current_config['resources']['memory'] += scale_amount * 1024  # 1GB par unité
+            cpu += scale_amount
+            memory += scale_amount * 1024  # 1GB par unité
         elif scale_type == 'down':
-            current_config['resources']['cpu'] = max(1, current_config['resources']['cpu'] - scale_amount)
-            current_config['resources']['memory'] = max(1024, current_config['resources']['memory'] - scale_amount * 1024)
+            cpu = max(1, cpu - scale_amount)
+            memory = max(1024, memory - scale_amount * 1024)
         else:
             raise ValueError("Invalid scale type. Use 'up' or 'down'")
+        return dict(resources, cpu=dict(resources['cpu'], value=cpu), memory=dict(resources['memory'], value=memory))
 
-        self.update_sub_slice(sub_slice_id, current_config)
-
-    def _calculate_resources(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        # Calcul des ressources pour chaque composant du sous-slice
-        slice_type = config['slice_type']
-        qos = config['qos']
-        requested_resources = config['resources']
-
-        calculated_resources = {}
-        for component in ['AMF', 'NRF', 'SMF', 'UPF']:
-            calculated_resources[component] = self._calculate_component_resources(
-                component, slice_type, qos, requested_resources
-            )
+    def scale_sub_slices(self, actions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Mise à l'échelle groupée : une action {'sub_slice_id', 'scale_type', 'scale_amount'}
+        # par sous-slice, un résultat par action
+        results = []
+        for action in actions:
+            sub_slice_id = action['sub_slice_id']
+            try:
+                self.scale_sub_slice(sub_slice_id, action['scale_type'], action['scale_amount'])
+            except ValueError as e:
+                results.append({'status': 'failed', 'sub_slice_id': sub_slice_id, 'error': str(e)})
+                continue
+            results.append({'status': 'success', 'sub_slice_id': sub_slice_id})
+        return results
 
-        return calculated_resources
+    @traced('CoreNSSMF.persist')
+    def _persist(self, *sub_slice_ids: str) -> None:
+        # Écriture des sous-slices modifiés dans le stockage persistant
+        if self.store is not None:
+            self.store.put_many(STORE_NAMESPACE, ((s, self.sub_slices[s]) for s in sub_slice_ids))
 
-    def _calculate_component_resources(self, component, slice_type, qos, requested_resources):
-        # Calcul des ressources pour un composant spécifique
-        # Définition des seuils minimaux pour chaque composant
-        min_resources = {
-            'AMF': {'cpu': 2, 'memory': 2048, 'storage': 10},
-            'NRF': {'cpu': 1, 'memory': 1024, 'storage': 5},
-            'SMF': {'cpu': 2, 'memory': 2048, 'storage': 8},
-            'UPF': {'cpu': 4, 'memory': 4096, 'storage': 20}
-        }
-
-        # Facteurs d'ajustement basés sur le type de slice
-        slice_factors = {
-            'eMBB': {'cpu': 1.0, 'memory': 1.2, 'storage': 1.0},
-            'URLLC': {'cpu': 1.5, 'memory': 1.3, 'storage': 1.1},
-            'mMTC': {'cpu': 0.8, 'memory': 0.9, 'storage': 1.2}
-        }
+    def _emit(self, event_type: EventType, sub_slice_id: Optional[str], **data: Any) -> None:
+        # Publié sous l'ID de la slice NSMF parente s'il y en a une. Création, modification
+        # et suppression d'un sous-slice rattaché sont annoncées par le NSMF, pas ici
+        if self.events is None:
+            return
+        sub_slice = self.sub_slices.get(sub_slice_id) if sub_slice_id else None
+        parent_slice_id = sub_slice.get('parent_slice_id') if sub_slice else None
+        self.events.publish(event_type, 'nssmf', parent_slice_id or sub_slice_id, sub_slice_id=sub_slice_id, **data)
 
-        if slice_type not in slice_factors:
-            raise ValueError(f"Unknown slice type: {slice_type}")
+    def _emit_created(self, sub_slice_id: str) -> None:
+        sub_slice = self.sub_slices[sub_slice_id]
+        self._emit(EventType.SLICE_CREATED, sub_slice_id, slice_type=sub_slice['config'].get('slice_type'),
+                   nfvo_slice_id=sub_slice['nfvo_slice_id'])
 
-        factors = slice_factors[slice_type]
+    def _shared_components(self, config: Dict[str, Any]) -> Tuple[str, ...]:
+        # Sans niveau d'isolation explicite, la sous-slice garde des NFs dédiées
+        isolation = config.get('isolationLevel')
+        if isinstance(isolation, dict):
+            isolation = isolation.get('value')
+        if isolation is None or str(isolation).lower() == 'physical':
+            return ()
+        return SHARED_COMPONENTS
 
-        # Calcul des ressources ajustées
-        cpu = max(min_resources[component]['cpu'], 
-                  math.ceil(requested_resources['cpu']['value'] * factors['cpu']))
-        memory = max(min_resources[component]['memory'], 
-                     math.ceil(requested_resources['memory']['value'] * factors['memory']))
-        storage = max(min_resources[component]['storage'], 
-                      math.ceil(requested_resources['storage']['value'] * factors['storage']))
+    @traced('CoreNSSMF.calculate_resources')
+    def _calculate_resources(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        # Calcul des ressources pour chaque composant du sous-slice
+        return self.resource_model.calculate(config['slice_type'], config['qos'], config['resources'])
 
-        # Ajustements supplémentaires basés sur QoS
-        cpu += math.ceil(qos['throughput']['value'] / 100)
-        memory += math.ceil(qos['throughput']['value'] * 5)
+    def _calculate_component_resources(self, component, slice_type, qos, requested_resources):
+        # Calcul des ressources pour un composant spécifique (tables précalculées du modèle)
+        return self.resource_model.calculate_component(component, slice_type, qos, requested_resources)
 
-        return {'cpu': cpu, 'memory': memory, 'storage': storage}
-    
     def validate_config(self, config: Dict[str, Any]) -> bool:
         # Validation de la configuration du sous-slice
-        logging.debug(f"Validating configuration: {config}")
+        logger.debug("Validating configuration: %s", config)
         required_keys = ['slice_type', 'qos', 'resources']
         for key in required_keys:
             if key not in config:
-                logging.error(f"Missing required key: {key}")
+                logger.error("Missing required key: %s", key)
                 return False
         
         valid_slice_types = ['URLLC', 'eMBB', 'mMTC']
         if config['slice_type'] not in valid_slice_types:
-            logging.error(f"Invalid slice_type: {config['slice_type']}")
+            logger.error("Invalid slice_type: %s", config['slice_type'])
             return False
         
         if 'cpu' not in config['resources'] or 'memory' not in config['resources']:
-            logging.error("Missing 'cpu' or 'memory' in resources")
+            logger.error("Missing 'cpu' or 'memory' in resources")
             return False
         
         if not isinstance(config['resources']['cpu'].get('value'), (int, float)) or config['resources']['cpu']['value'] <= 0:
-            logging.error("Invalid CPU value")
+            logger.error("Invalid CPU value")
             return False
         if not isinstance(config['resources']['memory'].get('value'), (int, float)) or config['resources']['memory']['value'] <= 0:
-            logging.error("Invalid memory value")
+            logger.error("Invalid memory value")
             return False
 
         # Vérification que le QoS contient une valeur de débit (throughput)
         if 'throughput' not in config['qos'] or not isinstance(config['qos']['throughput'].get('value'), (int, float)):
-            logging.error("Missing or invalid 'throughput' in QoS")
+            logger.error("Missing or invalid 'throughput' in QoS")
             return False
 
-        logging.debug("Configuration validation passed")
+        logger.debug("Configuration validation passed")
         return True
 
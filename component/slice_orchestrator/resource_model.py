@@ -0,0 +1,149 @@
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy n'est requis que pour le calcul matriciel
+    np = None
+
+DEFAULT_RESOURCE_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           "config", "resource_model.json")
+
+# Ordre des colonnes de la matrice de requêtes et des ressources calculées
+REQUEST_COLUMNS = ('cpu', 'memory', 'storage', 'throughput')
+RESOURCE_KEYS = ('cpu', 'memory', 'storage')
+
+
+class ResourceModel:
+    """Modèle de dimensionnement des composants du Core (AMF, NRF, SMF, UPF).
+
+    Les tables de minima par composant et de facteurs par type de slice sont
+    chargées depuis la configuration puis précalculées une fois, sous forme
+    de tuples pour le calcul unitaire et de tableaux NumPy pour le calcul
+    matriciel (`calculate_batch`), qui dimensionne n slices en une passe.
+    """
+
+    def __init__(self, components: Dict[str, Dict[str, int]], slice_factors: Dict[str, Dict[str, float]],
+                 qos: Optional[Dict[str, float]] = None):
+        qos = qos or {}
+        self.components: List[str] = list(components)
+        self.slice_types: List[str] = list(slice_factors)
+        self.throughput_per_cpu = qos.get('throughput_per_cpu', 100)
+        self.memory_per_throughput = qos.get('memory_per_throughput', 5)
+
+        self._min_resources = {c: tuple(components[c][k] for k in RESOURCE_KEYS) for c in self.components}
+        self._factors = {t: tuple(slice_factors[t][k] for k in RESOURCE_KEYS) for t in self.slice_types}
+        self._slice_type_index = {t: i for i, t in enumerate(self.slice_types)}
+
+        if np is not None:
+            self._min_matrix = np.array([self._min_resources[c] for c in self.components], dtype=np.int64)
+            self._factor_matrix = np.array([self._factors[t] for t in self.slice_types], dtype=np.float64)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ResourceModel':
+        return cls(data['components'], data['slice_factors'], data.get('qos'))
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_RESOURCE_MODEL_PATH) -> 'ResourceModel':
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Resource model file not found: {path}")
+        with open(path, 'r') as file:
+            return cls.from_dict(json.load(file))
+
+    def calculate(self, slice_type: str, qos: Dict[str, Any],
+                  requested_resources: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+        # Dimensionnement de tous les composants pour une slice
+        return {
+            component: self.calculate_component(component, slice_type, qos, requested_resources)
+            for component in self.components
+        }
+
+    def calculate_component(self, component: str, slice_type: str, qos: Dict[str, Any],
+                            requested_resources: Dict[str, Any]) -> Dict[str, int]:
+        if slice_type not in self._factors:
+            raise ValueError(f"Unknown slice type: {slice_type}")
+
+        min_cpu, min_memory, min_storage = self._min_resources[component]
+        cpu_factor, memory_factor, storage_factor = self._factors[slice_type]
+        throughput = qos['throughput']['value']
+
+        cpu = max(min_cpu, math.ceil(requested_resources['cpu']['value'] * cpu_factor))
+        memory = max(min_memory, math.ceil(requested_resources['memory']['value'] * memory_factor))
+        storage = max(min_storage, math.ceil(requested_resources['storage']['value'] * storage_factor))
+
+        # Ajustements supplémentaires basés sur QoS
+        cpu += math.ceil(throughput / self.throughput_per_cpu)
+        memory += math.ceil(throughput * self.memory_per_throughput)
+
+        return {'cpu': cpu, 'memory': memory, 'storage': storage}
+
+    @staticmethod
+    def request_row(qos: Dict[str, Any], requested_resources: Dict[str, Any]) -> Tuple[float, ...]:
+        # Ligne de la matrice de requêtes (colonnes REQUEST_COLUMNS) ; ValueError si une valeur manque
+        values = [requested_resources.get(key, {}).get('value') for key in RESOURCE_KEYS]
+        values.append((qos.get('throughput') or {}).get('value'))
+        for column, value in zip(REQUEST_COLUMNS, values):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Invalid or missing {column} value")
+        return tuple(float(value) for value in values)
+
+    def calculate_many(self, slice_types: Sequence[str],
+                       rows: Sequence[Tuple[float, ...]]) -> List[Dict[str, Dict[str, int]]]:
+        # Dimensionnement de plusieurs slices, au format de calculate() : une passe
+        # matricielle avec NumPy, sinon le calcul unitaire slice par slice
+        if not rows:
+            return []
+        if np is None:
+            return [self.calculate(slice_type, {'throughput': {'value': row[3]}},
+                                   {key: {'value': value} for key, value in zip(RESOURCE_KEYS, row)})
+                    for slice_type, row in zip(slice_types, rows)]
+        resources = self.calculate_batch(np.array(rows, dtype=np.float64), slice_types).tolist()
+        return [{component: dict(zip(RESOURCE_KEYS, per_component[i])) for i, component in enumerate(self.components)}
+                for per_component in resources]
+
+    def slice_type_codes(self, slice_types: Sequence[str]) -> 'np.ndarray':
+        # Conversion des noms de types de slice en indices de la table des facteurs
+        self._require_numpy()
+        try:
+            return np.fromiter((self._slice_type_index[t] for t in slice_types), dtype=np.intp,
+                               count=len(slice_types))
+        except KeyError as e:
+            raise ValueError(f"Unknown slice type: {e.args[0]}")
+
+    def calculate_batch(self, requests: 'np.ndarray', slice_types: Sequence) -> 'np.ndarray':
+        """Dimensionne n slices en une passe.
+
+        `requests` est une matrice (n, 4) dont les colonnes suivent
+        REQUEST_COLUMNS ; `slice_types` contient les noms ou les indices des
+        types de slice. Le résultat est un tableau entier (n, composants, 3)
+        dont le dernier axe suit RESOURCE_KEYS.
+        """
+        self._require_numpy()
+        requests = np.asarray(requests, dtype=np.float64)
+        if requests.ndim != 2 or requests.shape[1] != len(REQUEST_COLUMNS):
+            raise ValueError(f"requests must have shape (n, {len(REQUEST_COLUMNS)})")
+
+        codes = np.asarray(slice_types)
+        if codes.dtype.kind not in 'iu':
+            codes = self.slice_type_codes(list(slice_types))
+        elif codes.size and (codes.min() < 0 or codes.max() >= len(self.slice_types)):
+            raise ValueError("Unknown slice type code")
+
+        scaled = np.ceil(requests[:, :3] * self._factor_matrix[codes]).astype(np.int64)
+        resources = np.maximum(scaled[:, None, :], self._min_matrix[None, :, :])
+
+        throughput = requests[:, 3]
+        resources[:, :, 0] += np.ceil(throughput / self.throughput_per_cpu).astype(np.int64)[:, None]
+        resources[:, :, 1] += np.ceil(throughput * self.memory_per_throughput).astype(np.int64)[:, None]
+        return resources
+
+    def totals(self, resources: 'np.ndarray') -> Dict[str, int]:
+        # Somme des ressources d'un résultat de calculate_batch, pour la planification de capacité
+        summed = resources.sum(axis=(0, 1))
+        return {key: int(summed[i]) for i, key in enumerate(RESOURCE_KEYS)}
+
+    def _require_numpy(self) -> None:
+        if np is None:
+            raise RuntimeError("NumPy is required for batch resource calculation")
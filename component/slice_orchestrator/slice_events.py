@@ -0,0 +1,247 @@
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from threading import Condition, Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_QUEUE_SIZE = 1000
+
+# Politiques d'un abonné dont la file est pleine
+DROP_OLDEST = 'drop_oldest'  # L'événement le plus ancien est écarté (lecteurs « état courant » : UI, SSE)
+DROP_NEWEST = 'drop_newest'  # Le nouvel événement est écarté
+BLOCK = 'block'  # Le producteur attend au plus `block_timeout` secondes, puis écarte le nouvel événement
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class EventType(Enum):
+    SLICE_CREATED = 'slice.created'
+    SLICE_MODIFIED = 'slice.modified'
+    SLICE_SCALED = 'slice.scaled'
+    SLICE_FAILED = 'slice.failed'
+    SLICE_DELETED = 'slice.deleted'
+    VNF_ALLOCATED = 'vnf.allocated'
+    VNF_RELEASED = 'vnf.released'
+
+
+class SliceEvent:
+    """Événement publié par un composant (nsmf, nssmf, nfvo).
+
+    `sequence` est croissant sur tout le bus : un trou dans la séquence reçue
+    par un abonné signale des événements écartés ou filtrés.
+    """
+
+    __slots__ = ('sequence', 'type', 'source', 'slice_id', 'timestamp', 'data')
+
+    def __init__(self, sequence: int, event_type: EventType, source: str, slice_id: Optional[str],
+                 data: Dict[str, Any], timestamp: Optional[float] = None):
+        self.sequence = sequence
+        self.type = event_type
+        self.source = source
+        self.slice_id = slice_id
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'sequence': self.sequence,
+            'type': self.type.value,
+            'source': self.source,
+            'slice_id': self.slice_id,
+            'timestamp': self.timestamp,
+            'data': self.data
+        }
+
+    def __repr__(self) -> str:
+        return f"SliceEvent({self.sequence}, {self.type.value}, {self.source}, {self.slice_id})"
+
+
+class Subscription:
+    """File bornée d'un abonné, remplie par les producteurs et vidée par le lecteur.
+
+    La lecture est bloquante (`get`, `get_many`, itération) ou asynchrone
+    (`get_many_async`) ; les deux peuvent coexister. Un abonné lent n'affecte
+    que sa propre file : selon sa politique, il perd des événements
+    (`dropped`) ou ralentit tous les producteurs du bus (BLOCK, à réserver
+    aux lecteurs rapides : les publications sont sérialisées et les
+    producteurs publient en tenant les verrous des slices).
+    """
+
+    def __init__(self, bus: 'EventBus', types: Optional[Iterable[Any]] = None, slice_id: Optional[str] = None,
+                 maxsize: int = DEFAULT_QUEUE_SIZE, policy: str = DROP_OLDEST, block_timeout: float = 1.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.bus = bus
+        self.types = frozenset(EventType(t) for t in types) if types else None
+        self.slice_id = slice_id
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+        self._queue = deque()
+        self._cond = Condition(Lock())
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def matches(self, event: SliceEvent) -> bool:
+        return ((self.types is None or event.type in self.types)
+                and (self.slice_id is None or event.slice_id == self.slice_id))
+
+    def offer(self, event: SliceEvent) -> bool:
+        # Appelé par le bus ; retourne False si l'événement a été écarté
+        with self._cond:
+            if self.closed:
+                return False
+            if len(self._queue) >= self.maxsize:
+                if self.policy == DROP_OLDEST:
+                    self._queue.popleft()
+                    self.dropped += 1
+                elif self.policy == BLOCK:
+                    self._cond.wait_for(lambda: self.closed or len(self._queue) < self.maxsize, self.block_timeout)
+                if self.closed or len(self._queue) >= self.maxsize:
+                    self.dropped += 1
+                    return False
+            self._queue.append(event)
+            self._cond.notify_all()
+            self._wake_async()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[SliceEvent]:
+        # Prochain événement, ou None après `timeout` secondes ou à la fermeture
+        events = self.get_many(1, timeout)
+        return events[0] if events else None
+
+    def get_many(self, max_items: int = 100, timeout: Optional[float] = None) -> List[SliceEvent]:
+        # Jusqu'à `max_items` événements dès qu'au moins un est disponible (liste vide à l'expiration)
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or self.closed, timeout)
+            return self._drain(max_items)
+
+    async def get_many_async(self, max_items: int = 100, timeout: Optional[float] = None) -> List[SliceEvent]:
+        # Équivalent de get_many pour une boucle asyncio, sans occuper de thread
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._queue or self.closed:
+                return self._drain(max_items)
+            waiter = loop.create_future()
+            self._async_waiters.append((loop, waiter))
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                if (loop, waiter) in self._async_waiters:
+                    self._async_waiters.remove((loop, waiter))
+        with self._cond:
+            return self._drain(max_items)
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def close(self) -> None:
+        # Désabonne et réveille les lecteurs en attente ; les événements restants restent lisibles
+        self.bus.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+            self._wake_async()
+
+    def __iter__(self) -> Iterator[SliceEvent]:
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            yield event
+
+    def __enter__(self) -> 'Subscription':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _drain(self, max_items: int) -> List[SliceEvent]:
+        # À appeler avec la condition tenue
+        count = min(max_items, len(self._queue))
+        events = [self._queue.popleft() for _ in range(count)]
+        self.delivered += count
+        if count:
+            self._cond.notify_all()  # Producteurs BLOCK en attente de place
+        return events
+
+    def _wake_async(self) -> None:
+        # À appeler avec la condition tenue
+        for loop, waiter in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, waiter)
+            except RuntimeError:  # Boucle fermée
+                pass
+        self._async_waiters.clear()
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class EventBus:
+    """Bus d'événements en processus entre les composants d'orchestration.
+
+    `publish` est synchrone et ne fait que déposer l'événement dans la file
+    de chaque abonné concerné ; sans abonné, il retourne immédiatement sans
+    construire d'événement. La séquence est attribuée et l'événement déposé
+    sous un même verrou de publication : chaque abonné reçoit les événements
+    dans l'ordre de leur séquence, quel que soit le nombre de producteurs.
+    La liste des abonnés est remplacée à chaque (dés)abonnement, si bien que
+    s'abonner n'attend jamais une publication en cours.
+    """
+
+    def __init__(self, default_maxsize: int = DEFAULT_QUEUE_SIZE):
+        self.default_maxsize = default_maxsize
+        self.published = 0  # Aussi la séquence du dernier événement publié
+        self._subscribers: Tuple[Subscription, ...] = ()
+        self._lock = Lock()
+        self._publish_lock = Lock()  # Distinct de _lock : un abonné BLOCK peut se fermer pendant une publication
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, types: Optional[Iterable[Any]] = None, slice_id: Optional[str] = None,
+                  maxsize: Optional[int] = None, policy: str = DROP_OLDEST,
+                  block_timeout: float = 1.0) -> Subscription:
+        # `types` : EventType ou leurs valeurs ('slice.created'), tous les types si None
+        subscription = Subscription(self, types, slice_id, maxsize or self.default_maxsize, policy, block_timeout)
+        with self._lock:
+            self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    def publish(self, event_type: EventType, source: str, slice_id: Optional[str] = None,
+                **data: Any) -> Optional[SliceEvent]:
+        if not self._subscribers:
+            return None
+        with self._publish_lock:
+            subscribers = self._subscribers
+            if not subscribers:
+                return None
+            self.published += 1
+            event = SliceEvent(self.published, event_type, source, slice_id, data)
+            for subscription in subscribers:
+                if subscription.matches(event):
+                    subscription.offer(event)
+        return event
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'published': self.published,
+            'subscribers': [{'types': sorted(t.value for t in s.types) if s.types else None,
+                             'slice_id': s.slice_id, 'policy': s.policy, 'pending': s.pending(),
+                             'delivered': s.delivered, 'dropped': s.dropped} for s in self._subscribers]
+        }
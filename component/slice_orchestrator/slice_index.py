@@ -0,0 +1,138 @@
+from collections import deque
+from itertools import islice
+from threading import RLock
+from typing import Any, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
+
+INDEXED_FIELDS = ('slice_type', 'slice_differentiator', 'status', 'owner')
+FEED_SIZE = 10000  # Changements conservés pour les consommateurs du flux
+
+
+class SliceIndex:
+    """Index secondaires sur l'inventaire des slices.
+
+    Pour chaque champ indexé, on maintient valeur -> {slice_id: None} (un
+    dict sert d'ensemble ordonné, ce qui rend la pagination stable). Une
+    requête intersecte les ensembles en partant du plus petit, sans jamais
+    parcourir l'inventaire complet. Chaque modification est aussi numérotée
+    dans un flux de changements borné (voir `changes`).
+    """
+
+    def __init__(self, fields: Iterable[str] = INDEXED_FIELDS, feed_size: int = FEED_SIZE):
+        self.fields = tuple(fields)
+        self._indexes: Dict[str, Dict[Hashable, Dict[str, None]]] = {field: {} for field in self.fields}
+        self._entries: Dict[str, Dict[str, Hashable]] = {}
+        self._lock = RLock()  # Les index sont partagés entre les threads de l'orchestrateur
+        self._sequence = 0
+        self._feed: Deque[Tuple[int, str, Optional[Dict[str, Hashable]]]] = deque(maxlen=feed_size)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, slice_id: str) -> bool:
+        return slice_id in self._entries
+
+    def upsert(self, slice_id: str, attributes: Dict[str, Any]) -> None:
+        # Ajout ou mise à jour des valeurs indexées d'une slice
+        with self._lock:
+            previous = self._entries.get(slice_id, {})
+            entry = {}
+            for field in self.fields:
+                value = attributes.get(field)
+                if not isinstance(value, Hashable):
+                    value = str(value)
+                entry[field] = value
+                if field in previous and previous[field] == value:
+                    continue
+                if field in previous:
+                    self._discard(field, previous[field], slice_id)
+                self._indexes[field].setdefault(value, {})[slice_id] = None
+            self._entries[slice_id] = entry
+            self._record(slice_id, entry)
+
+    def update_field(self, slice_id: str, field: str, value: Any) -> None:
+        with self._lock:
+            if slice_id not in self._entries:
+                return
+            attributes = dict(self._entries[slice_id])
+            attributes[field] = value
+            self.upsert(slice_id, attributes)
+
+    def remove(self, slice_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(slice_id, None)
+            if entry is None:
+                return
+            for field, value in entry.items():
+                self._discard(field, value, slice_id)
+            self._record(slice_id, None)
+
+    def count(self, field: str, value: Any) -> int:
+        return len(self._indexes[field].get(value, {}))
+
+    def values(self, field: str) -> Dict[Hashable, int]:
+        # Répartition des slices par valeur d'un champ (ex. nombre de slices par statut)
+        with self._lock:
+            return {value: len(ids) for value, ids in self._indexes[field].items()}
+
+    def query(self, offset: int = 0, limit: Optional[int] = None, **filters: Any) -> Dict[str, Any]:
+        """Retourne une page d'IDs correspondant à tous les filtres (égalité).
+
+        Le résultat contient `slice_ids`, `total` et `next_offset` (None sur
+        la dernière page).
+        """
+        with self._lock:
+            unknown = set(filters) - set(self.fields)
+            if unknown:
+                raise ValueError(f"Unknown index field(s): {', '.join(sorted(unknown))}")
+            if offset < 0 or (limit is not None and limit < 0):
+                raise ValueError("offset and limit must be non-negative")
+
+            if filters:
+                candidates = sorted((self._indexes[f].get(v, {}) for f, v in filters.items()), key=len)
+                smallest, others = candidates[0], candidates[1:]
+                matches: List[str] = [s for s in smallest if all(s in other for other in others)]
+                total = len(matches)
+                page = matches[offset:None if limit is None else offset + limit]
+            else:
+                total = len(self._entries)
+                stop = None if limit is None else offset + limit
+                page = list(islice(self._entries, offset, stop))
+
+            next_offset = offset + len(page)
+            return {
+                'slice_ids': page,
+                'total': total,
+                'next_offset': next_offset if next_offset < total else None
+            }
+
+    def changes(self, since: int = 0) -> Dict[str, Any]:
+        """Changements survenus après le curseur `since` (0 au premier appel).
+
+        Le résultat contient `cursor`, à repasser à l'appel suivant, et
+        `changes` : une paire (slice_id, valeurs indexées) par slice modifiée,
+        avec None pour une slice supprimée. Si le curseur est sorti de la
+        fenêtre du flux, `reset` est vrai et `changes` décrit tout l'inventaire.
+        """
+        with self._lock:
+            if since >= self._sequence:
+                return {'cursor': self._sequence, 'reset': False, 'changes': []}
+            oldest = self._feed[0][0] if self._feed else self._sequence + 1
+            if since + 1 < oldest:
+                return {'cursor': self._sequence, 'reset': True, 'changes': list(self._entries.items())}
+            latest: Dict[str, Optional[Dict[str, Hashable]]] = {}
+            for _, slice_id, entry in islice(self._feed, since + 1 - oldest, None):
+                latest[slice_id] = entry  # Seul le dernier état de chaque slice compte
+            return {'cursor': self._sequence, 'reset': False, 'changes': list(latest.items())}
+
+    def _record(self, slice_id: str, entry: Optional[Dict[str, Hashable]]) -> None:
+        # Les entrées ne sont jamais modifiées en place : le flux peut les partager
+        self._sequence += 1
+        self._feed.append((self._sequence, slice_id, entry))
+
+    def _discard(self, field: str, value: Hashable, slice_id: str) -> None:
+        ids = self._indexes[field].get(value)
+        if ids is None:
+            return
+        ids.pop(slice_id, None)
+        if not ids:
+            del self._indexes[field][value]
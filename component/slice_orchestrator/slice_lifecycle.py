@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from slice_logging import get_logger
+
+logger = get_logger('lifecycle')
+
+# Concurrence maximale par défaut pour chaque étape du pipeline
+DEFAULT_STAGE_CONCURRENCY = {
+    'translate': 32,
+    'instantiate': 8,
+    'update': 8,
+    'terminate': 8
+}
+
+# Nombre de jobs terminés conservés pour consultation avant éviction des plus anciens
+DEFAULT_MAX_FINISHED_JOBS = 1000
+
+
+class JobStatus(Enum):
+    PENDING = 1
+    RUNNING = 2
+    SUCCEEDED = 3
+    FAILED = 4
+
+
+class SliceJob:
+    """Handle d'une opération de cycle de vie exécutée en arrière-plan.
+
+    Le handle peut être interrogé (`status`, `stage`, `done()`), attendu de
+    façon bloquante (`result()`) ou attendu depuis une coroutine (`await job`).
+    """
+
+    def __init__(self, operation: str, slice_id: Optional[str] = None):
+        self.job_id = str(uuid.uuid4())
+        self.operation = operation
+        self.slice_id = slice_id
+        self.status = JobStatus.PENDING
+        self.stage = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._future: Future = Future()
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        # Attente bloquante du résultat ; relève l'exception de l'étape en échec
+        return self._future.result(timeout)
+
+    def add_done_callback(self, callback: Callable[['SliceJob'], None]) -> None:
+        self._future.add_done_callback(lambda _: callback(self))
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'operation': self.operation,
+            'slice_id': self.slice_id,
+            'status': self.status.name,
+            'stage': self.stage,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class LifecycleEngine:
+    """Moteur asyncio exécutant les opérations de slice comme des pipelines.
+
+    Chaque opération est une suite d'étapes `(nom, fonction)` ; chaque
+    fonction reçoit le résultat de l'étape précédente. Les fonctions sont
+    synchrones (CSMF, NSMF...) et tournent dans un pool de threads, tandis
+    qu'un sémaphore par étape borne la concurrence. La boucle d'événements
+    tourne dans un thread dédié démarré à la première soumission.
+
+    Les jobs terminés restent consultables via `get_job` ; au-delà de
+    `max_finished_jobs`, les plus anciennement terminés sont évincés.
+    """
+
+    def __init__(self, stage_concurrency: Optional[Dict[str, int]] = None, max_workers: int = 32,
+                 max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS):
+        self.stage_concurrency = dict(DEFAULT_STAGE_CONCURRENCY)
+        self.stage_concurrency.update(stage_concurrency or {})
+        self.max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: Dict[str, SliceJob] = {}
+        self._finished: 'OrderedDict[str, None]' = OrderedDict()  # Ordre de fin des jobs terminés
+        self._jobs_lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._start_lock = threading.Lock()
+
+    def submit(self, operation: str, steps: List[Tuple[str, Callable[[Any], Any]]],
+               slice_id: Optional[str] = None) -> SliceJob:
+        # Soumission d'un pipeline ; retourne immédiatement le handle du job
+        self._ensure_started()
+        job = SliceJob(operation, slice_id)
+        with self._jobs_lock:
+            self.jobs[job.job_id] = job
+        asyncio.run_coroutine_threadsafe(self._run(job, steps), self._loop)
+        logger.debug("Submitted %s job %s", operation, job.job_id)
+        return job
+
+    def get_job(self, job_id: str) -> SliceJob:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Job {job_id} not found")
+        return job
+
+    def forget_job(self, job_id: str) -> None:
+        # Oubli d'un job terminé pour libérer la mémoire ; sans effet s'il a déjà été évincé
+        with self._jobs_lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            if not job.done():
+                raise RuntimeError(f"Job {job_id} is still running")
+            del self.jobs[job_id]
+            self._finished.pop(job_id, None)
+
+    def _retire(self, job: SliceJob) -> None:
+        # Enregistrement d'un job terminé et éviction des plus anciens au-delà de la limite
+        with self._jobs_lock:
+            if job.job_id not in self.jobs:
+                return
+            self._finished[job.job_id] = None
+            while len(self._finished) > self.max_finished_jobs:
+                evicted, _ = self._finished.popitem(last=False)
+                del self.jobs[evicted]
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._start_lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            if wait:
+                self._thread.join()
+            self._executor.shutdown(wait=wait)
+            self._loop = None
+            self._thread = None
+            self._executor = None
+            self._semaphores = {}
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="slice-lifecycle")
+            self._thread = threading.Thread(target=self._loop.run_forever,
+                                            name="slice-lifecycle-loop", daemon=True)
+            self._thread.start()
+
+    def _semaphore(self, stage: str) -> asyncio.Semaphore:
+        # Création paresseuse dans le thread de la boucle
+        if stage not in self._semaphores:
+            self._semaphores[stage] = asyncio.Semaphore(self.stage_concurrency.get(stage, self.max_workers))
+        return self._semaphores[stage]
+
+    async def _run(self, job: SliceJob, steps: List[Tuple[str, Callable[[Any], Any]]]) -> None:
+        loop = asyncio.get_running_loop()
+        value = None
+        job.status = JobStatus.RUNNING
+        try:
+            for stage, func in steps:
+                job.stage = stage
+                async with self._semaphore(stage):
+                    value = await loop.run_in_executor(self._executor, func, value)
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            job.finished_at = time.time()
+            logger.error("%s job %s failed at stage %s: %s", job.operation, job.job_id, job.stage, e)
+            self._retire(job)
+            job._future.set_exception(e)
+            return
+
+        job.status = JobStatus.SUCCEEDED
+        job.finished_at = time.time()
+        if job.slice_id is None and isinstance(value, str):
+            job.slice_id = value
+        self._retire(job)
+        job._future.set_result(value)
@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from threading import RLock
+from typing import Any, Dict, Iterator, Optional
+
+
+class VersionConflictError(RuntimeError):
+    """Levée quand une modification porte sur une version périmée d'une slice."""
+
+    def __init__(self, slice_id: str, expected_version: int, current_version: int):
+        super().__init__(f"Slice {slice_id} is at version {current_version}, expected {expected_version}")
+        self.slice_id = slice_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+class SliceLockManager:
+    """Verrous par slice, répartis sur un nombre fixe de verrous (lock striping).
+
+    Deux slices différentes ne se bloquent que si elles tombent sur le même
+    verrou, ce qui reste rare avec suffisamment de stripes ; la mémoire ne
+    croît pas avec le nombre de slices. Les verrous sont réentrants pour
+    qu'une opération puisse en appeler une autre sur la même slice.
+    """
+
+    def __init__(self, stripes: int = 256):
+        if stripes < 1:
+            raise ValueError("stripes must be a positive integer")
+        self._locks = [RLock() for _ in range(stripes)]
+
+    def lock_for(self, slice_id: str) -> RLock:
+        return self._locks[hash(slice_id) % len(self._locks)]
+
+    @contextmanager
+    def locked(self, slice_id: str) -> Iterator[None]:
+        with self.lock_for(slice_id):
+            yield
+
+
+def check_version(slice_id: str, record: Dict[str, Any], expected_version: Optional[int]) -> None:
+    # Contrôle optimiste : à appeler avec le verrou de la slice tenu
+    if expected_version is not None and record.get('version', 0) != expected_version:
+        raise VersionConflictError(slice_id, expected_version, record.get('version', 0))
+
+
+def bump_version(record: Dict[str, Any]) -> int:
+    record['version'] = record.get('version', 0) + 1
+    return record['version']
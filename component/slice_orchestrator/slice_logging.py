@@ -0,0 +1,141 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Any, Dict, Iterable, Optional
+
+ROOT_LOGGER = 'slice_orchestrator'
+COMPONENTS = ('csmf', 'orchestrator', 'nsmf', 'nssmf', 'nfvo', 'lifecycle', 'inventory_store', 'placement',
+              'metrics', 'autoscaler')
+ENV_LEVELS = 'SLICE_LOG_LEVELS'  # ex. "INFO,nssmf=DEBUG,nfvo=WARNING"
+DEFAULT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+# Attributs standard d'un LogRecord, exclus des champs structurés
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_EXCEPTION_FORMATTER = logging.Formatter()
+
+
+def get_logger(component: str) -> logging.Logger:
+    """Logger d'un composant (`slice_orchestrator.<component>`), réglable individuellement."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{component}")
+
+
+class LazyJson:
+    """Charge utile JSON rendue seulement si l'enregistrement est émis.
+
+    À passer en argument %-style : `logger.debug("Request: %s", LazyJson(request))`.
+    """
+
+    __slots__ = ('value', 'indent')
+
+    def __init__(self, value: Any, indent: Optional[int] = None):
+        self.value = value
+        self.indent = indent
+
+    def __str__(self) -> str:
+        return json.dumps(self.value, indent=self.indent, default=str)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class StructuredFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement, avec les champs passés via `extra`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # Seuls les enregistrements d'un niveau actif arrivent ici. Comme dans QueueHandler,
+    # le message (y compris les LazyJson) est rendu dans le thread appelant, tant que les
+    # arguments sont dans l'état journalisé, puis args et exc_info sont retirés ; la mise
+    # en forme finale et l'écriture restent dans le thread du QueueListener
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _EXCEPTION_FORMATTER.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    # "INFO,nssmf=DEBUG" -> {'': 'INFO', 'nssmf': 'DEBUG'} ; '' désigne le niveau par défaut
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        component, _, level = item.rpartition('=')
+        levels[component.strip()] = level.strip().upper()
+    return levels
+
+
+def configure(level: str = 'INFO', levels: Optional[Dict[str, str]] = None,
+              handlers: Optional[Iterable[logging.Handler]] = None, structured: bool = False,
+              use_queue: bool = True, filename: Optional[str] = None) -> logging.Logger:
+    """Configure la journalisation des composants de slicing (idempotent).
+
+    `levels` fixe le niveau de chaque composant (`{'nssmf': 'DEBUG'}`), en
+    plus de la variable d'environnement SLICE_LOG_LEVELS. Avec `use_queue`,
+    les composants ne font qu'empiler l'enregistrement dans une file ; le
+    formatage et les écritures ont lieu dans le thread d'un QueueListener.
+    """
+    global _listener
+    shutdown()
+
+    levels = dict(levels or {})
+    levels.update(parse_levels(os.environ.get(ENV_LEVELS, '')))
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(levels.pop('', level).upper())
+    for component in set(COMPONENTS) | set(levels):
+        get_logger(component).setLevel(levels.get(component, logging.NOTSET))
+
+    if handlers is None:
+        handlers = [logging.FileHandler(filename) if filename else logging.StreamHandler()]
+    handlers = list(handlers)
+    formatter = StructuredFormatter() if structured else logging.Formatter(DEFAULT_FORMAT)
+    for handler in handlers:
+        if handler.formatter is None:
+            handler.setFormatter(formatter)
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if use_queue:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        root.addHandler(DeferredQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            root.addHandler(handler)
+    root.propagate = False
+    return root
+
+
+def shutdown() -> None:
+    # Vide la file et arrête le thread d'écriture
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown)
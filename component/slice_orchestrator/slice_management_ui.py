@@ -1,16 +1,140 @@
 import math
+import queue
 import tkinter as tk
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from tkinter import ttk, messagebox
 from slice_orchestrator2 import SliceOrchestrator
 from csmf2 import CSMF
 from nsmf import NSMF
 from nssmf import CoreNSSMF
-from nfvo import NFVO
 
-logging.basicConfig(level=logging.DEBUG, filename='slice_management.log', filemode='w',
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+SLICE_COLUMNS = ('slice_id', 'slice_type', 'slice_differentiator', 'status', 'version')
+VISIBLE_ROWS = 15  # Lignes réellement créées dans le Treeview, quel que soit le nombre de slices
+RESULT_POLL_MS = 50  # Période de collecte des résultats des workers
+FEED_POLL_MS = 500  # Période de lecture du flux de changements de l'inventaire
+MAX_RESULTS_PER_TICK = 100  # Borne le travail fait dans la boucle Tk à chaque collecte
+
+
+class SliceRows:
+    """Modèle des lignes de la vue des slices, indépendant de Tk.
+
+    Les lignes gardent l'ordre d'arrivée ; une suppression invalide
+    simplement l'ordre, reconstruit au prochain affichage.
+    """
+
+    def __init__(self):
+        self.rows: Dict[str, Tuple] = {}
+        self._order: Optional[List[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def clear(self) -> None:
+        self.rows = {}
+        self._order = []
+
+    def apply(self, changes: Iterable[Tuple[str, Optional[Tuple]]]) -> bool:
+        # Applique des paires (slice_id, valeurs) ; None supprime la ligne. Retourne True si la vue a changé
+        changed = False
+        for slice_id, values in changes:
+            if values is None:
+                if self.rows.pop(slice_id, None) is not None:
+                    self._order = None
+                    changed = True
+                continue
+            if slice_id not in self.rows and self._order is not None:
+                self._order.append(slice_id)
+            if self.rows.get(slice_id) != values:
+                self.rows[slice_id] = values
+                changed = True
+        return changed
+
+    def window(self, offset: int, count: int) -> List[Tuple[str, Tuple]]:
+        if self._order is None:
+            self._order = list(self.rows)
+        return [(slice_id, self.rows[slice_id]) for slice_id in self._order[offset:offset + count]]
+
+
+class VirtualTreeview(ttk.Frame):
+    """Treeview virtualisé : seules `visible_rows` lignes existent dans le widget.
+
+    Le défilement et les mises à jour réécrivent les valeurs de ces lignes
+    à partir du modèle `SliceRows`, sans insérer un item Tk par slice.
+    """
+
+    def __init__(self, master, columns: Tuple[str, ...] = SLICE_COLUMNS, visible_rows: int = VISIBLE_ROWS,
+                 on_select: Optional[Callable[[str], None]] = None):
+        super().__init__(master)
+        self.model = SliceRows()
+        self.visible_rows = visible_rows
+        self.offset = 0
+        self.on_select = on_select
+        self._visible_ids: List[str] = []
+
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', height=visible_rows, selectmode='browse')
+        for column in columns:
+            self.tree.heading(column, text=column.replace('_', ' ').title())
+            self.tree.column(column, width=280 if column == 'slice_id' else 110, stretch=column == 'slice_id')
+        self._iids = [self.tree.insert('', 'end', values=()) for _ in range(visible_rows)]
+        for iid in self._iids:
+            self.tree.detach(iid)
+
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scroll)
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll_to(self.offset - int(event.delta / 120) * 3))
+        self.tree.bind('<Button-4>', lambda event: self.scroll_to(self.offset - 3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_to(self.offset + 3))
+
+    def apply(self, changes: Iterable[Tuple[str, Optional[Tuple]]], reset: bool = False) -> None:
+        if reset:
+            self.model.clear()
+        if self.model.apply(changes) or reset:
+            self.render()
+
+    def scroll_to(self, offset: int) -> None:
+        offset = max(0, min(offset, len(self.model) - self.visible_rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self) -> None:
+        self.offset = max(0, min(self.offset, len(self.model) - self.visible_rows))
+        window = self.model.window(self.offset, self.visible_rows)
+        self._visible_ids = [slice_id for slice_id, _ in window]
+        for position, iid in enumerate(self._iids):
+            if position < len(window):
+                self.tree.move(iid, '', position)
+                self.tree.item(iid, values=window[position][1])
+            else:
+                self.tree.detach(iid)
+        total = len(self.model)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_scroll(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.model)))
+        elif unit == 'pages':
+            self.scroll_to(self.offset + int(amount) * self.visible_rows)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def _on_select(self, _event) -> None:
+        selection = self.tree.selection()
+        if selection and self.on_select is not None:
+            position = self._iids.index(selection[0])
+            if position < len(self._visible_ids):
+                self.on_select(self._visible_ids[position])
+
 
 class SliceManagementUI:
     def __init__(self, master):
@@ -22,16 +146,28 @@ class SliceManagementUI:
         self.csmf = CSMF("config/network_slice_templates/gst_template2.json")
         self.nsmf = NSMF()
         self.nssmf = CoreNSSMF()
-        self.nfvo = NFVO()
-        
+        self.nfvo = self.nssmf.nfvo  # NFVO qui porte réellement les VNFs des sous-slices
+
         self.so.set_components(self.csmf, self.nsmf, self.nssmf)
         self.csmf.set_slice_orchestrator(self.so)
 
         self.service_type = tk.StringVar()
         self.service_type.set(CSMF.valid_slice_types[0])  # Valeur par défaut
 
+        # Les opérations tournent dans un pool de workers ; leurs résultats sont
+        # déposés dans une file vidée par la boucle Tk (seul thread qui touche aux widgets)
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="slice-ui")
+        self.results: queue.SimpleQueue = queue.SimpleQueue()
+        self.pending = 0
+        self.feed_cursor = 0
+        self.feed_generation = 0  # Incrémentée par une relecture complète : les lectures en vol sont ignorées
+        self.feed_in_flight = False
+
         # Créer les widgets
         self.create_widgets()
+        master.protocol("WM_DELETE_WINDOW", self.close)
+        self.master.after(RESULT_POLL_MS, self.process_results)
+        self.poll_inventory()
 
     def create_widgets(self):
         # Frame pour la création de slice
@@ -95,12 +231,24 @@ class SliceManagementUI:
         ttk.Button(manage_frame, text="Delete Slice", command=self.delete_slice).grid(row=2, column=0, columnspan=2)
         ttk.Button(manage_frame, text="List Slices", command=self.list_network_slices).grid(row=3, column=1, columnspan=2)
 
-        # Frame pour les résultats
-        self.result_frame = ttk.LabelFrame(self.master, text="Results")
+        # Détails de la slice sélectionnée ; les niveaux imbriqués ne sont insérés qu'à l'ouverture
+        self.details = ttk.Treeview(manage_frame, columns=('value',), height=10)
+        self.details.heading('#0', text="Field")
+        self.details.heading('value', text="Value")
+        self.details.grid(row=4, column=0, columnspan=2, pady=10, sticky="nsew")
+        self.details.bind('<<TreeviewOpen>>', self._expand_details)
+        self._detail_values: Dict[str, Any] = {}
+
+        # Frame pour les slices, alimenté par le flux de changements de l'inventaire NSMF
+        self.result_frame = ttk.LabelFrame(self.master, text="Network Slices")
         self.result_frame.grid(row=1, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
 
-        self.result_text = tk.Text(self.result_frame, height=10, width=50)
-        self.result_text.pack(expand=True, fill="both")
+        self.slice_view = VirtualTreeview(self.result_frame, on_select=self.select_slice)
+        self.slice_view.pack(expand=True, fill="both")
+
+        self.status_text = tk.StringVar(value="Ready")
+        ttk.Label(self.master, textvariable=self.status_text, anchor="w").grid(row=2, column=0, columnspan=2,
+                                                                                 padx=10, sticky="ew")
 
     def validate_slice_parameters(self):
         slice_type = self.slice_type.get()
@@ -117,148 +265,220 @@ class SliceManagementUI:
         if self.cpu.get() > available_cpu or self.memory.get() > available_memory:
             raise ValueError("Requested resources exceed available resources")
 
-    def create_slice(self):
+    def run_in_background(self, label: str, operation: Callable[[], Any],
+                          on_success: Optional[Callable[[Any], None]] = None,
+                          on_error: Optional[Callable[[BaseException], None]] = None) -> None:
+        # Exécute `operation` dans un worker ; les rappels ont lieu dans la boucle Tk.
+        # Sans `on_error`, une erreur est signalée par une boîte de dialogue.
+        self.pending += 1
+        if on_error is None:
+            self.status_text.set(f"{label}...")
+        future = self.executor.submit(operation)
+        future.add_done_callback(lambda done: self.results.put((label, done, on_success, on_error)))
+
+    def process_results(self) -> None:
+        # Appelé par after() : ne traite qu'un nombre borné de résultats par passage
         try:
-            logging.debug("Starting slice creation with parameters:")
-            logging.debug(f"Slice Type: {self.slice_type.get()}")
-            logging.debug(f"Slice Differentiator: {self.slice_differentiator.get()}")
-            logging.debug(f"Latency: {self.latency.get()} ms")
-            logging.debug(f"Throughput: {self.throughput.get()} Mbps")
-            logging.debug(f"Reliability: {self.reliability.get()}%")
-            logging.debug(f"CPU: {self.cpu.get()} vCPUs")
-            logging.debug(f"Memory: {self.memory.get()} MB")
-            logging.debug(f"Storage: {self.storage.get()} GB")
-            logging.debug(f"Bandwidth: {self.bandwidth.get()} Mbps")
+            for _ in range(MAX_RESULTS_PER_TICK):
+                try:
+                    label, future, on_success, on_error = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                self.pending -= 1
+                error = future.exception()
+                if error is not None and on_error is not None:
+                    on_error(error)
+                    continue
+                if error is not None:
+                    logging.error("%s failed: %s", label, error, exc_info=error)
+                    self.status_text.set(f"{label} failed: {error}")
+                    title = "Configuration Error" if isinstance(error, ValueError) else "Error"
+                    messagebox.showerror(title, str(error))
+                    continue
+                if on_success is not None:
+                    on_success(future.result())
+                if not self.pending and self.status_text.get().endswith("..."):
+                    self.status_text.set("Ready")
+        finally:
+            self.master.after(RESULT_POLL_MS, self.process_results)
+
+    def poll_inventory(self) -> None:
+        # Lecture incrémentale du flux de changements ; une seule lecture en vol à la fois
+        if not self.feed_in_flight:
+            self.feed_in_flight = True
+            cursor, generation = self.feed_cursor, self.feed_generation
+            self.run_in_background("Inventory refresh", lambda: self._read_inventory_changes(cursor),
+                                   lambda result: self._apply_inventory_changes(generation, result),
+                                   self._inventory_refresh_failed)
+        self.master.after(FEED_POLL_MS, self.poll_inventory)
+
+    def _read_inventory_changes(self, cursor: int) -> Tuple[int, bool, List[Tuple[str, Optional[Tuple]]]]:
+        feed = self.nsmf.index.changes(cursor)
+        rows = []
+        for slice_id, entry in feed['changes']:
+            if entry is None:
+                rows.append((slice_id, None))
+                continue
+            record = self.nsmf.slices.get(slice_id)
+            rows.append((slice_id, (slice_id, entry['slice_type'], entry['slice_differentiator'] or '',
+                                    entry['status'], record['version'] if record else '')))
+        return feed['cursor'], feed['reset'], rows
+
+    def _apply_inventory_changes(self, generation: int,
+                                 result: Tuple[int, bool, List[Tuple[str, Optional[Tuple]]]]) -> None:
+        self.feed_in_flight = False
+        if generation != self.feed_generation:
+            return
+        self.feed_cursor, reset, rows = result
+        self.slice_view.apply(rows, reset)
+
+    def _inventory_refresh_failed(self, error: BaseException) -> None:
+        # Pas de boîte de dialogue toutes les FEED_POLL_MS : journalisation, nouvel essai au prochain passage
+        self.feed_in_flight = False
+        logging.error("Inventory refresh failed: %s", error)
+
+    def select_slice(self, slice_id: str) -> None:
+        self.slice_id.delete(0, tk.END)
+        self.slice_id.insert(0, slice_id)
+
+    def show_details(self, title: str, data: Dict[str, Any]) -> None:
+        # Seul le premier niveau est inséré ; un dict ou une liste reçoit un enfant factice
+        self.details.delete(*self.details.get_children())
+        self._detail_values = {}
+        root = self.details.insert('', 'end', text=title, open=True)
+        self._insert_detail_children(root, data)
+
+    def _insert_detail_children(self, parent: str, data: Any) -> None:
+        items = data.items() if isinstance(data, dict) else enumerate(data)
+        for key, value in items:
+            if isinstance(value, (dict, list)) and value:
+                iid = self.details.insert(parent, 'end', text=str(key), values=(f"{len(value)} item(s)",))
+                self._detail_values[iid] = value
+                self.details.insert(iid, 'end', text="...")
+            else:
+                self.details.insert(parent, 'end', text=str(key), values=(str(value),))
+
+    def _expand_details(self, _event) -> None:
+        iid = self.details.focus()
+        value = self._detail_values.pop(iid, None)
+        if value is not None:
+            self.details.delete(*self.details.get_children(iid))
+            self._insert_detail_children(iid, value)
+
+    def _selected_slice_id(self) -> str:
+        slice_id = self.slice_id.get()
+        if not slice_id:
+            raise ValueError("Please enter a slice ID")
+        return slice_id
 
+    def create_slice(self):
+        # Les variables Tk sont lues ici, dans la boucle Tk ; seul l'appel à l'orchestrateur part dans un worker
+        try:
             self.validate_slice_parameters()
             self.check_resource_availability()
-
-            service_request = {
-                "slice_type": self.slice_type.get(),
-                "slice_differentiator": self.slice_differentiator.get() or None,
-                "qos": {
-                    "latency": {"value": self.latency.get(), "unit": "ms"},
-                    "throughput": {"value": self.throughput.get(), "unit": "Mbps"},
-                    "reliability": {"value": self.reliability.get(), "unit": "%"}
-                },
-                "resources": {
-                    "cpu": {"value": self.cpu.get(), "unit": "vCPUs"},
-                    "memory": {"value": self.memory.get(), "unit": "MB"},
-                    "storage": {"value": self.storage.get(), "unit": "GB"},
-                    "bandwidth": {"value": self.bandwidth.get(), "unit": "Mbps"}
-                }
+        except (ValueError, tk.TclError) as ve:
+            logging.error("Validation error: %s", ve)
+            messagebox.showerror("Configuration Error", str(ve))
+            return
+
+        service_request = {
+            "slice_type": self.slice_type.get(),
+            "slice_differentiator": self.slice_differentiator.get() or None,
+            "qos": {
+                "latency": {"value": self.latency.get(), "unit": "ms"},
+                "throughput": {"value": self.throughput.get(), "unit": "Mbps"},
+                "reliability": {"value": self.reliability.get(), "unit": "%"}
+            },
+            "resources": {
+                "cpu": {"value": self.cpu.get(), "unit": "vCPUs"},
+                "memory": {"value": self.memory.get(), "unit": "MB"},
+                "storage": {"value": self.storage.get(), "unit": "GB"},
+                "bandwidth": {"value": self.bandwidth.get(), "unit": "Mbps"}
             }
+        }
+        logging.debug("Service request: %s", service_request)
 
-            logging.debug(f"Service request: {json.dumps(service_request, indent=2)}")
+        def created(slice_id):
+            self.status_text.set(f"Created slice with ID: {slice_id}")
+            self.select_slice(slice_id)
 
-            slice_id = self.csmf.process_communication_service_request(service_request)
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"Created slice with ID: {slice_id}\n")
-
-            # Obtenir la configuration VCN
-            vcn_config = self.nsmf.generate_nsi_config(slice_id, service_request)
-            self.result_text.insert(tk.END, "\nVCN Configuration:\n")
-            self.result_text.insert(tk.END, json.dumps(vcn_config, indent=2))
-            
-            # Appel à NFVO pour instancier les VNFs
-            vnf_instances = self.nfvo.instantiate_vnfs(service_request)
-            self.result_text.insert(tk.END, "\n\nInstantiated VNFs:\n")
-            self.result_text.insert(tk.END, json.dumps(vnf_instances, indent=2))
-
-        except ValueError as ve:
-            logging.error(f"Validation error: {str(ve)}")
-            messagebox.showerror("Configuration Error", str(ve))
-        except Exception as e:
-            logging.error(f"Unexpected error: {str(e)}", exc_info=True)
-            messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
+        self.run_in_background("Creating slice", lambda: self.csmf.process_communication_service_request(service_request),
+                               created)
 
     def get_status(self):
         try:
-            slice_id = self.slice_id.get()
-            if not slice_id:
-                raise ValueError("Please enter a slice ID")
-            
-            logging.debug(f"Getting status for slice ID: {slice_id}")
-            status = self.so.get_slice_status(slice_id)
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"Status of slice {slice_id}:\n")
-            self.result_text.insert(tk.END, json.dumps(status, indent=2))
-            
-            # Obtenir le statut des VNFs via NFVO
-            vnf_status = self.nfvo.get_vnf_status(slice_id)
-            self.result_text.insert(tk.END, "\n\nVNF Status:\n")
-            self.result_text.insert(tk.END, json.dumps(vnf_status, indent=2))
-        except Exception as e:
-            logging.error(f"Error getting slice status: {str(e)}", exc_info=True)
-            messagebox.showerror("Error", str(e))
+            slice_id = self._selected_slice_id()
+        except ValueError as ve:
+            messagebox.showerror("Error", str(ve))
+            return
+
+        def shown(details):
+            self.show_details(f"Slice {slice_id}", details)
+            self.status_text.set(f"Status of slice {slice_id}: {details['status']}")
+
+        self.run_in_background("Getting slice status", lambda: self._slice_details(slice_id), shown)
+
+    def _slice_details(self, slice_id: str) -> Dict[str, Any]:
+        # Exécuté dans un worker : instance NSMF et état des VNFs de ses sous-slices
+        instance = self.nsmf.get_slice_instance(slice_id)
+        details = {
+            'status': instance['status'],
+            'version': instance['version'],
+            'request': instance['request'],
+            'vnfs': {}
+        }
+        for domain, sub_slice_id in instance['sub_slices'].items():
+            sub_slice = self.nssmf.sub_slices.get(sub_slice_id) if domain == 'core' else None
+            if sub_slice is None:
+                continue
+            network_slice = self.nfvo.network_slices.get(sub_slice['nfvo_slice_id'], {})
+            for component, vnf in dict(network_slice.get('vnf_instances', {})).items():
+                details['vnfs'][component] = {key: vnf.get(key) for key in ('status', 'ip_address', 'host')}
+        return details
 
     def modify_slice(self):
         try:
-            slice_id = self.slice_id.get()
-            if not slice_id:
-                raise ValueError("Please enter a slice ID")
-            
-            logging.debug(f"Modifying slice ID: {slice_id}")
+            slice_id = self._selected_slice_id()
             modifications = {
                 "qos": {
                     "latency": {"value": self.latency.get(), "unit": "ms"},
                     "throughput": {"value": self.throughput.get(), "unit": "Mbps"}
                 }
             }
-            
-            result = self.so.modify_slice(slice_id, modifications)
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"Modified slice {slice_id}:\n")
-            self.result_text.insert(tk.END, json.dumps(result, indent=2))
-            
-            # Modifier les VNFs via NFVO si nécessaire
-            vnf_modifications = self.nfvo.modify_vnfs(slice_id, modifications)
-            self.result_text.insert(tk.END, "\n\nVNF Modifications:\n")
-            self.result_text.insert(tk.END, json.dumps(vnf_modifications, indent=2))
-        except Exception as e:
-            logging.error(f"Error modifying slice: {str(e)}", exc_info=True)
+        except (ValueError, tk.TclError) as e:
             messagebox.showerror("Error", str(e))
+            return
+
+        self.run_in_background("Modifying slice", lambda: self.so.modify_slice(slice_id, modifications),
+                               lambda _: self.status_text.set(f"Modified slice {slice_id}"))
 
     def delete_slice(self):
         try:
-            slice_id = self.slice_id.get()
-            if not slice_id:
-                raise ValueError("Please enter a slice ID")
-            
-            logging.debug(f"Deleting slice ID: {slice_id}")
-            result = self.so.delete_slice(slice_id)
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"Deleted slice {slice_id}:\n")
-            self.result_text.insert(tk.END, json.dumps(result, indent=2))
-            
-            # Supprimer les VNFs associées via NFVO
-            vnf_deletion = self.nfvo.terminate_vnfs(slice_id)
-            self.result_text.insert(tk.END, "\n\nVNF Termination:\n")
-            self.result_text.insert(tk.END, json.dumps(vnf_deletion, indent=2))
-        except Exception as e:
-            logging.error(f"Error deleting slice: {str(e)}", exc_info=True)
-            messagebox.showerror("Error", str(e))
+            slice_id = self._selected_slice_id()
+        except ValueError as ve:
+            messagebox.showerror("Error", str(ve))
+            return
+
+        self.run_in_background("Deleting slice", lambda: self.so.delete_slice(slice_id),
+                               lambda _: self.status_text.set(f"Deleted slice {slice_id}"))
 
     def list_network_slices(self):
-        try:
-            logging.debug("Listing network slices")
-            slices = self.so.list_slices()
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, "Network Slices:\n")
-            self.result_text.insert(tk.END, json.dumps(slices, indent=2))
-            
-        # Lister les VNFs via NFVO
-            vnfs = self.nfvo.list_vnfs()
-            self.result_text.insert(tk.END, "\n\nVNF Instances:\n")
-            self.result_text.insert(tk.END, json.dumps(vnfs, indent=2))
-        except Exception as e:
-            logging.error(f"Error listing network slices: {str(e)}", exc_info=True)
-            messagebox.showerror("Error", str(e))
+        # La vue suit déjà l'inventaire ; on force une relecture complète au prochain passage
+        self.feed_cursor = 0
+        self.feed_generation += 1
+        self.slice_view.apply([], reset=True)
+        self.status_text.set(f"Refreshing {len(self.nsmf.index)} network slices")
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.master.destroy()
 
 def main():
+    logging.basicConfig(level=logging.DEBUG, filename='slice_management.log', filemode='w',
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     root = tk.Tk()
     SliceManagementUI(root)
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,6 +1,10 @@
 import uuid
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from enum import Enum
+from slice_lifecycle import LifecycleEngine, SliceJob
+from slice_index import SliceIndex
+from slice_locks import SliceLockManager, VersionConflictError, check_version, bump_version
+from tracing import instrument
 
 
 class SliceStatus(Enum):
@@ -197,12 +201,16 @@ class SliceOrchestrator:
     def monitor_slices(self) -> Dict[str, SliceStatus]:
         return {slice_id: self.get_slice_status(slice_id) for slice_id in self.slices}
 """
+@instrument
 class SliceOrchestrator:
-    def __init__(self):
+    def __init__(self, stage_concurrency: Optional[Dict[str, int]] = None):
         self.slices: Dict[str, Dict[str, Any]] = {}
         self.csmf = None
         self.nsmf = None
         self.nssmf = None
+        self.lifecycle = LifecycleEngine(stage_concurrency)
+        self.index = SliceIndex()  # Index secondaires (type, SD, statut, propriétaire)
+        self.locks = SliceLockManager()  # Verrous par slice
 
     def set_components(self, csmf, nsmf, nssmf):
         self.csmf = csmf
@@ -210,34 +218,147 @@ class SliceOrchestrator:
         self.nsmf.register_nssmf('core', nssmf)  # Enregistrer le CoreNSSMF avec le NSMF
 
     def create_slice(self, slice_request: Dict[str, Any]) -> str:
+        return self._wait(self.create_slice_async(slice_request))
+
+    def modify_slice(self, slice_id: str, modification: Dict[str, Any],
+                     expected_version: Optional[int] = None) -> None:
+        self._wait(self.modify_slice_async(slice_id, modification, expected_version))
+
+    def delete_slice(self, slice_id: str, expected_version: Optional[int] = None) -> None:
+        self._wait(self.delete_slice_async(slice_id, expected_version))
+
+    def create_slice_async(self, slice_request: Dict[str, Any]) -> SliceJob:
+        # Traduction CSMF puis instanciation NSMF (-> CoreNSSMF -> NFVO) en pipeline
         if not all([self.csmf, self.nsmf]):
             raise RuntimeError("All components (CSMF, NSMF) must be set before creating a slice")
 
-        try:
-            translated_request = self.csmf.translate_request(slice_request)
+        def instantiate(translated_request):
             slice_id = self.nsmf.create_slice_instance(translated_request)
-            self.slices[slice_id] = {"status": SliceStatus.ACTIVE, "request": slice_request}
+            self._register(slice_id, slice_request)
             return slice_id
-        except Exception as e:
-            raise
 
-    def modify_slice(self, slice_id: str, modification: Dict[str, Any]) -> None:
-        if slice_id not in self.slices:
-            raise ValueError(f"Slice {slice_id} not found")
+        return self.lifecycle.submit('create', [
+            ('translate', lambda _: self.csmf.translate_request(slice_request)),
+            ('instantiate', instantiate)
+        ])
 
-        try:
-            translated_mod = self.csmf.translate_modification(modification)
-            self.nsmf.update_slice_instance(slice_id, translated_mod)
-            self.slices[slice_id]["status"] = SliceStatus.ACTIVE
-        except Exception as e:
-            self.slices[slice_id]["status"] = SliceStatus.ERROR
-            self.slices[slice_id]["error"] = str(e)
-            raise
+    def create_slices(self, slice_requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self._wait(self.create_slices_async(slice_requests))
 
-    def delete_slice(self, slice_id: str) -> None:
+    def create_slices_async(self, slice_requests: List[Dict[str, Any]]) -> SliceJob:
+        # Admission groupée : le job retourne un résultat par requête, dans l'ordre
+        if not all([self.csmf, self.nsmf]):
+            raise RuntimeError("All components (CSMF, NSMF) must be set before creating a slice")
+
+        def translate(_):
+            translated = []
+            for slice_request in slice_requests:
+                try:
+                    translated.append(self.csmf.translate_request(slice_request))
+                except Exception as e:
+                    translated.append(e)
+            return translated
+
+        def instantiate(translated):
+            results: List[Dict[str, Any]] = [None] * len(translated)
+            valid = []
+            for index, item in enumerate(translated):
+                if isinstance(item, Exception):
+                    results[index] = {'status': 'failed', 'error': str(item)}
+                else:
+                    valid.append(index)
+
+            nsmf_results = self.nsmf.create_slice_instances([translated[i] for i in valid])
+            for index, result in zip(valid, nsmf_results):
+                if result['status'] == 'success':
+                    self._register(result['slice_id'], slice_requests[index])
+                results[index] = result
+            return results
+
+        return self.lifecycle.submit('create_batch', [
+            ('translate', translate),
+            ('instantiate', instantiate)
+        ])
+
+    def modify_slice_async(self, slice_id: str, modification: Dict[str, Any],
+                           expected_version: Optional[int] = None) -> SliceJob:
+        # Les modifications d'une même slice sont sérialisées par son verrou ; avec
+        # `expected_version`, une modification basée sur un état périmé est rejetée.
+        with self.locks.locked(slice_id):
+            if slice_id not in self.slices:
+                raise ValueError(f"Slice {slice_id} not found")
+            check_version(slice_id, self.slices[slice_id], expected_version)
+            self._set_status(slice_id, SliceStatus.MODIFYING)
+
+        def update(translated_mod):
+            with self.locks.locked(slice_id):
+                if slice_id not in self.slices:
+                    raise ValueError(f"Slice {slice_id} not found")
+                try:
+                    check_version(slice_id, self.slices[slice_id], expected_version)
+                    self.nsmf.update_slice_instance(slice_id, translated_mod)
+                except VersionConflictError:
+                    self._set_status(slice_id, SliceStatus.ACTIVE)
+                    raise
+                except Exception as e:
+                    self._mark_error(slice_id, e)
+                    raise
+                record = self.slices[slice_id]
+                record['request'] = dict(record['request'], **translated_mod)  # Les lectures voient la requête modifiée
+                record['status'] = SliceStatus.ACTIVE
+                bump_version(record)
+                self._index(slice_id)
+
+        def translate(_):
+            # Une modification refusée par le CSMF n'a rien changé : la slice redevient ACTIVE
+            try:
+                return self.csmf.translate_modification(modification)
+            except Exception:
+                with self.locks.locked(slice_id):
+                    if slice_id in self.slices:
+                        self._set_status(slice_id, SliceStatus.ACTIVE)
+                raise
+
+        return self.lifecycle.submit('modify', [
+            ('translate', translate),
+            ('update', update)
+        ], slice_id)
+
+    def delete_slice_async(self, slice_id: str, expected_version: Optional[int] = None) -> SliceJob:
+        # Vérification et changement de statut sous le verrou : pas d'entrelacement avec un job en cours
+        with self.locks.locked(slice_id):
+            if slice_id not in self.slices:
+                raise ValueError(f"Slice {slice_id} not found")
+            check_version(slice_id, self.slices[slice_id], expected_version)
+            self._set_status(slice_id, SliceStatus.DELETING)
+
+        def terminate(_):
+            with self.locks.locked(slice_id):
+                if slice_id not in self.slices:
+                    raise ValueError(f"Slice {slice_id} not found")
+                try:
+                    check_version(slice_id, self.slices[slice_id], expected_version)
+                    self.nsmf.terminate_slice_instance(slice_id)
+                except VersionConflictError:
+                    self._set_status(slice_id, SliceStatus.ACTIVE)
+                    raise
+                except Exception as e:
+                    self._mark_error(slice_id, e)
+                    raise
+                del self.slices[slice_id]
+                self.index.remove(slice_id)
+
+        return self.lifecycle.submit('delete', [('terminate', terminate)], slice_id)
+
+    def get_slice_version(self, slice_id: str) -> int:
         if slice_id not in self.slices:
             raise ValueError(f"Slice {slice_id} not found")
-            
+        return self.slices[slice_id]["version"]
+
+    def get_job(self, job_id: str) -> SliceJob:
+        # Consultation (polling) d'un job de cycle de vie
+        return self.lifecycle.get_job(job_id)
+
     def get_slice_status(self, slice_id):
         if slice_id in self.slices:
             return self.slices[slice_id]['status']
@@ -246,9 +367,44 @@ class SliceOrchestrator:
 
     def update_slice_status(self, slice_id, status):
         if slice_id in self.slices:
-            self.slices[slice_id]['status'] = status
+            self._set_status(slice_id, status)
         else:
             raise ValueError(f"Slice with ID {slice_id} not found")
 
+    def list_slices(self) -> List[str]:
+        return list(self.slices.keys())
 
+    def query_slices(self, offset: int = 0, limit: Optional[int] = None, **filters: Any) -> Dict[str, Any]:
+        # Recherche paginée via les index, ex. query_slices(status='ERROR', slice_type='URLLC', limit=50)
+        if isinstance(filters.get('status'), str) and filters['status'] in SliceStatus.__members__:
+            filters['status'] = SliceStatus[filters['status']]
+        return self.index.query(offset, limit, **filters)
 
+    def _wait(self, job: SliceJob) -> Any:
+        # Attente bloquante d'un job dont personne d'autre ne détient le handle : il est oublié une fois terminé
+        try:
+            return job.result()
+        finally:
+            self.lifecycle.forget_job(job.job_id)
+
+    def _register(self, slice_id: str, slice_request: Dict[str, Any]) -> None:
+        self.slices[slice_id] = {"status": SliceStatus.ACTIVE, "request": slice_request, "version": 1}
+        self._index(slice_id)
+
+    def _index(self, slice_id: str) -> None:
+        record = self.slices[slice_id]
+        self.index.upsert(slice_id, {
+            'slice_type': record['request'].get('slice_type'),
+            'slice_differentiator': record['request'].get('slice_differentiator'),
+            'status': record['status'],
+            'owner': record['request'].get('owner')
+        })
+
+    def _set_status(self, slice_id: str, status) -> None:
+        self.slices[slice_id]["status"] = status
+        self.index.update_field(slice_id, 'status', status)
+
+    def _mark_error(self, slice_id: str, error: Exception) -> None:
+        if slice_id in self.slices:
+            self._set_status(slice_id, SliceStatus.ERROR)
+            self.slices[slice_id]["error"] = str(error)
@@ -1,26 +1,176 @@
 import uuid
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from enum import Enum
-import logging
+from threading import Lock
+from tracing import instrument
+from slice_logging import get_logger
+
+logger = get_logger('orchestrator')
+
+class CapacityLedger:
+    """Registre des capacités engagées et réservées, par site et par domaine.
+
+    Les totaux sont tenus à jour à chaque opération, si bien que l'admission
+    d'une demande se fait en O(1) par type de ressource, sans re-sommer
+    l'inventaire. Une réservation suit un cycle en deux phases :
+    reserve() -> commit() une fois la slice créée, ou release() en cas
+    d'échec ou de suppression.
+    """
+
+    def __init__(self):
+        self.capacity: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.reserved: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.committed: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.reservations: Dict[str, Dict[str, Any]] = {}
+        self._lock = Lock()
+
+    def set_capacity(self, capacity: Dict[str, float], site: str = 'default', domain: str = 'core') -> None:
+        with self._lock:
+            key = (site, domain)
+            self.capacity[key] = dict(capacity)
+            self.reserved.setdefault(key, {r: 0 for r in capacity})
+            self.committed.setdefault(key, {r: 0 for r in capacity})
+
+    def headroom(self, site: str = 'default', domain: str = 'core') -> Dict[str, float]:
+        # Capacité encore disponible (totale - engagée - réservée)
+        with self._lock:
+            key = self._key(site, domain)
+            return {r: total - self.committed[key].get(r, 0) - self.reserved[key].get(r, 0)
+                    for r, total in self.capacity[key].items()}
+
+    def check(self, amounts: Dict[str, float], site: str = 'default', domain: str = 'core') -> List[str]:
+        # Retourne la liste des ressources en dépassement (vide si la demande est admissible)
+        key = self._key(site, domain)
+        capacity, committed, reserved = self.capacity[key], self.committed[key], self.reserved[key]
+        errors = []
+        for resource, amount in amounts.items():
+            if resource not in capacity:
+                errors.append(f"Unknown resource type: {resource}")
+            elif committed.get(resource, 0) + reserved.get(resource, 0) + amount > capacity[resource]:
+                errors.append(resource)
+        return errors
+
+    def reserve(self, amounts: Dict[str, float], site: str = 'default', domain: str = 'core') -> str:
+        # Première phase : réservation atomique de toutes les ressources demandées
+        with self._lock:
+            errors = self.check(amounts, site, domain)
+            if errors:
+                raise ValueError(f"Insufficient capacity on {site}/{domain}: {', '.join(errors)}")
+            reservation_id = str(uuid.uuid4())
+            self._apply(self.reserved[(site, domain)], amounts, 1)
+            self.reservations[reservation_id] = {
+                'site': site, 'domain': domain, 'amounts': dict(amounts), 'state': 'reserved', 'slice_id': None
+            }
+            return reservation_id
+
+    def commit(self, reservation_id: str, slice_id: Optional[str] = None) -> None:
+        # Seconde phase : la réservation devient un engagement de la slice
+        with self._lock:
+            reservation = self._get(reservation_id)
+            if reservation['state'] == 'committed':
+                return
+            key = (reservation['site'], reservation['domain'])
+            self._apply(self.reserved[key], reservation['amounts'], -1)
+            self._apply(self.committed[key], reservation['amounts'], 1)
+            reservation['state'] = 'committed'
+            reservation['slice_id'] = slice_id
+
+    def resize(self, reservation_id: str, amounts: Dict[str, float]) -> None:
+        # Remplacement des quantités d'une réservation ; seule la différence est contrôlée
+        with self._lock:
+            self._resize(self._get(reservation_id), amounts)
+
+    def update(self, reservation_id: str, amounts: Dict[str, float]) -> Dict[str, float]:
+        # Mise à jour partielle des quantités d'une réservation ; retourne les quantités précédentes
+        with self._lock:
+            reservation = self._get(reservation_id)
+            previous = dict(reservation['amounts'])
+            self._resize(reservation, dict(previous, **amounts))
+            return previous
+
+    def release(self, reservation_id: str) -> None:
+        with self._lock:
+            reservation = self.reservations.pop(reservation_id, None)
+            if reservation is None:
+                return
+            key = (reservation['site'], reservation['domain'])
+            bucket = self.committed[key] if reservation['state'] == 'committed' else self.reserved[key]
+            self._apply(bucket, reservation['amounts'], -1)
+
+    def _resize(self, reservation: Dict[str, Any], amounts: Dict[str, float]) -> None:
+        # À appeler avec le verrou tenu
+        key = (reservation['site'], reservation['domain'])
+        delta = {r: amounts.get(r, 0) - reservation['amounts'].get(r, 0)
+                 for r in set(amounts) | set(reservation['amounts'])}
+        errors = self.check({r: d for r, d in delta.items() if d > 0}, *key)
+        if errors:
+            raise ValueError(f"Insufficient capacity on {key[0]}/{key[1]}: {', '.join(errors)}")
+        bucket = self.committed[key] if reservation['state'] == 'committed' else self.reserved[key]
+        self._apply(bucket, delta, 1)
+        reservation['amounts'] = dict(amounts)
+
+    def _key(self, site: str, domain: str) -> Tuple[str, str]:
+        if (site, domain) not in self.capacity:
+            raise ValueError(f"No capacity registered for {site}/{domain}")
+        return (site, domain)
+
+    def _get(self, reservation_id: str) -> Dict[str, Any]:
+        if reservation_id not in self.reservations:
+            raise ValueError(f"Reservation {reservation_id} not found")
+        return self.reservations[reservation_id]
+
+    @staticmethod
+    def _apply(totals: Dict[str, float], amounts: Dict[str, float], sign: int) -> None:
+        for resource, amount in amounts.items():
+            totals[resource] = totals.get(resource, 0) + sign * amount
+
 
 class ResourceValidator:
-    def __init__(self, available_resources):
+    def __init__(self, available_resources, site: str = 'default', domain: str = 'core'):
         # Initialise le validateur avec les ressources disponibles
         self.available_resources = available_resources
+        self.site = site
+        self.domain = domain
+        self.ledger = CapacityLedger()
+        self.ledger.set_capacity(available_resources, site, domain)
 
-    def validate(self, requested_resources):
-        # Valide les ressources demandées par rapport aux ressources disponibles
+    def validate(self, requested_resources, site: Optional[str] = None, domain: Optional[str] = None):
+        # Valide les ressources demandées par rapport à la capacité restante (hors engagements et réservations)
+        site, domain = site or self.site, domain or self.domain
+        headroom = self.ledger.headroom(site, domain)
         errors = []
         for resource, details in requested_resources.items():
-            if resource in self.available_resources:
-                if details['value'] > self.available_resources[resource]:
+            if resource in headroom:
+                if details['value'] > headroom[resource]:
                     # Ajoute une erreur si la demande dépasse la disponibilité
-                    errors.append(f"Requested {resource} ({details['value']} {details['unit']}) exceeds available {resource} ({self.available_resources[resource]} {details['unit']})")
+                    errors.append(f"Requested {resource} ({details['value']} {details['unit']}) exceeds available {resource} ({headroom[resource]} {details['unit']})")
             else:
                 # Ajoute une erreur si le type de ressource est inconnu
                 errors.append(f"Unknown resource type: {resource}")
         return errors
 
+    def reserve(self, requested_resources, site: Optional[str] = None, domain: Optional[str] = None) -> str:
+        # Réserve les ressources demandées ; lève ValueError si la capacité est insuffisante
+        return self.ledger.reserve(self._amounts(requested_resources), site or self.site, domain or self.domain)
+
+    def resize(self, reservation_id: str, requested_resources) -> None:
+        self.ledger.resize(reservation_id, self._amounts(requested_resources))
+
+    def update(self, reservation_id: str, requested_resources) -> Dict[str, float]:
+        # Seules les ressources demandées changent ; retourne les quantités précédentes
+        return self.ledger.update(reservation_id, self._amounts(requested_resources))
+
+    def commit(self, reservation_id: str, slice_id: Optional[str] = None) -> None:
+        self.ledger.commit(reservation_id, slice_id)
+
+    def release(self, reservation_id: str) -> None:
+        self.ledger.release(reservation_id)
+
+    @staticmethod
+    def _amounts(requested_resources) -> Dict[str, float]:
+        return {resource: details['value'] for resource, details in requested_resources.items()}
+
+@instrument
 class SliceOrchestrator:
     def __init__(self):
         # Initialise l'orchestrateur de tranches
@@ -33,6 +183,7 @@ class SliceOrchestrator:
             'storage': 10000,  # exemple: 10 TB disponibles
             'bandwidth': 10000  # exemple: 10 Gbps disponibles
         })
+        self.reservations: Dict[str, str] = {}  # slice_id -> réservation dans le registre de capacité
 
     def set_components(self, csmf, nsmf, nssmf):
         # Configure les composants CSMF, NSMF et NSSMF
@@ -47,9 +198,17 @@ class SliceOrchestrator:
         if validation_errors:
             raise ValueError(f"Resource validation failed: {', '.join(validation_errors)}")
 
-        # Si la validation passe, procède à la création de la tranche
-        nsi_config = self.generate_nsi_config(translated_request)
-        return self.nsmf.create_slice_instance(nsi_config)
+        # Si la validation passe, réserve les ressources puis procède à la création de la tranche
+        reservation_id = self.resource_validator.reserve(translated_request['resources'])
+        try:
+            nsi_config = self.generate_nsi_config(translated_request)
+            slice_id = self.nsmf.create_slice_instance(nsi_config)
+        except Exception:
+            self.resource_validator.release(reservation_id)
+            raise
+        self.resource_validator.commit(reservation_id, slice_id)
+        self.reservations[slice_id] = reservation_id
+        return slice_id
 
     def generate_nsi_config(self, translated_request: Dict[str, Any]) -> Dict[str, Any]:
         # Génère la configuration pour une nouvelle instance de tranche réseau
@@ -65,34 +224,39 @@ class SliceOrchestrator:
 
         # Génère la configuration des sous-tranches pour chaque domaine
         for domain, nssmf in self.nsmf.nssmfs.items():
-            logging.debug(f"Creating sub-slice for domain: {domain}")
+            logger.debug("Creating sub-slice for domain: %s", domain)
             sub_slice_id = nssmf.create_sub_slice(translated_request)
-            logging.debug(f"Created sub-slice with ID: {sub_slice_id}")
+            logger.debug("Created sub-slice with ID: %s", sub_slice_id)
             if sub_slice_id is None:
-                logging.error(f"Failed to create sub-slice for domain: {domain}")
+                logger.error("Failed to create sub-slice for domain: %s", domain)
                 continue
             sub_slice_config = nssmf.get_sub_slice_config(sub_slice_id)
-            logging.debug(f"Retrieved sub-slice config: {sub_slice_config}")
+            logger.debug("Retrieved sub-slice config: %s", sub_slice_config)
             if sub_slice_config is None:
-                logging.error(f"Failed to retrieve config for sub-slice: {sub_slice_id}")
+                logger.error("Failed to retrieve config for sub-slice: %s", sub_slice_id)
                 continue
             nsi_config["sub_slices"][domain] = sub_slice_config
 
         return nsi_config
 
     def delete_slice(self, slice_id: str) -> bool:
-        # Supprime une instance de tranche réseau
-        return self.nsmf.delete_slice_instance(slice_id)
+        # Supprime une instance de tranche réseau et libère ses ressources engagées
+        self.nsmf.terminate_slice_instance(slice_id)
+        reservation_id = self.reservations.pop(slice_id, None)
+        if reservation_id is not None:
+            self.resource_validator.release(reservation_id)
+        return True
 
     def modify_slice(self, slice_id: str, modifications: Dict[str, Any]) -> bool:
         # Modifie une instance de tranche réseau existante
-        # Valide d'abord les modifications de ressources
-        if 'resources' in modifications:
-            validation_errors = self.resource_validator.validate(modifications['resources'])
-            if validation_errors:
-                raise ValueError(f"Resource modification validation failed: {', '.join(validation_errors)}")
-
-        return self.nsmf.modify_slice_instance(slice_id, modifications)
+        # Ajuste d'abord l'engagement de ressources de la slice (seule la différence est contrôlée)
+        previous = self._resize_reservation(slice_id, modifications, "Resource modification validation failed")
+        try:
+            self.nsmf.update_slice_instance(slice_id, modifications)
+        except Exception:
+            self._restore_reservation(slice_id, previous)
+            raise
+        return True
 
     def get_slice_info(self, slice_id: str) -> Dict[str, Any]:
         # Récupère les informations sur une instance de tranche réseau
@@ -107,11 +271,47 @@ class SliceOrchestrator:
         return self.nsmf.monitor_slice_instance(slice_id)
 
     def scale_slice(self, slice_id: str, scaling_info: Dict[str, Any]) -> bool:
-        # Redimensionne une instance de tranche réseau
-        # Valide d'abord les modifications de ressources pour le scaling
-        if 'resources' in scaling_info:
-            validation_errors = self.resource_validator.validate(scaling_info['resources'])
+        # Redimensionne le sous-slice cœur d'une instance de tranche réseau
+        # scaling_info : {'scale_type': 'up' | 'down', 'scale_amount': n}
+        sub_slice_id = self.nsmf.get_slice_instance(slice_id)['sub_slices'].get('core')
+        if sub_slice_id is None:
+            raise ValueError(f"Slice instance {slice_id} has no core sub-slice")
+        nssmf = self.nsmf.nssmfs['core']
+        scale_type, scale_amount = scaling_info['scale_type'], scaling_info['scale_amount']
+        # Verrou réentrant du sous-slice : aucun autre scaling entre le calcul, la réservation et l'application
+        with nssmf.locks.locked(sub_slice_id):
+            resources = nssmf.scaled_resources(sub_slice_id, scale_type, scale_amount)
+            # Ajuste d'abord l'engagement de ressources pour le scaling
+            previous = self._resize_reservation(
+                slice_id, {'resources': {r: resources[r] for r in ('cpu', 'memory')}},
+                "Scaling resource validation failed")
+            try:
+                nssmf.scale_sub_slice(sub_slice_id, scale_type, scale_amount)
+            except Exception:
+                self._restore_reservation(slice_id, previous)
+                raise
+        return True
+
+    def _resize_reservation(self, slice_id: str, changes: Dict[str, Any], error_prefix: str) -> Optional[Dict[str, float]]:
+        # Retourne les quantités précédentes pour pouvoir annuler en cas d'échec
+        if 'resources' not in changes:
+            return None
+        reservation_id = self.reservations.get(slice_id)
+        if reservation_id is None:
+            validation_errors = self.resource_validator.validate(changes['resources'])
             if validation_errors:
-                raise ValueError(f"Scaling resource validation failed: {', '.join(validation_errors)}")
+                raise ValueError(f"{error_prefix}: {', '.join(validation_errors)}")
+            return None
+
+        try:
+            return self.resource_validator.update(reservation_id, changes['resources'])
+        except ValueError as e:
+            raise ValueError(f"{error_prefix}: {e}")
 
-        return self.nsmf.scale_slice_instance(slice_id, scaling_info)
\ No newline at end of file
+    def _restore_reservation(self, slice_id: str, previous: Optional[Dict[str, float]]) -> None:
+        # Appelé pendant la gestion d'une erreur : un échec ici ne doit pas masquer l'erreur d'origine
+        if previous is not None and slice_id in self.reservations:
+            try:
+                self.resource_validator.ledger.resize(self.reservations[slice_id], previous)
+            except Exception as e:
+                logger.error("Failed to restore the reservation of slice %s: %s", slice_id, e)
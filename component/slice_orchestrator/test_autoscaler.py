@@ -0,0 +1,123 @@
+import unittest
+from autoscaler import Autoscaler, ScalingPolicy, simulate
+from nssmf import CoreNSSMF
+from vnf_metrics import FakeMetricsSource, MetricsCollector, np
+from test_slice_lifecycle import SLICE_REQUEST
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class TestAutoscaler(unittest.TestCase):
+    def setUp(self):
+        self.nssmf = CoreNSSMF()
+        self.now = 0.0
+        self.source = FakeMetricsSource(lambda instance_id, instance: {'cpu_usage': 0.0})
+        self.collector = MetricsCollector(self.nssmf.nfvo, self.source, clock=lambda: self.now)
+
+    def upf(self, sub_slice_id):
+        nfvo_slice_id = self.nssmf.sub_slices[sub_slice_id]['nfvo_slice_id']
+        return self.nssmf.nfvo.get_vnf_instance(nfvo_slice_id, 'UPF')
+
+    def load(self, sub_slice_id, utilization):
+        # Charge exprimée en % des vCPUs alloués à l'UPF
+        upf = self.upf(sub_slice_id)
+        self.source.set(upf['instance_id'], {'cpu_usage': utilization * upf['resources']['cpu']})
+
+    def tick(self, autoscaler, seconds=10.0):
+        self.now += seconds
+        self.collector.collect_once()
+        return autoscaler.step(self.now)
+
+    def test_scale_sub_slice_updates_resource_values(self):
+        sub_slice_id = self.nssmf.create_sub_slice(SLICE_REQUEST)
+        self.nssmf.scale_sub_slice(sub_slice_id, 'up', 2)
+        resources = self.nssmf.get_sub_slice_config(sub_slice_id)['resources']
+        self.assertEqual(resources['cpu'], {'value': 6, 'unit': 'vCPUs'})
+        self.assertEqual(resources['memory']['value'], 4096 + 2048)
+        self.assertEqual(SLICE_REQUEST['resources']['cpu']['value'], 4)
+
+        results = self.nssmf.scale_sub_slices([{'sub_slice_id': sub_slice_id, 'scale_type': 'down', 'scale_amount': 10},
+                                               {'sub_slice_id': 'missing', 'scale_type': 'up', 'scale_amount': 1}])
+        self.assertEqual([r['status'] for r in results], ['success', 'failed'])
+        self.assertEqual(self.nssmf.get_sub_slice_config(sub_slice_id)['resources']['cpu']['value'], 1)
+
+    def test_vnf_scaling_survives_sub_slice_updates(self):
+        sub_slice_id = self.nssmf.create_sub_slice(SLICE_REQUEST)
+        nfvo_slice_id = self.nssmf.sub_slices[sub_slice_id]['nfvo_slice_id']
+        base = dict(self.upf(sub_slice_id)['resources'])
+        self.nssmf.nfvo.scale_vnf_instance(nfvo_slice_id, 'UPF', 'up', 2)
+
+        self.nssmf.update_sub_slice(sub_slice_id, dict(SLICE_REQUEST, priority=2))
+        self.assertEqual(self.upf(sub_slice_id)['resources']['cpu'], base['cpu'] + 2)
+        self.assertEqual(self.upf(sub_slice_id)['resources']['memory'], base['memory'] + 2048)
+
+        # La mise à l'échelle du VNF s'ajoute à la nouvelle taille de la sous-slice
+        self.nssmf.scale_sub_slice(sub_slice_id, 'up', 1)
+        resized = self.nssmf.resource_model.calculate(
+            'eMBB', SLICE_REQUEST['qos'], self.nssmf.get_sub_slice_config(sub_slice_id)['resources'])['UPF']
+        self.assertEqual(self.upf(sub_slice_id)['resources']['cpu'], resized['cpu'] + 2)
+
+    def test_hysteresis_sustain_and_cooldown(self):
+        sub_slice_id = self.nssmf.create_sub_slice(SLICE_REQUEST)
+        autoscaler = Autoscaler(self.nssmf)
+        autoscaler.set_policy(sub_slice_id, ScalingPolicy(window=5, sustain=2, cooldown=30))
+        initial = self.upf(sub_slice_id)['resources']['cpu']
+
+        self.load(sub_slice_id, 50)  # Entre les deux seuils : aucune action
+        self.assertEqual(self.tick(autoscaler), [])
+        self.load(sub_slice_id, 95)
+        self.assertEqual(self.tick(autoscaler), [])  # Une seule évaluation au-dessus du seuil
+        actions = self.tick(autoscaler)
+        self.assertEqual([(a['scale_type'], a['scale_amount'], a['status']) for a in actions], [('up', 1, 'success')])
+        self.assertEqual(self.upf(sub_slice_id)['resources']['cpu'], initial + 1)
+
+        self.load(sub_slice_id, 95)
+        self.assertEqual(self.tick(autoscaler), [])
+        self.assertEqual(self.tick(autoscaler), [])  # Encore dans la période de refroidissement
+        self.assertEqual(len(self.tick(autoscaler)), 1)
+
+    def test_scale_up_wins_over_conflicting_scale_down(self):
+        sub_slice_id = self.nssmf.create_sub_slice(SLICE_REQUEST)
+        autoscaler = Autoscaler(self.nssmf, dry_run=True)
+        autoscaler.set_policy(sub_slice_id,
+                              ScalingPolicy(window=5, scale_out_threshold=40, scale_in_threshold=10),
+                              ScalingPolicy(window=5, scale_out_threshold=90, scale_in_threshold=60, step=3))
+        self.load(sub_slice_id, 50)
+        self.now += 10.0
+        self.collector.collect_once()
+        actions = autoscaler.evaluate(self.now)
+        self.assertEqual([(a['scale_type'], a['scale_amount']) for a in actions], [('up', 1)])
+
+    def test_batched_actions_respect_bounds_and_dry_run(self):
+        first = self.nssmf.create_sub_slice(SLICE_REQUEST)
+        second = self.nssmf.create_sub_slice(SLICE_REQUEST)
+        autoscaler = Autoscaler(self.nssmf, dry_run=True)
+        for sub_slice_id in (first, second):
+            autoscaler.set_policy(sub_slice_id, ScalingPolicy(window=5, cooldown=0, target=50, max_step=8, max_cpu=10))
+        initial = self.upf(first)['resources']['cpu']
+
+        self.load(first, 100)
+        self.load(second, 5)
+        actions = self.tick(autoscaler)
+        self.assertEqual(sorted((a['scale_type'], a['status']) for a in actions), [('down', 'dry_run'), ('up', 'dry_run')])
+        self.assertEqual(self.upf(first)['resources']['cpu'], initial)
+
+        autoscaler.dry_run = False
+        actions = {a['sub_slice_id']: a for a in self.tick(autoscaler)}
+        self.assertEqual(actions[first]['scale_amount'], 10 - initial)
+        self.assertEqual(self.upf(first)['resources']['cpu'], 10)
+        self.assertEqual(self.upf(second)['resources']['cpu'], initial - actions[second]['scale_amount'])
+
+        self.nssmf.terminate_sub_slice(second)
+        self.tick(autoscaler)
+        self.assertEqual(list(autoscaler.policies), [first])
+
+    def test_simulation_measures_reaction_time(self):
+        trace = [(t * 15.0, 1.0 if t < 5 or t >= 30 else 8.0) for t in range(40)]
+        report = simulate(trace, ScalingPolicy(window=30, cooldown=30, target=60, max_cpu=16))
+        self.assertFalse(report['unresolved_overload'])
+        self.assertEqual(len(report['reaction_times']), 1)
+        self.assertGreater(report['max_reaction_time'], 0)
+        self.assertGreater(report['actions'], 1)
+        self.assertGreaterEqual(report['peak_overshoot'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from benchmark_slices import BENCHMARKS, compare, run_benchmark
+
+class TestBenchmarkSlices(unittest.TestCase):
+    def test_every_benchmark_runs_all_phases(self):
+        for benchmark in BENCHMARKS:
+            results = run_benchmark(benchmark, 6, allocation_sample=2)
+            self.assertTrue(results)
+            for result in results:
+                self.assertEqual(result['ops'], 4)
+                self.assertGreater(result['ops_per_sec'], 0)
+                self.assertLessEqual(result['p50_us'], result['p99_us'])
+                self.assertGreater(result['peak_rss_kb'], 0)
+            phases = [result['phase'] for result in results]
+            if benchmark != 'csmf':
+                self.assertEqual(phases, ['create', 'modify', 'scale', 'delete'])
+
+    def test_compare_reports_regressions(self):
+        baseline = {'results': [{'benchmark': 'nfvo', 'slices': 10, 'phase': 'create', 'ops_per_sec': 1000, 'p99_us': 10}]}
+        current = {'results': [{'benchmark': 'nfvo', 'slices': 10, 'phase': 'create', 'ops_per_sec': 700, 'p99_us': 11}]}
+        self.assertEqual(compare(baseline, current), ["nfvo/10/create: ops/sec 1000 -> 700"])
+        self.assertEqual(compare(baseline, current, threshold=0.5), [])
+
+if __name__ == '__main__':
+    unittest.main()
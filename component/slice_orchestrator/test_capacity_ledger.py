@@ -0,0 +1,87 @@
+import unittest
+from slice_orchestrator2 import CapacityLedger, SliceOrchestrator
+from csmf2 import CSMF
+from nsmf import NSMF
+from nssmf import CoreNSSMF
+from test_slice_lifecycle import SLICE_REQUEST
+
+class TestCapacityLedger(unittest.TestCase):
+    def test_two_phase_reservation(self):
+        ledger = CapacityLedger()
+        ledger.set_capacity({'cpu': 10, 'memory': 1000}, site='paris')
+        first = ledger.reserve({'cpu': 6, 'memory': 500}, site='paris')
+        with self.assertRaises(ValueError):
+            ledger.reserve({'cpu': 5}, site='paris')
+
+        ledger.commit(first, 'slice-1')
+        self.assertEqual(ledger.committed[('paris', 'core')], {'cpu': 6, 'memory': 500})
+        self.assertEqual(ledger.headroom('paris'), {'cpu': 4, 'memory': 500})
+
+        ledger.resize(first, {'cpu': 9, 'memory': 500})
+        with self.assertRaises(ValueError):
+            ledger.resize(first, {'cpu': 11, 'memory': 500})
+        self.assertEqual(ledger.update(first, {'memory': 800}), {'cpu': 9, 'memory': 500})
+        self.assertEqual(ledger.headroom('paris'), {'cpu': 1, 'memory': 200})
+        ledger.release(first)
+        self.assertEqual(ledger.headroom('paris'), {'cpu': 10, 'memory': 1000})
+        with self.assertRaises(ValueError):
+            ledger.reserve({'cpu': 1}, site='lyon')
+
+    def test_orchestrator_accounts_for_existing_slices(self):
+        so = SliceOrchestrator()
+        so.set_components(CSMF("config/network_slice_templates/gst_template2.json"), NSMF(), CoreNSSMF())
+        request = dict(SLICE_REQUEST, resources=dict(SLICE_REQUEST['resources'], cpu={'value': 40, 'unit': 'vCPUs'}))
+
+        first = so.create_slice(request)
+        second = so.create_slice(request)
+        self.assertEqual(so.resource_validator.ledger.headroom()['cpu'], 20)
+        with self.assertRaises(ValueError):
+            so.create_slice(request)
+        self.assertEqual(so.resource_validator.ledger.headroom()['cpu'], 20)
+
+        with self.assertRaises(ValueError):
+            so.modify_slice(first, {'resources': {'cpu': {'value': 61, 'unit': 'vCPUs'}}})
+        so.modify_slice(first, {'resources': {'cpu': {'value': 60, 'unit': 'vCPUs'}}})
+        self.assertEqual(so.resource_validator.ledger.headroom()['cpu'], 0)
+
+        so.delete_slice(second)
+        self.assertEqual(so.resource_validator.ledger.headroom()['cpu'], 40)
+
+    def test_scaling_resizes_the_core_sub_slice_and_its_reservation(self):
+        so = SliceOrchestrator()
+        nssmf = CoreNSSMF()
+        so.set_components(CSMF("config/network_slice_templates/gst_template2.json"), NSMF(), nssmf)
+        request = dict(SLICE_REQUEST, resources=dict(SLICE_REQUEST['resources'], cpu={'value': 40, 'unit': 'vCPUs'}))
+        slice_id = so.create_slice(request)
+        sub_slice_id = so.nsmf.get_slice_instance(slice_id)['sub_slices']['core']
+
+        self.assertTrue(so.scale_slice(slice_id, {'scale_type': 'up', 'scale_amount': 2}))
+        resources = nssmf.get_sub_slice_config(sub_slice_id)['resources']
+        self.assertEqual((resources['cpu']['value'], resources['memory']['value']), (42, 4096 + 2048))
+        self.assertEqual(so.resource_validator.ledger.headroom()['cpu'], 58)
+        self.assertEqual(so.resource_validator.ledger.headroom()['memory'], 256000 - 4096 - 2048)
+
+        with self.assertRaisesRegex(ValueError, "Scaling resource validation failed"):
+            so.scale_slice(slice_id, {'scale_type': 'up', 'scale_amount': 59})
+        self.assertEqual(nssmf.get_sub_slice_config(sub_slice_id)['resources']['cpu']['value'], 42)
+        self.assertEqual(so.resource_validator.ledger.headroom()['cpu'], 58)
+
+        so.scale_slice(slice_id, {'scale_type': 'down', 'scale_amount': 10})
+        self.assertEqual(so.resource_validator.ledger.headroom()['cpu'], 68)
+
+    def test_failed_rollback_keeps_the_original_error(self):
+        so = SliceOrchestrator()
+        so.set_components(CSMF("config/network_slice_templates/gst_template2.json"), NSMF(), CoreNSSMF())
+        slice_id = so.create_slice(SLICE_REQUEST)
+
+        def fail(*args):
+            so.resource_validator.release(so.reservations[slice_id])  # La restauration échouera aussi
+            raise RuntimeError("core unreachable")
+
+        so.nsmf.update_slice_instance = fail
+        with self.assertLogs('slice_orchestrator.orchestrator', 'ERROR'):
+            with self.assertRaisesRegex(RuntimeError, "core unreachable"):
+                so.modify_slice(slice_id, {'resources': {'cpu': {'value': 8, 'unit': 'vCPUs'}}})
+
+if __name__ == '__main__':
+    unittest.main()
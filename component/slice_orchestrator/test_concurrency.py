@@ -0,0 +1,90 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from nsmf import NSMF
+from nssmf import CoreNSSMF
+from slice_locks import SliceLockManager, VersionConflictError
+from slice_orchestrator import SliceOrchestrator
+from csmf import CSMF
+from test_slice_lifecycle import SLICE_REQUEST
+
+class TestConcurrency(unittest.TestCase):
+    def setUp(self):
+        self.nsmf = NSMF()
+        self.nssmf = CoreNSSMF()
+        self.nsmf.register_nssmf('core', self.nssmf)
+
+    def test_independent_slices_in_parallel(self):
+        def lifecycle(_):
+            slice_id = self.nsmf.create_slice_instance(dict(SLICE_REQUEST))
+            version = self.nsmf.update_slice_instance(slice_id, {'slice_differentiator': '000080'})
+            return slice_id, version
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lifecycle, range(50)))
+
+        self.assertEqual(len({slice_id for slice_id, _ in results}), 50)
+        self.assertTrue(all(version == 2 for _, version in results))
+        self.assertEqual(self.nsmf.query_slice_instances(slice_differentiator='000080')['total'], 50)
+        self.assertEqual(self.nssmf.nfvo.ip_allocator.available(), 254 - 50 * 4)
+
+    def test_stale_versions_are_rejected(self):
+        slice_id = self.nsmf.create_slice_instance(dict(SLICE_REQUEST))
+
+        def edit(i):
+            try:
+                self.nsmf.update_slice_instance(slice_id, {'slice_differentiator': str(i)}, expected_version=1)
+                return True
+            except VersionConflictError:
+                return False
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            outcomes = list(pool.map(edit, range(8)))
+
+        self.assertEqual(outcomes.count(True), 1)
+        self.assertEqual(self.nsmf.get_slice_instance(slice_id)['version'], 2)
+
+    def test_orchestrator_serializes_same_slice_edits(self):
+        so = SliceOrchestrator()
+        so.set_components(CSMF("config/network_slice_templates/gst_template2.json"), self.nsmf, self.nssmf)
+        try:
+            slice_id = so.create_slice(SLICE_REQUEST)
+            jobs = [so.modify_slice_async(slice_id, {"slice_differentiator": str(i)}) for i in range(10)]
+            for job in jobs:
+                job.result(timeout=5)
+            self.assertEqual(so.get_slice_version(slice_id), 11)
+
+            with self.assertRaises(VersionConflictError):
+                so.modify_slice(slice_id, {"slice_differentiator": "stale"}, expected_version=1)
+            so.delete_slice(slice_id, expected_version=11)
+            self.assertEqual(so.list_slices(), [])
+        finally:
+            so.lifecycle.shutdown()
+
+    def test_submission_waits_for_the_slice_lock(self):
+        so = SliceOrchestrator()
+        so.set_components(CSMF("config/network_slice_templates/gst_template2.json"), self.nsmf, self.nssmf)
+        try:
+            slice_id = so.create_slice(SLICE_REQUEST)
+            submitted = []
+            with so.locks.locked(slice_id):  # Job en cours sur la slice
+                submitter = threading.Thread(target=lambda: submitted.append(
+                    so.modify_slice_async(slice_id, {"slice_differentiator": "000002"}, expected_version=1)))
+                submitter.start()
+                submitter.join(0.1)
+                self.assertTrue(submitter.is_alive())
+                self.assertEqual(so.get_slice_status(slice_id).name, 'ACTIVE')
+            submitter.join(5)
+            submitted[0].result(timeout=5)
+            self.assertEqual(so.get_slice_version(slice_id), 2)
+        finally:
+            so.lifecycle.shutdown()
+
+    def test_lock_manager_is_reentrant(self):
+        locks = SliceLockManager(stripes=4)
+        with locks.locked("a"):
+            with locks.locked("a"):
+                self.assertIs(locks.lock_for("a"), locks.lock_for("a"))
+
+if __name__ == '__main__':
+    unittest.main()
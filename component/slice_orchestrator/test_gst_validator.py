@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import unittest
+from csmf import CSMF
+from gst_validator import load_compiled_template
+
+TEMPLATE = "config/network_slice_templates/gst_template2.json"
+
+class TestGSTValidator(unittest.TestCase):
+    def setUp(self):
+        self.csmf = CSMF(TEMPLATE)
+
+    def test_translation_applies_defaults_and_keeps_values(self):
+        config = self.csmf.translate_request({
+            "slice_type": "URLLC",
+            "qos": {"latency": {"value": 1, "unit": "ms"}}
+        })
+        self.assertEqual(list(config), list(self.csmf.gst_template['gst']['attributes']))
+        self.assertEqual(config["slice_type"], "URLLC")
+        self.assertIsNone(config["slice_differentiator"])
+        self.assertEqual(config["qos"]["latency"]["value"], 1)
+
+    def test_invalid_values_are_rejected(self):
+        invalid_requests = [
+            {"slice_type": "unknown"},
+            {"slice_type": 5},
+            {"qos": {"latency": {"value": "fast", "unit": "ms"}}},
+            {"resources": {"memory": {"value": 1024, "unit": "GB"}}},
+            {"resources": "lots"}
+        ]
+        for request in invalid_requests:
+            with self.assertRaises(ValueError):
+                self.csmf.translate_request(request)
+        self.assertTrue(self.csmf._validate_attribute("slice_differentiator", None))
+
+    def test_max_length_from_ngmn_template(self):
+        csmf = CSMF("config/network_slice_templates/gst_template.json")
+        self.assertTrue(csmf._validate_attribute("NumberOfTerminals", "1" * 22))
+        self.assertFalse(csmf._validate_attribute("NumberOfTerminals", "1" * 23))
+        self.assertFalse(csmf._validate_attribute("Service/SliceType(Sst)", {"value": "eMBB"}))
+
+    def test_compiled_plan_is_cached_until_file_changes(self):
+        self.assertIs(load_compiled_template(TEMPLATE), self.csmf.compiled_template)
+
+        fd, path = tempfile.mkstemp(suffix=".json")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"gst": {"attributes": {"slice_type": {"type": "string", "default": "eMBB"}}}}, f)
+            first = load_compiled_template(path)
+            self.assertIs(load_compiled_template(path), first)
+
+            with open(path, 'w') as f:
+                json.dump({"gst": {"attributes": {"slice_type": {"type": "string", "default": "mMTC"}}}}, f)
+            os.utime(path, ns=(0, 0))
+            second = load_compiled_template(path)
+            self.assertIsNot(second, first)
+            self.assertEqual(second.translate({}), {"slice_type": "mMTC"})
+        finally:
+            os.remove(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import unittest
+from inventory_store import InventoryStore, LOG_FILE
+from nsmf import NSMF
+from nssmf import CoreNSSMF
+from test_slice_lifecycle import SLICE_REQUEST
+
+class TestInventoryStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_recovery_replays_log(self):
+        store = InventoryStore(self.directory)
+        store.put('slices', 'a', {'status': 'active'})
+        store.put_many('slices', [('b', {'status': 'creating'}), ('c', {'status': 'active'})])
+        store.put('slices', 'b', {'status': 'active'})
+        store.delete('slices', 'c')
+        store.close()
+
+        recovered = InventoryStore(self.directory)
+        self.assertEqual(recovered.namespace('slices'), {'a': {'status': 'active'}, 'b': {'status': 'active'}})
+
+    def test_torn_tail_is_discarded(self):
+        store = InventoryStore(self.directory)
+        store.put('slices', 'a', 1)
+        store.put('slices', 'b', 2)
+        store.close()
+        log_path = os.path.join(self.directory, LOG_FILE)
+        with open(log_path, 'r+b') as log:
+            log.truncate(os.path.getsize(log_path) - 3)
+
+        recovered = InventoryStore(self.directory)
+        self.assertEqual(recovered.namespace('slices'), {'a': 1})
+        recovered.put('slices', 'c', 3)
+        recovered.close()
+        self.assertEqual(InventoryStore(self.directory).namespace('slices'), {'a': 1, 'c': 3})
+
+    def test_compaction_truncates_log(self):
+        store = InventoryStore(self.directory, compact_every=10)
+        for i in range(25):
+            store.put('slices', str(i % 5), i)
+        store.close()
+        self.assertLess(os.path.getsize(os.path.join(self.directory, LOG_FILE)), 200)
+        self.assertEqual(InventoryStore(self.directory).namespace('slices'),
+                         {str(i): 20 + i for i in range(5)})
+
+    def test_snapshot_holds_values_as_written(self):
+        store = InventoryStore(self.directory)
+        record = {'status': 'active', 'vnfs': ['AMF']}
+        store.put('slices', 'a', record)
+        record['status'] = 'deleting'  # Modification non journalisée : ne doit pas fuir dans le snapshot
+        record['vnfs'].append('UPF')
+        store.compact()
+        store.close()
+
+        recovered = InventoryStore(self.directory)
+        self.assertEqual(recovered.get('slices', 'a'), {'status': 'active', 'vnfs': ['AMF']})
+        self.assertIsNone(recovered.get('slices', 'b'))
+
+    def test_components_restore_from_store(self):
+        store = InventoryStore(self.directory)
+        nsmf = NSMF(store)
+        nsmf.register_nssmf('core', CoreNSSMF(store=store))
+        kept = nsmf.create_slice_instance(dict(SLICE_REQUEST))
+        removed = nsmf.create_slice_instances([dict(SLICE_REQUEST)])[0]['slice_id']
+        nsmf.terminate_slice_instance(removed)
+        used_ips = {i['ip_address'] for i in nsmf.nssmfs['core'].nfvo.network_slices[
+            nsmf.nssmfs['core'].sub_slices[nsmf.slices[kept]['sub_slices']['core']]['nfvo_slice_id']
+        ]['vnf_instances'].values()}
+        store.close()
+
+        store = InventoryStore(self.directory)
+        restored = NSMF(store)
+        nssmf = CoreNSSMF(store=store)
+        restored.register_nssmf('core', nssmf)
+        self.assertEqual(restored.list_slice_instances(), [kept])
+        self.assertEqual(len(nssmf.sub_slices), 1)
+        for ip in used_ips:
+            self.assertTrue(nssmf.nfvo.ip_allocator.is_allocated(ip))
+        self.assertEqual(nssmf.nfvo.ip_allocator.available(), 254 - len(used_ips))
+
+        restored.terminate_slice_instance(kept)
+        self.assertEqual(nssmf.nfvo.list_network_slices(), [])
+
+    def test_added_ip_pool_survives_restart(self):
+        store = InventoryStore(self.directory)
+        nssmf = CoreNSSMF(store=store)
+        nssmf.nfvo.ip_allocator.allocate_many(nssmf.nfvo.ip_allocator.available('default'))
+        nssmf.nfvo.add_ip_pool('10.9.0.0/24')
+        nsmf = NSMF(store)
+        nsmf.register_nssmf('core', nssmf)
+        nsmf.create_slice_instance(dict(SLICE_REQUEST))
+        used_ips = {i['ip_address'] for s in nssmf.nfvo.network_slices.values() for i in s['vnf_instances'].values()}
+        self.assertTrue(all(ip.startswith('10.9.0.') for ip in used_ips))
+        store.close()
+
+        store = InventoryStore(self.directory)
+        restored = CoreNSSMF(store=store)
+        self.assertEqual([str(p.network) for p in restored.nfvo.ip_allocator.pools['default']],
+                         ['192.168.0.0/24', '10.9.0.0/24'])
+        self.assertEqual(restored.nfvo.ip_allocator.available(), 2 * 254 - len(used_ips))
+        for ip in used_ips:
+            self.assertTrue(restored.nfvo.ip_allocator.is_allocated(ip))
+
+if __name__ == '__main__':
+    unittest.main()
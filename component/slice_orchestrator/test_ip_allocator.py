@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from nfvo import IPPool, IPAllocator, NFVO
+
+class TestIPAllocator(unittest.TestCase):
+    def test_ipv4_pool_excludes_network_and_broadcast(self):
+        pool = IPPool("192.168.0.0/24")
+        self.assertEqual(pool.free, 254)
+        addresses = IPAllocator({'default': ["192.168.0.0/24"]}).allocate_many(254)
+        self.assertEqual(addresses[0], "192.168.0.1")
+        self.assertEqual(addresses[-1], "192.168.0.254")
+
+    def test_release_merges_free_ranges(self):
+        allocator = IPAllocator({'default': ["10.0.0.0/29"]})
+        addresses = allocator.allocate_many(6)
+        with self.assertRaises(Exception):
+            allocator.allocate()
+
+        for ip in [addresses[1], addresses[3], addresses[2]]:
+            self.assertTrue(allocator.release(ip))
+        self.assertFalse(allocator.release(addresses[2]))  # Double libération ignorée
+        pool = allocator.pools['default'][0]
+        self.assertEqual(len(pool._starts), 1)
+        self.assertEqual(allocator.available(), 3)
+        self.assertEqual(allocator.allocate(), addresses[1])
+
+    def test_large_and_ipv6_pools_stay_compact(self):
+        allocator = IPAllocator({'site-a': ["10.0.0.0/8"], 'site-b': ["2001:db8::/64"]})
+        allocator.allocate_many(1000, 'site-a')
+        ipv6 = allocator.allocate_many(3, 'site-b')
+        self.assertEqual(ipv6[0], "2001:db8::1")
+        self.assertEqual(len(allocator.pools['site-a'][0]._starts), 1)
+        self.assertTrue(allocator.is_allocated("10.0.3.232"))
+        with self.assertRaises(ValueError):
+            allocator.release("172.16.0.1")
+
+    def test_bulk_allocation_spans_pools_of_a_site(self):
+        allocator = IPAllocator({'default': ["10.0.0.0/30", "10.0.1.0/30"]})
+        self.assertEqual(allocator.allocate_many(4), ["10.0.0.1", "10.0.0.2", "10.0.1.1", "10.0.1.2"])
+        with self.assertRaises(ValueError):
+            allocator.add_pool("10.0.0.0/24")
+
+    def test_nfvo_state_round_trip(self):
+        nfvo = NFVO()
+        response = nfvo.instantiate_vnfs({
+            'AMF': {'cpu': 2, 'memory': 2048, 'storage': 10},
+            'UPF': {'cpu': 4, 'memory': 4096, 'storage': 20}
+        })
+        fd, filename = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            nfvo.save_state(filename)
+            restored = NFVO()
+            restored.load_state(filename)
+        finally:
+            os.remove(filename)
+
+        self.assertEqual(restored.ip_allocator.available(), 252)
+        for instance in response['vnf_instances'].values():
+            self.assertTrue(restored.ip_allocator.is_allocated(instance['ip_address']))
+        self.assertTrue(restored.delete_network_slice(response['slice_id']))
+        self.assertEqual(restored.ip_allocator.available(), 254)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from nfvo import NFVO
+
+RESOURCES = {
+    'AMF': {'cpu': 2, 'memory': 2048, 'storage': 10},
+    'UPF': {'cpu': 4, 'memory': 4096, 'storage': 20}
+}
+
+class TestNFVOState(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "nfvo_state.json")
+        self.nfvo = NFVO()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _deploy(self):
+        return self.nfvo.instantiate_vnfs({c: dict(r) for c, r in RESOURCES.items()})['slice_id']
+
+    def test_incremental_snapshots_write_only_changes(self):
+        slices = [self._deploy() for _ in range(5)]
+        self.nfvo.save_state(self.filename, incremental=True)  # Pas de base : snapshot complet
+
+        self.nfvo.scale_vnf_instance(slices[0], 'UPF', 'up', 2)
+        self.nfvo.delete_network_slice(slices[1])
+        self.nfvo.save_state(self.filename, incremental=True)
+        added = self._deploy()
+        self.nfvo.save_state(self.filename, incremental=True)
+
+        deltas = sorted(glob.glob(self.filename + ".delta.*"))
+        self.assertEqual(len(deltas), 2)
+
+        restored = NFVO()
+        restored.load_state(self.filename)
+        self.assertEqual(restored.network_slices, self.nfvo.network_slices)
+        self.assertEqual(restored.network_slices[slices[0]]['vnf_instances']['UPF']['resources']['cpu'], 6)
+        self.assertNotIn(slices[1], restored.network_slices)
+        self.assertIn(added, restored.network_slices)
+        self.assertEqual(restored.ip_allocator.available(), self.nfvo.ip_allocator.available())
+
+        # Les deltas suivants continuent la séquence après un rechargement
+        restored.delete_network_slice(added)
+        restored.save_state(self.filename, incremental=True)
+        reloaded = NFVO()
+        reloaded.load_state(self.filename)
+        self.assertNotIn(added, reloaded.network_slices)
+
+    def test_full_snapshot_discards_deltas(self):
+        self._deploy()
+        self.nfvo.save_state(self.filename)
+        self._deploy()
+        self.nfvo.save_state(self.filename, incremental=True)
+        self.nfvo.save_state(self.filename)
+        self.assertEqual(glob.glob(self.filename + ".delta.*"), [])
+
+        restored = NFVO()
+        restored.load_state(self.filename)
+        self.assertEqual(len(restored.network_slices), 2)
+
+    def test_deltas_hold_only_changes(self):
+        shared = {'AMF': dict(RESOURCES['AMF'])}
+        self.nfvo.instantiate_vnfs(dict(shared, UPF=dict(RESOURCES['UPF'])), shared_components=['AMF'])
+        self._deploy()
+        self.nfvo.save_state(self.filename, incremental=True)
+
+        added = self.nfvo.instantiate_vnfs({'UPF': dict(RESOURCES['UPF'])})
+        self.nfvo.add_ip_pool("10.200.0.0/30", 'edge')
+        self.nfvo.save_state(self.filename, incremental=True)
+        with open(self.filename + ".delta.000001") as f:
+            delta = json.load(f)
+        self.assertEqual(list(delta['network_slices']), [added['slice_id']])
+        self.assertEqual(delta['ip_changes'], {'added_pools': [['edge', "10.200.0.0/30"]],
+                                               'allocated': [added['vnf_instances']['UPF']['ip_address']],
+                                               'released': []})
+        self.assertEqual((delta['shared_vnfs'], delta['deleted_shared_vnfs']), ({}, []))
+        self.assertNotIn('ip_pools', delta)
+
+        amf_slice = next(s for s, data in self.nfvo.network_slices.items() if data['shared_vnfs'])
+        self.nfvo.delete_network_slice(amf_slice)
+        self.nfvo.save_state(self.filename, incremental=True)
+        with open(self.filename + ".delta.000002") as f:
+            delta = json.load(f)
+        self.assertEqual(delta['deleted_shared_vnfs'], ['AMF'])
+        self.assertEqual(len(delta['ip_changes']['released']), 2)
+
+        restored = NFVO()
+        restored.load_state(self.filename)
+        self.assertEqual(restored.network_slices, self.nfvo.network_slices)
+        self.assertEqual(restored.shared_vnfs, {})
+        self.assertEqual(restored.ip_allocator.to_dict(), self.nfvo.ip_allocator.to_dict())
+
+    def test_stale_deltas_are_not_replayed_over_a_new_base(self):
+        kept = self._deploy()
+        self.nfvo.save_state(self.filename, incremental=True)
+        removed = self._deploy()
+        self.nfvo.save_state(self.filename, incremental=True)
+        with open(self.filename + ".delta.000001") as f:
+            stale = f.read()
+
+        # Arrêt simulé après l'écriture de la nouvelle base, avant le nettoyage des deltas
+        self.nfvo.delete_network_slice(removed)
+        self.nfvo.save_state(self.filename)
+        with open(self.filename + ".delta.000001", 'w') as f:
+            f.write(stale)
+
+        restored = NFVO()
+        restored.load_state(self.filename)
+        self.assertEqual(list(restored.network_slices), [kept])
+        self.assertEqual(restored.ip_allocator.available(), self.nfvo.ip_allocator.available())
+
+    def test_baseline_state_is_migrated(self):
+        # Fichier écrit par le save_state d'origine : slices et liste des adresses libres
+        with open(self.filename, 'w') as f:
+            json.dump({
+                'network_slices': {'legacy': {'status': 'active', 'vnf_instances': {
+                    'AMF': {'instance_id': 'amf-1', 'ip_address': '192.168.0.1', 'status': 'running',
+                            'resources': dict(RESOURCES['AMF'])},
+                    'UPF': {'instance_id': 'upf-1', 'ip_address': '192.168.0.2', 'status': 'running',
+                            'resources': dict(RESOURCES['UPF'])}
+                }}},
+                'ip_pool': [f"192.168.0.{i}" for i in range(3, 255)]
+            }, f)
+        restored = NFVO()
+        restored.load_state(self.filename)
+        self.assertEqual(restored.list_network_slices(), ['legacy'])
+        self.assertEqual(restored.ip_allocator.available(), 252)
+        self.assertEqual(restored.get_slice_by_ip('192.168.0.2')['slice_id'], 'legacy')
+
+        # La sauvegarde suivante réécrit une base complète : un delta ne peut pas référencer l'ancien fichier
+        added = restored.instantiate_vnfs({c: dict(r) for c, r in RESOURCES.items()})['slice_id']
+        restored.save_state(self.filename, incremental=True)
+        self.assertEqual(glob.glob(self.filename + ".delta.*"), [])
+        reloaded = NFVO()
+        reloaded.load_state(self.filename)
+        self.assertEqual(sorted(reloaded.list_network_slices()), sorted(['legacy', added]))
+        self.assertEqual(reloaded.ip_allocator.available(), 250)
+
+    def test_unknown_formats_are_rejected(self):
+        with open(self.filename, 'w') as f:
+            json.dump({'network_slices': {}}, f)
+        with self.assertRaisesRegex(ValueError, "Unsupported NFVO state format"):
+            NFVO().load_state(self.filename)
+
+        self._deploy()
+        self.nfvo.save_state(self.filename, incremental=True)
+        self._deploy()
+        self.nfvo.save_state(self.filename, incremental=True)
+        delta_file = glob.glob(self.filename + ".delta.*")[0]
+        with open(delta_file) as f:
+            delta = json.load(f)
+        del delta['ip_changes']
+        with open(delta_file, 'w') as f:
+            json.dump(delta, f)
+        with self.assertRaisesRegex(ValueError, "Unsupported NFVO delta format"):
+            NFVO().load_state(self.filename)
+
+    def test_reverse_maps_follow_allocation(self):
+        slice_id = self._deploy()
+        batch = self.nfvo.instantiate_vnfs_batch([{c: dict(r) for c, r in RESOURCES.items()}])[0]
+        self.nfvo.update_network_slice(slice_id, {'SMF': {'cpu': 2, 'memory': 2048, 'storage': 8}})
+
+        for owner_slice in (slice_id, batch['slice_id']):
+            for component, instance in self.nfvo.network_slices[owner_slice]['vnf_instances'].items():
+                expected = {'slice_id': owner_slice, 'component': component}
+                self.assertEqual(self.nfvo.get_slice_by_ip(instance['ip_address']), expected)
+                self.assertEqual(self.nfvo.get_slice_by_instance(instance['instance_id']), expected)
+
+        smf = self.nfvo.network_slices[slice_id]['vnf_instances']['SMF']
+        self.nfvo.save_state(self.filename)
+        restored = NFVO()
+        restored.load_state(self.filename)
+        self.assertEqual(restored.get_slice_by_ip(smf['ip_address']), {'slice_id': slice_id, 'component': 'SMF'})
+
+        self.nfvo.delete_network_slice(slice_id)
+        with self.assertRaises(ValueError):
+            self.nfvo.get_slice_by_ip(smf['ip_address'])
+        with self.assertRaises(ValueError):
+            self.nfvo.get_slice_by_instance(smf['instance_id'])
+        self.assertEqual(len(self.nfvo.ip_owners), len(RESOURCES))
+
+if __name__ == '__main__':
+    unittest.main()
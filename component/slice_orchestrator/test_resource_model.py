@@ -0,0 +1,76 @@
+import random
+import unittest
+from unittest import mock
+from resource_model import ResourceModel, RESOURCE_KEYS, np
+from nssmf import CoreNSSMF
+
+def make_config(slice_type, cpu, memory, storage, throughput):
+    return {
+        'slice_type': slice_type,
+        'qos': {'throughput': {'value': throughput, 'unit': 'Mbps'}},
+        'resources': {
+            'cpu': {'value': cpu, 'unit': 'vCPUs'},
+            'memory': {'value': memory, 'unit': 'MB'},
+            'storage': {'value': storage, 'unit': 'GB'}
+        }
+    }
+
+class TestResourceModel(unittest.TestCase):
+    def setUp(self):
+        self.model = ResourceModel.from_file()
+
+    def test_component_sizing(self):
+        nssmf = CoreNSSMF()
+        resources = nssmf._calculate_resources(make_config('URLLC', 4, 4096, 20, 300))
+        self.assertEqual(resources['UPF'], {'cpu': 9, 'memory': 6825, 'storage': 22})
+        self.assertEqual(resources['NRF'], {'cpu': 9, 'memory': 6825, 'storage': 22})
+        with self.assertRaises(ValueError):
+            nssmf._calculate_resources(make_config('unknown', 4, 4096, 20, 300))
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def test_batch_matches_scalar_calculation(self):
+        rng = random.Random(42)
+        rows, types, configs = [], [], []
+        for _ in range(500):
+            slice_type = rng.choice(self.model.slice_types)
+            row = [rng.randint(1, 64), rng.randint(512, 65536), rng.randint(1, 500), rng.uniform(0, 5000)]
+            rows.append(row)
+            types.append(slice_type)
+            configs.append(make_config(slice_type, *row))
+
+        batch = self.model.calculate_batch(np.array(rows), types)
+        self.assertEqual(batch.shape, (500, len(self.model.components), len(RESOURCE_KEYS)))
+        for i, config in enumerate(configs):
+            expected = self.model.calculate(config['slice_type'], config['qos'], config['resources'])
+            for j, component in enumerate(self.model.components):
+                self.assertEqual([int(v) for v in batch[i, j]], [expected[component][k] for k in RESOURCE_KEYS])
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def test_batch_accepts_type_codes_and_rejects_unknown_types(self):
+        requests = np.array([[4, 4096, 20, 100], [1, 512, 1, 0]])
+        by_name = self.model.calculate_batch(requests, ['eMBB', 'mMTC'])
+        by_code = self.model.calculate_batch(requests, self.model.slice_type_codes(['eMBB', 'mMTC']))
+        self.assertTrue((by_name == by_code).all())
+        self.assertEqual(self.model.totals(by_name)['storage'], int(by_name[:, :, 2].sum()))
+        with self.assertRaises(ValueError):
+            self.model.calculate_batch(requests, ['eMBB', 'unknown'])
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def test_batch_creation_sizes_valid_configs_in_one_pass(self):
+        nssmf = CoreNSSMF()
+        configs = [make_config('URLLC', 4, 4096, 20, 300), make_config('eMBB', 8, 8192, 40, 1000),
+                   make_config('mMTC', 2, 2048, 10, 50)]
+        del configs[2]['resources']['storage']
+        with mock.patch.object(nssmf.resource_model, 'calculate_batch',
+                               wraps=nssmf.resource_model.calculate_batch) as calculate_batch:
+            results = nssmf.create_sub_slices(configs)
+        self.assertEqual(calculate_batch.call_count, 1)
+        self.assertEqual([r['status'] for r in results], ['success', 'success', 'failed'])
+        self.assertEqual(results[2]['error'], "Invalid or missing storage value")
+        for config, result in zip(configs, results):
+            if result['status'] == 'success':
+                self.assertEqual(nssmf.sub_slices[result['sub_slice_id']]['calculated_resources'],
+                                 nssmf._calculate_resources(config))
+
+if __name__ == '__main__':
+    unittest.main()
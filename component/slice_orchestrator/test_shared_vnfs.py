@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+import unittest
+from csmf import CSMF
+from inventory_store import InventoryStore
+from nsmf import NSMF
+from nssmf import CoreNSSMF
+from slice_orchestrator import SliceOrchestrator
+from test_slice_lifecycle import SLICE_REQUEST
+
+SHARED_REQUEST = dict(SLICE_REQUEST, isolationLevel={'value': 'logical'})
+
+class TestSharedVnfs(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.nssmf = CoreNSSMF()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_control_plane_is_shared_and_refcounted(self):
+        first = self.nssmf.create_sub_slice(SHARED_REQUEST)
+        dedicated = self.nssmf.create_sub_slice(dict(SLICE_REQUEST, isolationLevel={'value': 'physical'}))
+        results = self.nssmf.create_sub_slices([SHARED_REQUEST, SHARED_REQUEST])
+        self.assertEqual([r['status'] for r in results], ['success', 'success'])
+
+        details = self.nssmf.get_sub_slice_details(first)
+        self.assertEqual(sorted(details['vnf_instances']), ['SMF', 'UPF'])
+        self.assertEqual(sorted(details['shared_vnfs']), ['AMF', 'NRF'])
+        self.assertEqual(sorted(self.nssmf.get_sub_slice_details(dedicated)['vnf_instances']), ['AMF', 'NRF', 'SMF', 'UPF'])
+
+        amf = self.nssmf.nfvo.get_shared_vnfs()['AMF']
+        self.assertEqual(amf['refcount'], 3)
+        per_slice = details['calculated_resources']['AMF']['cpu']
+        self.assertLess(amf['resources']['cpu'], 3 * per_slice)
+
+        # Trois slices partagent deux instances : 3 x (SMF, UPF) + AMF + NRF, plus 4 VNFs dédiées
+        self.assertEqual(len(self.nssmf.nfvo.vnf_instances), 12)
+
+    def test_resize_and_release_shared_instances(self):
+        first = self.nssmf.create_sub_slice(SHARED_REQUEST)
+        second = self.nssmf.create_sub_slice(SHARED_REQUEST)
+        before = self.nssmf.nfvo.get_shared_vnfs()['AMF']['resources']['cpu']
+
+        bigger = dict(SHARED_REQUEST, resources=dict(SLICE_REQUEST['resources'], cpu={'value': 40, 'unit': 'vCPUs'}))
+        self.nssmf.update_sub_slice(first, bigger)
+        grown = self.nssmf.nfvo.get_shared_vnfs()['AMF']['resources']['cpu']
+        self.assertGreater(grown, before)
+
+        self.nssmf.terminate_sub_slice(first)
+        amf = self.nssmf.nfvo.get_shared_vnfs()['AMF']
+        self.assertEqual(amf['refcount'], 1)
+        self.assertLess(amf['resources']['cpu'], before)
+
+        self.nssmf.terminate_sub_slice(second)
+        self.assertEqual(self.nssmf.nfvo.get_shared_vnfs(), {})
+        self.assertEqual(self.nssmf.nfvo.ip_allocator.available('default'), 254)
+
+    def test_shared_instances_survive_restart(self):
+        store = InventoryStore(self.directory)
+        nssmf = CoreNSSMF(store=store)
+        sub_slice_id = nssmf.create_sub_slice(SHARED_REQUEST)
+        nssmf.create_sub_slice(SHARED_REQUEST)
+        shared = nssmf.nfvo.get_shared_vnfs()
+        store.close()
+
+        store = InventoryStore(self.directory)
+        restarted = CoreNSSMF(store=store)
+        self.assertEqual(restarted.nfvo.get_shared_vnfs(), shared)
+        self.assertEqual(restarted.nfvo.get_slice_by_ip(shared['AMF']['ip_address'])['component'], 'AMF')
+        restarted.terminate_sub_slice(sub_slice_id)
+        self.assertEqual(restarted.nfvo.get_shared_vnfs()['AMF']['refcount'], 1)
+        store.close()
+
+    def test_orchestrated_slices_share_control_plane(self):
+        # La demande passe par la traduction CSMF : le niveau d'isolation doit arriver jusqu'au NFVO
+        so = SliceOrchestrator()
+        nsmf = NSMF()
+        so.set_components(CSMF("config/network_slice_templates/gst_template2.json"), nsmf, self.nssmf)
+        try:
+            first, second = (so.create_slice(SHARED_REQUEST) for _ in range(2))
+        finally:
+            so.lifecycle.shutdown()
+
+        amf = self.nssmf.nfvo.get_shared_vnfs()['AMF']
+        self.assertEqual(amf['refcount'], 2)
+        for slice_id in (first, second):
+            details = self.nssmf.get_sub_slice_details(nsmf.get_slice_instance(slice_id)['sub_slices']['core'])
+            self.assertEqual(details['shared_vnfs']['AMF']['instance_id'], amf['instance_id'])
+            self.assertNotIn('AMF', details['vnf_instances'])
+
+if __name__ == '__main__':
+    unittest.main()
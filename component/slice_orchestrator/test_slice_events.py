@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import unittest
+from slice_events import BLOCK, DROP_NEWEST, DROP_OLDEST, EventBus, EventType
+from nsmf import NSMF
+from nssmf import CoreNSSMF
+from test_slice_lifecycle import SLICE_REQUEST
+
+class TestEventBus(unittest.TestCase):
+    def test_filters_and_sequence(self):
+        bus = EventBus()
+        self.assertIsNone(bus.publish(EventType.SLICE_CREATED, 'nsmf', 's0'))  # Sans abonné, rien n'est construit
+        everything = bus.subscribe()
+        deletions = bus.subscribe(types=['slice.deleted'])
+        one_slice = bus.subscribe(slice_id='s2')
+
+        bus.publish(EventType.SLICE_CREATED, 'nsmf', 's1', slice_type='eMBB')
+        bus.publish(EventType.SLICE_DELETED, 'nsmf', 's1')
+        bus.publish(EventType.SLICE_MODIFIED, 'nsmf', 's2', version=2)
+
+        self.assertEqual([e.sequence for e in everything.get_many()], [1, 2, 3])
+        self.assertEqual([(e.type, e.slice_id) for e in deletions.get_many()], [(EventType.SLICE_DELETED, 's1')])
+        event = one_slice.get(timeout=0)
+        self.assertEqual(event.to_dict()['type'], 'slice.modified')
+        self.assertEqual(event.data, {'version': 2})
+        with self.assertRaises(ValueError):
+            bus.subscribe(types=['slice.exploded'])
+
+    def test_concurrent_producers_deliver_in_sequence_order(self):
+        bus = EventBus()
+        subscription = bus.subscribe(maxsize=10000)
+
+        def produce(source):
+            for i in range(500):
+                bus.publish(EventType.SLICE_MODIFIED, source, f's{i}')
+
+        producers = [threading.Thread(target=produce, args=(f'p{n}',)) for n in range(4)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+        self.assertEqual([e.sequence for e in subscription.get_many(10000, timeout=0)], list(range(1, 2001)))
+        self.assertEqual(bus.published, 2000)
+
+    def test_overflow_policies(self):
+        bus = EventBus()
+        oldest = bus.subscribe(maxsize=2, policy=DROP_OLDEST)
+        newest = bus.subscribe(maxsize=2, policy=DROP_NEWEST)
+        for i in range(5):
+            bus.publish(EventType.SLICE_CREATED, 'nsmf', f's{i}')
+        self.assertEqual([e.slice_id for e in oldest.get_many()], ['s3', 's4'])
+        self.assertEqual([e.slice_id for e in newest.get_many()], ['s0', 's1'])
+        self.assertEqual((oldest.dropped, newest.dropped), (3, 3))
+
+    def test_block_policy_applies_backpressure(self):
+        bus = EventBus()
+        subscription = bus.subscribe(maxsize=1, policy=BLOCK, block_timeout=5)
+        bus.publish(EventType.SLICE_CREATED, 'nsmf', 's0')
+        producer = threading.Thread(target=bus.publish, args=(EventType.SLICE_CREATED, 'nsmf', 's1'))
+        producer.start()
+        producer.join(0.1)
+        self.assertTrue(producer.is_alive())  # File pleine : le producteur attend le lecteur
+        self.assertEqual(subscription.get().slice_id, 's0')
+        producer.join(1)
+        self.assertEqual(subscription.get(timeout=1).slice_id, 's1')
+        self.assertEqual(subscription.dropped, 0)
+
+        subscription.block_timeout = 0.01
+        bus.publish(EventType.SLICE_CREATED, 'nsmf', 's2')
+        bus.publish(EventType.SLICE_CREATED, 'nsmf', 's3')
+        self.assertEqual(subscription.dropped, 1)
+
+    def test_async_reader_and_close(self):
+        bus = EventBus()
+        subscription = bus.subscribe()
+
+        async def read():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, lambda: threading.Thread(
+                target=bus.publish, args=(EventType.VNF_ALLOCATED, 'nfvo', 's1')).start())
+            events = await subscription.get_many_async(timeout=2)
+            empty = await subscription.get_many_async(timeout=0.01)
+            return events, empty
+
+        events, empty = asyncio.run(read())
+        self.assertEqual([e.type for e in events], [EventType.VNF_ALLOCATED])
+        self.assertEqual(empty, [])
+
+        subscription.close()
+        self.assertFalse(bus.has_subscribers)
+        self.assertEqual(list(subscription), [])
+
+class TestComponentEvents(unittest.TestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.nsmf = NSMF(events=self.bus)
+        self.nssmf = CoreNSSMF(events=self.bus)
+        self.nsmf.register_nssmf('core', self.nssmf)
+        self.subscription = self.bus.subscribe()
+
+    def events(self):
+        return [(e.source, e.type.value) for e in self.subscription.get_many(1000, timeout=0)]
+
+    def test_slice_lifecycle_events(self):
+        slice_id = self.nsmf.create_slice_instance(dict(SLICE_REQUEST))
+        created = self.events()
+        self.assertEqual(created.count(('nfvo', 'vnf.allocated')), 4)
+        self.assertEqual(created[-1], ('nsmf', 'slice.created'))
+        self.assertNotIn(('nssmf', 'slice.created'), created)  # Une seule annonce par création
+
+        sub_slice_id = self.nsmf.get_slice_instance(slice_id)['sub_slices']['core']
+        self.nssmf.scale_sub_slice(sub_slice_id, 'up', 1)
+        self.assertEqual(self.events(), [('nssmf', 'slice.scaled')])
+        self.nsmf.update_slice_instance(slice_id, {'priority': 2})
+        self.assertEqual(self.events(), [('nsmf', 'slice.modified')])
+
+        self.nsmf.terminate_slice_instance(slice_id)
+        deleted = self.events()
+        self.assertEqual(deleted.count(('nfvo', 'vnf.released')), 4)
+        self.assertEqual(deleted[-1], ('nsmf', 'slice.deleted'))
+        self.assertNotIn(('nssmf', 'slice.deleted'), deleted)
+
+    def test_events_are_published_under_the_api_slice_id(self):
+        other = self.nsmf.create_slice_instance(dict(SLICE_REQUEST))
+        self.subscription.get_many(1000, timeout=0)
+        slice_id = self.nsmf.create_slice_instance(dict(SLICE_REQUEST, isolationLevel={'value': 'logical'}))
+        created = self.subscription.get_many(1000, timeout=0)
+        self.assertEqual({e.slice_id for e in created}, {slice_id})
+        self.assertEqual(sorted(e.data['component'] for e in created if e.type == EventType.VNF_ALLOCATED),
+                         ['AMF', 'NRF', 'SMF', 'UPF'])
+
+        subscription = self.bus.subscribe(slice_id=slice_id)
+        sub_slice_id = self.nsmf.get_slice_instance(slice_id)['sub_slices']['core']
+        nfvo_slice_id = self.nssmf.get_sub_slice_details(sub_slice_id)['nfvo_slice_id']
+
+        self.nssmf.scale_sub_slice(sub_slice_id, 'up', 1)
+        self.nsmf.terminate_slice_instance(other)
+        self.nsmf.terminate_slice_instance(slice_id)
+        events = subscription.get_many(1000, timeout=0)
+        self.assertEqual({e.slice_id for e in events}, {slice_id})
+
+        scaled = [e for e in events if e.type == EventType.SLICE_SCALED]
+        self.assertEqual([e.data['sub_slice_id'] for e in scaled], [sub_slice_id])
+        released = [e for e in events if e.type == EventType.VNF_RELEASED]
+        self.assertEqual(sorted(e.data['component'] for e in released), ['AMF', 'NRF', 'SMF', 'UPF'])
+        self.assertEqual({e.data['nfvo_slice_id'] for e in released if not e.data['shared']}, {nfvo_slice_id})
+        self.assertEqual(sum(e.data['shared'] for e in released), 2)  # Dernière slice rattachée : AMF et NRF partagés libérés
+        self.assertEqual(events[-1].type, EventType.SLICE_DELETED)
+
+    def test_batch_failures_are_published(self):
+        results = self.nsmf.create_slice_instances([dict(SLICE_REQUEST), {'qos': {}}])
+        self.assertEqual([r['status'] for r in results], ['success', 'failed'])
+        events = self.events()
+        self.assertIn(('nsmf', 'slice.failed'), events)
+        self.assertEqual(events.count(('nsmf', 'slice.created')), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from slice_index import SliceIndex
+from slice_orchestrator import SliceOrchestrator, SliceStatus
+from csmf import CSMF
+from nsmf import NSMF
+from nssmf import CoreNSSMF
+from test_slice_lifecycle import SLICE_REQUEST
+
+class TestSliceIndex(unittest.TestCase):
+    def test_query_intersects_and_paginates(self):
+        index = SliceIndex()
+        for i in range(10):
+            index.upsert(f"s{i}", {'slice_type': 'URLLC' if i % 2 else 'eMBB', 'status': 'active',
+                                   'slice_differentiator': '000080' if i < 4 else '000001'})
+        page = index.query(limit=2, slice_type='URLLC', status='active')
+        self.assertEqual(page, {'slice_ids': ['s1', 's3'], 'total': 5, 'next_offset': 2})
+        self.assertEqual(index.query(offset=4, limit=2, slice_type='URLLC')['next_offset'], None)
+        self.assertEqual(index.query(slice_type='URLLC', slice_differentiator='000080')['slice_ids'], ['s1', 's3'])
+
+        index.update_field('s1', 'status', 'error')
+        index.remove('s3')
+        self.assertEqual(index.query(status='error')['slice_ids'], ['s1'])
+        self.assertEqual(index.values('slice_type'), {'eMBB': 5, 'URLLC': 4})
+        self.assertEqual(index.query(offset=8)['slice_ids'], ['s9'])
+        with self.assertRaises(ValueError):
+            index.query(color='blue')
+
+    def test_change_feed(self):
+        index = SliceIndex(feed_size=4)
+        index.upsert('s1', {'slice_type': 'eMBB', 'status': 'creating'})
+        first = index.changes()
+        self.assertEqual([(slice_id, entry['status']) for slice_id, entry in first['changes']], [('s1', 'creating')])
+
+        index.update_field('s1', 'status', 'active')
+        index.upsert('s2', {'slice_type': 'URLLC', 'status': 'active'})
+        index.remove('s2')
+        feed = index.changes(first['cursor'])
+        self.assertFalse(feed['reset'])
+        self.assertEqual([(slice_id, entry and entry['status']) for slice_id, entry in feed['changes']],
+                         [('s1', 'active'), ('s2', None)])
+        self.assertEqual(index.changes(feed['cursor'])['changes'], [])
+
+        for i in range(5):
+            index.upsert(f"s{i + 3}", {'slice_type': 'mMTC'})
+        overflowed = index.changes(feed['cursor'])
+        self.assertTrue(overflowed['reset'])
+        self.assertEqual(len(overflowed['changes']), len(index))
+
+    def test_orchestrator_and_nsmf_indexes_follow_lifecycle(self):
+        so = SliceOrchestrator()
+        nsmf = NSMF()
+        so.set_components(CSMF("config/network_slice_templates/gst_template2.json"), nsmf, CoreNSSMF())
+        try:
+            urllc = so.create_slice(dict(SLICE_REQUEST, slice_type='URLLC', owner='tenant-a'))
+            embb = so.create_slice(dict(SLICE_REQUEST, owner='tenant-b'))
+
+            self.assertEqual(so.query_slices(slice_type='URLLC')['slice_ids'], [urllc])
+            self.assertEqual(nsmf.query_slice_instances(slice_type='eMBB', status='active')['slice_ids'], [embb])
+
+            so.update_slice_status(embb, SliceStatus.ERROR)
+            self.assertEqual(so.query_slices(status='ERROR')['slice_ids'], [embb])
+
+            so.delete_slice(urllc)
+            self.assertEqual(so.query_slices()['total'], 1)
+            self.assertEqual(nsmf.query_slice_instances(slice_type='URLLC')['total'], 0)
+        finally:
+            so.lifecycle.shutdown()
+
+    def test_partial_modification_keeps_indexes_consistent(self):
+        so = SliceOrchestrator()
+        nsmf = NSMF()
+        so.set_components(CSMF("config/network_slice_templates/gst_template2.json"), nsmf, CoreNSSMF())
+        try:
+            slice_id = so.create_slice(dict(SLICE_REQUEST))
+            so.modify_slice(slice_id, {'slice_differentiator': '000002'})
+
+            request = nsmf.get_slice_instance(slice_id)['request']
+            self.assertEqual(request['slice_type'], 'eMBB')
+            self.assertEqual(request['resources'], SLICE_REQUEST['resources'])
+            self.assertEqual(nsmf.query_slice_instances(slice_type='eMBB')['slice_ids'], [slice_id])
+            self.assertEqual(nsmf.query_slice_instances(slice_differentiator='000002')['slice_ids'], [slice_id])
+            self.assertEqual(so.query_slices(slice_type='eMBB')['slice_ids'], [slice_id])
+            self.assertEqual(so.slices[slice_id]['request']['slice_differentiator'], '000002')
+        finally:
+            so.lifecycle.shutdown()
+
+if __name__ == '__main__':
+    unittest.main()
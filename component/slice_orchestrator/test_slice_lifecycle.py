@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+from slice_orchestrator import SliceOrchestrator, SliceStatus
+from slice_lifecycle import JobStatus
+from csmf import CSMF
+from nsmf import NSMF
+from nssmf import CoreNSSMF
+
+SLICE_REQUEST = {
+    "slice_type": "eMBB",
+    "slice_differentiator": "000001",
+    "qos": {
+        "latency": {"value": 10, "unit": "ms"},
+        "throughput": {"value": 100, "unit": "Mbps"},
+        "reliability": {"value": 99.9, "unit": "%"}
+    },
+    "resources": {
+        "cpu": {"value": 4, "unit": "vCPUs"},
+        "memory": {"value": 4096, "unit": "MB"},
+        "storage": {"value": 20, "unit": "GB"},
+        "bandwidth": {"value": 100, "unit": "Mbps"}
+    }
+}
+
+class TestSliceLifecycle(unittest.TestCase):
+    def setUp(self):
+        self.so = SliceOrchestrator()
+        self.csmf = CSMF("config/network_slice_templates/gst_template2.json")
+        self.nsmf = NSMF()
+        self.so.set_components(self.csmf, self.nsmf, CoreNSSMF())
+
+    def tearDown(self):
+        self.so.lifecycle.shutdown()
+
+    def test_async_create_returns_job_handle(self):
+        jobs = [self.so.create_slice_async(SLICE_REQUEST) for _ in range(10)]
+        slice_ids = [job.result(timeout=5) for job in jobs]
+
+        self.assertEqual(len(set(slice_ids)), 10)
+        for job, slice_id in zip(jobs, slice_ids):
+            polled = self.so.get_job(job.job_id)
+            self.assertEqual(polled.status, JobStatus.SUCCEEDED)
+            self.assertEqual(polled.slice_id, slice_id)
+            self.assertEqual(self.so.get_slice_status(slice_id), SliceStatus.ACTIVE)
+
+    def test_job_can_be_awaited(self):
+        async def create():
+            return await self.so.create_slice_async(SLICE_REQUEST)
+
+        slice_id = asyncio.run(create())
+        self.assertIn(slice_id, self.nsmf.list_slice_instances())
+
+    def test_failed_stage_is_reported(self):
+        job = self.so.create_slice_async({"slice_type": "eMBB"})
+        with self.assertRaises(Exception):
+            job.result(timeout=5)
+        self.assertEqual(job.status, JobStatus.FAILED)
+        self.assertEqual(job.stage, 'instantiate')
+        self.assertIsNotNone(job.error)
+
+    def test_blocking_wrappers(self):
+        slice_id = self.so.create_slice(SLICE_REQUEST)
+        self.so.modify_slice(slice_id, {"qos": SLICE_REQUEST["qos"]})
+        self.assertEqual(self.so.get_slice_status(slice_id), SliceStatus.ACTIVE)
+
+        self.so.delete_slice(slice_id)
+        self.assertNotIn(slice_id, self.so.slices)
+        with self.assertRaises(ValueError):
+            self.nsmf.get_slice_instance(slice_id)
+
+    def test_rejected_modification_keeps_slice_active(self):
+        slice_id = self.so.create_slice(SLICE_REQUEST)
+        with self.assertRaises(ValueError):
+            self.so.modify_slice(slice_id, {"slice_type": "bogus"})
+        self.assertEqual(self.so.get_slice_status(slice_id), SliceStatus.ACTIVE)
+        self.assertEqual(self.so.query_slices(status='ACTIVE')['slice_ids'], [slice_id])
+        self.assertEqual(self.so.get_slice_version(slice_id), 1)
+
+    def test_blocking_wrappers_forget_their_jobs(self):
+        slice_id = self.so.create_slice(SLICE_REQUEST)
+        self.so.modify_slice(slice_id, {"qos": SLICE_REQUEST["qos"]})
+        self.so.create_slices([SLICE_REQUEST, dict(SLICE_REQUEST, slice_type="unknown")])
+        with self.assertRaises(Exception):
+            self.so.create_slice({"slice_type": "eMBB"})
+        self.so.delete_slice(slice_id)
+        self.assertEqual(len(self.so.lifecycle.jobs), 0)
+
+    def test_finished_async_jobs_are_evicted(self):
+        self.so.lifecycle.max_finished_jobs = 3
+        jobs = [self.so.create_slice_async(SLICE_REQUEST) for _ in range(5)]
+        for job in jobs:
+            job.result(timeout=5)
+        failed = self.so.create_slice_async({"slice_type": "eMBB"})
+        with self.assertRaises(Exception):
+            failed.result(timeout=5)
+
+        self.assertEqual(len(self.so.lifecycle.jobs), 3)
+        self.assertIs(self.so.get_job(failed.job_id), failed)
+        evicted = [job for job in jobs if job.job_id not in self.so.lifecycle.jobs]
+        self.assertEqual(len(evicted), 3)
+        with self.assertRaises(ValueError):
+            self.so.get_job(evicted[0].job_id)
+        self.so.lifecycle.forget_job(evicted[0].job_id)  # Déjà évincé : sans effet
+
+    def test_batch_admission_reports_per_item_results(self):
+        self.csmf.set_slice_orchestrator(self.so)
+        invalid = dict(SLICE_REQUEST, slice_type="unknown")
+        results = self.csmf.process_communication_service_requests([SLICE_REQUEST, invalid, SLICE_REQUEST])
+
+        self.assertEqual([r['status'] for r in results], ['success', 'failed', 'success'])
+        for result in (results[0], results[2]):
+            self.assertEqual(self.so.get_slice_status(result['slice_id']), SliceStatus.ACTIVE)
+            self.assertIn('core', self.nsmf.get_slice_instance(result['slice_id'])['sub_slices'])
+
+    def test_batch_admission_stops_at_ip_exhaustion(self):
+        nfvo = self.nsmf.nssmfs['core'].nfvo
+        nfvo.ip_allocator.allocate_many(nfvo.ip_allocator.available() - 6)
+        results = self.so.create_slices([SLICE_REQUEST] * 3)
+
+        self.assertEqual([r['status'] for r in results], ['success', 'failed', 'failed'])
+        self.assertEqual(results[1]['error'], "IP pool exhausted")
+        self.assertEqual(nfvo.ip_allocator.available(), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import logging
+import unittest
+from csmf2 import CSMF
+from slice_logging import LazyJson, configure, get_logger, parse_levels, shutdown, ROOT_LOGGER
+
+class CountingPayload:
+    # Compte les rendus : un payload jamais émis ne doit jamais être sérialisé
+    def __init__(self):
+        self.renders = 0
+
+    def __str__(self):
+        self.renders += 1
+        return "payload"
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record, self.format(record)))
+
+class TestSliceLogging(unittest.TestCase):
+    def setUp(self):
+        self.handler = ListHandler()
+
+    def tearDown(self):
+        shutdown()
+        root = logging.getLogger(ROOT_LOGGER)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.setLevel(logging.NOTSET)
+        root.propagate = True
+
+    def test_payload_not_rendered_below_level(self):
+        configure(level='INFO', handlers=[self.handler], use_queue=False)
+        payload = CountingPayload()
+        get_logger('nssmf').debug("Request: %s", payload)
+        self.assertEqual(payload.renders, 0)
+        self.assertEqual(self.handler.records, [])
+
+        get_logger('nssmf').info("Request: %s", payload)
+        self.assertEqual(payload.renders, 1)
+        self.assertEqual(self.handler.records[0][0].getMessage(), "Request: payload")
+
+    def test_lazy_json_renders_on_demand(self):
+        self.assertEqual(str(LazyJson({'slice_type': 'eMBB'})), '{"slice_type": "eMBB"}')
+        self.assertEqual(str(LazyJson({'a': 1}, indent=2)), json.dumps({'a': 1}, indent=2))
+
+    def test_per_component_levels(self):
+        configure(level='WARNING', levels={'nfvo': 'DEBUG'}, handlers=[self.handler], use_queue=False)
+        get_logger('nfvo').debug("nfvo detail")
+        get_logger('nsmf').info("nsmf info")
+        get_logger('nsmf').warning("nsmf warning")
+        self.assertEqual([record.getMessage() for record, _ in self.handler.records], ["nfvo detail", "nsmf warning"])
+
+    def test_queue_handler_renders_in_caller_thread(self):
+        configure(level='DEBUG', handlers=[self.handler], structured=True)
+        payload = CountingPayload()
+        request = {'slice_type': 'eMBB'}
+        get_logger('csmf').debug("Request: %s %s", payload, LazyJson(request))
+        request['slice_type'] = 'URLLC'  # Modifié après l'appel : le message garde l'état journalisé
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            get_logger('csmf').exception("Failed")
+        shutdown()  # Vide la file
+
+        self.assertEqual(payload.renders, 1)
+        (record, line), (failed, failed_line) = self.handler.records
+        self.assertEqual(json.loads(line)['message'], 'Request: payload {"slice_type": "eMBB"}')
+        self.assertIsNone(record.args)
+        self.assertIsNone(failed.exc_info)
+        self.assertIn("ValueError: boom", json.loads(failed_line)['exception'])
+
+    def test_structured_output(self):
+        configure(level='INFO', handlers=[self.handler], structured=True, use_queue=False)
+        get_logger('nsmf').info("Slice %s created", 'abc', extra={'slice_id': 'abc'})
+        entry = json.loads(self.handler.records[0][1])
+        self.assertEqual(entry['logger'], 'slice_orchestrator.nsmf')
+        self.assertEqual(entry['message'], "Slice abc created")
+        self.assertEqual(entry['slice_id'], 'abc')
+
+    def test_components_log_through_their_logger(self):
+        configure(level='DEBUG', handlers=[self.handler], use_queue=False)
+        csmf = CSMF("templates")
+        with self.assertRaises(ValueError):
+            csmf.process_communication_service_request({'slice_type': 'unknown'})
+        names = {record.name for record, _ in self.handler.records}
+        self.assertEqual(names, {'slice_orchestrator.csmf'})
+
+    def test_parse_levels(self):
+        self.assertEqual(parse_levels("info, nssmf=debug,nfvo=WARNING"),
+                         {'': 'INFO', 'nssmf': 'DEBUG', 'nfvo': 'WARNING'})
+        self.assertEqual(parse_levels(""), {})
+
+if __name__ == '__main__':
+    unittest.main()
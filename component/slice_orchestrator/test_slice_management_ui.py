@@ -0,0 +1,19 @@
+import unittest
+from slice_management_ui import SliceRows
+
+class TestSliceRows(unittest.TestCase):
+    def test_window_follows_incremental_changes(self):
+        rows = SliceRows()
+        self.assertTrue(rows.apply((f"s{i}", (f"s{i}", 'eMBB', 'active')) for i in range(1000)))
+        self.assertEqual([slice_id for slice_id, _ in rows.window(500, 3)], ['s500', 's501', 's502'])
+
+        self.assertFalse(rows.apply([('s500', ('s500', 'eMBB', 'active'))]))  # Valeurs inchangées
+        self.assertTrue(rows.apply([('s501', ('s501', 'eMBB', 'error')), ('s500', None), ('unknown', None)]))
+        self.assertEqual(rows.window(500, 2), [('s501', ('s501', 'eMBB', 'error')), ('s502', ('s502', 'eMBB', 'active'))])
+
+        rows.apply([('s1000', ('s1000', 'URLLC', 'active'))])
+        self.assertEqual(len(rows), 1000)
+        self.assertEqual(rows.window(998, 5)[-1][0], 's1000')
+
+if __name__ == '__main__':
+    unittest.main()
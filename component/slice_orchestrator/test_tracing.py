@@ -0,0 +1,88 @@
+import threading
+import unittest
+import urllib.request
+from nsmf import NSMF
+from nssmf import CoreNSSMF
+from tracing import instrument, render_prometheus, start_metrics_server, stats, tracer
+from test_slice_lifecycle import SLICE_REQUEST
+
+@instrument
+class Sample:
+    def work(self, fail=False):
+        if fail:
+            raise ValueError("boom")
+        return 42
+
+    def items(self):
+        yield 1
+
+    def _private(self):
+        return 0
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        tracer.reset()
+        tracer.enable()
+
+    def tearDown(self):
+        tracer.disable()
+        tracer.reset()
+
+    def test_public_methods_are_timed(self):
+        sample = Sample()
+        self.assertEqual(sample.work(), 42)
+        with self.assertRaises(ValueError):
+            sample.work(fail=True)
+        self.assertEqual(list(sample.items()), [1])
+        sample._private()
+
+        self.assertEqual(list(stats()), ['Sample.work'])
+        self.assertEqual(stats()['Sample.work']['count'], 2)
+        self.assertEqual(stats()['Sample.work']['errors'], 1)
+
+        tracer.disable()
+        sample.work()
+        self.assertEqual(stats()['Sample.work']['count'], 2)
+
+    def test_stages_of_a_slice_creation(self):
+        nsmf = NSMF()
+        nsmf.register_nssmf('core', CoreNSSMF())
+        nsmf.create_slice_instance(SLICE_REQUEST)
+        recorded = stats()
+        for name in ('NSMF.create_slice_instance', 'CoreNSSMF.create_sub_slice', 'CoreNSSMF.calculate_resources',
+                     'NFVO.instantiate_vnfs', 'NFVO.allocate_instances'):
+            self.assertEqual(recorded[name]['count'], 1, name)
+        outer, inner = recorded['NSMF.create_slice_instance'], recorded['NFVO.instantiate_vnfs']
+        self.assertGreaterEqual(outer['sum'], inner['sum'])
+
+    def test_prometheus_exposition(self):
+        Sample().work()
+        server, _ = start_metrics_server(port=0, address='127.0.0.1')
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(body, render_prometheus())
+        self.assertIn('# TYPE slice_orchestrator_span_duration_seconds histogram', body)
+        self.assertIn('slice_orchestrator_span_duration_seconds_bucket{span="Sample.work",le="+Inf"} 1', body)
+        self.assertIn('slice_orchestrator_span_duration_seconds_count{span="Sample.work"} 1', body)
+
+    def test_reads_while_new_spans_are_recorded(self):
+        def record():
+            for i in range(2000):
+                tracer.record(f'span-{i}', 1e-4)
+
+        writer = threading.Thread(target=record)
+        writer.start()
+        while writer.is_alive():
+            stats()
+            render_prometheus()
+        writer.join()
+        self.assertEqual(len(stats()), 2000)
+        self.assertEqual(sum(s['count'] for s in stats().values()), 2000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from nfvo import NFVO
+from vnf_metrics import (CgroupMetricsSource, FakeMetricsSource, MetricsCollector, MetricsStore, RingBuffer,
+                         container_name_resolver, np)
+
+RESOURCES = {
+    'AMF': {'cpu': 2, 'memory': 2048, 'storage': 10},
+    'UPF': {'cpu': 4, 'memory': 4096, 'storage': 20}
+}
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class TestVnfMetrics(unittest.TestCase):
+    def test_ring_buffer_window_aggregates(self):
+        buffer = RingBuffer(capacity=10)
+        for t in range(25):
+            buffer.append(float(t), {'cpu_usage': t, 'memory_usage': 100})
+        self.assertEqual(len(buffer), 10)
+        self.assertEqual(buffer.latest()['cpu_usage'], 24)
+
+        stats = buffer.aggregate()
+        self.assertEqual(stats['cpu_usage']['max'], 24)
+        self.assertAlmostEqual(stats['cpu_usage']['mean'], 19.5)
+        self.assertEqual(stats['memory_usage']['p95'], 100)
+
+        recent = buffer.aggregate(seconds=4, now=24.0)
+        self.assertEqual(recent['cpu_usage']['samples'], 5)
+        self.assertAlmostEqual(recent['cpu_usage']['mean'], 22)
+
+    def test_collector_feeds_nfvo_metrics(self):
+        nfvo = NFVO(metrics=MetricsStore(capacity=60))
+        slice_id = nfvo.instantiate_vnfs({c: dict(r) for c, r in RESOURCES.items()})['slice_id']
+        source = FakeMetricsSource(lambda instance_id, instance: {'cpu_usage': instance['resources']['cpu'] * 10})
+        clock = iter(range(100, 200))
+        collector = MetricsCollector(nfvo, source, clock=lambda: float(next(clock)))
+
+        for _ in range(3):
+            self.assertEqual(collector.collect_once(), 2)
+        upf_id = nfvo.network_slices[slice_id]['vnf_instances']['UPF']['instance_id']
+        source.set(upf_id, {'cpu_usage': 90})
+        collector.collect_once()
+
+        self.assertEqual(nfvo.get_vnf_metrics(slice_id, 'UPF')['cpu_usage'], 90)
+        stats = nfvo.get_vnf_metric_stats(slice_id, 'UPF')
+        self.assertEqual(stats['cpu_usage']['max'], 90)
+        self.assertAlmostEqual(stats['cpu_usage']['mean'], 52.5)
+
+        nfvo.delete_network_slice(slice_id)
+        self.assertEqual(len(nfvo.metrics), 0)
+
+    def test_background_collection(self):
+        nfvo = NFVO()
+        slice_id = nfvo.instantiate_vnfs({c: dict(r) for c, r in RESOURCES.items()})['slice_id']
+        collector = MetricsCollector(nfvo, FakeMetricsSource(lambda i, vnf: {'memory_usage': 512}), interval=0.01)
+        collector.start()
+        try:
+            deadline = time.time() + 2
+            while len(nfvo.metrics.series(slice_id, 'AMF') or ()) < 3 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            collector.stop()
+        self.assertFalse(collector.running)
+        self.assertEqual(nfvo.get_vnf_metrics(slice_id, 'AMF')['memory_usage'], 512)
+
+def write_cgroup(root, container_id, usage_usec, received, pid='42'):
+    # Arborescence cgroup v2 et /proc factices d'un conteneur Docker
+    scope = os.path.join(root, 'cgroup', 'system.slice', f'docker-{container_id}.scope')
+    os.makedirs(scope, exist_ok=True)
+    os.makedirs(os.path.join(root, 'proc', pid, 'net'), exist_ok=True)
+    with open(os.path.join(scope, 'cpu.stat'), 'w') as f:
+        f.write(f"usage_usec {usage_usec}\nuser_usec 0\n")
+    with open(os.path.join(scope, 'memory.current'), 'w') as f:
+        f.write(str(256 * 2**20))
+    with open(os.path.join(scope, 'cgroup.procs'), 'w') as f:
+        f.write(f"{pid}\n")
+    with open(os.path.join(root, 'proc', pid, 'net', 'dev'), 'w') as f:
+        f.write("header\nheader\n")
+        f.write(f"  eth0: {received} 0 0 0 0 0 0 0 2048 0 0 0 0 0 0 0\n")
+        f.write("    lo: 999 0 0 0 0 0 0 0 999 0 0 0 0 0 0 0\n")
+
+class TestCgroupMetricsSource(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def source(self, clock, **kwargs):
+        return CgroupMetricsSource(os.path.join(self.root, 'cgroup'), os.path.join(self.root, 'proc'),
+                                   clock=lambda: next(clock), **kwargs)
+
+    def test_reads_counters(self):
+        source = self.source(iter([0.0, 2.0]))
+        instances = {'vnf-1': {'container_id': 'abc'}, 'vnf-2': {}}
+        write_cgroup(self.root, 'abc', 1000000, 0)
+        self.assertEqual(source.sample(instances)['vnf-1']['cpu_usage'], 0)
+        write_cgroup(self.root, 'abc', 2000000, 4096)
+        sample = source.sample(instances)
+        self.assertEqual(list(sample), ['vnf-1'])
+        self.assertEqual(sample['vnf-1']['cpu_usage'], 50)
+        self.assertEqual(sample['vnf-1']['memory_usage'], 256)
+        self.assertEqual(sample['vnf-1']['network_in'], 2)
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def test_resolver_maps_nfvo_instances_to_containers(self):
+        # Les instances du NFVO ne portent pas de conteneur : le résolveur en fournit un
+        nfvo = NFVO()
+        slice_id = nfvo.instantiate_vnfs({c: dict(r) for c, r in RESOURCES.items()})['slice_id']
+        upf_id = nfvo.network_slices[slice_id]['vnf_instances']['UPF']['instance_id']
+        source = self.source(iter([0.0, 1.0]), resolver=lambda instance_id, instance: {upf_id: 'upf0'}.get(instance_id))
+        collector = MetricsCollector(nfvo, source)
+
+        write_cgroup(self.root, 'upf0', 0, 0, pid='7')
+        self.assertEqual(collector.collect_once(), 1)
+        write_cgroup(self.root, 'upf0', 250000, 0, pid='7')
+        collector.collect_once()
+        self.assertEqual(nfvo.get_vnf_metrics(slice_id, 'UPF')['cpu_usage'], 25)
+        self.assertIsNone(nfvo.metrics.latest(slice_id, 'AMF'))
+
+    def test_container_name_resolver(self):
+        resolve = container_name_resolver('vnf-{instance_id}')
+        self.assertEqual(resolve('i1', {}), 'vnf-i1')
+        self.assertEqual(resolve('i1', {'container_id': 'abc'}), 'abc')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from nfvo import NFVO
+from vnf_placement import PlacementEngine
+
+def vnf(cpu, memory=1024, storage=10):
+    return {'cpu': cpu, 'memory': memory, 'storage': storage}
+
+class TestVnfPlacement(unittest.TestCase):
+    def make_engine(self, strategy='best_fit'):
+        engine = PlacementEngine(strategy)
+        engine.add_host('host-a', cpu=8, memory=16384, storage=500)
+        engine.add_host('host-b', cpu=4, memory=16384, storage=500)
+        return engine
+
+    def test_first_fit_and_best_fit_decreasing(self):
+        first_fit = self.make_engine('first_fit')
+        self.assertEqual(first_fit.place('s1', {'amf': vnf(1), 'upf': vnf(3)}), {'upf': 'host-a', 'amf': 'host-a'})
+
+        best_fit = self.make_engine('best_fit')
+        self.assertEqual(best_fit.place('s1', {'amf': vnf(1), 'upf': vnf(3)}), {'upf': 'host-b', 'amf': 'host-b'})
+        self.assertEqual(best_fit.utilization()['host-b']['used']['cpu'], 4)
+
+    def test_urllc_anti_affinity_and_rollback(self):
+        engine = self.make_engine()
+        hosts = engine.place('s1', {'amf': vnf(1), 'smf': vnf(1)}, slice_type='URLLC')
+        self.assertNotEqual(hosts['amf'], hosts['smf'])
+
+        # Une troisième VNF anti-affine n'a plus d'hôte libre : rien ne doit rester placé
+        with self.assertRaises(ValueError):
+            engine.place('s2', {'amf': vnf(1), 'smf': vnf(1), 'upf': vnf(1)}, slice_type='URLLC')
+        self.assertEqual(sum(h['vnf_count'] for h in engine.utilization().values()), 2)
+
+    def test_replace_moves_only_when_host_is_full(self):
+        engine = self.make_engine()
+        engine.place('s1', {'upf': vnf(2)})
+        self.assertEqual(engine.get_host('s1', 'upf'), 'host-b')
+        self.assertEqual(engine.replace('s1', 'upf', vnf(4)), 'host-b')
+        self.assertEqual(engine.replace('s1', 'upf', vnf(6)), 'host-a')
+        with self.assertRaises(ValueError):
+            engine.replace('s1', 'upf', vnf(9))
+        self.assertEqual(engine.get_host('s1', 'upf'), 'host-a')
+
+        engine.release('s1')
+        self.assertEqual(engine.utilization()['host-a']['used']['cpu'], 0)
+
+    def test_nfvo_places_and_releases_vnfs(self):
+        engine = self.make_engine()
+        nfvo = NFVO(placement=engine)
+        response = nfvo.instantiate_vnfs({'amf': vnf(1), 'upf': vnf(2)})
+        slice_id = response['slice_id']
+        self.assertEqual(response['vnf_instances']['upf']['host'], 'host-b')
+
+        nfvo.scale_vnf_instance(slice_id, 'upf', 'up', 3)
+        self.assertEqual(nfvo.network_slices[slice_id]['vnf_instances']['upf']['host'], 'host-a')
+        with self.assertRaises(ValueError):
+            nfvo.instantiate_vnfs({'upf': vnf(16)})
+
+        results = nfvo.instantiate_vnfs_batch([{'amf': vnf(1)}, {'upf': vnf(16)}])
+        self.assertEqual([r['status'] for r in results], ['success', 'failed'])
+
+        nfvo.delete_network_slice(slice_id)
+        self.assertEqual(sum(h['vnf_count'] for h in engine.utilization().values()), 1)
+
+    def test_urllc_scaling_keeps_anti_affinity(self):
+        engine = PlacementEngine()
+        engine.add_host('roomy', cpu=16, memory=32768, storage=500)
+        engine.add_host('crowded', cpu=8, memory=32768, storage=500)
+        engine.add_host('small', cpu=4, memory=32768, storage=500)
+        nfvo = NFVO(placement=engine)
+        slice_id = nfvo.instantiate_vnfs({'amf': vnf(2), 'smf': vnf(2)}, slice_type='URLLC')['slice_id']
+        instances = nfvo.network_slices[slice_id]['vnf_instances']
+        self.assertEqual((instances['amf']['host'], instances['smf']['host']), ('small', 'crowded'))
+
+        # Sans anti-affinité, le best fit choisirait l'hôte qui porte déjà le SMF
+        nfvo.scale_vnf_instance(slice_id, 'amf', 'up', 3)
+        self.assertEqual(instances['amf']['host'], 'roomy')
+        with self.assertRaises(ValueError):
+            nfvo.update_network_slice(slice_id, {'smf': vnf(9)})
+        self.assertEqual(instances['smf']['host'], 'crowded')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+import functools
+import inspect
+import os
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # L'export OpenTelemetry est optionnel
+    otel_trace = None
+
+# Bornes des seaux de latence, en secondes (de 5 µs à 10 s)
+LATENCY_BUCKETS = (5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                   1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_PREFIX = 'slice_orchestrator_span'
+ENV_VARIABLE = 'SLICE_TRACING'  # "1" active les spans, "otel" ajoute l'export OpenTelemetry
+
+
+class Histogram:
+    """Histogramme de latences à seaux fixes, au format Prometheus."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Dernier seau : +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self._lock = Lock()
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+            if error:
+                self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        # Borne supérieure du seau contenant le quantile (estimation conservatrice)
+        with self._lock:
+            return self._quantile(q)
+
+    def state(self) -> Tuple[List[int], int, float, int]:
+        # Copie cohérente (seaux, nombre, somme, erreurs) pour l'exposition Prometheus
+        with self._lock:
+            return list(self.counts), self.count, self.sum, self.errors
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                'count': self.count,
+                'errors': self.errors,
+                'sum': self.sum,
+                'mean': self.sum / self.count if self.count else 0.0,
+                'p50': self._quantile(0.5),
+                'p99': self._quantile(0.99),
+                'max': self.max
+            }
+
+    def _quantile(self, q: float) -> float:
+        # À appeler avec le verrou tenu
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+
+class Tracer:
+    """Collecte des spans : un histogramme de latence par nom de span.
+
+    Désactivé, un span ne coûte qu'un test de booléen dans l'enveloppe de
+    la méthode. Avec `opentelemetry=True` (et le paquet installé), chaque
+    span est aussi émis vers le TracerProvider OpenTelemetry configuré.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms: Dict[str, Histogram] = {}
+        self._otel = None
+        self._lock = Lock()
+
+    def enable(self, opentelemetry: bool = False) -> None:
+        if opentelemetry:
+            if otel_trace is None:
+                raise RuntimeError("opentelemetry-api is not installed")
+            self._otel = otel_trace.get_tracer('slice_orchestrator')
+        else:
+            self._otel = None
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self._otel = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms = {}
+
+    def record(self, name: str, seconds: float, error: bool = False) -> None:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        histogram.observe(seconds, error)
+
+    def span(self, name: str) -> Any:
+        return _Span(self, name) if self.enabled else _NOOP_SPAN
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        # Vue en processus : nombre, erreurs, moyenne, p50/p99 estimés et maximum par span
+        return {name: histogram.snapshot() for name, histogram in self._items()}
+
+    def render_prometheus(self) -> str:
+        # Exposition au format texte Prometheus (version 0.0.4)
+        lines = [
+            f"# HELP {METRIC_PREFIX}_duration_seconds Latency of orchestration component calls.",
+            f"# TYPE {METRIC_PREFIX}_duration_seconds histogram"
+        ]
+        errors = [
+            f"# HELP {METRIC_PREFIX}_errors_total Orchestration component calls that raised.",
+            f"# TYPE {METRIC_PREFIX}_errors_total counter"
+        ]
+        for name, histogram in self._items():
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            counts, total, seconds, failures = histogram.state()
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{METRIC_PREFIX}_duration_seconds_bucket{{span="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'{METRIC_PREFIX}_duration_seconds_sum{{span="{label}"}} {seconds!r}')
+            lines.append(f'{METRIC_PREFIX}_duration_seconds_count{{span="{label}"}} {total}')
+            errors.append(f'{METRIC_PREFIX}_errors_total{{span="{label}"}} {failures}')
+        return "\n".join(lines + errors) + "\n"
+
+    def _items(self) -> List[Tuple[str, Histogram]]:
+        # Copie sous verrou : record() peut ajouter un span pendant l'itération
+        with self._lock:
+            return sorted(self.histograms.items())
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'start', 'otel')
+
+    def __init__(self, tracer: Tracer, name: str):
+        self.tracer = tracer
+        self.name = name
+        self.otel = None
+
+    def __enter__(self) -> '_Span':
+        if self.tracer._otel is not None:
+            self.otel = self.tracer._otel.start_as_current_span(self.name)
+            self.otel.__enter__()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        self.tracer.record(self.name, time.perf_counter() - self.start, exc_type is not None)
+        if self.otel is not None:
+            self.otel.__exit__(exc_type, exc, traceback)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+tracer = Tracer()
+if os.environ.get(ENV_VARIABLE, '').lower() in ('1', 'true', 'otel'):
+    tracer.enable(opentelemetry=os.environ[ENV_VARIABLE].lower() == 'otel')
+
+
+def span(name: str) -> Any:
+    """Span explicite autour d'une étape : `with span('NFVO.allocate_ips'): ...`"""
+    return _Span(tracer, name) if tracer.enabled else _NOOP_SPAN
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Décorateur : mesure chaque appel de la fonction sous le nom `name`."""
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with _Span(tracer, name):
+                return function(*args, **kwargs)
+        wrapper.__traced__ = name
+        return wrapper
+    return decorator
+
+
+def instrument(cls: type) -> type:
+    """Décorateur de classe : trace toutes les méthodes publiques sous `Classe.méthode`.
+
+    Les générateurs, méthodes statiques et de classe ne sont pas enveloppés.
+    """
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_') or not inspect.isfunction(value) or inspect.isgeneratorfunction(value):
+            continue
+        if hasattr(value, '__traced__'):
+            continue
+        setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    return tracer.stats()
+
+
+def render_prometheus() -> str:
+    return tracer.render_prometheus()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Pas de journalisation par scrape
+
+
+def start_metrics_server(port: int = 9464, address: str = '') -> Tuple[ThreadingHTTPServer, Thread]:
+    """Démarre un endpoint HTTP `/metrics` (texte Prometheus) dans un thread démon."""
+    server = ThreadingHTTPServer((address, port), _MetricsHandler)
+    thread = Thread(target=server.serve_forever, name="span-metrics-server", daemon=True)
+    thread.start()
+    return server, thread
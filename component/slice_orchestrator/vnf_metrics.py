@@ -0,0 +1,406 @@
+import http.client
+import json
+import os
+import socket
+import time
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from slice_logging import get_logger
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est requis pour les séries temporelles
+    np = None
+
+# Métriques collectées par VNF : CPU en % d'un cœur, mémoire en Mo, réseau en ko/s
+METRICS = ('cpu_usage', 'memory_usage', 'network_in', 'network_out')
+DEFAULT_CAPACITY = 720  # Une heure d'historique à l'intervalle par défaut
+DEFAULT_INTERVAL = 5.0  # Secondes entre deux collectes
+DEFAULT_CGROUP_ROOT = '/sys/fs/cgroup'
+DEFAULT_DOCKER_SOCKET = '/var/run/docker.sock'
+
+logger = get_logger('metrics')
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("NumPy is required for VNF metrics collection")
+
+
+class RingBuffer:
+    """Série temporelle de taille fixe pour une VNF, une colonne par métrique.
+
+    L'ajout écrase l'échantillon le plus ancien en O(1) ; les agrégats sur
+    une fenêtre sont calculés de façon vectorisée sur les lignes dont
+    l'horodatage tombe dans la fenêtre, sans réordonner le tampon.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, columns: Iterable[str] = METRICS):
+        _require_numpy()
+        if capacity < 1:
+            raise ValueError("capacity must be a positive integer")
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self.timestamps = np.full(capacity, np.nan)
+        self.values = np.zeros((capacity, len(self.columns)), dtype=np.float32)
+        self.count = 0
+        self._next = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, timestamp: float, sample: Dict[str, float]) -> None:
+        row = self._next
+        self.timestamps[row] = timestamp
+        self.values[row] = [sample.get(column, 0.0) for column in self.columns]
+        self._next = (row + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        if not self.count:
+            return None
+        row = self.values[(self._next - 1) % self.capacity]
+        return {column: float(value) for column, value in zip(self.columns, row)}
+
+    def window(self, seconds: Optional[float] = None, now: Optional[float] = None) -> 'np.ndarray':
+        # Échantillons des `seconds` dernières secondes (tous si None), dans un ordre quelconque
+        if seconds is None:
+            return self.values[:self.count] if self.count < self.capacity else self.values
+        now = time.time() if now is None else now
+        return self.values[self.timestamps >= now - seconds]  # NaN (lignes vides) est exclu
+
+    def aggregate(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        values = self.window(seconds, now)
+        if not len(values):
+            return {}
+        mean = values.mean(axis=0)
+        p95 = np.percentile(values, 95, axis=0)
+        maximum = values.max(axis=0)
+        return {
+            column: {'mean': float(mean[i]), 'p95': float(p95[i]), 'max': float(maximum[i]), 'samples': len(values)}
+            for i, column in enumerate(self.columns)
+        }
+
+
+class MetricsStore:
+    """Séries temporelles de toutes les VNFs, indexées par (slice, composant)."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, columns: Iterable[str] = METRICS):
+        _require_numpy()
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self._series: Dict[Tuple[str, str], RingBuffer] = {}
+        self._by_slice: Dict[str, Dict[str, None]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def record(self, slice_id: str, component: str, sample: Dict[str, float], timestamp: Optional[float] = None) -> None:
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._buffer(slice_id, component).append(timestamp, sample)
+
+    def record_many(self, samples: Dict[Tuple[str, str], Dict[str, float]], timestamp: Optional[float] = None) -> None:
+        # Enregistrement d'une collecte complète sous un seul verrou
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for (slice_id, component), sample in samples.items():
+                self._buffer(slice_id, component).append(timestamp, sample)
+
+    def series(self, slice_id: str, component: str) -> Optional[RingBuffer]:
+        return self._series.get((slice_id, component))
+
+    def latest(self, slice_id: str, component: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            buffer = self._series.get((slice_id, component))
+            return buffer.latest() if buffer else None
+
+    def aggregate(self, slice_id: str, component: str, window: Optional[float] = None,
+                  now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        # Moyenne, p95 et maximum de chaque métrique sur les `window` dernières secondes
+        with self._lock:
+            buffer = self._series.get((slice_id, component))
+            return buffer.aggregate(window, now) if buffer else {}
+
+    def remove(self, slice_id: str, component: Optional[str] = None) -> None:
+        with self._lock:
+            components = self._by_slice.get(slice_id, {})
+            for c in [component] if component else list(components):
+                self._series.pop((slice_id, c), None)
+                components.pop(c, None)
+            if not components:
+                self._by_slice.pop(slice_id, None)
+
+    def _buffer(self, slice_id: str, component: str) -> RingBuffer:
+        # À appeler avec le verrou tenu
+        key = (slice_id, component)
+        buffer = self._series.get(key)
+        if buffer is None:
+            buffer = self._series[key] = RingBuffer(self.capacity, self.columns)
+            self._by_slice.setdefault(slice_id, {})[component] = None
+        return buffer
+
+
+class _RateTracker:
+    # Conversion de compteurs cumulés (octets, µs CPU) en débits entre deux collectes
+    def __init__(self):
+        self._previous: Dict[Any, Tuple[float, float]] = {}
+
+    def rate(self, key: Any, value: float, now: float) -> float:
+        previous = self._previous.get(key)
+        self._previous[key] = (value, now)
+        if previous is None or now <= previous[1] or value < previous[0]:
+            return 0.0
+        return (value - previous[0]) / (now - previous[1])
+
+    def forget(self, keep: Iterable[Any]) -> None:
+        keep = set(keep)
+        for key in [k for k in self._previous if k[0] not in keep]:
+            del self._previous[key]
+
+
+def instance_container(instance_id: str, instance: Dict[str, Any]) -> Optional[str]:
+    # Résolveur par défaut : conteneur renseigné sur l'instance par le déploiement
+    return instance.get('container_id') or instance.get('container')
+
+
+def container_name_resolver(template: str = 'vnf-{instance_id}') -> Callable[[str, Dict[str, Any]], Optional[str]]:
+    # Conteneurs nommés d'après l'instance VNF (ex. `docker run --name vnf-<instance_id>`) ;
+    # un conteneur renseigné sur l'instance reste prioritaire
+    def resolve(instance_id: str, instance: Dict[str, Any]) -> Optional[str]:
+        return instance_container(instance_id, instance) or template.format(instance_id=instance_id)
+    return resolve
+
+
+class FakeMetricsSource:
+    """Source de métriques déterministe pour les tests et la simulation.
+
+    Les échantillons sont fixés par instance (`set`) ou produits par une
+    fonction `generator(instance_id, instance)`.
+    """
+
+    def __init__(self, generator: Optional[Callable[[str, Dict[str, Any]], Dict[str, float]]] = None):
+        self.generator = generator
+        self.values: Dict[str, Dict[str, float]] = {}
+
+    def set(self, instance_id: str, sample: Dict[str, float]) -> None:
+        self.values[instance_id] = sample
+
+    def sample(self, instances: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+        samples = {}
+        for instance_id, instance in instances.items():
+            if instance_id in self.values:
+                samples[instance_id] = self.values[instance_id]
+            elif self.generator is not None:
+                samples[instance_id] = self.generator(instance_id, instance)
+        return samples
+
+
+class CgroupMetricsSource:
+    """Lecture directe des fichiers cgroup v2 des conteneurs Docker.
+
+    Seules les instances dont `resolver(instance_id, instance)` donne un
+    conteneur sont échantillonnées (par défaut, celles portant un
+    `container_id`). Le CPU vient de `cpu.stat` (usage_usec), la mémoire de
+    `memory.current` et le réseau de `/proc/<pid>/net/dev` du premier
+    processus du conteneur.
+    """
+
+    def __init__(self, root: str = DEFAULT_CGROUP_ROOT, proc: str = '/proc',
+                 path_template: str = 'system.slice/docker-{container_id}.scope',
+                 clock: Callable[[], float] = time.monotonic,
+                 resolver: Callable[[str, Dict[str, Any]], Optional[str]] = instance_container):
+        self.root = root
+        self.proc = proc
+        self.path_template = path_template
+        self.clock = clock
+        self.resolver = resolver
+        self._rates = _RateTracker()
+
+    def sample(self, instances: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+        now = self.clock()
+        samples = {}
+        for instance_id, instance in instances.items():
+            container_id = self.resolver(instance_id, instance)
+            if not container_id:
+                continue
+            try:
+                samples[instance_id] = self._read(instance_id, container_id, now)
+            except (OSError, ValueError) as e:
+                logger.debug("Cannot read cgroup metrics of container %s: %s", container_id, e)
+        self._rates.forget(instances)
+        return samples
+
+    def _read(self, instance_id: str, container_id: str, now: float) -> Dict[str, float]:
+        directory = os.path.join(self.root, self.path_template.format(container_id=container_id))
+        with open(os.path.join(directory, 'cpu.stat')) as f:
+            usage_usec = next(int(line.split()[1]) for line in f if line.startswith('usage_usec'))
+        with open(os.path.join(directory, 'memory.current')) as f:
+            memory_bytes = int(f.read())
+
+        received = sent = 0
+        with open(os.path.join(directory, 'cgroup.procs')) as f:
+            pid = f.readline().strip()
+        if pid:
+            with open(os.path.join(self.proc, pid, 'net', 'dev')) as f:
+                for line in f.readlines()[2:]:
+                    interface, counters = line.split(':', 1)
+                    if interface.strip() == 'lo':
+                        continue
+                    fields = counters.split()
+                    received += int(fields[0])
+                    sent += int(fields[8])
+
+        return {
+            'cpu_usage': self._rates.rate((instance_id, 'cpu'), usage_usec, now) / 1e4,  # µs/s -> %
+            'memory_usage': memory_bytes / 2**20,
+            'network_in': self._rates.rate((instance_id, 'rx'), received, now) / 1024,
+            'network_out': self._rates.rate((instance_id, 'tx'), sent, now) / 1024
+        }
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DockerStatsSource:
+    """Échantillonnage via l'API Docker Engine sur le socket unix.
+
+    Une requête `stats?stream=false&one-shot=true` par conteneur sur une
+    connexion persistante ; les débits sont calculés entre deux collectes
+    plutôt que d'attendre le second échantillon du démon. Le conteneur d'une
+    instance est donné par `resolver` (ID ou nom, voir container_name_resolver).
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_DOCKER_SOCKET, timeout: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 resolver: Callable[[str, Dict[str, Any]], Optional[str]] = instance_container):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.clock = clock
+        self.resolver = resolver
+        self._connection: Optional[_UnixHTTPConnection] = None
+        self._rates = _RateTracker()
+
+    def sample(self, instances: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+        samples = {}
+        for instance_id, instance in instances.items():
+            container_id = self.resolver(instance_id, instance)
+            if not container_id:
+                continue
+            try:
+                stats = self._get(f"/containers/{container_id}/stats?stream=false&one-shot=true")
+            except (OSError, http.client.HTTPException, ValueError) as e:
+                logger.debug("Cannot read Docker stats of container %s: %s", container_id, e)
+                self.close()
+                continue
+            if stats is not None:
+                samples[instance_id] = self._parse(instance_id, stats, self.clock())
+        self._rates.forget(instances)
+        return samples
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _get(self, path: str) -> Optional[Dict[str, Any]]:
+        if self._connection is None:
+            self._connection = _UnixHTTPConnection(self.socket_path, self.timeout)
+        self._connection.request('GET', path)
+        response = self._connection.getresponse()
+        body = response.read()
+        if response.status == 404:  # Conteneur arrêté ou supprimé entre-temps
+            return None
+        if response.status != 200:
+            raise ValueError(f"Docker API returned {response.status} for {path}")
+        return json.loads(body)
+
+    def _parse(self, instance_id: str, stats: Dict[str, Any], now: float) -> Dict[str, float]:
+        cpu_stats = stats.get('cpu_stats', {})
+        total = cpu_stats.get('cpu_usage', {}).get('total_usage', 0)
+        system = cpu_stats.get('system_cpu_usage', 0)
+        online = cpu_stats.get('online_cpus') or len(cpu_stats.get('cpu_usage', {}).get('percpu_usage') or [1])
+        # Même formule que `docker stats`, entre deux collectes successives
+        container_delta = self._rates.rate((instance_id, 'cpu'), total, now)
+        system_delta = self._rates.rate((instance_id, 'system'), system, now)
+        cpu_usage = container_delta / system_delta * online * 100 if system_delta > 0 else 0.0
+
+        memory = stats.get('memory_stats', {})
+        memory_bytes = memory.get('usage', 0) - memory.get('stats', {}).get('inactive_file', 0)
+        networks = stats.get('networks', {}).values()
+        received = sum(n.get('rx_bytes', 0) for n in networks)
+        sent = sum(n.get('tx_bytes', 0) for n in networks)
+        return {
+            'cpu_usage': cpu_usage,
+            'memory_usage': max(0, memory_bytes) / 2**20,
+            'network_in': self._rates.rate((instance_id, 'rx'), received, now) / 1024,
+            'network_out': self._rates.rate((instance_id, 'tx'), sent, now) / 1024
+        }
+
+
+class MetricsCollector:
+    """Collecte périodique des métriques de toutes les VNFs d'un NFVO.
+
+    Un thread démon échantillonne la source à intervalle fixe et écrit une
+    ligne par VNF dans le `MetricsStore` du NFVO ; `collect_once` permet de
+    piloter la collecte manuellement (tests, simulation).
+    """
+
+    def __init__(self, nfvo: Any, source: Any, interval: float = DEFAULT_INTERVAL,
+                 clock: Callable[[], float] = time.time):
+        if nfvo.metrics is None:
+            nfvo.metrics = MetricsStore()
+        self.nfvo = nfvo
+        self.metrics: MetricsStore = nfvo.metrics
+        self.source = source
+        self.interval = interval
+        self.clock = clock
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def collect_once(self) -> int:
+        # Une collecte complète ; retourne le nombre de VNFs échantillonnées
+        targets = {instance['instance_id']: (slice_id, component, instance)
+                   for slice_id, component, instance in self.nfvo.iter_vnf_instances()}
+        samples = self.source.sample({instance_id: target[2] for instance_id, target in targets.items()})
+        self.metrics.record_many({targets[instance_id][:2]: sample
+                                  for instance_id, sample in samples.items() if instance_id in targets},
+                                 self.clock())
+        return len(samples)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name="vnf-metrics-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                self.collect_once()
+            except Exception as e:
+                logger.error("VNF metrics collection failed: %s", e)
+            # Intervalle fixe : la durée de la collecte est déduite de l'attente
+            if self._stop.wait(max(0.0, self.interval - (time.monotonic() - started))):
+                return
@@ -0,0 +1,208 @@
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+from slice_logging import get_logger
+
+RESOURCE_KEYS = ('cpu', 'memory', 'storage')
+STRATEGIES = ('first_fit', 'best_fit')
+# Types de slice dont les VNFs sont réparties sur des hôtes distincts par défaut
+ANTI_AFFINITY_SLICE_TYPES = ('URLLC',)
+
+logger = get_logger('placement')
+
+
+class ComputeHost:
+    def __init__(self, host_id: str, cpu: float, memory: float, storage: float):
+        self.host_id = host_id
+        self.capacity = {'cpu': cpu, 'memory': memory, 'storage': storage}
+        self.used = {key: 0 for key in RESOURCE_KEYS}
+        self.vnfs: Dict[Tuple[str, str], Dict[str, float]] = {}  # (slice_id, composant) -> ressources
+
+    def fits(self, resources: Dict[str, float]) -> bool:
+        capacity, used = self.capacity, self.used
+        return all(used[k] + resources.get(k, 0) <= capacity[k] for k in RESOURCE_KEYS)
+
+    def slack_after(self, resources: Dict[str, float]) -> float:
+        # Capacité restante normalisée après placement (plus petit = meilleur ajustement)
+        return sum((self.capacity[k] - self.used[k] - resources.get(k, 0)) / self.capacity[k]
+                   for k in RESOURCE_KEYS if self.capacity[k])
+
+    def add(self, key: Tuple[str, str], resources: Dict[str, float]) -> None:
+        for k in RESOURCE_KEYS:
+            self.used[k] += resources.get(k, 0)
+        self.vnfs[key] = {k: resources.get(k, 0) for k in RESOURCE_KEYS}
+
+    def remove(self, key: Tuple[str, str]) -> Dict[str, float]:
+        resources = self.vnfs.pop(key)
+        for k in RESOURCE_KEYS:
+            self.used[k] -= resources[k]
+        return resources
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'host_id': self.host_id, 'capacity': dict(self.capacity), 'used': dict(self.used),
+                'vnf_count': len(self.vnfs)}
+
+
+class PlacementEngine:
+    """Placement des VNFs d'une slice sur un pool d'hôtes de calcul.
+
+    Les composants sont triés par demande décroissante puis placés en
+    first-fit ou best-fit (first-fit-decreasing / best-fit-decreasing). Avec
+    l'anti-affinité, activée par défaut pour les slices URLLC, deux
+    composants d'une même slice ne partagent jamais un hôte. Le placement
+    d'une slice est tout-ou-rien.
+    """
+
+    def __init__(self, strategy: str = 'best_fit'):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown placement strategy: {strategy}")
+        self.strategy = strategy
+        self.hosts: Dict[str, ComputeHost] = {}
+        self.assignments: Dict[Tuple[str, str], str] = {}  # (slice_id, composant) -> host_id
+        self._slice_components: Dict[str, Dict[str, None]] = {}  # slice_id -> composants placés
+        self._lock = Lock()
+
+    def add_host(self, host_id: str, cpu: float, memory: float, storage: float) -> ComputeHost:
+        with self._lock:
+            if host_id in self.hosts:
+                raise ValueError(f"Host {host_id} already exists")
+            host = ComputeHost(host_id, cpu, memory, storage)
+            self.hosts[host_id] = host
+            return host
+
+    def remove_host(self, host_id: str) -> None:
+        with self._lock:
+            if host_id not in self.hosts:
+                raise ValueError(f"Host {host_id} not found")
+            if self.hosts[host_id].vnfs:
+                raise RuntimeError(f"Host {host_id} still runs {len(self.hosts[host_id].vnfs)} VNFs")
+            del self.hosts[host_id]
+
+    def place(self, slice_id: str, calculated_resources: Dict[str, Dict[str, float]],
+              slice_type: Optional[str] = None, anti_affinity: Optional[bool] = None) -> Dict[str, str]:
+        # Placement de tous les composants d'une slice ; retourne composant -> host_id
+        if anti_affinity is None:
+            anti_affinity = slice_type in ANTI_AFFINITY_SLICE_TYPES
+
+        with self._lock:
+            used_hosts = {self.assignments[(slice_id, c)] for c in self._components_of(slice_id)} if anti_affinity else set()
+            placed: Dict[str, str] = {}
+            for component, resources in sorted(calculated_resources.items(),
+                                               key=lambda item: self._demand(item[1]), reverse=True):
+                host = self._choose_host(resources, used_hosts if anti_affinity else ())
+                if host is None:
+                    for placed_component in placed:
+                        self._unassign(slice_id, placed_component)
+                    raise ValueError(f"No host can accommodate {component} of slice {slice_id}")
+                self._assign(slice_id, component, host, resources)
+                placed[component] = host.host_id
+                if anti_affinity:
+                    used_hosts.add(host.host_id)
+            return placed
+
+    def place_batch(self, requests: List[Tuple[str, Dict[str, Dict[str, float]], Optional[str]]]) -> List[Dict[str, Any]]:
+        # Placement d'une liste (slice_id, ressources, slice_type) ; un résultat par slice
+        results = []
+        for slice_id, calculated_resources, slice_type in requests:
+            try:
+                results.append({'status': 'success', 'hosts': self.place(slice_id, calculated_resources, slice_type)})
+            except ValueError as e:
+                results.append({'status': 'failed', 'error': str(e)})
+        return results
+
+    def replace(self, slice_id: str, component: str, resources: Dict[str, float],
+                slice_type: Optional[str] = None, anti_affinity: Optional[bool] = None) -> str:
+        # Re-placement incrémental après un scaling : le VNF reste sur son hôte
+        # s'il y tient encore, sinon il est déplacé ; retourne l'hôte final
+        if anti_affinity is None:
+            anti_affinity = slice_type in ANTI_AFFINITY_SLICE_TYPES
+
+        with self._lock:
+            key = (slice_id, component)
+            if key not in self.assignments:
+                raise ValueError(f"Component {component} of slice {slice_id} is not placed")
+            current = self.hosts[self.assignments[key]]
+            previous = current.remove(key)
+            if current.fits(resources):
+                current.add(key, resources)
+                return current.host_id
+
+            excluded = {self.assignments[(slice_id, c)] for c in self._components_of(slice_id) if c != component} \
+                if anti_affinity else set()
+            excluded.add(current.host_id)
+            host = self._choose_host(resources, excluded)
+            if host is None:
+                current.add(key, previous)
+                raise ValueError(f"No host can accommodate scaled {component} of slice {slice_id}")
+            host.add(key, resources)
+            self.assignments[key] = host.host_id
+            logger.info("Moved %s of slice %s from %s to %s", component, slice_id, current.host_id, host.host_id)
+            return host.host_id
+
+    def restore(self, slice_id: str, component: str, host_id: str, resources: Dict[str, float]) -> None:
+        # Réinscription d'un placement existant (rechargement d'état), sans contrôle de capacité
+        with self._lock:
+            if host_id not in self.hosts:
+                raise ValueError(f"Host {host_id} not found")
+            if (slice_id, component) in self.assignments:
+                self._unassign(slice_id, component)
+            self._assign(slice_id, component, self.hosts[host_id], resources)
+
+    def release(self, slice_id: str, component: Optional[str] = None) -> None:
+        # Libération d'un composant, ou de tous les composants de la slice
+        with self._lock:
+            components = [component] if component else list(self._components_of(slice_id))
+            for c in components:
+                if (slice_id, c) in self.assignments:
+                    self._unassign(slice_id, c)
+
+    def get_host(self, slice_id: str, component: str) -> str:
+        key = (slice_id, component)
+        if key not in self.assignments:
+            raise ValueError(f"Component {component} of slice {slice_id} is not placed")
+        return self.assignments[key]
+
+    def utilization(self) -> Dict[str, Dict[str, Any]]:
+        return {host_id: host.to_dict() for host_id, host in self.hosts.items()}
+
+    def _components_of(self, slice_id: str):
+        return self._slice_components.get(slice_id, {}).keys()
+
+    def _assign(self, slice_id: str, component: str, host: ComputeHost, resources: Dict[str, float]) -> None:
+        host.add((slice_id, component), resources)
+        self.assignments[(slice_id, component)] = host.host_id
+        self._slice_components.setdefault(slice_id, {})[component] = None
+
+    def _unassign(self, slice_id: str, component: str) -> None:
+        host_id = self.assignments.pop((slice_id, component))
+        self.hosts[host_id].remove((slice_id, component))
+        components = self._slice_components.get(slice_id, {})
+        components.pop(component, None)
+        if not components:
+            self._slice_components.pop(slice_id, None)
+
+    def _choose_host(self, resources: Dict[str, float], excluded) -> Optional[ComputeHost]:
+        if self.strategy == 'first_fit':
+            for host in self.hosts.values():
+                if host.host_id not in excluded and host.fits(resources):
+                    return host
+            return None
+
+        # Best-fit : plus petite capacité résiduelle normalisée ; boucle déroulée car c'est le chemin chaud
+        cpu, memory, storage = (resources.get(k, 0) for k in RESOURCE_KEYS)
+        best, best_slack = None, None
+        for host in self.hosts.values():
+            capacity, used = host.capacity, host.used
+            free_cpu = capacity['cpu'] - used['cpu'] - cpu
+            free_memory = capacity['memory'] - used['memory'] - memory
+            free_storage = capacity['storage'] - used['storage'] - storage
+            if free_cpu < 0 or free_memory < 0 or free_storage < 0 or host.host_id in excluded:
+                continue
+            slack = host.slack_after(resources) if not all(capacity.values()) else \
+                free_cpu / capacity['cpu'] + free_memory / capacity['memory'] + free_storage / capacity['storage']
+            if best is None or slack < best_slack:
+                best, best_slack = host, slack
+        return best
+
+    @staticmethod
+    def _demand(resources: Dict[str, float]) -> Tuple[float, ...]:
+        return tuple(resources.get(k, 0) for k in RESOURCE_KEYS)
@@ -28,6 +28,13 @@ import time
 import logging
 import argparse
 import sys
+import os
+import json
+import queue
+import hashlib
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(
     level=logging.DEBUG,
@@ -53,6 +60,356 @@ COMPOSE_CONF_MAP = {
     'docker-compose-basic-vpp-pcf-steering.yaml' : 'conf/redirection_steering_config.yaml'
 }
 
+# Deployments selectable with --type start-<name> / stop-<name>
+SCENARIOS = {
+    'mini': MINI_NO_NRF,
+    'basic': BASIC_W_NRF,
+    'basic-vpp': BASIC_VPP_W_NRF,
+    'basic-ebpf': BASIC_EBPF_W_NRF,
+    'vpp-redirection': BASIC_VPP_W_NRF_REDIRECT,
+    'vpp-steering': BASIC_VPP_W_NRF_STEERING,
+}
+
+# Parsed scenarios are memoized here, keyed by the hash of their source files
+SCENARIO_CACHE_DIR = os.environ.get('CN5G_SCENARIO_CACHE',
+                                    os.path.join(os.path.expanduser('~'), '.cache', 'oai-cn5g-fed'))
+# Bump when the model changes so that older cache entries are ignored
+SCENARIO_MODEL_VERSION = 1
+EXT_DN_SERVICE = 'oai-ext-dn'
+BRIDGE_NAME_OPTION = 'com.docker.network.bridge.name'
+# Log lines proving the N4 association and the PFCP heartbeats between SMF and UPF
+N4_ASSOCIATION = 'Received N4 ASSOCIATION SETUP RESPONSE from an UPF'
+SMF_PFCP_HEARTBEAT = 'PFCP HEARTBEAT PROCEDURE'
+SMF_NO_NRF_HEARTBEAT = 'handle_receive(16 bytes)'
+UPF_SX_HEARTBEATS = ['Received SX HEARTBEAT RESPONSE', 'Received SX HEARTBEAT REQUEST']
+
+class Scenario:
+    """Deployment model of a docker-compose file and of its NF configuration
+
+    Everything deploy, check_config and undeploy need is derived from the
+    two files: the services and their addresses (as the other NFs resolve
+    them, `extra_hosts` included), the NRF endpoint, the NFs expected to
+    register to it, the log checks matching the UPF datapath, and the
+    networks to capture on.
+    """
+
+    FIELDS = ('compose_file', 'config_file', 'services', 'containers', 'nf_types', 'addresses', 'nrf',
+              'http_version', 'registrations', 'log_checks', 'capture_interfaces', 'dn_addresses')
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            setattr(self, field, fields[field])
+
+    @property
+    def has_nrf(self):
+        return self.nrf is not None
+
+    @property
+    def scenario_id(self):
+        # --scenario value: "1" with NRF, "2" without
+        return '1' if self.has_nrf else '2'
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    @classmethod
+    def parse(cls, compose_file):
+        with open(compose_file) as f:
+            compose = yaml.safe_load(f)
+        services = compose['services']
+        networks = compose.get('networks') or {}
+        config_file = COMPOSE_CONF_MAP.get(compose_file)
+        if config_file is None or not os.path.exists(config_file):
+            config_file = _mounted_config(services)
+        config = {}
+        if config_file is not None:
+            with open(config_file) as f:
+                config = yaml.safe_load(f)
+
+        nf_types = {name: _nf_type(service.get('image', '')) for name, service in services.items()}
+        containers = {name: service.get('container_name', name) for name, service in services.items()}
+        # Host names given to the other containers win over the compose addresses:
+        # that is how the NFs reach a host-networked UPF or a VPP-UPF interface
+        aliases = {}
+        for service in services.values():
+            aliases.update(_extra_hosts(service))
+        addresses = {}
+        fqdns = {}
+        for name, service in services.items():
+            alias = next(((host, ip) for host, ip in aliases.items()
+                          if host == name or host.startswith(f'{name}.')), None)
+            if alias is not None:
+                fqdns[name], addresses[name] = alias
+            else:
+                ips = _service_addresses(service)
+                if ips:
+                    addresses[name] = ips[0]
+
+        nrf = None
+        nrf_service = _service_of_type(nf_types, 'NRF')
+        if nrf_service is not None:
+            nrf_port = ((config.get('nfs') or {}).get('nrf') or {}).get('sbi', {}).get('port', 80)
+            nrf = {'address': addresses[nrf_service], 'port': nrf_port}
+        registrations = {}
+        if nrf is not None:
+            for name, nf_type in nf_types.items():
+                if nf_type not in (None, 'NRF') and _registers_to_nrf(services[name], config):
+                    registrations[nf_type] = addresses[name]
+
+        capture_interfaces = [network['driver_opts'][BRIDGE_NAME_OPTION] for network in networks.values()
+                              if BRIDGE_NAME_OPTION in (network.get('driver_opts') or {})]
+        dn_addresses = _service_addresses(services.get(EXT_DN_SERVICE, {}))
+
+        return cls(compose_file=compose_file, config_file=config_file, services=list(services),
+                   containers=containers, nf_types=nf_types, addresses=addresses, nrf=nrf,
+                   http_version=config.get('http_version', 1), registrations=registrations,
+                   log_checks=_log_checks(services, config, nf_types, containers, addresses, fqdns, nrf),
+                   capture_interfaces=capture_interfaces, dn_addresses=dn_addresses)
+
+def _nf_type(image):
+    # oaisoftwarealliance/oai-upf-vpp:v2.0.1 -> UPF ; mysql:8.0 -> None
+    match = re.match(r'oai-([a-z]+)', image.rsplit('/', 1)[-1])
+    return match.group(1).upper() if match else None
+
+def _service_of_type(nf_types, nf_type):
+    return next((name for name, t in nf_types.items() if t == nf_type), None)
+
+def _extra_hosts(service):
+    entries = service.get('extra_hosts') or []
+    if isinstance(entries, dict):
+        return dict(entries)
+    return dict(entry.rsplit(':', 1) for entry in entries)
+
+def _service_addresses(service):
+    networks = service.get('networks') or {}
+    if not isinstance(networks, dict):
+        return []
+    return [network['ipv4_address'] for network in networks.values() if network and network.get('ipv4_address')]
+
+def _environment(service):
+    environment = service.get('environment') or {}
+    if isinstance(environment, dict):
+        return {key: str(value) for key, value in environment.items()}
+    return dict(entry.split('=', 1) for entry in environment if '=' in entry)
+
+def _config_volume(service):
+    # Source of the NF configuration file mounted in the container, if any
+    for volume in service.get('volumes') or []:
+        source, _, target = str(volume).partition(':')
+        if target.split(':')[0].endswith('/etc/config.yaml'):
+            return os.path.normpath(source)
+    return None
+
+def _mounted_config(services):
+    # Configuration file shared by the NFs, for compose files missing from COMPOSE_CONF_MAP
+    return next((source for source in map(_config_volume, services.values()) if source), None)
+
+def _registers_to_nrf(service, config):
+    # NFs configured by environment (VPP-UPF) or by the shared configuration file
+    environment = _environment(service)
+    if 'REGISTER_NRF' in environment:
+        return environment['REGISTER_NRF'].lower() in ('yes', 'true', '1')
+    return _config_volume(service) is not None and bool((config.get('register_nf') or {}).get('general'))
+
+def _log_checks(services, config, nf_types, containers, addresses, fqdns, nrf):
+    """Log checks of the SMF/UPF association, as (container, patterns, require_all, success, error)"""
+    smf = _service_of_type(nf_types, 'SMF')
+    upf = _service_of_type(nf_types, 'UPF')
+    if smf is None or upf is None:
+        return []
+    n4_ok = 'UPF did answer to N4 Association request from SMF'
+    n4_ko = 'UPF did not answer to N4 Association request from SMF'
+    if upf in fqdns and '.' in fqdns[upf]:
+        upf_node = f'Node ID Type FQDN: {upf}'
+    else:
+        upf_node = f'Resolve IP Addr {addresses.get(upf)}, FQDN {upf}'
+    if nrf is None:
+        return [[containers[smf], [N4_ASSOCIATION, upf_node], True, n4_ok, n4_ko],
+                [containers[smf], [SMF_NO_NRF_HEARTBEAT], True,
+                 'UPF is receiving heartbeats from SMF', 'UPF is NOT receiving heartbeats from SMF']]
+    upf_features = (config.get('upf') or {}).get('support_features') or {}
+    if 'vpp' not in services[upf].get('image', '') and upf_features.get('enable_bpf_datapath'):
+        # The eBPF datapath UPF reports the heartbeats on its side
+        return [[containers[upf], UPF_SX_HEARTBEATS, False,
+                 'UPF is receiving heartbeats from SMF', 'UPF is NOT receiving heartbeats from SMF']]
+    return [[containers[smf], [N4_ASSOCIATION, upf_node], True, n4_ok, n4_ko],
+            [containers[smf], [SMF_PFCP_HEARTBEAT], True,
+             'SMF is receiving heartbeats from UPF', 'SMF is NOT receiving heartbeats from UPF']]
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_scenario(compose_file):
+    """Returns the Scenario of a docker-compose file
+
+    The parsed model is memoized in SCENARIO_CACHE_DIR and reused as long as
+    the compose and configuration files keep the same content.
+
+    Returns:
+        Scenario: the deployment model
+    """
+    location = hashlib.sha1(os.path.abspath(compose_file).encode()).hexdigest()[:12]
+    cache_file = os.path.join(SCENARIO_CACHE_DIR, f'{location}-{os.path.basename(compose_file)}.json')
+    try:
+        with open(cache_file) as f:
+            entry = json.load(f)
+        if entry['version'] == SCENARIO_MODEL_VERSION and \
+           all(_file_hash(path) == digest for path, digest in entry['sources'].items()):
+            return Scenario.from_dict(entry['model'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    scenario = Scenario.parse(compose_file)
+    sources = [path for path in (compose_file, scenario.config_file) if path is not None]
+    entry = {'version': SCENARIO_MODEL_VERSION, 'sources': {path: _file_hash(path) for path in sources},
+             'model': scenario.to_dict()}
+    try:
+        os.makedirs(SCENARIO_CACHE_DIR, exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logging.debug(f'Cannot cache the scenario of {compose_file}: {e}')
+    return scenario
+
+# Health wait budget, the same as the former 50 x 2 s polling loop
+HEALTH_TIMEOUT = 100
+# The NFs register to the NRF and associate over N4 shortly after being healthy
+CONFIG_CHECK_TIMEOUT = 30
+CONFIG_CHECK_INTERVAL = 2
+# Container states ending the health wait with a failure
+FAILED_STATES = ('unhealthy', 'exited', 'dead')
+
+class HealthWaiter:
+    """Tracks the health of the services of a docker-compose file
+
+    The `docker events` stream is opened before `docker-compose up` so that no
+    transition is missed, then a single `docker inspect` gives the state of the
+    containers at the time the wait starts. Every later start, die and
+    health_status event updates the state of its service; the wait returns as
+    soon as all services are healthy or one of them has failed. Services
+    without a health check are ready once running.
+
+    If the event stream cannot be followed, the engine is polled with
+    `docker inspect` instead.
+    """
+
+    def __init__(self, file_name, services, poll_interval=1):
+        self.file_name = file_name
+        self.services = set(services)
+        self.poll_interval = poll_interval
+        self.states = {}
+        self.has_healthcheck = {}
+        self.events = queue.Queue()
+        self.process = None
+        self.seeded_at = 0
+
+    def start(self):
+        cmd = ['docker', 'events', '--format', '{{json .}}', '--filter', 'type=container',
+               '--filter', 'event=start', '--filter', 'event=die', '--filter', 'event=health_status']
+        try:
+            self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                            universal_newlines=True)
+        except OSError as e:
+            logging.warning(f'Cannot follow docker events ({e}), polling the containers instead')
+            return
+        threading.Thread(target=self._read_events, daemon=True).start()
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+
+    def wait(self, timeout):
+        """Returns True once all services are healthy, False on a failure or after `timeout` seconds"""
+        deadline = time.monotonic() + timeout
+        self.seeded_at = time.time_ns()
+        self._inspect()
+        following = self.process is not None
+        while True:
+            if self.failed():
+                return False
+            if self.healthy():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if not following:
+                time.sleep(min(self.poll_interval, remaining))
+                self._inspect()
+                continue
+            try:
+                event = self.events.get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if event is None:
+                logging.warning('docker events stream closed, polling the containers instead')
+                following = False
+                continue
+            self._apply_event(event)
+
+    def healthy(self):
+        return all(self.states.get(service) == 'healthy' for service in self.services)
+
+    def failed(self):
+        return [service for service, state in self.states.items() if state in FAILED_STATES]
+
+    def pending(self):
+        return sorted(service for service in self.services if self.states.get(service) != 'healthy')
+
+    def _read_events(self):
+        for line in self.process.stdout:
+            try:
+                self.events.put(json.loads(line))
+            except ValueError:
+                pass
+        self.events.put(None)
+
+    def _inspect(self):
+        ids = run_cmd(f'docker-compose -f {self.file_name} ps -q')
+        if not ids:
+            return
+        res = run_cmd(f'docker inspect {" ".join(ids.split())}')
+        if res is None:
+            return
+        for container in json.loads(res):
+            service = container['Config']['Labels'].get('com.docker.compose.service')
+            if service not in self.services:
+                continue
+            state = container['State']
+            self.has_healthcheck[service] = 'Health' in state
+            if 'Health' in state:
+                self.states[service] = state['Health']['Status']
+            elif state.get('Running'):
+                self.states[service] = 'healthy'
+            else:
+                self.states[service] = state['Status']
+
+    def _apply_event(self, event):
+        # Events older than the inspection are already reflected by it
+        if event.get('timeNano', 0) < self.seeded_at:
+            return
+        attributes = event.get('Actor', {}).get('Attributes', {})
+        service = attributes.get('com.docker.compose.service')
+        if service not in self.services:
+            return
+        config_files = attributes.get('com.docker.compose.project.config_files')
+        if config_files and os.path.basename(self.file_name) not in map(os.path.basename, config_files.split(',')):
+            return
+        action = event.get('Action', event.get('status', ''))
+        if action == 'start':
+            self.states[service] = 'starting' if self.has_healthcheck.get(service, True) else 'healthy'
+        elif action == 'die':
+            self.states[service] = 'exited'
+        elif action.startswith('health_status'):
+            self.states[service] = action.split(':', 1)[1].strip()
+
 def _parse_args() -> argparse.Namespace:
     """Parse the command line args
 
@@ -79,8 +436,7 @@ def _parse_args() -> argparse.Namespace:
         '--type', '-t',
         action='store',
         required=True,
-        choices=['start-mini', 'start-basic', 'start-basic-vpp', 'start-basic-ebpf','start-vpp-redirection', 'start-vpp-steering',\
-                 'stop-vpp-redirection', 'stop-vpp-steering','stop-mini', 'stop-basic', 'stop-basic-vpp', 'stop-basic-ebpf'],
+        choices=[f'{action}-{name}' for action in ('start', 'stop') for name in SCENARIOS],
         help='Functional type of 5g core network',
     )
     # Deployment scenario with NRF/ without NRF
@@ -99,7 +455,7 @@ def _parse_args() -> argparse.Namespace:
     )
     return parser.parse_args()
 
-def deploy(file_name, extra_interface=False):
+def deploy(scenario):
     """Deploy the containers using the docker-compose template
 
     Returns:
@@ -108,45 +464,65 @@ def deploy(file_name, extra_interface=False):
     logging.debug('\033[0;34m Starting 5gcn components... Please wait\033[0m....')
     # The assumption is that all services described in docker-compose files
     # have explicit or built-in health checks.
-    cmd = f'docker-compose -f {file_name} config --services | wc -l'
-    res = run_cmd(cmd, True)
-    ct = int(res)
+    waiter = HealthWaiter(scenario.compose_file, scenario.services)
+    # Follow the container events before anything is started
+    waiter.start()
+    try:
+        _deploy_and_wait(scenario, waiter)
+    finally:
+        waiter.stop()
+    deadline = time.monotonic() + CONFIG_CHECK_TIMEOUT
+    status = check_config(scenario)
+    while not status and time.monotonic() < deadline:
+        logging.debug(f'\033[0;34m Core network not configured yet, re-checking in {CONFIG_CHECK_INTERVAL} secs\033[0m....')
+        time.sleep(CONFIG_CHECK_INTERVAL)
+        status = check_config(scenario)
+    if not status:
+        sys.exit(-1)
 
+def _capture_cmd(scenario, capture_file):
+    # Explanation of the capture filter:
+    #  - On all containers but oai-ext-dn
+    #   * `not arp`                 --> NO ARP packets
+    #   * `not port 53`             --> NO DNS requests from any container
+    #   * `not port 2152`           --> When running w/ OAI RF simulator, remove all GTP packets
+    #  - On oai-ext-dn container
+    #   * `icmp`                    --> Only ping packets
+    interfaces = ' '.join(f'-i {interface}' for interface in scenario.capture_interfaces)
+    not_dn = ''.join(f'not host {address} and ' for address in scenario.dn_addresses)
+    dn = ' or '.join(f'host {address}' for address in scenario.dn_addresses)
+    capture_filter = f'({not_dn}not arp and not port 53 and not port 2152)'
+    if dn:
+        capture_filter += f' or (({dn}) and icmp)'
+    return f'nohup sudo tshark {interfaces} -f "{capture_filter}" -w {capture_file} > /dev/null 2>&1 &'
+
+def _deploy_and_wait(scenario, waiter):
+    """Start the containers (and the optional capture), then wait for them to be healthy
+
+    Returns:
+        None
+    """
     if args.capture is None:
         # When no capture, just deploy all at once.
-        cmd = f'docker-compose -f {file_name} up -d'
+        cmd = f'docker-compose -f {scenario.compose_file} up -d'
         res = run_cmd(cmd, False)
     else:
         # First just deploy mysql container, all docker networks will be up.
-        cmd = f'docker-compose -f {file_name} up -d mysql'
+        cmd = f'docker-compose -f {scenario.compose_file} up -d mysql'
         res = run_cmd(cmd, False)
         if res is None:
             sys.exit(f'\033[0;31m Incorrect/Unsupported executing command {cmd}')
         print(res)
-        # Then we can start the capture on the "demo-oai" interface.
+        # Then we can start the capture on the bridges of all the docker networks.
         # When we undeploy, the process will terminate automatically.
-        # Explanation of the capture filter:
-        #  - On all containers but oai-ext-dn
-        #   * `not arp`                 --> NO ARP packets
-        #   * `not port 53`             --> NO DNS requests from any container
-        #   * `not port 2152`           --> When running w/ OAI RF simulator, remove all GTP packets
-        #  - On oai-ext-dn container
-        #   * `icmp`                    --> Only ping packets
-        cmd = f'nohup sudo tshark -i demo-oai -f "(not host 192.168.70.135 and not arp and not port 53 and not port 2152) or (host 192.168.70.135 and icmp)" -w {args.capture} > /dev/null 2>&1 &'
-        if extra_interface:
-            if file_name == BASIC_VPP_W_NRF:
-                cmd = re.sub('-i demo-oai', '-i demo-oai -i cn5g-core', cmd)
-                cmd = re.sub('70', '73', cmd)
-            if file_name == BASIC_EBPF_W_NRF:
-                cmd = re.sub('-i demo-oai', '-i demo-oai -i demo-n3 -i demo-n6', cmd)
-                cmd = re.sub('70', '72', cmd)
+        cmd = _capture_cmd(scenario, args.capture)
         res = run_cmd(cmd, False)
         if res is None:
             sys.exit(f'\033[0;31m Incorrect/Unsupported executing command {cmd}')
         cmd = f'sleep 20; sudo chmod 666 {args.capture}'
         run_cmd(cmd)
         # Finally deploy the rest of the network functions.
-        cmd = f'docker-compose -f {file_name} up -d'
+        cmd = f'docker-compose -f {scenario.compose_file} up -d'
         res = run_cmd(cmd, False)
     # sometimes first try does not go through
     if args.capture is not None:
@@ -156,36 +532,26 @@ def deploy(file_name, extra_interface=False):
         sys.exit(f'\033[0;31m Incorrect/Unsupported executing command {cmd}')
     print(res)
     logging.debug('\033[0;32m OAI 5G Core network started, checking the health status of the containers... takes few secs\033[0m....')
-    notSilentForFirstTime = False
-    for x in range(50):
-        cmd = f'docker-compose -f {file_name} ps -a'
-        res = run_cmd(cmd, notSilentForFirstTime)
-        notSilentForFirstTime = True
-        if res is None:
-            sys.exit(f'\033[0;31m Incorrect/Unsupported executing command "{cmd}"')
-        time.sleep(2)
-        cnt = res.count('(healthy)')
-        if cnt == ct:
-            logging.debug('\033[0;32m All components are healthy, please see below for more details\033[0m....')
-            print(res)
-            break
-    if cnt != ct:
-        logging.error('\033[0;31m Core network is un-healthy, please see below for more details\033[0m....')
+    healthy = waiter.wait(HEALTH_TIMEOUT)
+    cmd = f'docker-compose -f {scenario.compose_file} ps -a'
+    res = run_cmd(cmd, False)
+    if healthy:
+        logging.debug('\033[0;32m All components are healthy, please see below for more details\033[0m....')
+        print(res)
+    else:
+        failed = waiter.failed() or waiter.pending()
+        logging.error(f'\033[0;31m Core network is un-healthy ({", ".join(failed)}), please see below for more details\033[0m....')
         print(res)
-        sys.exit(-1)
-    time.sleep(10)
-    status = check_config(file_name)
-    if not status:
         sys.exit(-1)
 
-def undeploy(file_name):
+def undeploy(scenario):
     """UnDeploy the docker container
 
     Returns:
         None
     """
     logging.debug('\033[0;34m UnDeploying OAI 5G core components\033[0m....')
-    cmd = f'docker-compose -f {file_name} down -t 0'
+    cmd = f'docker-compose -f {scenario.compose_file} down -t 0'
     res = run_cmd(cmd, False)
     if res is None:
         sys.exit(f'\033[0;31m Incorrect/Unsupported executing command {cmd}')
@@ -194,156 +560,147 @@ def undeploy(file_name):
     run_cmd(cmd, True)
     logging.debug('\033[0;32m OAI 5G core components are UnDeployed\033[0m....')
 
-def generate_nrf_curl_cmd(compose_file):
-    # if not found, there is an exception here, but it is fine because then we have to update our scenarios
-    conf_file = COMPOSE_CONF_MAP[compose_file]
-    with open(conf_file) as f:
-        y = yaml.safe_load(f)
-        http_version = y.get('http_version', 1)
-        nrf_port = 80
+NRF_NF_INSTANCES = '/nnrf-nfm/v1/nf-instances'
+
+class NrfClient:
+    """Client of the NRF management API
 
-        if y.get('nfs') and y['nfs'].get('nrf'):
-            nrf_cfg = y['nfs']['nrf']
-            if nrf_cfg.get('sbi') and nrf_cfg['sbi'].get('port'):
-                nrf_port = nrf_cfg['sbi']['port']
+    All the queries share one keep-alive HTTP/1.1 connection. HTTP/2 with
+    prior knowledge (`http_version: 2`) is not available in http.client, so
+    such NRFs are queried through curl.
+    """
 
-        cmd = 'curl -s -X GET '
-        if http_version == 2:
-            cmd = cmd + '--http2-prior-knowledge '
-        cmd = cmd + f'http://192.168.70.130:{nrf_port}/nnrf-nfm/v1/nf-instances?nf-type='
-        return cmd
+    def __init__(self, host, port, http_version=1, timeout=5):
+        self.url = f'http://{host}:{port}'
+        self.http_version = http_version
+        self.connection = None if http_version == 2 else http.client.HTTPConnection(host, port, timeout=timeout)
 
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
 
-def check_config(file_name):
-    """Checks the container configurations
+    def get(self, path):
+        """Returns the body of a 200 answer, None otherwise"""
+        if self.connection is None:
+            return run_cmd(f'curl -s --fail --http2-prior-knowledge "{self.url}{path}"')
+        # A kept-alive connection closed by the NRF is re-opened once
+        for attempt in range(2):
+            try:
+                self.connection.request('GET', path)
+                response = self.connection.getresponse()
+                body = response.read().decode(errors='replace')
+                return body if response.status == 200 else None
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+        return None
+
+    def nf_instances(self, nf_type=None):
+        return self.get(NRF_NF_INSTANCES if nf_type is None else f'{NRF_NF_INSTANCES}?nf-type={nf_type}')
+
+def nrf_client(scenario):
+    return NrfClient(scenario.nrf['address'], scenario.nrf['port'], scenario.http_version)
+
+def _contains_ip(text, ip):
+    # Whole address only: 192.168.70.13 must not match 192.168.70.134
+    return text is not None and re.search(rf'(?<![\d.]){re.escape(ip)}(?![\d.])', text) is not None
+
+def check_nrf_registrations(scenario):
+    """Checks that each NF type is registered to the NRF with its address
+
+    The NRF is queried once for all the nf-instances; only the NF types not
+    found in that answer (or all of them, if the NRF does not support an
+    unfiltered query) are queried by type, over the same connection.
 
     Returns:
-        None
+        list: the NF types not registered
     """
+    registrations = scenario.registrations
+    client = nrf_client(scenario)
+    try:
+        instances = client.nf_instances()
+        missing = [nf for nf, ip in registrations.items() if not _contains_ip(instances, ip)]
+        missing = [nf for nf in missing if not _contains_ip(client.nf_instances(nf), registrations[nf])]
+    finally:
+        client.close()
+    for nf, ip in registrations.items():
+        if nf not in missing:
+            print(f'{nf} {ip}')
+    return missing
+
+def scan_logs(container, patterns):
+    """Reads the logs of a container once and counts the lines matching each pattern
+
+    Stops reading as soon as every pattern has been seen.
 
-    curl_cmd = generate_nrf_curl_cmd(file_name)
+    Returns:
+        dict: pattern -> number of matching lines (None if the logs cannot be read)
+    """
+    counts = dict.fromkeys(patterns, 0)
+    matcher = re.compile('|'.join(f'(?P<p{i}>{re.escape(p)})' for i, p in enumerate(patterns)))
+    names = {f'p{i}': p for i, p in enumerate(patterns)}
+    try:
+        process = subprocess.Popen(['docker', 'logs', container], stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, universal_newlines=True, errors='replace')
+    except OSError:
+        return None
+    seen = set()
+    try:
+        for line in process.stdout:
+            for match in matcher.finditer(line):
+                pattern = names[match.lastgroup]
+                counts[pattern] += 1
+                seen.add(pattern)
+            if len(seen) == len(patterns):
+                break
+    finally:
+        process.kill()
+        process.wait()
+    # Killed once all patterns were seen; a positive code means the logs could not be read
+    if process.returncode > 0 and not seen:
+        return None
+    return counts
+
+def check_config(scenario):
+    """Checks the container configurations
+
+    The NRF query and the log scans run concurrently, and the logs of each
+    container are read once for all the checks on that container.
+
+    Returns:
+        bool: True if the core network is configured
+    """
+    registrations = scenario.registrations
+    log_checks = scenario.log_checks
+    patterns = {}
+    for container, container_patterns, *_ in log_checks:
+        for pattern in container_patterns:
+            if pattern not in patterns.setdefault(container, []):
+                patterns[container].append(pattern)
     deployStatus = True
 
     logging.debug('\033[0;34m Checking if the containers are configured\033[0m....')
-    # With NRF configuration check
-    if args.scenario == '1':
-        logging.debug('\033[0;34m Checking if AMF, SMF and UPF registered with nrf core network\033[0m....')
-        cmd = f'{curl_cmd}"AMF" | grep -o "192.168.70.132"'
-        amf_registration_nrf = run_cmd(cmd, False)
-        if amf_registration_nrf is not None:
-            print(amf_registration_nrf)
-        cmd = f'{curl_cmd}"SMF" | grep -o "192.168.70.133"'
-        smf_registration_nrf = run_cmd(cmd, False)
-        if smf_registration_nrf is not None:
-            print(smf_registration_nrf)
-        if file_name == BASIC_VPP_W_NRF or file_name == BASIC_VPP_W_NRF_REDIRECT or file_name == BASIC_VPP_W_NRF_STEERING:
-            cmd = f'{curl_cmd}"UPF" | grep -o "192.168.70.201"'
-        elif file_name == BASIC_EBPF_W_NRF:
-            cmd = f'{curl_cmd}"UPF" | grep -o "192.168.70.129"'
-        else:
-            cmd = f'{curl_cmd}"UPF" | grep -o "192.168.70.134"'
-        upf_registration_nrf = run_cmd(cmd, False)
-        if upf_registration_nrf is not None:
-            print(upf_registration_nrf)
-        if file_name == BASIC_VPP_W_NRF or file_name == BASIC_W_NRF or file_name == BASIC_EBPF_W_NRF:
-            logging.debug('\033[0;34m Checking if AUSF, UDM and UDR registered with nrf core network\033[0m....')
-            cmd = f'{curl_cmd}"AUSF" | grep -o "192.168.70.138"'
-            ausf_registration_nrf = run_cmd(cmd, False)
-            if ausf_registration_nrf is not None:
-                print(ausf_registration_nrf)
-            cmd = f'{curl_cmd}"UDM" | grep -o "192.168.70.137"'
-            udm_registration_nrf = run_cmd(cmd, False)
-            if udm_registration_nrf is not None:
-                print(udm_registration_nrf)
-            cmd = f'{curl_cmd}"UDR" | grep -o "192.168.70.136"'
-            udr_registration_nrf = run_cmd(cmd, False)
-            if udr_registration_nrf is not None:
-                print(udr_registration_nrf)
-        else:
-            ausf_registration_nrf = True
-            udm_registration_nrf = True
-            udr_registration_nrf = True
-        if amf_registration_nrf is None or smf_registration_nrf is None or upf_registration_nrf is None or \
-           ausf_registration_nrf is None or udm_registration_nrf is None or udr_registration_nrf is None:
-             logging.error('\033[0;31m Registration problem with NRF, check the reason manually\033[0m....')
-             deployStatus = False
-        else:
-            if file_name == BASIC_VPP_W_NRF or file_name == BASIC_W_NRF:
-                logging.debug('\033[0;32m AUSF, UDM, UDR, AMF, SMF and UPF are registered to NRF\033[0m....')
-            else:
-                logging.debug('\033[0;32m AMF, SMF and UPF are registered to NRF\033[0m....')
-        if file_name == BASIC_VPP_W_NRF or file_name == BASIC_VPP_W_NRF_REDIRECT or file_name == BASIC_VPP_W_NRF_STEERING:
-            logging.debug('\033[0;34m Checking if SMF is able to connect with UPF\033[0m....')
-            cmd1 = 'docker logs oai-smf 2>&1 | grep "Received N4 ASSOCIATION SETUP RESPONSE from an UPF"'
-            cmd2 = 'docker logs oai-smf 2>&1 | grep "Node ID Type FQDN: vpp-upf"'
-            upf_logs1 = run_cmd(cmd1)
-            upf_logs2 = run_cmd(cmd2)
-            if upf_logs1 is None or upf_logs2 is None:
-                logging.error('\033[0;31m UPF did not answer to N4 Association request from SMF\033[0m....')
-                deployStatus = False
-            else:
-                logging.debug('\033[0;32m UPF did answer to N4 Association request from SMF\033[0m....')
-            cmd1 = 'docker logs oai-smf 2>&1 | grep "PFCP HEARTBEAT PROCEDURE"'
-            upf_logs1 = run_cmd(cmd1)
-            if upf_logs1 is None:
-                logging.error('\033[0;31m SMF is NOT receiving heartbeats from UPF\033[0m....')
-                deployStatus = False
-            else:
-                logging.debug('\033[0;32m SMF is receiving heartbeats from UPF\033[0m....')
-        elif file_name == BASIC_W_NRF:
-            logging.debug('\033[0;34m Checking if SMF is able to connect with UPF\033[0m....')
-            cmd1 = 'docker logs oai-smf 2>&1 | grep "Received N4 ASSOCIATION SETUP RESPONSE from an UPF"'
-            cmd2 = 'docker logs oai-smf 2>&1 | grep "Resolve IP Addr 192.168.70.134, FQDN oai-upf"'
-            upf_logs1 = run_cmd(cmd1)
-            upf_logs2 = run_cmd(cmd2)
-            if upf_logs1 is None or upf_logs2 is None:
-                logging.error('\033[0;31m UPF did not answer to N4 Association request from SMF\033[0m....')
+    with ThreadPoolExecutor(max_workers=len(patterns) + 1) as pool:
+        nrf_check = pool.submit(check_nrf_registrations, scenario) if registrations else None
+        scans = {container: pool.submit(scan_logs, container, container_patterns)
+                 for container, container_patterns in patterns.items()}
+
+        if nrf_check is not None:
+            logging.debug(f'\033[0;34m Checking if {", ".join(registrations)} registered with nrf core network\033[0m....')
+            missing = nrf_check.result()
+            if missing:
+                logging.error(f'\033[0;31m Registration problem with NRF ({", ".join(missing)}), check the reason manually\033[0m....')
                 deployStatus = False
             else:
-                logging.debug('\033[0;32m UPF did answer to N4 Association request from SMF\033[0m....')
-            cmd1 = 'docker logs oai-smf 2>&1 | grep "PFCP HEARTBEAT PROCEDURE"'
-            upf_logs1 = run_cmd(cmd1)
-            if upf_logs1 is None:
-                logging.error('\033[0;31m SMF is NOT receiving heartbeats from UPF\033[0m....')
-                deployStatus = False
+                logging.debug(f'\033[0;32m {", ".join(registrations)} are registered to NRF\033[0m....')
+
+        for container, container_patterns, require_all, success, error in log_checks:
+            counts = scans[container].result() or {}
+            found = [counts.get(pattern, 0) > 0 for pattern in container_patterns]
+            if all(found) if require_all else any(found):
+                logging.debug(f'\033[0;32m {success}\033[0m....')
             else:
-                logging.debug('\033[0;32m SMF is receiving heartbeats from UPF\033[0m....')
-        else:
-            logging.debug('\033[0;34m Checking if SMF is able to connect with UPF\033[0m....')
-            cmd1 = 'docker logs oai-upf 2>&1 | grep "Received SX HEARTBEAT RESPONSE"'
-            cmd2 = 'docker logs oai-upf 2>&1 | grep "Received SX HEARTBEAT REQUEST"'
-            upf_logs1 = run_cmd(cmd1)
-            upf_logs2 = run_cmd(cmd2)
-            if upf_logs1 is None and upf_logs2 is None:
-                logging.error('\033[0;31m UPF is NOT receiving heartbeats from SMF\033[0m....')
+                logging.error(f'\033[0;31m {error}\033[0m....')
                 deployStatus = False
-            else:
-                logging.debug('\033[0;32m UPF is receiving heartbeats from SMF\033[0m....')
-    # With noNRF configuration checks
-    # Only the Mini-No-NRF is supported anymore.
-    elif args.scenario == '2':
-        logging.debug('\033[0;34m Checking if SMF is able to connect with UPF\033[0m....')
-        cmd1 = 'docker logs oai-smf 2>&1 | grep "Received N4 ASSOCIATION SETUP RESPONSE from an UPF"'
-        cmd2 = 'docker logs oai-smf 2>&1 | grep "Resolve IP Addr 192.168.70.134, FQDN oai-upf"'
-        upf_logs1 = run_cmd(cmd1)
-        upf_logs2 = run_cmd(cmd2)
-        if upf_logs1 is None or upf_logs2 is None:
-            logging.error('\033[0;31m UPF did not answer to N4 Association request from SMF\033[0m....')
-            deployStatus = False
-        else:
-            logging.debug('\033[0;32m UPF did answer to N4 Association request from SMF\033[0m....')
-        status = 0
-        for x in range(4):
-            cmd = "docker logs oai-smf 2>&1 | grep  'handle_receive(16 bytes)'"
-            res = run_cmd(cmd)
-            if res is None:
-               logging.error('\033[0;31m UPF is NOT receiving heartbeats from SMF, re-trying\033[0m....')
-            else:
-                status += 1
-        if status > 2:
-            logging.debug('\033[0;32m UPF is receiving heartbeats from SMF\033[0m....')
-        else:
-            deployStatus = False
     if deployStatus:
         logging.debug('\033[0;32m OAI 5G Core network is configured and healthy\033[0m....')
     else:
@@ -368,69 +725,14 @@ if __name__ == '__main__':
 
     # Parse the arguments to get the deployment instruction
     args = _parse_args()
-    if args.type == 'start-mini':
-        # Mini function with NRF
-        if args.scenario == '1':
-            logging.error('Mini deployments with NRF are no longer supported')
+    action, name = args.type.split('-', 1)
+    scenario = load_scenario(SCENARIOS[name])
+    if action == 'start':
+        # The NRF, or its absence, is part of the deployment
+        if args.scenario != scenario.scenario_id:
+            deployment = 'Mini' if name == 'mini' else 'Basic'
+            logging.error(f'{deployment} deployments {"with" if args.scenario == "1" else "without"} NRF are no longer supported')
             sys.exit(-1)
-        # Mini function without NRF
-        elif args.scenario == '2':
-            deploy(MINI_NO_NRF)
-    elif args.type == 'start-basic':
-        # Basic function with NRF
-        if args.scenario == '1':
-            deploy(BASIC_W_NRF)
-        # Basic function without NRF
-        elif args.scenario == '2':
-            logging.error('Basic deployments without NRF are no longer supported')
-            sys.exit(-1)
-    elif args.type == 'start-basic-vpp':
-        # Basic function with NRF and VPP-UPF
-        if args.scenario == '1':
-            deploy(BASIC_VPP_W_NRF, True)
-        # Basic function without NRF but with VPP-UPF
-        elif args.scenario == '2':
-            logging.error('Basic deployments without NRF are no longer supported')
-            sys.exit(-1)
-    elif args.type == 'start-basic-ebpf':
-        # Basic function with NRF and UPF-eBPF
-        if args.scenario == '1':
-            deploy(BASIC_EBPF_W_NRF, True)
-        # Basic function without NRF but with UPF-eBPF
-        elif args.scenario == '2':
-            logging.error('Basic deployments without NRF are no longer supported')
-            sys.exit(-1)
-    elif args.type == 'start-vpp-redirection':
-        # Basic function with NRF and VPP-UPF
-        if args.scenario == '1':
-            deploy(BASIC_VPP_W_NRF_REDIRECT, True)
-        # Basic function without NRF but with VPP-UPF
-        elif args.scenario == '2':
-            logging.error('Basic deployments without NRF are no longer supported')
-            sys.exit(-1)
-    elif args.type == 'start-vpp-steering':
-        # Basic function with NRF and VPP-UPF
-        if args.scenario == '1':
-            deploy(BASIC_VPP_W_NRF_STEERING, True)
-        # Basic function without NRF but with VPP-UPF
-        elif args.scenario == '2':
-            logging.error('Basic deployments without NRF are no longer supported')
-            sys.exit(-1)
-    elif args.type == 'stop-mini':
-        if args.scenario == '2':
-            undeploy(MINI_NO_NRF)
-    elif args.type == 'stop-basic':
-        if args.scenario == '1':
-            undeploy(BASIC_W_NRF)
-    elif args.type == 'stop-basic-vpp':
-        if args.scenario == '1':
-            undeploy(BASIC_VPP_W_NRF)
-    elif args.type == 'stop-vpp-redirection':
-        if args.scenario == '1':
-            undeploy(BASIC_VPP_W_NRF_REDIRECT)
-    elif args.type == 'stop-vpp-steering':
-        if args.scenario == '1':
-            undeploy(BASIC_VPP_W_NRF_STEERING)
-    elif args.type == 'stop-basic-ebpf':
-        if args.scenario == '1':
-            undeploy(BASIC_EBPF_W_NRF)
+        deploy(scenario)
+    else:
+        undeploy(scenario)
@@ -0,0 +1,176 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+COMPOSE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# core-network.py is a script: load it by path
+spec = importlib.util.spec_from_file_location('core_network', os.path.join(COMPOSE_DIR, 'core-network.py'))
+core_network = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(core_network)
+
+CORE_REGISTRATIONS = {
+    'UDR': '192.168.70.136', 'UDM': '192.168.70.137', 'AUSF': '192.168.70.138',
+    'AMF': '192.168.70.132', 'SMF': '192.168.70.133'
+}
+NRF = {'address': '192.168.70.130', 'port': 8080}
+N4_OK = 'UPF did answer to N4 Association request from SMF'
+N4_KO = 'UPF did not answer to N4 Association request from SMF'
+SMF_HEARTBEATS = [['oai-smf', ['PFCP HEARTBEAT PROCEDURE'], True,
+                   'SMF is receiving heartbeats from UPF', 'SMF is NOT receiving heartbeats from UPF']]
+VPP_LOG_CHECKS = [['oai-smf', ['Received N4 ASSOCIATION SETUP RESPONSE from an UPF', 'Node ID Type FQDN: vpp-upf'],
+                   True, N4_OK, N4_KO]] + SMF_HEARTBEATS
+
+def capture(interfaces, dn_hosts):
+    not_dn = ''.join(f'not host {host} and ' for host in dn_hosts)
+    dn = ' or '.join(f'host {host}' for host in dn_hosts)
+    return (f'nohup sudo tshark {interfaces} -f "({not_dn}not arp and not port 53 and not port 2152) or '
+            f'(({dn}) and icmp)" -w capture.pcap > /dev/null 2>&1 &')
+
+# Models of the SCENARIOS, as hardcoded in the former core-network.py
+EXPECTED = {
+    'mini': {
+        'nrf': None,
+        'registrations': {},
+        'log_checks': [
+            ['oai-smf', ['Received N4 ASSOCIATION SETUP RESPONSE from an UPF',
+                         'Resolve IP Addr 192.168.70.134, FQDN oai-upf'], True, N4_OK, N4_KO],
+            ['oai-smf', ['handle_receive(16 bytes)'], True,
+             'UPF is receiving heartbeats from SMF', 'UPF is NOT receiving heartbeats from SMF']
+        ],
+        'capture': capture('-i demo-oai', ['192.168.70.135'])
+    },
+    'basic': {
+        'nrf': NRF,
+        'registrations': dict(CORE_REGISTRATIONS, UPF='192.168.70.134'),
+        'log_checks': [['oai-smf', ['Received N4 ASSOCIATION SETUP RESPONSE from an UPF',
+                                    'Resolve IP Addr 192.168.70.134, FQDN oai-upf'], True, N4_OK, N4_KO]]
+                      + SMF_HEARTBEATS,
+        'capture': capture('-i demo-oai', ['192.168.70.135'])
+    },
+    'basic-vpp': {
+        'nrf': NRF,
+        'registrations': dict(CORE_REGISTRATIONS, UPF='192.168.70.201'),
+        'log_checks': VPP_LOG_CHECKS,
+        'capture': capture('-i demo-oai -i cn5g-access -i cn5g-core', ['192.168.73.135'])
+    },
+    'basic-ebpf': {
+        'nrf': NRF,
+        'registrations': dict(CORE_REGISTRATIONS, UPF='192.168.70.129'),
+        'log_checks': [['oai-upf', ['Received SX HEARTBEAT RESPONSE', 'Received SX HEARTBEAT REQUEST'], False,
+                        'UPF is receiving heartbeats from SMF', 'UPF is NOT receiving heartbeats from SMF']],
+        'capture': capture('-i demo-oai -i demo-n3 -i demo-n6', ['192.168.70.135', '192.168.71.135', '192.168.72.135'])
+    },
+    'vpp-redirection': {
+        'nrf': NRF,
+        'registrations': dict(CORE_REGISTRATIONS, PCF='192.168.70.139', UPF='192.168.70.201'),
+        'log_checks': VPP_LOG_CHECKS,
+        'capture': capture('-i demo-oai -i cn5g-access -i cn5g-core', ['192.168.73.135'])
+    },
+    'vpp-steering': {
+        'nrf': NRF,
+        'registrations': dict(CORE_REGISTRATIONS, PCF='192.168.70.139', UPF='192.168.70.201'),
+        'log_checks': VPP_LOG_CHECKS,
+        'capture': capture('-i demo-oai -i cn5g-access -i cn5g-core-pri -i cn5g-core-sec',
+                           ['192.168.73.135', '192.168.74.135'])
+    }
+}
+
+MINIMAL_COMPOSE = """
+services:
+  oai-nrf:
+    image: oaisoftwarealliance/oai-nrf:v2.0.1
+    networks:
+      public_net:
+        ipv4_address: {nrf_address}
+networks:
+  public_net:
+    driver_opts:
+      com.docker.network.bridge.name: "demo-oai"
+"""
+
+class TestScenario(unittest.TestCase):
+    def setUp(self):
+        # Compose files and COMPOSE_CONF_MAP entries are relative to the docker-compose directory
+        self.cwd = os.getcwd()
+        os.chdir(COMPOSE_DIR)
+        self.addCleanup(os.chdir, self.cwd)
+
+    def test_scenarios_match_the_former_hardcoded_checks(self):
+        self.assertEqual(set(core_network.SCENARIOS), set(EXPECTED))
+        for name, compose_file in core_network.SCENARIOS.items():
+            with self.subTest(scenario=name):
+                scenario = core_network.Scenario.parse(compose_file)
+                expected = EXPECTED[name]
+                self.assertEqual(scenario.nrf, expected['nrf'])
+                self.assertEqual(scenario.scenario_id, '2' if expected['nrf'] is None else '1')
+                self.assertEqual(scenario.registrations, expected['registrations'])
+                self.assertEqual(scenario.log_checks, expected['log_checks'])
+                self.assertEqual(core_network._capture_cmd(scenario, 'capture.pcap'), expected['capture'])
+                self.assertEqual(core_network.Scenario.from_dict(scenario.to_dict()).to_dict(), scenario.to_dict())
+
+    def test_contains_ip_matches_whole_addresses(self):
+        self.assertTrue(core_network._contains_ip('{"ipv4Addresses":["192.168.70.13"]}', '192.168.70.13'))
+        self.assertFalse(core_network._contains_ip('{"ipv4Addresses":["192.168.70.134"]}', '192.168.70.13'))
+        self.assertFalse(core_network._contains_ip('{"ipv4Addresses":["10.192.168.70.13"]}', '192.168.70.13'))
+        self.assertFalse(core_network._contains_ip(None, '192.168.70.13'))
+
+class TestLoadScenario(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        cache_dir = mock.patch.object(core_network, 'SCENARIO_CACHE_DIR', os.path.join(self.directory, 'cache'))
+        cache_dir.start()
+        self.addCleanup(cache_dir.stop)
+        self.compose_file = os.path.join(self.directory, 'docker-compose-test.yaml')
+        self.write_compose('192.168.70.130')
+
+    def write_compose(self, nrf_address):
+        with open(self.compose_file, 'w') as f:
+            f.write(MINIMAL_COMPOSE.format(nrf_address=nrf_address))
+
+    def test_cache_is_reused_until_the_file_changes(self):
+        with mock.patch.object(core_network.Scenario, 'parse', wraps=core_network.Scenario.parse) as parse:
+            self.assertEqual(core_network.load_scenario(self.compose_file).nrf['address'], '192.168.70.130')
+            cached = core_network.load_scenario(self.compose_file)
+            self.assertEqual(parse.call_count, 1)
+            self.assertEqual(cached.nrf, {'address': '192.168.70.130', 'port': 80})
+            self.assertEqual(cached.capture_interfaces, ['demo-oai'])
+
+            self.write_compose('192.168.70.150')
+            self.assertEqual(core_network.load_scenario(self.compose_file).nrf['address'], '192.168.70.150')
+            self.assertEqual(parse.call_count, 2)
+
+class TestHealthWaiter(unittest.TestCase):
+    def setUp(self):
+        self.waiter = core_network.HealthWaiter('docker-compose-basic-nrf.yaml', ['oai-smf', 'oai-upf'])
+        self.waiter.seeded_at = 1000
+        self.waiter.states = {'oai-smf': 'starting', 'oai-upf': 'starting'}
+
+    def event(self, action, service='oai-smf', time_nano=2000, config_files='/src/docker-compose-basic-nrf.yaml'):
+        return {'Action': action, 'timeNano': time_nano,
+                'Actor': {'Attributes': {'com.docker.compose.service': service,
+                                         'com.docker.compose.project.config_files': config_files}}}
+
+    def test_events_update_the_state_of_their_service(self):
+        self.waiter._apply_event(self.event('health_status: healthy'))
+        self.waiter._apply_event(self.event('die', service='oai-upf'))
+        self.assertEqual(self.waiter.states, {'oai-smf': 'healthy', 'oai-upf': 'exited'})
+        self.assertEqual(self.waiter.failed(), ['oai-upf'])
+
+        self.waiter.has_healthcheck['oai-upf'] = False
+        self.waiter._apply_event(self.event('start', service='oai-upf'))
+        self.assertTrue(self.waiter.healthy())
+
+    def test_stale_and_foreign_events_are_ignored(self):
+        self.waiter._apply_event(self.event('die', time_nano=999))  # Older than the inspection
+        self.waiter._apply_event(self.event('die', config_files='/src/docker-compose-basic-vpp-nrf.yaml'))
+        self.waiter._apply_event(self.event('die', service='mysql'))
+        self.assertEqual(self.waiter.states, {'oai-smf': 'starting', 'oai-upf': 'starting'})
+        self.assertEqual(self.waiter.failed(), [])
+
+if __name__ == '__main__':
+    unittest.main()